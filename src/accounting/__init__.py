@@ -33,12 +33,16 @@ data_dir: Path = Path(__file__).parent / "data"
 
 
 def init_app(app: Flask, user_utils: UserUtilityInterface,
-             url_prefix: str = "/accounting") -> None:
+             url_prefix: str = "/accounting",
+             read_bind: str | None = None) -> None:
     """Initialize the application.
 
     :param app: The Flask application.
     :param user_utils: The user utilities.
     :param url_prefix: The URL prefix of the accounting application.
+    :param read_bind: The bind key in SQLALCHEMY_BINDS of the secondary
+        database for the read-only traffic, like the reports, the search, the
+        lists, and the details, or None to read from the primary database.
     :return: None.
     """
     # The database instance must be set before loading everything
@@ -63,19 +67,35 @@ def init_app(app: Flask, user_utils: UserUtilityInterface,
     bp.add_app_template_global(default_currency_code,
                                "accounting_default_currency_code")
 
-    from .commands import init_db_command, titleize_command
+    from .commands import init_db_command, upgrade_db_command, \
+        titleize_command, classify_accounts_command, build_assets_command, \
+        archive_command, reclassify_command, export_reports_command, \
+        changes_command
     app.cli.add_command(init_db_command)
+    app.cli.add_command(upgrade_db_command)
     app.cli.add_command(titleize_command)
+    app.cli.add_command(classify_accounts_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(archive_command)
+    app.cli.add_command(reclassify_command)
+    app.cli.add_command(export_reports_command)
+    app.cli.add_command(changes_command)
 
     from . import locale
     locale.init_app(app, bp)
 
+    from . import assets
+    assets.init_app(bp)
+
     from .utils import permission
     permission.init_app(bp, user_utils)
 
     from .utils import next_uri
     next_uri.init_app(bp)
 
+    from .utils import read_routing
+    read_routing.init_app(app, read_bind)
+
     from . import base_account
     base_account.init_app(app, bp)
 
@@ -94,4 +114,10 @@ def init_app(app: Flask, user_utils: UserUtilityInterface,
     from . import option
     option.init_app(bp)
 
+    from . import reclassify
+    reclassify.init_app(bp)
+
+    from . import change_log
+    change_log.init_app(app, bp)
+
     app.register_blueprint(bp, url_prefix=url_prefix)
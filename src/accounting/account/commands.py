@@ -68,11 +68,13 @@ def init_accounts_command(username: str) -> None:
     for base in bases_to_add:
         l10n: dict[str, str] = {x.locale: x.title for x in base.l10n}
         account_id: int = get_new_id()
+        is_need_offset: bool = __is_need_offset(base.code)
         data.append({"id": account_id,
                      "base_code": base.code,
                      "no": 1,
                      "title_l10n": base.title_l10n,
-                     "is_need_offset": __is_need_offset(base.code),
+                     "is_need_offset": is_need_offset,
+                     **Account.classification(base.code, is_need_offset),
                      "created_by_id": creator_pk,
                      "updated_by_id": creator_pk})
         for locale in {"zh_Hant", "zh_Hans"}:
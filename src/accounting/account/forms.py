@@ -20,7 +20,7 @@
 import sqlalchemy as sa
 from flask import request
 from flask_wtf import FlaskForm
-from wtforms import StringField, BooleanField
+from wtforms import StringField, BooleanField, IntegerField
 from wtforms.validators import DataRequired, ValidationError
 
 from accounting import db
@@ -83,6 +83,8 @@ class AccountForm(FlaskForm):
     is_need_offset = BooleanField(
         validators=[NoOffsetNominalAccount()])
     """Whether the the journal entry line items of this account need offset."""
+    version = IntegerField()
+    """The version of the account that the form was based on."""
 
     def populate_obj(self, obj: Account) -> None:
         """Populates the form data into an account object.
@@ -28,12 +28,13 @@ from accounting import db
 from accounting.locale import lazy_gettext
 from accounting.models import Account, BaseAccount
 from accounting.utils.cast import s
+from accounting.utils.concurrency import is_stale, try_commit
 from accounting.utils.flash_errors import flash_form_errors
 from accounting.utils.next_uri import inherit_next, or_next
 from accounting.utils.pagination import Pagination
 from accounting.utils.permission import can_view, has_permission, can_edit
+from accounting.utils.read_routing import read_only
 from accounting.utils.user import get_current_user_pk
-from .forms import AccountForm, sort_accounts_in, AccountReorderForm
 from .queries import get_account_query
 
 bp: Blueprint = Blueprint("account", __name__)
@@ -42,6 +43,7 @@ bp: Blueprint = Blueprint("account", __name__)
 
 @bp.get("", endpoint="list")
 @has_permission(can_view)
+@read_only
 def list_accounts() -> str:
     """Lists the accounts.
 
@@ -60,6 +62,7 @@ def show_add_account_form() -> str:
 
     :return: The form to add an account.
     """
+    from .forms import AccountForm
     if "form" in session:
         form = AccountForm(ImmutableMultiDict(parse_qsl(session["form"])))
         del session["form"]
@@ -78,6 +81,7 @@ def add_account() -> redirect:
     :return: The redirection to the account detail on success, or the account
         creation form on error.
     """
+    from .forms import AccountForm
     form = AccountForm(request.form)
     if not form.validate():
         flash_form_errors(form)
@@ -93,6 +97,7 @@ def add_account() -> redirect:
 
 @bp.get("<account:account>", endpoint="detail")
 @has_permission(can_view)
+@read_only
 def show_account_detail(account: Account) -> str:
     """Shows the account detail.
 
@@ -110,6 +115,7 @@ def show_account_edit_form(account: Account) -> str:
     :param account: The account.
     :return: The form to edit the account.
     """
+    from .forms import AccountForm
     form: AccountForm
     if "form" in session:
         form = AccountForm(ImmutableMultiDict(parse_qsl(session["form"])))
@@ -130,12 +136,14 @@ def update_account(account: Account) -> redirect:
     :return: The redirection to the account detail on success, or the account
         edit form on error.
     """
+    from .forms import AccountForm
     form = AccountForm(request.form)
+    if is_stale(account, form.version.data):
+        return __conflict(__get_edit_uri(account))
     if not form.validate():
         flash_form_errors(form)
         session["form"] = urlencode(list(request.form.items()))
-        return redirect(inherit_next(url_for("accounting.account.edit",
-                                             account=account)))
+        return redirect(__get_edit_uri(account))
     with db.session.no_autoflush:
         form.populate_obj(account)
     if not account.is_modified:
@@ -143,7 +151,9 @@ def update_account(account: Account) -> redirect:
         return redirect(inherit_next(__get_detail_uri(account)))
     account.updated_by_id = get_current_user_pk()
     account.updated_at = sa.func.now()
-    db.session.commit()
+    edit_uri: str = __get_edit_uri(account)
+    if not try_commit():
+        return __conflict(edit_uri)
     flash(s(lazy_gettext("The account is updated successfully.")), "success")
     return redirect(inherit_next(__get_detail_uri(account)))
 
@@ -157,18 +167,22 @@ def delete_account(account: Account) -> redirect:
     :return: The redirection to the account list on success, or the account
         detail on error.
     """
+    from .forms import sort_accounts_in
     if not account.can_delete:
         flash(s(lazy_gettext("The account cannot be deleted.")), "error")
         return redirect(inherit_next(__get_detail_uri(account)))
+    detail_uri: str = __get_detail_uri(account)
     account.delete()
     sort_accounts_in(account.base_code, account.id)
-    db.session.commit()
+    if not try_commit():
+        return __conflict(inherit_next(detail_uri))
     flash(s(lazy_gettext("The account is deleted successfully.")), "success")
     return redirect(or_next(__get_list_uri()))
 
 
 @bp.get("bases/<baseAccount:base>", endpoint="order")
 @has_permission(can_view)
+@read_only
 def show_account_order(base: BaseAccount) -> str:
     """Shows the order of the accounts under a same base account.
 
@@ -184,15 +198,19 @@ def sort_accounts(base: BaseAccount) -> redirect:
     """Reorders the accounts under a base account.
 
     :param base: The base account.
-    :return: The redirection to the incoming account or the account list.  The
-        reordering operation does not fail.
+    :return: The redirection to the incoming account or the account list, or
+        the order of the accounts if the order was changed by someone else in
+        between.
     """
+    from .forms import AccountReorderForm
     form: AccountReorderForm = AccountReorderForm(base)
     form.save_order()
     if not form.is_modified:
         flash(s(lazy_gettext("The order was not modified.")), "success")
         return redirect(or_next(__get_list_uri()))
-    db.session.commit()
+    if not try_commit():
+        return __conflict(inherit_next(url_for("accounting.account.order",
+                                               base=base)))
     flash(s(lazy_gettext("The order is updated successfully.")), "success")
     return redirect(or_next(__get_list_uri()))
 
@@ -206,6 +224,28 @@ def __get_detail_uri(account: Account) -> str:
     return url_for("accounting.account.detail", account=account)
 
 
+def __get_edit_uri(account: Account) -> str:
+    """Returns the edit URI of an account.
+
+    :param account: The account.
+    :return: The edit URI of the account.
+    """
+    return inherit_next(url_for("accounting.account.edit", account=account))
+
+
+def __conflict(uri: str) -> redirect:
+    """Reports that the accounts were changed by someone else in between,
+    and redirects to where the newer data can be reviewed.
+
+    :param uri: The URI to review the newer data.
+    :return: The redirection to the URI.
+    """
+    flash(s(lazy_gettext("The account was changed by someone else."
+                         "  Please review the latest version and try"
+                         " again.")), "error")
+    return redirect(uri)
+
+
 def __get_list_uri() -> str:
     """Returns the account list URI.
 
@@ -0,0 +1,195 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The static asset bundles.
+
+The JavaScript and CSS files of each page are concatenated and minified into
+a bundle by the "accounting-build-assets" console command at build time.
+The bundles are written with their content hashes in their file names, and
+are listed in a manifest.  Since the content of a file name never changes,
+they are served with a long-lived immutable cache.  When the bundles are not
+built, or in the debug mode, the original files are served instead.
+
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from flask import Blueprint, Response, current_app, url_for, \
+    send_from_directory
+
+static_dir: Path = Path(__file__).parent / "static"
+"""The static file directory."""
+BUNDLES: dict[str, list[str]] = {
+    "style.css": ["css/style.css"],
+    "base.js": ["js/timezone.js"],
+    "account-form.js": ["js/account-form.js"],
+    "account-order.js": ["js/drag-and-drop-reorder.js",
+                         "js/account-order.js"],
+    "currency-form.js": ["js/currency-form.js"],
+    "journal-entry-form.js": ["js/drag-and-drop-reorder.js",
+                              "js/journal-entry-form.js",
+                              "js/journal-entry-line-item-editor.js",
+                              "js/journal-entry-account-selector.js",
+                              "js/original-line-item-selector.js",
+                              "js/description-editor.js"],
+    "journal-entry-order.js": ["js/drag-and-drop-reorder.js",
+                               "js/journal-entry-order.js"],
+    "option-form.js": ["js/drag-and-drop-reorder.js", "js/option-form.js"],
+    "report.js": ["js/material-fab-speed-dial.js", "js/period-chooser.js"],
+    "report-search.js": ["js/material-fab-speed-dial.js"]}
+"""The source files of the bundles, in their loading order."""
+MANIFEST: str = "manifest.json"
+"""The file name of the manifest."""
+BANNER: str = "/* The Mia! Accounting Project, Copyright (c) imacat.  " \
+              "Licensed under the Apache License, Version 2.0. */\n"
+"""The license banner of the bundles."""
+MAX_AGE: int = 365 * 24 * 60 * 60
+"""The number of seconds to cache the bundles."""
+__manifest: tuple[Path, float, dict[str, str]] | None = None
+"""The cached manifest, with its path and modification time."""
+
+
+def get_assets_dir() -> Path:
+    """Returns the directory of the built bundles.  It can be changed with the
+    ACCOUNTING_ASSETS_DIR configuration.
+
+    :return: The directory of the built bundles.
+    """
+    return Path(current_app.config.get("ACCOUNTING_ASSETS_DIR",
+                                       static_dir / "dist"))
+
+
+def minify_js(source: str) -> str:
+    """Minifies the JavaScript source.  Only the whole-line comments, the
+    indentation, and the blank lines are removed, so that the strings, the
+    regular expressions, and the automatic semicolon insertion are not
+    affected.
+
+    :param source: The JavaScript source.
+    :return: The minified JavaScript.
+    """
+    lines: list[str] = []
+    is_in_comment: bool = False
+    for line in source.splitlines():
+        line = line.strip()
+        if is_in_comment:
+            if "*/" not in line:
+                continue
+            line = line[line.index("*/") + 2:].strip()
+            is_in_comment = False
+        if line.startswith("/*"):
+            if "*/" not in line:
+                is_in_comment = True
+                continue
+            line = line[line.index("*/") + 2:].strip()
+        if line == "" or line.startswith("//"):
+            continue
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def minify_css(source: str) -> str:
+    """Minifies the CSS source.  The comments, the indentation, and the blank
+    lines are removed.
+
+    :param source: The CSS source.
+    :return: The minified CSS.
+    """
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.DOTALL)
+    lines: list[str] = [x.strip() for x in source.splitlines()]
+    return "\n".join([x for x in lines if x != ""]) + "\n"
+
+
+def build_bundles(output_dir: Path) -> dict[str, str]:
+    """Builds the bundles into the output directory, and writes the manifest.
+
+    :param output_dir: The output directory.
+    :return: The manifest, the file names of the bundles by their names.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest: dict[str, str] = {}
+    for name, files in BUNDLES.items():
+        minify = minify_css if name.endswith(".css") else minify_js
+        content: bytes = (BANNER + "".join(
+            [minify((static_dir / x).read_text(encoding="utf-8"))
+             for x in files])).encode("utf-8")
+        digest: str = hashlib.sha256(content).hexdigest()[:12]
+        stem, suffix = name.rsplit(".", 1)
+        filename: str = f"{stem}.{digest}.{suffix}"
+        (output_dir / filename).write_bytes(content)
+        manifest[name] = filename
+    (output_dir / MANIFEST).write_text(
+        json.dumps(manifest, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8")
+    return manifest
+
+
+def __get_manifest() -> dict[str, str]:
+    """Returns the manifest of the built bundles.  It is read again only when
+    the manifest file is changed.
+
+    :return: The manifest, or an empty dictionary if the bundles are not
+        built.
+    """
+    global __manifest
+    path: Path = get_assets_dir() / MANIFEST
+    try:
+        mtime: float = path.stat().st_mtime
+    except FileNotFoundError:
+        return {}
+    if __manifest is None or __manifest[0] != path or __manifest[1] != mtime:
+        __manifest = (path, mtime,
+                      json.loads(path.read_text(encoding="utf-8")))
+    return __manifest[2]
+
+
+def asset_urls(name: str) -> list[str]:
+    """Returns the URLs to load a bundle.  In the debug mode, or when the
+    bundles are not built, these are the URLs of the original files.
+
+    :param name: The bundle name.
+    :return: The URLs to load the bundle.
+    """
+    if not current_app.debug:
+        manifest: dict[str, str] = __get_manifest()
+        if name in manifest:
+            return [url_for("accounting.assets", filename=manifest[name])]
+    return [url_for("accounting.static", filename=x) for x in BUNDLES[name]]
+
+
+def __serve_asset(filename: str) -> Response:
+    """Serves a built bundle, with a long-lived immutable cache.
+
+    :param filename: The file name of the bundle.
+    :return: The response.
+    """
+    response: Response = send_from_directory(get_assets_dir(), filename,
+                                             max_age=MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_app(bp: Blueprint) -> None:
+    """Initializes the application.
+
+    :param bp: The blueprint of the accounting application.
+    :return: None.
+    """
+    bp.add_url_rule("/assets/<path:filename>", "assets", __serve_asset)
+    bp.add_app_template_global(asset_urls, "accounting_asset_urls")
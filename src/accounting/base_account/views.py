@@ -22,6 +22,7 @@ from flask import Blueprint, render_template
 from accounting.models import BaseAccount
 from accounting.utils.pagination import Pagination
 from accounting.utils.permission import has_permission, can_view
+from accounting.utils.read_routing import read_only
 from .queries import get_base_account_query
 
 bp: Blueprint = Blueprint("base-account", __name__)
@@ -30,6 +31,7 @@ bp: Blueprint = Blueprint("base-account", __name__)
 
 @bp.get("", endpoint="list")
 @has_permission(can_view)
+@read_only
 def list_accounts() -> str:
     """Lists the base accounts.
 
@@ -43,6 +45,7 @@ def list_accounts() -> str:
 
 @bp.get("<baseAccount:account>", endpoint="detail")
 @has_permission(can_view)
+@read_only
 def show_account_detail(account: BaseAccount) -> str:
     """Shows the account detail.
 
@@ -0,0 +1,289 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The capture of the changes into the change log.
+
+The changes of the journal entries, the accounts, the currencies, and the
+options are captured from the database session, and appended to the change
+log in the same transaction when it is committed.  The changes of the ORM
+entities are found when they are flushed.  The rows inserted, updated, or
+deleted in bulk are found when the statement is executed.  They are merged
+into one change for each record in the transaction.  A change of a line item
+is an update of its journal entry, and a change of a localized title is an
+update of its account or currency.
+
+The sequence numbers are taken from the row of the change counter right
+before the commit, and the data generation on the row is increased.  The row
+stays locked until the commit, so that the transactions that take the
+sequence numbers later commit later, and a downstream system that has seen a
+sequence number never misses a change before it.
+
+The archive moves the journal entries into the archive tables without
+changing them, and is not captured, by executing its statements with the
+LOGGED execution option set to False.  It marks the data as changed instead,
+so that the data generation is still increased.
+
+When a transaction with changes is committed, the changes_committed signal is
+sent with the Flask application, for the caches that depend on the data.
+
+"""
+from collections.abc import Callable
+from typing import Any
+
+import sqlalchemy as sa
+from blinker import Namespace, NamedSignal
+from flask import Flask, current_app, has_app_context
+
+from accounting import db
+from accounting.models import Account, AccountL10n, Change, \
+    ChangeCounter, Currency, CurrencyL10n, JournalEntry, \
+    JournalEntryLineItem, Option
+
+LOGGED: str = "accounting_logged"
+"""The execution option whether the statement is captured, default True."""
+__PENDING: str = "accounting_pending_changes"
+"""The key of the session info that keeps the changes to append."""
+__CHANGED: str = "accounting_changes_logged"
+"""The key of the session info that changes are logged in the transaction."""
+changes_committed: NamedSignal = Namespace().signal("changes-committed")
+"""The signal sent with the Flask application when a transaction with changes
+is committed."""
+
+Identity = tuple[str, str, bool]
+"""The identity of a change, as the model, the key, and whether the record
+is the record of the model itself, but not its line item or localized
+title."""
+
+
+def __identify(cls: type, get: Callable[[str], Any]) -> Identity | None:
+    """Returns the identity of a change of a record.
+
+    :param cls: The model class of the record.
+    :param get: The function to get a column value of the record.
+    :return: The identity of the change, or None if the model is not in the
+        change log.
+    """
+    if issubclass(cls, JournalEntry):
+        return "journal-entry", str(get("id")), True
+    if issubclass(cls, JournalEntryLineItem):
+        return "journal-entry", str(get("journal_entry_id")), False
+    if issubclass(cls, Account):
+        return "account", str(get("id")), True
+    if issubclass(cls, AccountL10n):
+        return "account", str(get("account_id")), False
+    if issubclass(cls, Currency):
+        return "currency", get("code"), True
+    if issubclass(cls, CurrencyL10n):
+        return "currency", get("currency_code"), False
+    if issubclass(cls, Option):
+        return "option", get("name"), True
+    return None
+
+
+def __add(changes: dict[tuple[str, str], str], identity: Identity | None,
+          operation: str) -> None:
+    """Adds a change.  A creation or a deletion of a record is not replaced
+    by its updates, or the updates of its line items or localized titles, but
+    is replaced by a later creation or deletion.
+
+    :param changes: The operations by the models and the keys.
+    :param identity: The identity of the change, or None if the model is not
+        in the change log.
+    :param operation: The operation.
+    :return: None.
+    """
+    if identity is None:
+        return
+    model, key, is_self = identity
+    if not is_self:
+        operation = "update"
+    if operation == "update" \
+            and changes.get((model, key)) in {"create", "delete"}:
+        return
+    changes[(model, key)] = operation
+
+
+def __append(session: sa.orm.Session,
+             changes: dict[tuple[str, str], str]) -> None:
+    """Appends the changes to the change log, with the sequence numbers from
+    the change counter.  The data generation is increased even when there is
+    no change to append, for the changes that are not logged.
+
+    :param session: The session.
+    :param changes: The operations by the models and the keys.
+    :return: None.
+    """
+    last: int = __advance(session.connection(), len(changes))
+    if len(changes) == 0:
+        return
+    session.connection().execute(
+        sa.insert(Change.__table__),
+        [{"seq": last + i, "model": x[0], "key": x[1],
+          "operation": changes[x]}
+         for i, x in enumerate(changes, start=1)])
+
+
+def __advance(connection: sa.Connection, count: int) -> int:
+    """Advances the change counter, taking the sequence numbers and
+    increasing the data generation.  The row of the counter is updated first,
+    so that it is locked until the transaction ends.  The counter is created
+    from the change log when it does not exist yet.
+
+    :param connection: The database connection.
+    :param count: The number of the sequence numbers to take.
+    :return: The last sequence number before the taken ones.
+    """
+    counter: sa.Table = ChangeCounter.__table__
+    result: sa.CursorResult = connection.execute(
+        sa.update(counter).where(counter.c.id == 1)
+        .values(seq=counter.c.seq + count,
+                generation=counter.c.generation + 1))
+    if result.rowcount == 0:
+        connection.execute(sa.insert(counter).values(
+            id=1,
+            seq=sa.select(sa.func.coalesce(sa.func.max(Change.seq), 0)
+                          + count).scalar_subquery(),
+            generation=1))
+    return connection.scalar(sa.select(counter.c.seq)
+                             .where(counter.c.id == 1)) - count
+
+
+def __after_flush(session: sa.orm.Session, _) -> None:
+    """Keeps the changes of the flushed records until the commit.
+
+    :param session: The session.
+    :return: None.
+    """
+    changes: dict[tuple[str, str], str] \
+        = session.info.setdefault(__PENDING, {})
+    for operation, records in [
+            ("create", session.new),
+            ("update", [x for x in session.dirty if session.is_modified(x)]),
+            ("delete", session.deleted)]:
+        for record in records:
+            __add(changes, __identify(type(record),
+                                      lambda x: getattr(record, x)),
+                  operation)
+    if len(changes) > 0:
+        session.info[__CHANGED] = True
+
+
+def __do_orm_execute(state: sa.orm.ORMExecuteState) -> None:
+    """Keeps the changes of the records inserted, updated, or deleted in bulk
+    until the commit.  The records to update or delete are selected before
+    the statement is executed.
+
+    :param state: The ORM execution state.
+    :return: None.
+    """
+    if state.bind_mapper is None \
+            or not state.execution_options.get(LOGGED, True):
+        return
+    cls: type = state.bind_mapper.class_
+    rows: list[Any]
+    operation: str
+    if state.is_insert:
+        if state.parameters is None:
+            return
+        rows = state.parameters if isinstance(state.parameters, list) \
+            else [state.parameters]
+        operation = "create"
+    elif state.is_update or state.is_delete:
+        if __identify(cls, lambda x: None) is None:
+            return
+        select: sa.Select = sa.select(*cls.__table__.c)
+        if state.statement.whereclause is not None:
+            select = select.where(state.statement.whereclause)
+        rows = [x._mapping for x in state.session.execute(select)]
+        operation = "update" if state.is_update else "delete"
+    else:
+        return
+    changes: dict[tuple[str, str], str] \
+        = state.session.info.setdefault(__PENDING, {})
+    for row in rows:
+        __add(changes, __identify(cls, row.get), operation)
+    if len(changes) > 0:
+        state.session.info[__CHANGED] = True
+
+
+def __before_commit(session: sa.orm.Session) -> None:
+    """Appends the changes to the change log before the commit.
+
+    :param session: The session.
+    :return: None.
+    """
+    session.flush()
+    changes: dict[tuple[str, str], str] = session.info.pop(__PENDING, {})
+    if session.info.get(__CHANGED, False):
+        __append(session, changes)
+
+
+def __after_commit(session: sa.orm.Session) -> None:
+    """Sends the changes_committed signal when changes are committed.
+
+    :param session: The session.
+    :return: None.
+    """
+    if session.info.pop(__CHANGED, False) and has_app_context():
+        changes_committed.send(current_app._get_current_object())
+
+
+def __after_rollback(session: sa.orm.Session) -> None:
+    """Discards the pending changes and the mark of the logged changes.
+
+    :param session: The session.
+    :return: None.
+    """
+    session.info.pop(__PENDING, None)
+    session.info.pop(__CHANGED, None)
+
+
+def mark_changed(session: sa.orm.Session) -> None:
+    """Marks the data as changed in the current transaction of a session, for
+    the changes that are not logged, so that the data generation is still
+    increased and the changes_committed signal is still sent.
+
+    :param session: The session.
+    :return: None.
+    """
+    session.info[__CHANGED] = True
+
+
+def is_changed(session: sa.orm.Session) -> bool:
+    """Returns whether there are changes in the current transaction of a
+    session, but not committed yet.
+
+    :param session: The session.
+    :return: True if there are changes not committed yet, or False
+        otherwise.
+    """
+    return session.info.get(__CHANGED, False)
+
+
+def init_app(app: Flask) -> None:
+    """Initializes the application.
+
+    :param app: The Flask application.
+    :return: None.
+    """
+    listeners: dict[str, Callable] = {"after_flush": __after_flush,
+                                      "do_orm_execute": __do_orm_execute,
+                                      "before_commit": __before_commit,
+                                      "after_commit": __after_commit,
+                                      "after_rollback": __after_rollback}
+    for name, listener in listeners.items():
+        if not sa.event.contains(db.session, name, listener):
+            sa.event.listen(db.session, name, listener)
@@ -0,0 +1,68 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The queries for the change log.
+
+"""
+from typing import Any
+
+import sqlalchemy as sa
+
+from accounting import db
+from accounting.models import Change, ChangeCounter
+
+
+def get_changes(after: int, limit: int) -> list[Change]:
+    """Returns the changes after a sequence number.  The changes are found
+    from the sequence number on the primary key, so that the cost is in
+    proportion to the number of the changes, but not the size of the data.
+    The sequence numbers are given out in the order of the commits, so that
+    no change is committed later with a sequence number before the returned
+    ones.
+
+    :param after: The sequence number after which to return the changes, or
+        0 from the beginning.
+    :param limit: The maximum number of the changes to return.
+    :return: The changes in the order of their sequence numbers.
+    """
+    return list(db.session.scalars(sa.select(Change)
+                                   .filter(Change.seq > after)
+                                   .order_by(Change.seq)
+                                   .limit(limit)))
+
+
+def get_generation(session: sa.orm.Session) -> int:
+    """Returns the data generation on the change counter.  It is increased by
+    every committed transaction that changes the data.
+
+    :param session: The database session.
+    :return: The data generation, or 0 if nothing was changed.
+    """
+    return session.scalar(sa.select(ChangeCounter.generation)
+                          .filter(ChangeCounter.id == 1)) or 0
+
+
+def change_json(change: Change) -> dict[str, Any]:
+    """Returns the JSON representation of a change.
+
+    :param change: The change.
+    :return: The JSON representation of the change.
+    """
+    return {"seq": change.seq,
+            "model": change.model,
+            "key": change.key,
+            "operation": change.operation,
+            "changed_at": change.changed_at.isoformat()}
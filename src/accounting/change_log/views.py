@@ -0,0 +1,53 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The views for the change log.
+
+"""
+from typing import Any
+
+from flask import Blueprint, request
+
+from accounting.models import Change
+from accounting.utils.permission import has_permission, can_view
+from .queries import get_changes, change_json
+
+DEFAULT_LIMIT: int = 100
+"""The default number of the changes in a page."""
+MAX_LIMIT: int = 1000
+"""The maximum number of the changes in a page."""
+
+api_bp: Blueprint = Blueprint("change-log-api", __name__)
+"""The view blueprint for the change log API."""
+
+
+@api_bp.get("", endpoint="list")
+@has_permission(can_view)
+def list_changes() -> dict[str, Any]:
+    """Returns a page of the changes after the cursor.
+
+    :return: The changes in the page, the cursor of the next page, and
+        whether there are more changes.
+    """
+    after: int = max(request.args.get("after", 0, type=int), 0)
+    limit: int = min(max(request.args.get("limit", DEFAULT_LIMIT, type=int),
+                         1), MAX_LIMIT)
+    changes: list[Change] = get_changes(after, limit + 1)
+    has_more: bool = len(changes) > limit
+    changes = changes[:limit]
+    return {"changes": [change_json(x) for x in changes],
+            "next": changes[-1].seq if len(changes) > 0 else after,
+            "has_more": has_more}
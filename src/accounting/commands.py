@@ -17,16 +17,23 @@
 """The console commands.
 
 """
+import datetime as dt
+import json
 import os
+from collections.abc import Callable
+from pathlib import Path
 
 import click
+from flask import current_app
 from flask.cli import with_appcontext
 
 from accounting import db
 from accounting.account import init_accounts_command
+from accounting.assets import build_bundles, get_assets_dir
 from accounting.base_account import init_base_accounts_command
 from accounting.currency import init_currencies_command
-from accounting.models import BaseAccount, Account
+from accounting.models import BaseAccount, Account, Change, Currency
+from accounting.utils.archive import archive_through
 from accounting.utils.title_case import title_case
 from accounting.utils.user import has_user, get_user_pk
 import sqlalchemy as sa
@@ -62,7 +69,7 @@ def __validate_username(ctx: click.core.Context, param: click.core.Option,
 def init_db_command(username: str, skip_accounts: bool,
                     skip_currencies: bool) -> None:
     """Initializes the accounting database."""
-    db.create_all()
+    db.create_all(bind_key=None)
     init_base_accounts_command()
     if not skip_accounts:
         init_accounts_command(username)
@@ -99,3 +106,224 @@ def titleize_command(username: str) -> None:
         return
     db.session.commit()
     click.echo(f"{updated} account titles capitalized.")
+
+
+@click.command("accounting-classify-accounts")
+@with_appcontext
+def classify_accounts_command() -> None:
+    """Add and fill in the classification columns of the accounts."""
+    added: list[str] = __add_missing_columns(Account.__table__)
+    if len(added) > 0:
+        click.echo(f"Columns added: {', '.join(added)}.")
+    updated: int = len([x for x in Account.query if x.classify()])
+    db.session.commit()
+    if updated == 0:
+        click.echo("All accounts were already classified.")
+        return
+    click.echo(f"{updated} accounts classified.")
+
+
+@click.command("accounting-upgrade-db")
+@with_appcontext
+def upgrade_db_command() -> None:
+    """Add the tables, columns, and indexes missing in an earlier accounting
+    database, and fill in the classification columns of the accounts."""
+    connection: sa.Connection = db.session.connection()
+    existing: set[str] = set(sa.inspect(connection).get_table_names())
+    created: list[str] = []
+    added: list[str] = []
+    for table in db.metadata.sorted_tables:
+        if not table.name.startswith("accounting_"):
+            continue
+        if table.name not in existing:
+            table.create(connection)
+            created.append(table.name)
+            continue
+        added.extend(f"{table.name}.{x}"
+                     for x in __add_missing_columns(table))
+    classified: int = len([x for x in Account.query if x.classify()])
+    db.session.commit()
+    if len(created) == 0 and len(added) == 0 and classified == 0:
+        click.echo("The accounting database is already up to date.")
+        return
+    if len(created) > 0:
+        click.echo(f"Tables added: {', '.join(created)}.")
+    if len(added) > 0:
+        click.echo(f"Columns added: {', '.join(added)}.")
+    if classified > 0:
+        click.echo(f"{classified} accounts classified.")
+
+
+def __add_missing_columns(table: sa.Table) -> list[str]:
+    """Adds the columns and the indexes missing in a table created by an
+    earlier version.  The columns are added as nullable, so that they can be
+    filled in afterward.  The columns with a constant default, like the
+    versions, are filled in with it.
+
+    :param table: The table.
+    :return: The names of the added columns.
+    """
+    connection: sa.Connection = db.session.connection()
+    existing: set[str] = {x["name"] for x in
+                          sa.inspect(connection).get_columns(table.name)}
+    quote: Callable[[str], str] = connection.dialect.identifier_preparer.quote
+    added: list[str] = []
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        default: str = ""
+        if column.default is not None and column.default.is_scalar:
+            default = " DEFAULT " + str(
+                sa.literal(column.default.arg, column.type)
+                .compile(dialect=connection.dialect,
+                         compile_kwargs={"literal_binds": True}))
+        connection.execute(sa.text(
+            f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)}"
+            f" {column.type.compile(dialect=connection.dialect)}{default}"))
+        added.append(column.name)
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+    return added
+
+
+@click.command("accounting-build-assets")
+@click.option("-o", "--output", metavar="DIR", default=None,
+              help="The output directory.")
+@with_appcontext
+def build_assets_command(output: str | None) -> None:
+    """Build the static asset bundles."""
+    output_dir: Path = get_assets_dir() if output is None else Path(output)
+    manifest: dict[str, str] = build_bundles(output_dir)
+    click.echo(f"{len(manifest)} asset bundles built in {output_dir}.")
+
+
+@click.command("accounting-archive")
+@click.option("-u", "--username", metavar="USERNAME", prompt=True,
+              help="The username.", callback=__validate_username,
+              default=lambda: os.getlogin())
+@click.argument("year", type=int)
+@with_appcontext
+def archive_command(username: str, year: int) -> None:
+    """Move the closed fiscal years through YEAR into the archive."""
+    try:
+        count: int = archive_through(dt.date(year, 12, 31),
+                                     get_user_pk(username))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    db.session.commit()
+    click.echo(f"{count} journal entries archived through {year}.")
+
+
+@click.command("accounting-reclassify")
+@click.option("-u", "--username", metavar="USERNAME", prompt=True,
+              help="The username.", callback=__validate_username,
+              default=lambda: os.getlogin())
+@click.option("-c", "--currency", metavar="CODE", default=None,
+              help="The currency code, or all the currencies by default.")
+@click.option("--start", type=click.DateTime(["%Y-%m-%d"]), default=None,
+              help="The first date, or from the beginning by default.")
+@click.option("--end", type=click.DateTime(["%Y-%m-%d"]), default=None,
+              help="The last date, or to the latest by default.")
+@click.option("-d", "--description", metavar="PATTERN", default=None,
+              help="The SQL LIKE pattern of the descriptions.")
+@click.option("-n", "--dry-run", is_flag=True, default=False,
+              help="Count the line items to move without moving them.")
+@click.argument("source")
+@click.argument("target")
+@with_appcontext
+def reclassify_command(username: str, currency: str | None,
+                       start: dt.datetime | None, end: dt.datetime | None,
+                       description: str | None, dry_run: bool, source: str,
+                       target: str) -> None:
+    """Move the line items from the account SOURCE to the account
+    TARGET."""
+    from accounting.reclassify.reclassifier import Reclassifier
+    source_account: Account | None = Account.find_by_code(source)
+    if source_account is None:
+        raise click.BadParameter(f"Account {source} does not exist.",
+                                 param_hint="SOURCE")
+    target_account: Account | None = Account.find_by_code(target)
+    if target_account is None:
+        raise click.BadParameter(f"Account {target} does not exist.",
+                                 param_hint="TARGET")
+    if target_account.id == source_account.id:
+        raise click.BadParameter("The same account as SOURCE.",
+                                 param_hint="TARGET")
+    if not target_account.is_selectable_debit \
+            and not target_account.is_selectable_credit:
+        raise click.BadParameter(
+            f"Account {target} cannot be used in the line items.",
+            param_hint="TARGET")
+    currency_obj: Currency | None = None
+    if currency is not None:
+        currency_obj = db.session.get(Currency, currency)
+        if currency_obj is None:
+            raise click.BadParameter(f"Currency {currency} does not exist.",
+                                     param_hint="--currency")
+    if start is not None and end is not None and end < start:
+        raise click.BadParameter("Earlier than the start date.",
+                                 param_hint="--end")
+    reclassifier: Reclassifier = Reclassifier(
+        source_account, target_account, currency=currency_obj,
+        start=None if start is None else start.date(),
+        end=None if end is None else end.date(),
+        description=description)
+    if dry_run:
+        click.echo(f"{reclassifier.movable} of {reclassifier.total}"
+                   " line items can be moved.")
+    else:
+        moved: int = reclassifier.reclassify(get_user_pk(username))
+        db.session.commit()
+        click.echo(f"{moved} line items moved from {source} to {target}.")
+    if reclassifier.total > reclassifier.movable:
+        click.echo(f"Left {reclassifier.in_closed_periods} line items in the"
+                   f" closed periods, {reclassifier.with_offsets} matched"
+                   f" with offsets, and {reclassifier.wrong_side} on the"
+                   " debit or credit side where the target account cannot"
+                   " be used.")
+
+
+@click.command("accounting-export-reports")
+@click.option("-o", "--output", metavar="FILE", default=None,
+              help="The output ZIP file.")
+@click.option("-w", "--workers", metavar="N", type=click.IntRange(min=1),
+              default=lambda: os.cpu_count() or 1,
+              help="The number of the worker processes.")
+@click.argument("period", default="last-year")
+@with_appcontext
+def export_reports_command(output: str | None, workers: int,
+                           period: str) -> None:
+    """Export all the reports in PERIOD into a ZIP file."""
+    from accounting.report.bundle import ReportBundle
+    from accounting.report.period import get_period
+    # The reports are localized and linked as in a request.
+    with current_app.test_request_context():
+        try:
+            bundle: ReportBundle = ReportBundle(get_period(period))
+        except ValueError:
+            raise click.BadParameter(f"Invalid period {period}.",
+                                     param_hint="PERIOD")
+        path: Path = Path(f"reports-{bundle.period.spec}.zip"
+                          if output is None else output)
+        with path.open("wb") as fp, \
+                click.progressbar(length=len(bundle.tasks),
+                                  label="Exporting reports") as bar:
+            bundle.write(fp, workers, lambda x: bar.update(1))
+    click.echo(f"{len(bundle.tasks)} reports exported to {path}.")
+
+
+@click.command("accounting-changes")
+@click.option("-b", "--batch", metavar="N", type=click.IntRange(min=1),
+              default=1000, help="The number of the changes in a query.")
+@click.argument("seq", type=click.IntRange(min=0), default=0)
+@with_appcontext
+def changes_command(batch: int, seq: int) -> None:
+    """Stream the changes after the sequence number SEQ as JSON lines."""
+    from accounting.change_log.queries import get_changes, change_json
+    while True:
+        changes: list[Change] = get_changes(seq, batch)
+        for change in changes:
+            click.echo(json.dumps(change_json(change)))
+        if len(changes) < batch:
+            break
+        seq = changes[-1].seq
@@ -32,8 +32,8 @@ from accounting.utils.flash_errors import flash_form_errors
 from accounting.utils.next_uri import inherit_next, or_next
 from accounting.utils.pagination import Pagination
 from accounting.utils.permission import has_permission, can_view, can_edit
+from accounting.utils.read_routing import read_only
 from accounting.utils.user import get_current_user_pk
-from .forms import CurrencyForm
 from .queries import get_currency_query
 
 bp: Blueprint = Blueprint("currency", __name__)
@@ -44,6 +44,7 @@ api_bp: Blueprint = Blueprint("currency-api", __name__)
 
 @bp.get("", endpoint="list")
 @has_permission(can_view)
+@read_only
 def list_currencies() -> str:
     """Lists the currencies.
 
@@ -62,6 +63,7 @@ def show_add_currency_form() -> str:
 
     :return: The form to add a currency.
     """
+    from .forms import CurrencyForm
     if "form" in session:
         form = CurrencyForm(ImmutableMultiDict(parse_qsl(session["form"])))
         del session["form"]
@@ -80,6 +82,7 @@ def add_currency() -> redirect:
     :return: The redirection to the currency detail on success, or the currency
         creation form on error.
     """
+    from .forms import CurrencyForm
     form = CurrencyForm(request.form)
     if not form.validate():
         flash_form_errors(form)
@@ -95,6 +98,7 @@ def add_currency() -> redirect:
 
 @bp.get("<currency:currency>", endpoint="detail")
 @has_permission(can_view)
+@read_only
 def show_currency_detail(currency: Currency) -> str:
     """Shows the currency detail.
 
@@ -112,6 +116,7 @@ def show_currency_edit_form(currency: Currency) -> str:
     :param currency: The currency.
     :return: The form to edit the currency.
     """
+    from .forms import CurrencyForm
     form: CurrencyForm
     if "form" in session:
         form = CurrencyForm(ImmutableMultiDict(parse_qsl(session["form"])))
@@ -132,6 +137,7 @@ def update_currency(currency: Currency) -> redirect:
     :return: The redirection to the currency detail on success, or the currency
         edit form on error.
     """
+    from .forms import CurrencyForm
     form = CurrencyForm(request.form)
     form.obj_code = currency.code
     if not form.validate():
@@ -34,6 +34,26 @@ ACCOUNT_REQUIRED: DataRequired = DataRequired(
 """The validator to check if the account code is empty."""
 
 
+def is_debit_account_code(code: str) -> bool:
+    """Returns whether an account is for debit line items.
+
+    :param code: The account code.
+    :return: True if the account is for debit line items, or False otherwise.
+    """
+    return re.match(r"^(?:[1235689]|7[5678])", code) is not None \
+        and not code.startswith("3353-")
+
+
+def is_credit_account_code(code: str) -> bool:
+    """Returns whether an account is for credit line items.
+
+    :param code: The account code.
+    :return: True if the account is for credit line items, or False otherwise.
+    """
+    return re.match(r"^(?:[123489]|7[1234])", code) is not None \
+        and not code.startswith("3353-")
+
+
 class CurrencyExists:
     """The validator to check if the account exists."""
 
@@ -70,8 +90,7 @@ class IsDebitAccount:
     def __call__(self, form: FlaskForm, field: StringField) -> None:
         if field.data is None:
             return
-        if re.match(r"^(?:[1235689]|7[5678])", field.data) \
-                and not field.data.startswith("3353-"):
+        if is_debit_account_code(field.data):
             return
         raise ValidationError(self.__message)
 
@@ -90,7 +109,6 @@ class IsCreditAccount:
     def __call__(self, form: FlaskForm, field: StringField) -> None:
         if field.data is None:
             return
-        if re.match(r"^(?:[123489]|7[1234])", field.data) \
-                and not field.data.startswith("3353-"):
+        if is_credit_account_code(field.data):
             return
         raise ValidationError(self.__message)
@@ -33,5 +33,8 @@ def init_app(app: Flask, bp: Blueprint) -> None:
     app.url_map.converters["journalEntryType"] = JournalEntryTypeConverter
     app.url_map.converters["date"] = DateConverter
 
-    from .views import bp as journal_entry_bp
+    from .views import bp as journal_entry_bp, \
+        api_bp as journal_entry_api_bp
     bp.register_blueprint(journal_entry_bp, url_prefix="/journal-entries")
+    bp.register_blueprint(journal_entry_api_bp,
+                          url_prefix="/api/journal-entries")
@@ -25,17 +25,16 @@ import sqlalchemy as sa
 from flask_babel import LazyString
 from flask_wtf import FlaskForm
 from wtforms import DateField, FieldList, FormField, TextAreaField, \
-    BooleanField
+    BooleanField, IntegerField
 from wtforms.validators import DataRequired, ValidationError
 
 from accounting import db
-from accounting.journal_entry.utils.account_option import AccountOption
 from accounting.journal_entry.utils.description_editor import DescriptionEditor
-from accounting.journal_entry.utils.original_line_items import \
-    get_selectable_original_line_items
 from accounting.locale import lazy_gettext
 from accounting.models import JournalEntry, Account, JournalEntryLineItem, \
-    JournalEntryCurrency
+    JournalEntryCurrency, ArchivedJournalEntry, ArchivedJournalEntryLineItem
+from accounting.utils.concurrency import lock_numbering
+from accounting.utils.period_close import is_closed
 from accounting.utils.random_id import new_id
 from accounting.utils.strip_text import strip_multiline_text
 from accounting.utils.user import get_current_user_pk
@@ -80,6 +79,17 @@ class NotAfterOffsetItems:
                 "The date cannot be later than the offset items."))
 
 
+class NotInClosedPeriod:
+    """The validator to check if the date is not in a closed period."""
+
+    def __call__(self, form: FlaskForm, field: DateField) -> None:
+        if field.data is None:
+            return
+        if is_closed(field.data):
+            raise ValidationError(lazy_gettext(
+                "The date cannot be in a closed period."))
+
+
 class NeedSomeCurrencies:
     """The validator to check if there is any currency sub-form."""
 
@@ -113,6 +123,8 @@ class JournalEntryForm(FlaskForm):
     """The line items categorized by their currencies."""
     note = TextAreaField()
     """The note."""
+    version = IntegerField()
+    """The version of the journal entry that the form was based on."""
 
     def __init__(self, *args, **kwargs):
         """Constructs a base journal entry form.
@@ -129,13 +141,6 @@ class JournalEntryForm(FlaskForm):
         provide their own collectors."""
         self.obj: JournalEntry | None = kwargs.get("obj")
         """The journal entry, when editing an existing one."""
-        self._is_need_payable: bool = False
-        """Whether we need the payable original line items."""
-        self._is_need_receivable: bool = False
-        """Whether we need the receivable original line items."""
-        self.__original_line_item_options: list[JournalEntryLineItem] | None \
-            = None
-        """The options of the original line items."""
         self.__net_balance_exceeded: dict[int, LazyString] | None = None
         """The original line items whose net balances were exceeded by the
         amounts in the line item sub-forms."""
@@ -150,7 +155,7 @@ class JournalEntryForm(FlaskForm):
         """
         is_new: bool = obj.id is None
         if is_new:
-            obj.id = new_id(JournalEntry)
+            obj.id = new_id(JournalEntry, ArchivedJournalEntry)
         self.__set_date(obj, self.date.data)
         obj.note = self.note.data
 
@@ -185,13 +190,17 @@ class JournalEntryForm(FlaskForm):
         return line_items
 
     def __set_date(self, obj: JournalEntry, new_date: dt.date) -> None:
-        """Sets the journal entry date and number.
+        """Sets the journal entry date and number.  The numbering of the dates
+        is locked first, so that a concurrent append to the same date waits and
+        takes the next number.
 
         :param obj: The journal entry object.
         :param new_date: The new date.
         :return: None.
         """
         if obj.date is None or obj.date != new_date:
+            lock_numbering([new_date] if obj.date is None
+                           else [obj.date, new_date])
             if obj.date is not None:
                 sort_journal_entries_in(obj.date, obj.id)
             if self.max_date is not None and new_date == self.max_date:
@@ -212,40 +221,6 @@ class JournalEntryForm(FlaskForm):
                 obj.date = new_date
                 obj.no = count + 1
 
-    @property
-    def debit_account_options(self) -> list[AccountOption]:
-        """The selectable debit accounts.
-
-        :return: The selectable debit accounts.
-        """
-        accounts: list[AccountOption] \
-            = [AccountOption(x) for x in Account.selectable_debit()
-               if not (x.code[0] == "2" and x.is_need_offset)]
-        in_use: set[int] = set(db.session.scalars(
-            sa.select(JournalEntryLineItem.account_id)
-            .filter(JournalEntryLineItem.is_debit)
-            .group_by(JournalEntryLineItem.account_id)).all())
-        for account in accounts:
-            account.is_in_use = account.id in in_use
-        return accounts
-
-    @property
-    def credit_account_options(self) -> list[AccountOption]:
-        """The selectable credit accounts.
-
-        :return: The selectable credit accounts.
-        """
-        accounts: list[AccountOption] \
-            = [AccountOption(x) for x in Account.selectable_credit()
-               if not (x.code[0] == "1" and x.is_need_offset)]
-        in_use: set[int] = set(db.session.scalars(
-            sa.select(JournalEntryLineItem.account_id)
-            .filter(sa.not_(JournalEntryLineItem.is_debit))
-            .group_by(JournalEntryLineItem.account_id)).all())
-        for account in accounts:
-            account.is_in_use = account.id in in_use
-        return accounts
-
     @property
     def currencies_errors(self) -> list[str | LazyString]:
         """Returns the currency errors, without the errors in their sub-forms.
@@ -264,18 +239,14 @@ class JournalEntryForm(FlaskForm):
         return DescriptionEditor()
 
     @property
-    def original_line_item_options(self) -> list[JournalEntryLineItem]:
-        """Returns the selectable original line items.
+    def line_item_id_on_form(self) -> list[int]:
+        """Returns the ID of the existing line items on the form, whose offset
+        amounts are excluded from the net balances of the original line items.
 
-        :return: The selectable original line items.
+        :return: The ID of the existing line items on the form.
         """
-        if self.__original_line_item_options is None:
-            self.__original_line_item_options \
-                = get_selectable_original_line_items(
-                    {x.id.data for x in self.line_items
-                     if x.id.data is not None},
-                    self._is_need_payable, self._is_need_receivable)
-        return self.__original_line_item_options
+        return sorted({x.id.data for x in self.line_items
+                       if x.id.data is not None})
 
     @property
     def min_date(self) -> dt.date | None:
@@ -398,7 +369,8 @@ class LineItemCollector[T: JournalEntryForm](ABC):
                 self.form.is_modified = True
         else:
             line_item = JournalEntryLineItem()
-            line_item.id = new_id(JournalEntryLineItem)
+            line_item.id = new_id(JournalEntryLineItem,
+                                  ArchivedJournalEntryLineItem)
             line_item.is_debit = is_debit
             line_item.currency_code = currency_code
             line_item.account_id = Account.cash().id
@@ -449,7 +421,8 @@ class CashReceiptJournalEntryForm(JournalEntryForm):
     date = DateField(
         validators=[DATE_REQUIRED,
                     NotBeforeOriginalLineItems(),
-                    NotAfterOffsetItems()])
+                    NotAfterOffsetItems(),
+                    NotInClosedPeriod()])
     """The date."""
     currencies = FieldList(FormField(CashReceiptCurrencyForm), name="currency",
                            validators=[NeedSomeCurrencies()])
@@ -462,7 +435,6 @@ class CashReceiptJournalEntryForm(JournalEntryForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._is_need_receivable = True
 
         class Collector(LineItemCollector[CashReceiptJournalEntryForm]):
             """The line item collector for the cash receipt journal entries."""
@@ -495,7 +467,8 @@ class CashDisbursementJournalEntryForm(JournalEntryForm):
     date = DateField(
         validators=[DATE_REQUIRED,
                     NotBeforeOriginalLineItems(),
-                    NotAfterOffsetItems()])
+                    NotAfterOffsetItems(),
+                    NotInClosedPeriod()])
     """The date."""
     currencies = FieldList(FormField(CashDisbursementCurrencyForm),
                            name="currency",
@@ -509,7 +482,6 @@ class CashDisbursementJournalEntryForm(JournalEntryForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._is_need_payable = True
 
         class Collector(LineItemCollector[CashDisbursementJournalEntryForm]):
             """The line item collector for the cash disbursement journal
@@ -543,7 +515,8 @@ class TransferJournalEntryForm(JournalEntryForm):
     date = DateField(
         validators=[DATE_REQUIRED,
                     NotBeforeOriginalLineItems(),
-                    NotAfterOffsetItems()])
+                    NotAfterOffsetItems(),
+                    NotInClosedPeriod()])
     """The date."""
     currencies = FieldList(FormField(TransferCurrencyForm), name="currency",
                            validators=[NeedSomeCurrencies()])
@@ -556,8 +529,6 @@ class TransferJournalEntryForm(JournalEntryForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._is_need_payable = True
-        self._is_need_receivable = True
 
         class Collector(LineItemCollector[TransferJournalEntryForm]):
             """The line item collector for the transfer journal entries."""
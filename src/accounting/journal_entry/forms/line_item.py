@@ -31,7 +31,8 @@ from accounting import db
 from accounting.forms import ACCOUNT_REQUIRED, AccountExists, IsDebitAccount, \
     IsCreditAccount
 from accounting.locale import lazy_gettext
-from accounting.models import Account, JournalEntry, JournalEntryLineItem
+from accounting.models import Account, ArchivedJournalEntryLineItem, \
+    JournalEntry, JournalEntryLineItem
 from accounting.template_filters import format_amount
 from accounting.utils.random_id import new_id
 from accounting.utils.strip_text import strip_text
@@ -443,7 +444,8 @@ class DebitLineItemForm(LineItemForm):
         """
         is_new: bool = obj.id is None
         if is_new:
-            obj.id = new_id(JournalEntryLineItem)
+            obj.id = new_id(JournalEntryLineItem,
+                            ArchivedJournalEntryLineItem)
         obj.original_line_item_id = self.original_line_item_id.data
         obj.account_id = Account.find_by_code(self.account_code.data).id
         obj.description = self.description.data
@@ -495,7 +497,8 @@ class CreditLineItemForm(LineItemForm):
         """
         is_new: bool = obj.id is None
         if is_new:
-            obj.id = new_id(JournalEntryLineItem)
+            obj.id = new_id(JournalEntryLineItem,
+                            ArchivedJournalEntryLineItem)
         obj.original_line_item_id = self.original_line_item_id.data
         obj.account_id = Account.find_by_code(self.account_code.data).id
         obj.description = self.description.data
@@ -24,16 +24,22 @@ from flask import request
 
 from accounting import db
 from accounting.models import JournalEntry
+from accounting.utils.concurrency import lock_numbering
 
 
 def sort_journal_entries_in(date: dt.date, exclude: int | None = None) -> None:
     """Sorts the journal entries under a date after changing the date or
-    deleting a journal entry.
+    deleting a journal entry.  The numbering of the date is locked first, so
+    that the journal entries appended to the date at the same time are
+    numbered after it.  The renumbered journal entries are written with their
+    version checked, so that a renumbering based on a stale read fails the
+    commit instead of being interleaved.
 
     :param date: The date of the journal entry.
     :param exclude: The journal entry ID to exclude.
     :return: None.
     """
+    lock_numbering([date])
     conditions: list[sa.BinaryExpression] = [JournalEntry.date == date]
     if exclude is not None:
         conditions.append(JournalEntry.id != exclude)
@@ -0,0 +1,436 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The bulk posting of the journal entries.
+
+The scripts, like those that post the recurring items or the payroll, post
+the journal entries as plain data instead of the journal entry forms.  The
+journal entries are validated against the same rules as the forms, but with
+a few queries for the whole batch instead of the queries for each field, and
+are posted all together or none at all.
+
+"""
+import datetime as dt
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any
+
+import sqlalchemy as sa
+from flask_babel import LazyString
+
+from accounting import db
+from accounting.forms import is_debit_account_code, is_credit_account_code
+from accounting.locale import lazy_gettext
+from accounting.models import Currency, Account, JournalEntry, \
+    JournalEntryLineItem, ArchivedJournalEntry, ArchivedJournalEntryLineItem
+from accounting.template_filters import format_amount
+from accounting.utils.concurrency import lock_numbering
+from accounting.utils.period_close import get_closed_date
+from accounting.utils.random_id import new_ids
+from accounting.utils.strip_text import strip_text, strip_multiline_text
+
+
+@dataclass
+class LineItemData:
+    """A line item to post."""
+    account_code: str
+    """The account code."""
+    amount: Decimal | None
+    """The amount, or None if it is not filled in."""
+    description: str | None = None
+    """The description."""
+    original_line_item_id: int | None = None
+    """The ID of the original line item, if this is an offset."""
+
+
+@dataclass
+class CurrencyData:
+    """The line items in a currency to post."""
+    code: str
+    """The currency code."""
+    debit: list[LineItemData] = field(default_factory=list)
+    """The debit line items."""
+    credit: list[LineItemData] = field(default_factory=list)
+    """The credit line items."""
+
+
+@dataclass
+class JournalEntryData:
+    """A journal entry to post."""
+    date: dt.date
+    """The date."""
+    currencies: list[CurrencyData] = field(default_factory=list)
+    """The line items by their currencies."""
+    note: str | None = None
+    """The note."""
+
+
+@dataclass
+class PostingError:
+    """An error in a journal entry to post."""
+    index: int
+    """The index of the journal entry in the batch."""
+    field: str
+    """The field, named as in the journal entry forms, like
+    "currency-1-debit-2-amount"."""
+    message: str | LazyString
+    """The error message."""
+
+
+@dataclass
+class PostingResult:
+    """The result of a bulk posting."""
+    ids: list[int] = field(default_factory=list)
+    """The IDs of the posted journal entries, in the order of the batch."""
+    errors: list[PostingError] = field(default_factory=list)
+    """The errors.  Nothing is posted when there is any error."""
+
+    @property
+    def is_success(self) -> bool:
+        """Returns whether the journal entries are posted.
+
+        :return: True if the journal entries are posted, or False otherwise.
+        """
+        return len(self.errors) == 0
+
+
+class BulkPosting:
+    """The bulk posting of the journal entries."""
+
+    def __init__(self, journal_entries: list[JournalEntryData],
+                 user_pk: int):
+        """Constructs the bulk posting.
+
+        :param journal_entries: The journal entries to post.
+        :param user_pk: The primary key value of the user who posts.
+        """
+        self.journal_entries: list[JournalEntryData] = journal_entries
+        """The journal entries to post."""
+        self.user_pk: int = user_pk
+        """The primary key value of the user who posts."""
+        self.errors: list[PostingError] = []
+        """The errors."""
+        self.__accounts: dict[str, Account] = {}
+        """The accounts in use by their codes."""
+        self.__originals: dict[int, sa.Row] = {}
+        """The original line items in use by their IDs."""
+        self.__net_balances: dict[int, Decimal] = {}
+        """The net balances of the original line items, less the offsets
+        already validated in the batch."""
+
+    def validate(self) -> bool:
+        """Validates the journal entries.
+
+        :return: True if the journal entries are valid, or False otherwise.
+        """
+        self.errors = []
+        for journal_entry in self.journal_entries:
+            journal_entry.note = strip_multiline_text(journal_entry.note)
+            for currency in journal_entry.currencies:
+                for line_item in currency.debit + currency.credit:
+                    line_item.account_code \
+                        = strip_text(line_item.account_code)
+                    line_item.description = strip_text(line_item.description)
+        self.__load()
+        closed_date: dt.date | None = get_closed_date()
+        currency_codes: set[str] = set(db.session.scalars(
+            sa.select(Currency.code).filter(Currency.code.in_(
+                {y.code for x in self.journal_entries
+                 for y in x.currencies}))))
+        for i, journal_entry in enumerate(self.journal_entries):
+            if journal_entry.date is None:
+                self.__error(i, "date", lazy_gettext(
+                    "Please fill in the date."))
+            elif closed_date is not None and journal_entry.date <= closed_date:
+                self.__error(i, "date", lazy_gettext(
+                    "The date cannot be in a closed period."))
+            if len(journal_entry.currencies) == 0:
+                self.__error(i, "currency", lazy_gettext(
+                    "Please add some currencies."))
+            for j, currency in enumerate(journal_entry.currencies, start=1):
+                prefix: str = f"currency-{j}"
+                if currency.code not in currency_codes:
+                    self.__error(i, f"{prefix}-code", lazy_gettext(
+                        "The currency does not exist."))
+                for is_debit, line_items in [(True, currency.debit),
+                                             (False, currency.credit)]:
+                    side: str = f"{prefix}-{'debit' if is_debit else 'credit'}"
+                    if len(line_items) == 0:
+                        self.__error(i, side, lazy_gettext(
+                            "Please add some line items."))
+                    for k, line_item in enumerate(line_items, start=1):
+                        self.__validate_line_item(
+                            i, f"{side}-{k}", journal_entry, currency.code,
+                            is_debit, line_item)
+                if self.__is_valid_amounts(currency) \
+                        and sum([x.amount for x in currency.debit]) \
+                        != sum([x.amount for x in currency.credit]):
+                    self.__error(i, f"{prefix}-whole_form", lazy_gettext(
+                        "The totals of the debit and credit amounts do not"
+                        " match."))
+        return len(self.errors) == 0
+
+    def post(self) -> PostingResult:
+        """Validates and posts the journal entries, all together in the
+        current transaction or none at all.  The changes are not committed.
+
+        :return: The result, with the IDs of the posted journal entries or
+            the errors.
+        """
+        if not self.validate():
+            return PostingResult(errors=self.errors)
+        journal_entry_ids: list[int] = new_ids(
+            len(self.journal_entries), JournalEntry, ArchivedJournalEntry)
+        line_item_ids: list[int] = new_ids(
+            sum([len(y.debit) + len(y.credit) for x in self.journal_entries
+                 for y in x.currencies]),
+            JournalEntryLineItem, ArchivedJournalEntryLineItem)
+        numbers: list[int] = self.__number()
+        journal_entry_rows: list[dict[str, Any]] = []
+        line_item_rows: list[dict[str, Any]] = []
+        for i, journal_entry in enumerate(self.journal_entries):
+            journal_entry_rows.append({"id": journal_entry_ids[i],
+                                       "date": journal_entry.date,
+                                       "no": numbers[i],
+                                       "note": journal_entry.note,
+                                       "created_by_id": self.user_pk,
+                                       "updated_by_id": self.user_pk})
+            no: dict[bool, int] = {True: 0, False: 0}
+            for currency in journal_entry.currencies:
+                for is_debit, line_items in [(True, currency.debit),
+                                             (False, currency.credit)]:
+                    for line_item in line_items:
+                        no[is_debit] = no[is_debit] + 1
+                        line_item_rows.append({
+                            "id": line_item_ids.pop(),
+                            "journal_entry_id": journal_entry_ids[i],
+                            "is_debit": is_debit,
+                            "no": no[is_debit],
+                            "original_line_item_id":
+                                line_item.original_line_item_id,
+                            "currency_code": currency.code,
+                            "account_id":
+                                self.__accounts[line_item.account_code].id,
+                            "description": line_item.description,
+                            "amount": line_item.amount})
+        db.session.execute(sa.insert(JournalEntry), journal_entry_rows)
+        db.session.execute(sa.insert(JournalEntryLineItem), line_item_rows)
+        return PostingResult(ids=journal_entry_ids)
+
+    def __load(self) -> None:
+        """Loads the accounts and the original line items in use, with their
+        net balances, in a few queries for the whole batch.
+
+        :return: None.
+        """
+        line_items: list[LineItemData] \
+            = [z for x in self.journal_entries for y in x.currencies
+               for z in y.debit + y.credit]
+        codes: dict[str, tuple[str, int]] = {}
+        for line_item in line_items:
+            m = re.match(r"^([1-9]{4})-(\d{3})$", line_item.account_code or "")
+            if m is not None:
+                codes[line_item.account_code] = (m.group(1), int(m.group(2)))
+        self.__accounts = {}
+        if len(codes) > 0:
+            accounts: dict[tuple[str, int], Account] \
+                = {(x.base_code, x.no): x for x in Account.query.filter(
+                    Account.base_code.in_({x[0] for x in codes.values()}))}
+            self.__accounts = {x: accounts[codes[x]] for x in codes
+                               if codes[x] in accounts}
+
+        original_ids: set[int] = {x.original_line_item_id for x in line_items
+                                  if x.original_line_item_id is not None}
+        self.__originals = {}
+        self.__net_balances = {}
+        if len(original_ids) == 0:
+            return
+        select_originals: sa.Select \
+            = sa.select(JournalEntryLineItem.id,
+                        JournalEntryLineItem.is_debit,
+                        JournalEntryLineItem.original_line_item_id,
+                        JournalEntryLineItem.currency_code,
+                        JournalEntryLineItem.account_id,
+                        JournalEntryLineItem.amount,
+                        Account.is_need_offset,
+                        JournalEntry.date)\
+            .join(JournalEntry).join(Account)\
+            .filter(JournalEntryLineItem.id.in_(original_ids))
+        self.__originals = {x.id: x
+                            for x in db.session.execute(select_originals)}
+        select_offsets: sa.Select \
+            = sa.select(JournalEntryLineItem.original_line_item_id,
+                        sa.func.sum(sa.case(
+                            (JournalEntryLineItem.is_debit,
+                             JournalEntryLineItem.amount),
+                            else_=-JournalEntryLineItem.amount)))\
+            .filter(JournalEntryLineItem.original_line_item_id
+                    .in_(original_ids))\
+            .group_by(JournalEntryLineItem.original_line_item_id)
+        offsets: dict[int, Decimal] \
+            = {x[0]: x[1] for x in db.session.execute(select_offsets)}
+        for original in self.__originals.values():
+            offset: Decimal = offsets.get(original.id, Decimal("0"))
+            self.__net_balances[original.id] = original.amount \
+                + (offset if original.is_debit else -offset)
+
+    def __validate_line_item(self, index: int, prefix: str,
+                             journal_entry: JournalEntryData,
+                             currency_code: str, is_debit: bool,
+                             line_item: LineItemData) -> None:
+        """Validates a line item.
+
+        :param index: The index of the journal entry.
+        :param prefix: The prefix of the line item fields.
+        :param journal_entry: The journal entry.
+        :param currency_code: The currency code.
+        :param is_debit: True if this is a debit line item, or False
+            otherwise.
+        :param line_item: The line item.
+        :return: None.
+        """
+        account: Account | None = None
+        if line_item.account_code is None:
+            self.__error(index, f"{prefix}-account_code", lazy_gettext(
+                "Please select the account."))
+        elif line_item.account_code not in self.__accounts:
+            self.__error(index, f"{prefix}-account_code", lazy_gettext(
+                "The account does not exist."))
+        elif is_debit and not is_debit_account_code(line_item.account_code):
+            self.__error(index, f"{prefix}-account_code", lazy_gettext(
+                "This account is not for debit line items."))
+        elif not is_debit \
+                and not is_credit_account_code(line_item.account_code):
+            self.__error(index, f"{prefix}-account_code", lazy_gettext(
+                "This account is not for credit line items."))
+        else:
+            account = self.__accounts[line_item.account_code]
+            if line_item.original_line_item_id is None \
+                    and account.is_need_offset:
+                if is_debit and line_item.account_code[0] == "2":
+                    self.__error(index, f"{prefix}-account_code",
+                                 lazy_gettext("A payable line item cannot"
+                                              " start from debit."))
+                elif not is_debit and line_item.account_code[0] == "1":
+                    self.__error(index, f"{prefix}-account_code",
+                                 lazy_gettext("A receivable line item cannot"
+                                              " start from credit."))
+        if line_item.amount is None or line_item.amount <= 0:
+            self.__error(index, f"{prefix}-amount", lazy_gettext(
+                "Please fill in a positive amount."))
+        if line_item.original_line_item_id is None:
+            return
+
+        field_name: str = f"{prefix}-original_line_item_id"
+        original: sa.Row | None \
+            = self.__originals.get(line_item.original_line_item_id)
+        if original is None:
+            self.__error(index, field_name, lazy_gettext(
+                "The original line item does not exist."))
+            return
+        if original.is_debit == is_debit:
+            self.__error(index, field_name, lazy_gettext(
+                "The original line item is on the same debit or credit."))
+        elif not original.is_need_offset:
+            self.__error(index, field_name, lazy_gettext(
+                "The original line item does not need offset."))
+        elif original.original_line_item_id is not None:
+            self.__error(index, field_name, lazy_gettext(
+                "The original line item cannot be an offset item."))
+        if account is not None and account.id != original.account_id:
+            self.__error(index, f"{prefix}-account_code", lazy_gettext(
+                "The account must be the same as the original line item."))
+        if currency_code != original.currency_code:
+            self.__error(index, field_name, lazy_gettext(
+                "The currency must be the same as the original line item."))
+        if journal_entry.date is not None \
+                and journal_entry.date < original.date:
+            self.__error(index, "date", lazy_gettext(
+                "The date cannot be earlier than the original line items."))
+        if line_item.amount is not None and line_item.amount > 0:
+            net_balance: Decimal = self.__net_balances[original.id]
+            if line_item.amount > net_balance:
+                self.__error(index, f"{prefix}-amount", lazy_gettext(
+                    "The amount must not exceed the net balance %(balance)s"
+                    " of the original line item.",
+                    balance=format_amount(net_balance)))
+            else:
+                self.__net_balances[original.id] \
+                    = net_balance - line_item.amount
+
+    def __number(self) -> list[int]:
+        """Renumbers the existing journal entries in the affected dates in a
+        single pass, and returns the numbers of the new journal entries,
+        appended after them in the order of the batch.  The numbering of the
+        dates is locked first, as the journal entry forms do, so that the
+        concurrent postings to the same dates are numbered one after another.
+
+        :return: The numbers of the new journal entries.
+        """
+        dates: set[dt.date] = {x.date for x in self.journal_entries}
+        lock_numbering(dates)
+        existing: list[JournalEntry] = JournalEntry.query\
+            .filter(JournalEntry.date.in_(dates))\
+            .order_by(JournalEntry.date, JournalEntry.no).all()
+        counts: dict[dt.date, int] = {}
+        for journal_entry in existing:
+            no: int = counts.get(journal_entry.date, 0) + 1
+            if journal_entry.no != no:
+                journal_entry.no = no
+            counts[journal_entry.date] = no
+        numbers: list[int] = []
+        for journal_entry in self.journal_entries:
+            counts[journal_entry.date] = counts.get(journal_entry.date, 0) + 1
+            numbers.append(counts[journal_entry.date])
+        return numbers
+
+    @staticmethod
+    def __is_valid_amounts(currency: CurrencyData) -> bool:
+        """Returns whether all the amounts of a currency are filled in and
+        positive, so that their totals can be compared.  The invalid amounts
+        are reported on their own line items.
+
+        :param currency: The currency.
+        :return: True if all the amounts are filled in and positive, or False
+            otherwise.
+        """
+        return all([x.amount is not None and x.amount > 0
+                    for x in currency.debit + currency.credit])
+
+    def __error(self, index: int, field_name: str,
+                message: str | LazyString) -> None:
+        """Adds an error.
+
+        :param index: The index of the journal entry.
+        :param field_name: The field name.
+        :param message: The error message.
+        :return: None.
+        """
+        self.errors.append(PostingError(index, field_name, message))
+
+
+def post_journal_entries(journal_entries: list[JournalEntryData],
+                         user_pk: int) -> PostingResult:
+    """Validates and posts the journal entries, all together in the current
+    transaction or none at all.  The changes are not committed.
+
+    :param journal_entries: The journal entries to post.
+    :param user_pk: The primary key value of the user who posts.
+    :return: The result, with the IDs of the posted journal entries or the
+        errors.
+    """
+    return BulkPosting(journal_entries, user_pk).post()
@@ -0,0 +1,171 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The queries for the journal entry management.
+
+"""
+import datetime as dt
+import re
+from decimal import Decimal, InvalidOperation
+
+import sqlalchemy as sa
+from flask import request
+
+from accounting import db
+from accounting.models import Account, AccountL10n, JournalEntry, \
+    JournalEntryLineItem
+from accounting.utils.query import parse_query_keywords
+from .utils.account_option import AccountOption
+from .utils.original_line_items import get_selectable_original_line_items
+
+ACCOUNT_LIMIT: int = 50
+"""The maximum number of the accounts to return in an account lookup."""
+ORIGINAL_LINE_ITEM_PAGE_SIZE: int = 20
+"""The number of the original line items in a page."""
+
+
+def get_account_options(debit_credit: str) \
+        -> tuple[list[AccountOption], bool]:
+    """Returns the selectable accounts that match the query, ranked by how
+    often they are used on the debit or credit side.  Only the accounts in
+    use are returned, unless all the accounts are asked.
+
+    :param debit_credit: Either "debit" or "credit".
+    :return: The matched account options, and whether there are more matches
+        than returned.
+    """
+    is_debit: bool = debit_credit == "debit"
+    keywords: list[str] = parse_query_keywords(request.args.get("q"))
+    usage: sa.Subquery = sa.select(JournalEntryLineItem.account_id,
+                                   sa.func.count().label("count"))\
+        .filter(JournalEntryLineItem.is_debit == is_debit)\
+        .group_by(JournalEntryLineItem.account_id).subquery()
+    code: sa.BinaryExpression = __account_code()
+    conditions: list[sa.ColumnElement[bool]] \
+        = [Account.selectable_debit_condition() if is_debit
+           else Account.selectable_credit_condition()]
+    for k in keywords:
+        conditions.append(__account_matches(code, k))
+    if request.args.get("all") != "1":
+        conditions.append(usage.c.count.is_not(None))
+    order_by: list[sa.ColumnElement] = []
+    if len(keywords) > 0:
+        order_by.append(sa.case((code.startswith(keywords[0]), 0), else_=1))
+    order_by.extend([sa.func.coalesce(usage.c.count, 0).desc(),
+                     Account.base_code, Account.no])
+    select: sa.Select = sa.select(Account, usage.c.count)\
+        .outerjoin(usage, Account.id == usage.c.account_id)\
+        .filter(*conditions).order_by(*order_by).limit(ACCOUNT_LIMIT + 1)\
+        .options(sa.orm.selectinload(Account.l10n))
+    options: list[AccountOption] = []
+    for row in db.session.execute(select):
+        option: AccountOption = AccountOption(row[0])
+        option.is_in_use = row[1] is not None
+        options.append(option)
+    return options[:ACCOUNT_LIMIT], len(options) > ACCOUNT_LIMIT
+
+
+def get_original_line_item_options(debit_credit: str) \
+        -> tuple[list[JournalEntryLineItem], bool]:
+    """Returns a page of the selectable original line items to offset in a
+    line item on the debit or credit side, filtered by the query arguments.
+    The offset amounts of the line items on the form are excluded from the
+    net balances.
+
+    :param debit_credit: Either "debit" or "credit", the side of the line item
+        to offset the original line items.
+    :return: The original line items in the page, and whether there are more
+        pages.
+    """
+    filters: list[sa.ColumnElement[bool]] = []
+    currency_code: str | None = request.args.get("currency")
+    if currency_code is not None:
+        filters.append(JournalEntryLineItem.currency_code == currency_code)
+    account_code: str | None = request.args.get("account")
+    if account_code is not None:
+        m: re.Match | None = re.match(r"^(\d{4})-(\d{3})$", account_code)
+        filters.append(sa.false() if m is None
+                       else sa.and_(Account.base_code == m[1],
+                                    Account.no == int(m[2])))
+    try:
+        filters.append(JournalEntry.date
+                       <= dt.date.fromisoformat(request.args["date"]))
+    except (KeyError, ValueError):
+        pass
+    if "id" in request.args:
+        filters.append(JournalEntryLineItem.id
+                       == __to_int(request.args["id"]))
+    code: sa.BinaryExpression = __account_code()
+    for k in parse_query_keywords(request.args.get("q")):
+        sub_conditions: list[sa.ColumnElement[bool]] \
+            = [JournalEntryLineItem.description.icontains(k),
+               __account_matches(code, k)]
+        try:
+            sub_conditions.append(JournalEntryLineItem.amount == Decimal(k))
+        except InvalidOperation:
+            pass
+        filters.append(sa.or_(*sub_conditions))
+    line_item_id_on_form: set[int] \
+        = {__to_int(x) for x in request.args.getlist("exclude")}
+    page: int = max(__to_int(request.args.get("page", "1")), 1)
+    line_items: list[JournalEntryLineItem] \
+        = get_selectable_original_line_items(
+            line_item_id_on_form, debit_credit == "debit",
+            debit_credit == "credit", filters,
+            ORIGINAL_LINE_ITEM_PAGE_SIZE + 1,
+            (page - 1) * ORIGINAL_LINE_ITEM_PAGE_SIZE)
+    return line_items[:ORIGINAL_LINE_ITEM_PAGE_SIZE], \
+        len(line_items) > ORIGINAL_LINE_ITEM_PAGE_SIZE
+
+
+def __account_code() -> sa.BinaryExpression:
+    """Returns the SQL expression of the account code.
+
+    :return: The SQL expression of the account code.
+    """
+    return Account.base_code + "-" \
+        + sa.func.substr("000" + sa.cast(Account.no, sa.String),
+                         sa.func.char_length(sa.cast(Account.no,
+                                                     sa.String)) + 1)
+
+
+def __account_matches(code: sa.BinaryExpression, keyword: str) \
+        -> sa.ColumnElement[bool]:
+    """Returns the SQL condition that an account matches a keyword in its code
+    or its titles in all the locales.
+
+    :param code: The SQL expression of the account code.
+    :param keyword: The keyword.
+    :return: The SQL condition that the account matches the keyword.
+    """
+    l10n_matches: sa.Select = sa.select(AccountL10n.account_id)\
+        .filter(AccountL10n.title.icontains(keyword))
+    return sa.or_(code.contains(keyword),
+                  Account.title_l10n.icontains(keyword),
+                  Account.id.in_(l10n_matches))
+
+
+def __to_int(value: str) -> int:
+    """Converts a query argument to an integer.  Invalid values are converted
+    to zero, which matches nothing.
+
+    :param value: The query argument.
+    :return: The integer.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return 0
@@ -34,8 +34,6 @@ class AccountOption:
         """The account code."""
         self.title: str = account.title
         """The account title."""
-        self.query_values: list[str] = account.query_values
-        """The values to be queried."""
         self.__str: str = str(account)
         """The string representation of the account option."""
         self.is_in_use: bool = False
@@ -29,15 +29,24 @@ from accounting.utils.offset_alias import offset_alias
 
 def get_selectable_original_line_items(
         line_item_id_on_form: set[int], is_payable: bool,
-        is_receivable: bool) -> list[JournalEntryLineItem]:
+        is_receivable: bool,
+        filters: list[sa.ColumnElement[bool]] | None = None,
+        limit: int | None = None, start: int = 0) \
+        -> list[JournalEntryLineItem]:
     """Queries and returns the selectable original line items, with their net
-    balances.  The offset amounts of the form is excluded.
+    balances, from the latest to the earliest.  The offset amounts of the form
+    is excluded.
 
     :param line_item_id_on_form: The ID of the line items on the form.
     :param is_payable: True to check the payable original line items, or False
         otherwise.
     :param is_receivable: True to check the receivable original line items, or
         False otherwise.
+    :param filters: The additional conditions on the line items, their
+        accounts, and their journal entries, or None to skip.
+    :param limit: The maximum number of line items to return, or None to
+        return them all.
+    :param start: The number of line items to skip.
     :return: The selectable original line items, with their net balances.
     """
     assert is_payable or is_receivable
@@ -49,33 +58,41 @@ def get_selectable_original_line_items(
     conditions: list[sa.BinaryExpression] = [Account.is_need_offset]
     sub_conditions: list[sa.BinaryExpression] = []
     if is_payable:
-        sub_conditions.append(sa.and_(Account.base_code.startswith("2"),
+        sub_conditions.append(sa.and_(Account.account_class == 2,
                                       sa.not_(JournalEntryLineItem.is_debit)))
     if is_receivable:
-        sub_conditions.append(sa.and_(Account.base_code.startswith("1"),
+        sub_conditions.append(sa.and_(Account.account_class == 1,
                                       JournalEntryLineItem.is_debit))
     conditions.append(sa.or_(*sub_conditions))
+    if filters is not None:
+        conditions.extend(filters)
+    order_by: list[sa.UnaryExpression] \
+        = [JournalEntry.date.desc(), JournalEntry.no.desc(),
+           JournalEntryLineItem.is_debit.desc(),
+           JournalEntryLineItem.no.desc()]
     select_net_balances: sa.Select \
         = sa.select(JournalEntryLineItem.id, net_balance)\
         .join(Account)\
+        .join(JournalEntry)\
         .join(offset,
               JournalEntryLineItem.id == offset.c.original_line_item_id,
               isouter=True)\
         .filter(*conditions)\
-        .group_by(JournalEntryLineItem.id)\
-        .having(sa.or_(sa.func.count(offset.c.id) == 0, net_balance != 0))
+        .group_by(JournalEntryLineItem.id, JournalEntry.id)\
+        .having(sa.or_(sa.func.count(offset.c.id) == 0, net_balance != 0))\
+        .order_by(*order_by)
+    if limit is not None:
+        select_net_balances = select_net_balances.limit(limit).offset(start)
     net_balances: dict[int, Decimal] \
         = {x.id: x.net_balance
            for x in db.session.execute(select_net_balances).all()}
     line_items: list[JournalEntryLineItem] = JournalEntryLineItem.query\
         .filter(JournalEntryLineItem.id.in_({x for x in net_balances}))\
         .join(JournalEntry)\
-        .order_by(JournalEntry.date, JournalEntry.no,
-                  JournalEntryLineItem.is_debit, JournalEntryLineItem.no)\
+        .order_by(*order_by)\
         .options(selectinload(JournalEntryLineItem.currency),
                  selectinload(JournalEntryLineItem.account),
                  selectinload(JournalEntryLineItem.journal_entry)).all()
-    line_items.reverse()
     for line_item in line_items:
         line_item.net_balance = line_item.amount \
             if net_balances[line_item.id] is None \
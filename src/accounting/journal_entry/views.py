@@ -27,22 +27,26 @@ from werkzeug.datastructures import ImmutableMultiDict
 
 from accounting import db
 from accounting.locale import lazy_gettext
+from accounting.template_filters import format_amount, format_date, default
 from accounting.models import JournalEntry
 from accounting.utils.cast import s
+from accounting.utils.concurrency import is_stale, try_commit
 from accounting.utils.flash_errors import flash_form_errors
 from accounting.utils.journal_entry_types import JournalEntryType
 from accounting.utils.next_uri import inherit_next, or_next
+from accounting.utils.period_close import is_closed
 from accounting.utils.permission import has_permission, can_view, can_edit
+from accounting.utils.read_routing import read_only
 from accounting.utils.timezone import get_tz_today
 from accounting.utils.user import get_current_user_pk
-from .forms import sort_journal_entries_in, JournalEntryReorderForm
+from .queries import get_account_options, get_original_line_item_options
 from .template_filters import with_type, to_transfer, format_amount_input, \
     text2html
-from .utils.operators import JournalEntryOperator, JOURNAL_ENTRY_TYPE_TO_OP, \
-    get_journal_entry_op
 
 bp: Blueprint = Blueprint("journal-entry", __name__)
 """The view blueprint for the journal entry management."""
+api_bp: Blueprint = Blueprint("journal-entry-api", __name__)
+"""The view blueprint for the journal entry management API."""
 bp.add_app_template_filter(with_type, "accounting_journal_entry_with_type")
 bp.add_app_template_filter(to_transfer, "accounting_journal_entry_to_transfer")
 bp.add_app_template_filter(format_amount_input,
@@ -58,6 +62,7 @@ def show_add_journal_entry_form(journal_entry_type: JournalEntryType) -> str:
     :param journal_entry_type: The journal entry type.
     :return: The form to add a journal entry.
     """
+    from .utils.operators import JournalEntryOperator, JOURNAL_ENTRY_TYPE_TO_OP
     journal_entry_op: JournalEntryOperator \
         = JOURNAL_ENTRY_TYPE_TO_OP[journal_entry_type]
     form: journal_entry_op.form
@@ -81,6 +86,7 @@ def add_journal_entry(journal_entry_type: JournalEntryType) -> redirect:
     :return: The redirection to the journal entry detail on success, or the
         journal entry creation form on error.
     """
+    from .utils.operators import JournalEntryOperator, JOURNAL_ENTRY_TYPE_TO_OP
     journal_entry_op: JournalEntryOperator \
         = JOURNAL_ENTRY_TYPE_TO_OP[journal_entry_type]
     form: journal_entry_op.form = journal_entry_op.form(request.form)
@@ -91,9 +97,16 @@ def add_journal_entry(journal_entry_type: JournalEntryType) -> redirect:
             url_for("accounting.journal-entry.create",
                     journal_entry_type=journal_entry_type))))
     journal_entry: JournalEntry = JournalEntry()
-    form.populate_obj(journal_entry)
+    with db.session.no_autoflush:
+        form.populate_obj(journal_entry)
     db.session.add(journal_entry)
-    db.session.commit()
+    if not try_commit():
+        flash(s(lazy_gettext("The journal entries of the date were changed by"
+                             " someone else.  Please try again.")), "error")
+        session["form"] = urlencode(list(request.form.items()))
+        return redirect(inherit_next(with_type(
+            url_for("accounting.journal-entry.create",
+                    journal_entry_type=journal_entry_type))))
     flash(s(lazy_gettext("The journal entry is added successfully.")),
           "success")
     return redirect(inherit_next(__get_detail_uri(journal_entry)))
@@ -101,12 +114,14 @@ def add_journal_entry(journal_entry_type: JournalEntryType) -> redirect:
 
 @bp.get("<journalEntry:journal_entry>", endpoint="detail")
 @has_permission(can_view)
+@read_only
 def show_journal_entry_detail(journal_entry: JournalEntry) -> str:
     """Shows the journal entry detail.
 
     :param journal_entry: The journal entry.
     :return: The detail.
     """
+    from .utils.operators import JournalEntryOperator, get_journal_entry_op
     journal_entry_op: JournalEntryOperator \
         = get_journal_entry_op(journal_entry)
     return journal_entry_op.render_detail_template(journal_entry)
@@ -120,6 +135,11 @@ def show_journal_entry_edit_form(journal_entry: JournalEntry) -> str:
     :param journal_entry: The journal entry.
     :return: The form to edit the journal entry.
     """
+    if is_closed(journal_entry.date):
+        flash(s(lazy_gettext("The journal entry is in a closed period.")),
+              "error")
+        return redirect(inherit_next(__get_detail_uri(journal_entry)))
+    from .utils.operators import JournalEntryOperator, get_journal_entry_op
     journal_entry_op: JournalEntryOperator \
         = get_journal_entry_op(journal_entry, is_check_as=True)
     form: journal_entry_op.form
@@ -143,16 +163,21 @@ def update_journal_entry(journal_entry: JournalEntry) -> redirect:
     :return: The redirection to the journal entry detail on success, or the
         journal entry edit form on error.
     """
+    if is_closed(journal_entry.date):
+        flash(s(lazy_gettext("The journal entry is in a closed period.")),
+              "error")
+        return redirect(inherit_next(__get_detail_uri(journal_entry)))
+    from .utils.operators import JournalEntryOperator, get_journal_entry_op
     journal_entry_op: JournalEntryOperator \
         = get_journal_entry_op(journal_entry, is_check_as=True)
     form: journal_entry_op.form = journal_entry_op.form(request.form)
     form.obj = journal_entry
+    if is_stale(journal_entry, form.version.data):
+        return __conflict(__get_edit_uri(journal_entry))
     if not form.validate():
         flash_form_errors(form)
         session["form"] = urlencode(list(request.form.items()))
-        return redirect(inherit_next(with_type(
-            url_for("accounting.journal-entry.edit",
-                    journal_entry=journal_entry))))
+        return redirect(__get_edit_uri(journal_entry))
     with db.session.no_autoflush:
         form.populate_obj(journal_entry)
     if not form.is_modified:
@@ -161,7 +186,9 @@ def update_journal_entry(journal_entry: JournalEntry) -> redirect:
         return redirect(inherit_next(__get_detail_uri(journal_entry)))
     journal_entry.updated_by_id = get_current_user_pk()
     journal_entry.updated_at = sa.func.now()
-    db.session.commit()
+    edit_uri: str = __get_edit_uri(journal_entry)
+    if not try_commit():
+        return __conflict(edit_uri)
     flash(s(lazy_gettext("The journal entry is updated successfully.")),
           "success")
     return redirect(inherit_next(__get_detail_uri(journal_entry)))
@@ -176,12 +203,19 @@ def delete_journal_entry(journal_entry: JournalEntry) -> redirect:
     :return: The redirection to the journal entry list on success, or the
         journal entry detail on error.
     """
+    from .forms import sort_journal_entries_in
+    if is_closed(journal_entry.date):
+        flash(s(lazy_gettext("The journal entry is in a closed period.")),
+              "error")
+        return redirect(inherit_next(__get_detail_uri(journal_entry)))
     if not journal_entry.can_delete:
         flash(s(lazy_gettext("The journal entry cannot be deleted.")), "error")
         return redirect(inherit_next(__get_detail_uri(journal_entry)))
+    detail_uri: str = __get_detail_uri(journal_entry)
     journal_entry.delete()
     sort_journal_entries_in(journal_entry.date, journal_entry.id)
-    db.session.commit()
+    if not try_commit():
+        return __conflict(inherit_next(detail_uri))
     flash(s(lazy_gettext("The journal entry is deleted successfully.")),
           "success")
     return redirect(or_next(__get_default_page_uri()))
@@ -189,6 +223,7 @@ def delete_journal_entry(journal_entry: JournalEntry) -> redirect:
 
 @bp.get("dates/<date:date>", endpoint="order")
 @has_permission(can_view)
+@read_only
 def show_journal_entry_order(date: dt.date) -> str:
     """Shows the order of the journal entries in a same date.
 
@@ -208,19 +243,77 @@ def sort_journal_entries(date: dt.date) -> redirect:
     """Reorders the journal entries in a date.
 
     :param date: The date.
-    :return: The redirection to the incoming account or the account list.  The
-        reordering operation does not fail.
+    :return: The redirection to the incoming account or the account list, or
+        the order of the journal entries if the order was changed by someone
+        else in between.
     """
+    from .forms import JournalEntryReorderForm
+    if is_closed(date):
+        flash(s(lazy_gettext("The date is in a closed period.")), "error")
+        return redirect(or_next(__get_default_page_uri()))
     form: JournalEntryReorderForm = JournalEntryReorderForm(date)
     form.save_order()
     if not form.is_modified:
         flash(s(lazy_gettext("The order was not modified.")), "success")
         return redirect(or_next(__get_default_page_uri()))
-    db.session.commit()
+    if not try_commit():
+        return __conflict(inherit_next(
+            url_for("accounting.journal-entry.order", date=date)))
     flash(s(lazy_gettext("The order is updated successfully.")), "success")
     return redirect(or_next(__get_default_page_uri()))
 
 
+@api_bp.get("accounts/<any(debit, credit):debit_credit>",
+            endpoint="accounts")
+@has_permission(can_edit)
+def lookup_accounts(debit_credit: str) -> dict[str, list[dict] | bool]:
+    """Looks up the selectable accounts for the account selector.
+
+    :param debit_credit: Either "debit" or "credit".
+    :return: The matched accounts, and whether there are more matches.
+    """
+    options, has_more = get_account_options(debit_credit)
+    return {"accounts": [{"code": x.code,
+                          "title": x.title,
+                          "text": str(x),
+                          "is_in_use": x.is_in_use,
+                          "is_need_offset": x.is_need_offset}
+                         for x in options],
+            "has_more": has_more}
+
+
+@api_bp.get("original-line-items/<any(debit, credit):debit_credit>",
+            endpoint="original-line-items")
+@has_permission(can_edit)
+def lookup_original_line_items(debit_credit: str) \
+        -> dict[str, list[dict] | bool]:
+    """Looks up a page of the original line items for the original line item
+    selector.
+
+    :param debit_credit: Either "debit" or "credit", the side of the line item
+        to offset the original line items.
+    :return: The original line items in the page, and whether there are more
+        pages.
+    """
+    line_items, has_more = get_original_line_item_options(debit_credit)
+    return {"line_items": [{"id": x.id,
+                            "date": x.journal_entry.date.isoformat(),
+                            "date_text": format_date(x.journal_entry.date),
+                            "debit_credit": "debit" if x.is_debit
+                            else "credit",
+                            "currency_code": x.currency_code,
+                            "account_code": x.account.code,
+                            "account_title": x.account.title,
+                            "account_text": str(x.account),
+                            "description": default(x.description),
+                            "amount_text": format_amount(x.amount),
+                            "net_balance": format_amount_input(x.net_balance),
+                            "net_balance_text": format_amount(x.net_balance),
+                            "text": str(x)}
+                           for x in line_items],
+            "has_more": has_more}
+
+
 def __get_detail_uri(journal_entry: JournalEntry) -> str:
     """Returns the detail URI of a journal entry.
 
@@ -231,6 +324,30 @@ def __get_detail_uri(journal_entry: JournalEntry) -> str:
                    journal_entry=journal_entry)
 
 
+def __get_edit_uri(journal_entry: JournalEntry) -> str:
+    """Returns the edit URI of a journal entry.
+
+    :param journal_entry: The journal entry.
+    :return: The edit URI of the journal entry.
+    """
+    return inherit_next(with_type(
+        url_for("accounting.journal-entry.edit",
+                journal_entry=journal_entry)))
+
+
+def __conflict(uri: str) -> redirect:
+    """Reports that the journal entries were changed by someone else in
+    between, and redirects to where the newer data can be reviewed.
+
+    :param uri: The URI to review the newer data.
+    :return: The redirection to the URI.
+    """
+    flash(s(lazy_gettext("The journal entry was changed by someone else."
+                         "  Please review the latest version and try"
+                         " again.")), "error")
+    return redirect(uri)
+
+
 def __get_default_page_uri() -> str:
     """Returns the URI for the default page.
 
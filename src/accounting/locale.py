@@ -17,11 +17,13 @@
 """The localization for the accounting application.
 
 """
+import gzip
+import hashlib
 import json
 from pathlib import Path
 
-from flask import Flask, Response, Blueprint
-from flask_babel import LazyString, Domain
+from flask import Flask, Response, Blueprint, request, url_for, current_app
+from flask_babel import LazyString, Domain, get_locale
 from flask_babel_js import JAVASCRIPT, c2js
 
 translation_dir: Path = Path(__file__).parent / "translations"
@@ -29,6 +31,9 @@ translation_dir: Path = Path(__file__).parent / "translations"
 domain: Domain = Domain(translation_directories=[translation_dir],
                         domain="accounting")
 """The message domain."""
+MAX_AGE: int = 365 * 24 * 60 * 60
+"""The number of seconds to cache the JavaScript message catalog with its
+content hash."""
 
 
 def gettext(string, **variables) -> str:
@@ -62,57 +67,131 @@ def lazy_gettext(string, **variables) -> LazyString:
     return domain.lazy_gettext(string, **variables)
 
 
-def __babel_js_catalog_view() -> Response:
-    """A tweaked view taken from Flask-Babel-JS that returns the messages and
-    with the A_() function instead of _().
-
-    :return: The response.
+class JavaScriptCatalog:
+    """A precompiled JavaScript message catalog."""
+
+    def __init__(self, locale: str, mtime: float):
+        """Constructs the JavaScript message catalog of the current locale.
+        This is a tweaked view taken from Flask-Babel-JS that defines the
+        A_() function instead of _().
+
+        :param locale: The locale.
+        :param mtime: The last modification time of the translation files.
+        """
+        self.locale: str = locale
+        """The locale."""
+        self.mtime: float = mtime
+        """The last modification time of the translation files."""
+        translations = domain.get_translations()
+        # Here used to be an isinstance check for NullTranslations, but the
+        # translation object that is "merged" by flask-babel is seen as an
+        # instance of NullTranslations.
+        catalog = translations._catalog.copy()
+
+        # copy()ing the catalog here because we're modifying the original
+        # copy.
+        for key, value in catalog.copy().items():
+            if isinstance(key, tuple):
+                text, plural = key
+                if text not in catalog:
+                    catalog[text] = {}
+
+                catalog[text][plural] = value
+                del catalog[key]
+
+        js: list[str] = ["\"use strict\";\n(function() {\nvar babel = {};\n"
+                         "babel.catalog = ",
+                         json.dumps(catalog, separators=(",", ":"),
+                                    sort_keys=True),
+                         ";\n", JAVASCRIPT]
+
+        metadata = translations.gettext("")
+        if metadata:
+            for m in metadata.splitlines():
+                if m.lower().startswith("plural-forms:"):
+                    js.append("    babel.plural = ")
+                    js.append(c2js(m.lower().split("plural=")[1].rstrip(";")))
+
+        js.append("\nwindow.A_ = babel.gettext;\n})();\n")
+        self.content: bytes = "".join(js).encode("utf-8")
+        """The JavaScript content."""
+        self.gzipped: bytes = gzip.compress(self.content, mtime=0)
+        """The gzip-compressed JavaScript content."""
+        self.digest: str = hashlib.sha256(self.content).hexdigest()[:12]
+        """The content hash."""
+
+
+__js_catalogs: dict[str, JavaScriptCatalog] = {}
+"""The precompiled JavaScript message catalogs by their locales."""
+__mtime: float | None = None
+"""The last modification time of the translation files, or None before it is
+found."""
+
+
+def __get_mtime() -> float:
+    """Returns the last modification time of the translation files.  The
+    translation files are only checked once, except in the debug mode, where
+    they are checked on every request so that the changed translations show
+    without a restart.
+
+    :return: The last modification time of the translation files.
     """
-    js = [
-            """"use strict";
+    global __mtime
+    if __mtime is None or current_app.debug:
+        __mtime = max((x.stat().st_mtime
+                       for x in translation_dir.glob("*/LC_MESSAGES/*.mo")),
+                      default=0)
+    return __mtime
 
-(function() {
-    var babel = {};
-    babel.catalog = """
-    ]
 
-    translations = domain.get_translations()
-    # Here used to be an isinstance check for NullTranslations, but the
-    # translation object that is "merged" by flask-babel is seen as an
-    # instance of NullTranslations.
-    catalog = translations._catalog.copy()
+def get_js_catalog() -> JavaScriptCatalog:
+    """Returns the precompiled JavaScript message catalog of the current
+    locale.  It is compiled again only when the translation files are changed,
+    which is only checked in the debug mode.
 
-    # copy()ing the catalog here because we're modifying the original copy.
-    for key, value in catalog.copy().items():
-        if isinstance(key, tuple):
-            text, plural = key
-            if text not in catalog:
-                catalog[text] = {}
-
-            catalog[text][plural] = value
-            del catalog[key]
+    :return: The JavaScript message catalog of the current locale.
+    """
+    locale: str = str(get_locale())
+    mtime: float = __get_mtime()
+    js_catalog: JavaScriptCatalog | None = __js_catalogs.get(locale)
+    if js_catalog is None or js_catalog.mtime != mtime:
+        js_catalog = JavaScriptCatalog(locale, mtime)
+        __js_catalogs[locale] = js_catalog
+    return js_catalog
 
-    js.append(json.dumps(catalog, indent=4))
 
-    js.append(";\n")
-    js.append(JAVASCRIPT)
+def babel_js_catalog_url() -> str:
+    """Returns the URL of the JavaScript message catalog of the current
+    locale, with its content hash.
 
-    metadata = translations.gettext("")
-    if metadata:
-        for m in metadata.splitlines():
-            if m.lower().startswith("plural-forms:"):
-                js.append("    babel.plural = ")
-                js.append(c2js(m.lower().split("plural=")[1].rstrip(';')))
+    :return: The URL of the JavaScript message catalog.
+    """
+    return url_for("accounting.babel_catalog", v=get_js_catalog().digest)
 
-    js.append("""
 
-    window.A_ = babel.gettext;
-})();
-""")
+def __babel_js_catalog_view() -> Response:
+    """Returns the precompiled JavaScript message catalog.  When the URL has
+    the current content hash, it is cached as immutable.
 
-    resp = Response("".join(js))
-    resp.headers["Content-Type"] = "text/javascript"
-    return resp
+    :return: The response.
+    """
+    js_catalog: JavaScriptCatalog = get_js_catalog()
+    is_gzip: bool = "gzip" in request.accept_encodings
+    response: Response = Response(js_catalog.gzipped if is_gzip
+                                  else js_catalog.content,
+                                  content_type="text/javascript")
+    if is_gzip:
+        response.content_encoding = "gzip"
+    response.vary.add("Accept-Encoding")
+    response.set_etag(f"{js_catalog.digest}-gzip" if is_gzip
+                      else js_catalog.digest)
+    if request.args.get("v") == js_catalog.digest:
+        response.cache_control.public = True
+        response.cache_control.max_age = MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 def init_app(app: Flask, bp: Blueprint) -> None:
@@ -123,4 +202,6 @@ def init_app(app: Flask, bp: Blueprint) -> None:
     :return: None.
     """
     bp.add_url_rule("/_jstrans.js", "babel_catalog", __babel_js_catalog_view)
+    bp.add_app_template_global(babel_js_catalog_url,
+                               "accounting_babel_js_catalog_url")
     app.jinja_env.globals["A_"] = domain.gettext
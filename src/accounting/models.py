@@ -114,6 +114,18 @@ class Account(db.Model):
     """The title."""
     is_need_offset: Mapped[bool] = mapped_column(default=False)
     """Whether the journal entry line items of this account need offset."""
+    account_class: Mapped[int] = mapped_column(index=True)
+    """The account class, the first digit of the base account code."""
+    is_current: Mapped[bool] = mapped_column(default=False, index=True)
+    """Whether this is a current asset or liability account."""
+    is_selectable_debit: Mapped[bool] \
+        = mapped_column(default=False, index=True)
+    """Whether journal entry line items can start from the debit side of this
+    account."""
+    is_selectable_credit: Mapped[bool] \
+        = mapped_column(default=False, index=True)
+    """Whether journal entry line items can start from the credit side of
+    this account."""
     created_at: Mapped[dt.datetime] \
         = mapped_column(db.DateTime(timezone=True),
                         server_default=db.func.now())
@@ -132,12 +144,17 @@ class Account(db.Model):
     """The ID of the last user who updated the record."""
     updated_by: Mapped[user_cls] = db.relationship(foreign_keys=updated_by_id)
     """The last user who updated the record."""
+    version: Mapped[int] = mapped_column(default=1)
+    """The version, increased on every update.  An update is written only if
+    the version was not changed by another update in between."""
     l10n: Mapped[list[AccountL10n]] \
         = db.relationship(back_populates="account", lazy=False)
     """The localized titles."""
     line_items: Mapped[list[JournalEntryLineItem]] \
         = db.relationship(back_populates="account")
     """The journal entry line items."""
+    __mapper_args__ = {"version_id_col": version}
+    """The mapper arguments."""
 
     CASH_CODE: str = "1111-001"
     """The code of the cash account,"""
@@ -205,6 +222,58 @@ class Account(db.Model):
         """
         return self.base_code[0] in {"1", "2", "3"}
 
+    @staticmethod
+    def classification(base_code: str, is_need_offset: bool | None) \
+            -> dict[str, int | bool]:
+        """Returns the classification columns derived from the base account
+        code.  Payable line items can not start from debit, and receivable
+        line items can not start from credit.
+
+        :param base_code: The code of the base account.
+        :param is_need_offset: Whether the journal entry line items of the
+            account need offset.
+        :return: The values of the classification columns.
+        """
+        account_class: int = int(base_code[0])
+        is_current: bool = base_code[:2] in {"11", "12", "21", "22"}
+        if base_code == "3353":
+            return {"account_class": account_class,
+                    "is_current": is_current,
+                    "is_selectable_debit": False,
+                    "is_selectable_credit": False}
+        return {"account_class": account_class,
+                "is_current": is_current,
+                "is_selectable_debit":
+                    account_class in {1, 3, 5, 6, 8, 9}
+                    or (account_class == 2 and not is_need_offset)
+                    or base_code[:2] in {"75", "76", "77", "78"},
+                "is_selectable_credit":
+                    account_class in {2, 3, 4, 8, 9}
+                    or (account_class == 1 and not is_need_offset)
+                    or base_code[:2] in {"71", "72", "73", "74"}}
+
+    def classify(self) -> bool:
+        """Derives the classification columns from the base account code.
+
+        :return: True if any of the classification columns is changed, or
+            False otherwise.
+        """
+        is_changed: bool = False
+        for name, value in self.classification(
+                self.base_code, self.is_need_offset).items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                is_changed = True
+        return is_changed
+
+    @classmethod
+    def real_condition(cls) -> sa.ColumnElement[bool]:
+        """Returns the SQL condition of the real accounts.
+
+        :return: The SQL condition of the real accounts.
+        """
+        return cls.account_class <= 3
+
     @property
     def is_nominal(self) -> bool:
         """Returns whether the account is a nominal account.
@@ -261,7 +330,10 @@ class Account(db.Model):
         """
         if self.code in {"1111-001", "3351-001", "3353-001"}:
             return False
-        return len(self.line_items) == 0
+        if len(self.line_items) > 0:
+            return False
+        return not db.session.scalar(sa.select(sa.exists().where(
+            ArchivedJournalEntryLineItem.account_id == self.id)))
 
     def delete(self) -> None:
         """Deletes this account.
@@ -292,21 +364,17 @@ class Account(db.Model):
 
         :return: The selectable debit accounts.
         """
-        return cls.query.filter(sa.or_(cls.base_code.startswith("1"),
-                                       sa.and_(cls.base_code.startswith("2"),
-                                               sa.not_(cls.is_need_offset)),
-                                       cls.base_code.startswith("3"),
-                                       cls.base_code.startswith("5"),
-                                       cls.base_code.startswith("6"),
-                                       cls.base_code.startswith("75"),
-                                       cls.base_code.startswith("76"),
-                                       cls.base_code.startswith("77"),
-                                       cls.base_code.startswith("78"),
-                                       cls.base_code.startswith("8"),
-                                       cls.base_code.startswith("9")),
-                                cls.base_code != "3353")\
+        return cls.query.filter(cls.selectable_debit_condition())\
             .order_by(cls.base_code, cls.no).all()
 
+    @classmethod
+    def selectable_debit_condition(cls) -> sa.ColumnElement[bool]:
+        """Returns the SQL condition of the selectable debit accounts.
+
+        :return: The SQL condition of the selectable debit accounts.
+        """
+        return cls.is_selectable_debit
+
     @classmethod
     def selectable_credit(cls) -> list[Self]:
         """Returns the selectable debit accounts.
@@ -314,20 +382,17 @@ class Account(db.Model):
 
         :return: The selectable debit accounts.
         """
-        return cls.query.filter(sa.or_(sa.and_(cls.base_code.startswith("1"),
-                                               sa.not_(cls.is_need_offset)),
-                                       cls.base_code.startswith("2"),
-                                       cls.base_code.startswith("3"),
-                                       cls.base_code.startswith("4"),
-                                       cls.base_code.startswith("71"),
-                                       cls.base_code.startswith("72"),
-                                       cls.base_code.startswith("73"),
-                                       cls.base_code.startswith("74"),
-                                       cls.base_code.startswith("8"),
-                                       cls.base_code.startswith("9")),
-                                cls.base_code != "3353")\
+        return cls.query.filter(cls.selectable_credit_condition())\
             .order_by(cls.base_code, cls.no).all()
 
+    @classmethod
+    def selectable_credit_condition(cls) -> sa.ColumnElement[bool]:
+        """Returns the SQL condition of the selectable credit accounts.
+
+        :return: The SQL condition of the selectable credit accounts.
+        """
+        return cls.is_selectable_credit
+
     @classmethod
     def cash(cls) -> Self:
         """Returns the cash account.
@@ -345,6 +410,21 @@ class Account(db.Model):
         return cls.find_by_code(cls.ACCUMULATED_CHANGE_CODE)
 
 
+@sa.event.listens_for(Account, "before_insert")
+@sa.event.listens_for(Account, "before_update")
+def __classify_account(mapper: sa.orm.Mapper, connection: sa.Connection,
+                       target: Account) -> None:
+    """Derives the classification columns of an account from its base
+    account code when it is written.
+
+    :param mapper: The mapper.
+    :param connection: The database connection.
+    :param target: The account.
+    :return: None.
+    """
+    target.classify()
+
+
 class AccountL10n(db.Model):
     """A localized account title."""
     __tablename__ = "accounting_accounts_l10n"
@@ -461,7 +541,10 @@ class Currency(db.Model):
         from accounting.template_globals import default_currency_code
         if self.code == default_currency_code():
             return False
-        return len(self.line_items) == 0
+        if len(self.line_items) > 0:
+            return False
+        return not db.session.scalar(sa.select(sa.exists().where(
+            ArchivedJournalEntryLineItem.currency_code == self.code)))
 
     def delete(self) -> None:
         """Deletes the currency.
@@ -563,9 +646,14 @@ class JournalEntry(db.Model):
     """The ID of the last user who updated the record."""
     updated_by: Mapped[user_cls] = db.relationship(foreign_keys=updated_by_id)
     """The last user who updated the record."""
+    version: Mapped[int] = mapped_column(default=1)
+    """The version, increased on every update.  An update is written only if
+    the version was not changed by another update in between."""
     line_items: Mapped[list[JournalEntryLineItem]] \
         = db.relationship(back_populates="journal_entry")
     """The line items."""
+    __mapper_args__ = {"version_id_col": version}
+    """The mapper arguments."""
 
     def __str__(self) -> str:
         """Returns the string representation of this journal entry.
@@ -876,6 +964,19 @@ class JournalEntryLineItem(db.Model):
                 format_amount(self.amount)]
 
 
+class JournalEntryNumbering(db.Model):
+    """The numbering of the journal entries on a date.  Its row is locked
+    while the journal entries on the date are numbered, until the transaction
+    is committed, so that the journal entries on the same date are numbered
+    one transaction after another."""
+    __tablename__ = "accounting_journal_entry_numbering"
+    """The table name."""
+    date: Mapped[dt.date] = mapped_column(primary_key=True)
+    """The date."""
+    generation: Mapped[int] = mapped_column(default=0)
+    """The number of times the journal entries on the date were numbered."""
+
+
 class Option(db.Model):
     """An option."""
     __tablename__ = "accounting_options"
@@ -902,3 +1003,151 @@ class Option(db.Model):
     """The ID of the last user who updated the record."""
     updated_by: Mapped[user_cls] = db.relationship(foreign_keys=updated_by_id)
     """The last user who updated the record."""
+
+
+class PeriodClose(db.Model):
+    """A closed-through date of the accounting periods.  The journal entries
+    on or before the latest closed-through date cannot be changed."""
+    __tablename__ = "accounting_period_closes"
+    """The table name."""
+    date: Mapped[dt.date] = mapped_column(primary_key=True)
+    """The closed-through date."""
+    created_at: Mapped[dt.datetime] \
+        = mapped_column(db.DateTime(timezone=True),
+                        server_default=db.func.now())
+    """The date and time when this record was created."""
+    created_by_id: Mapped[int] \
+        = mapped_column(db.ForeignKey(user_pk_column, onupdate="CASCADE"))
+    """The ID of the user who created the record."""
+    created_by: Mapped[user_cls] = db.relationship(foreign_keys=created_by_id)
+    """The user who created the record."""
+    is_archived: Mapped[bool] = mapped_column(default=False)
+    """Whether the journal entries through the date are archived."""
+    balances: Mapped[list[PeriodCloseBalance]] \
+        = db.relationship(back_populates="period_close",
+                          cascade="all, delete-orphan")
+    """The snapshot of the balances through the closed-through date."""
+
+
+class PeriodCloseBalance(db.Model):
+    """The balance of an account in a currency through a closed-through
+    date."""
+    __tablename__ = "accounting_period_close_balances"
+    """The table name."""
+    date: Mapped[dt.date] \
+        = mapped_column(db.ForeignKey(PeriodClose.date, onupdate="CASCADE",
+                                      ondelete="CASCADE"),
+                        primary_key=True)
+    """The closed-through date."""
+    period_close: Mapped[PeriodClose] \
+        = db.relationship(back_populates="balances")
+    """The period close."""
+    currency_code: Mapped[str] \
+        = mapped_column(db.ForeignKey(Currency.code, onupdate="CASCADE"),
+                        primary_key=True)
+    """The currency code."""
+    account_id: Mapped[int] \
+        = mapped_column(db.ForeignKey(Account.id, onupdate="CASCADE"),
+                        primary_key=True)
+    """The account ID."""
+    balance: Mapped[Decimal] = mapped_column(db.Numeric(14, 2))
+    """The balance, debit positive and credit negative."""
+
+
+class ArchivedJournalEntry(db.Model):
+    """An archived journal entry in a closed fiscal year."""
+    __tablename__ = "accounting_archived_journal_entries"
+    """The table name."""
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    """The journal entry ID."""
+    date: Mapped[dt.date]
+    """The date."""
+    no: Mapped[int] = mapped_column(default=text("1"))
+    """The journal entry number under the date."""
+    note: Mapped[str | None]
+    """The note."""
+    created_at: Mapped[dt.datetime] \
+        = mapped_column(db.DateTime(timezone=True),
+                        server_default=db.func.now())
+    """The date and time when this record was created."""
+    created_by_id: Mapped[int] \
+        = mapped_column(db.ForeignKey(user_pk_column, onupdate="CASCADE"))
+    """The ID of the user who created the record."""
+    updated_at: Mapped[dt.datetime] \
+        = mapped_column(db.DateTime(timezone=True),
+                        server_default=db.func.now())
+    """The date and time when this record was last updated."""
+    updated_by_id: Mapped[int] \
+        = mapped_column(db.ForeignKey(user_pk_column, onupdate="CASCADE"))
+    """The ID of the last user who updated the record."""
+    version: Mapped[int] = mapped_column(default=1)
+    """The version when it was archived."""
+
+
+class ArchivedJournalEntryLineItem(db.Model):
+    """An archived line item in a closed fiscal year."""
+    __tablename__ = "accounting_archived_journal_entry_line_items"
+    """The table name."""
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    """The line item ID."""
+    journal_entry_id: Mapped[int] \
+        = mapped_column(db.ForeignKey(ArchivedJournalEntry.id,
+                                      onupdate="CASCADE", ondelete="CASCADE"))
+    """The journal entry ID."""
+    is_debit: Mapped[bool]
+    """True for a debit line item, or False for a credit line item."""
+    no: Mapped[int]
+    """The line item number under the journal entry and debit or credit."""
+    original_line_item_id: Mapped[int | None] \
+        = mapped_column(db.ForeignKey(id, onupdate="CASCADE"))
+    """The ID of the original line item."""
+    currency_code: Mapped[str] \
+        = mapped_column(db.ForeignKey(Currency.code, onupdate="CASCADE"))
+    """The currency code."""
+    account_id: Mapped[int] \
+        = mapped_column(db.ForeignKey(Account.id, onupdate="CASCADE"))
+    """The account ID."""
+    description: Mapped[str | None]
+    """The description."""
+    amount: Mapped[Decimal] = mapped_column(db.Numeric(14, 2))
+    """The amount."""
+
+
+class Change(db.Model):
+    """A change in the change log.  The change log is append-only, and the
+    sequence numbers follow the order in which the changes are committed, so
+    that the downstream systems can synchronize incrementally from the
+    sequence number they have last seen."""
+    __tablename__ = "accounting_changes"
+    """The table name."""
+    seq: Mapped[int] = mapped_column(primary_key=True)
+    """The sequence number."""
+    model: Mapped[str]
+    """The changed model, either "journal-entry", "account", "currency", or
+    "option"."""
+    key: Mapped[str]
+    """The key of the changed record, as the journal entry ID, the account
+    ID, the currency code, or the option name."""
+    operation: Mapped[str]
+    """The operation, either "create", "update", or "delete"."""
+    changed_at: Mapped[dt.datetime] \
+        = mapped_column(db.DateTime(timezone=True),
+                        server_default=db.func.now())
+    """The date and time when the change was made."""
+
+
+class ChangeCounter(db.Model):
+    """The counter of the change log and the data generation.  It has only
+    one row, which is locked from when it is advanced until the transaction is
+    committed, so that the sequence numbers and the generations are given out
+    in the order of the commits."""
+    __tablename__ = "accounting_change_counter"
+    """The table name."""
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    """The ID, always 1."""
+    seq: Mapped[int]
+    """The last sequence number given out."""
+    generation: Mapped[int] = mapped_column(default=0)
+    """The data generation, increased by every committed transaction that
+    changes the data, including the archive that is not in the change
+    log."""
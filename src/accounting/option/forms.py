@@ -17,19 +17,24 @@
 """The forms for the option management.
 
 """
+import datetime as dt
+
 from flask import render_template
 from flask_babel import LazyString
 from flask_wtf import FlaskForm
-from wtforms import StringField, FieldList, FormField, IntegerField
-from wtforms.validators import DataRequired, ValidationError
+from wtforms import StringField, FieldList, FormField, IntegerField, \
+    DateField
+from wtforms.validators import DataRequired, Optional, ValidationError
 
 from accounting.forms import ACCOUNT_REQUIRED, CurrencyExists, AccountExists, \
     IsDebitAccount, IsCreditAccount
 from accounting.locale import lazy_gettext
 from accounting.models import Account
+from accounting.utils.archive import get_archived_date
 from accounting.utils.current_account import CurrentAccount
 from accounting.utils.options import Options
 from accounting.utils.strip_text import strip_text
+from accounting.utils.timezone import get_tz_today
 
 
 class CurrentAccountExists:
@@ -54,6 +59,29 @@ class AccountNotCurrent:
                 "This is not a current account."))
 
 
+class NotInFuture:
+    """The validator to check that the date is not in the future."""
+
+    def __call__(self, form: FlaskForm, field: DateField) -> None:
+        if field.data is None:
+            return
+        if field.data > get_tz_today():
+            raise ValidationError(lazy_gettext(
+                "The date cannot be in the future."))
+
+
+class NotBeforeArchivedDate:
+    """The validator to check that the archived periods are not reopened."""
+
+    def __call__(self, form: FlaskForm, field: DateField) -> None:
+        archived_date: dt.date | None = get_archived_date()
+        if archived_date is None:
+            return
+        if field.data is None or field.data < archived_date:
+            raise ValidationError(lazy_gettext(
+                "The archived periods cannot be reopened."))
+
+
 class NotStartPayableFromExpense:
     """The validator to check that a payable line item does not start from
     expense."""
@@ -249,6 +277,9 @@ class OptionForm(FlaskForm):
     """The default account code for the income and expenses log."""
     recurring = FormField(RecurringForm)
     """The recurring expenses and incomes."""
+    closed_date = DateField(validators=[NotBeforeArchivedDate(), Optional(),
+                                        NotInFuture()])
+    """The date through which the periods are closed."""
 
     def populate_obj(self, obj: Options) -> None:
         """Populates the form data into a currency object.
@@ -259,6 +290,7 @@ class OptionForm(FlaskForm):
         obj.default_currency_code = self.default_currency_code.data
         obj.default_ie_account_code = self.default_ie_account_code.data
         obj.recurring_data = self.recurring.form.as_data
+        obj.closed_date = self.closed_date.data
 
     @property
     def current_accounts(self) -> list[CurrentAccount]:
@@ -29,7 +29,6 @@ from accounting.utils.flash_errors import flash_form_errors
 from accounting.utils.next_uri import inherit_next
 from accounting.utils.options import options
 from accounting.utils.permission import has_permission, can_admin
-from .forms import OptionForm
 
 bp: Blueprint = Blueprint("option", __name__)
 """The view blueprint for the currency management."""
@@ -52,6 +51,7 @@ def show_option_form() -> str:
 
     :return: The option form.
     """
+    from .forms import OptionForm
     form: OptionForm
     if "form" in session:
         form = OptionForm(ImmutableMultiDict(parse_qsl(session["form"])))
@@ -69,6 +69,7 @@ def update_options() -> redirect:
 
     :return: The redirection to the option form.
     """
+    from .forms import OptionForm
     form = OptionForm(request.form)
     if not form.validate():
         flash_form_errors(form)
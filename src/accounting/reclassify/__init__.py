@@ -0,0 +1,30 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The bulk reclassification of the line items between accounts.
+
+"""
+from flask import Blueprint
+
+
+def init_app(bp: Blueprint) -> None:
+    """Initialize the application.
+
+    :param bp: The blueprint of the accounting application.
+    :return: None.
+    """
+    from .views import bp as reclassify_bp
+    bp.register_blueprint(reclassify_bp, url_prefix="/reclassify")
@@ -0,0 +1,115 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The forms for the bulk reclassification.
+
+"""
+from flask_wtf import FlaskForm
+from wtforms import StringField, DateField
+from wtforms.validators import Optional, ValidationError
+
+from accounting import db
+from accounting.forms import ACCOUNT_REQUIRED, AccountExists, CurrencyExists
+from accounting.locale import lazy_gettext
+from accounting.models import Account, Currency
+from accounting.utils.strip_text import strip_text
+from .reclassifier import Reclassifier
+
+
+class NotSameAsSource:
+    """The validator to check that the target account is not the source
+    account."""
+
+    def __call__(self, form: FlaskForm, field: StringField) -> None:
+        assert isinstance(form, ReclassifyForm)
+        if field.data is None or field.data != form.source.data:
+            return
+        raise ValidationError(lazy_gettext(
+            "The target account must be different from the source account."))
+
+
+class IsSelectableAccount:
+    """The validator to check that the account can be used in the line
+    items."""
+
+    def __call__(self, form: FlaskForm, field: StringField) -> None:
+        if field.data is None:
+            return
+        account: Account | None = Account.find_by_code(field.data)
+        if account is None or account.is_selectable_debit \
+                or account.is_selectable_credit:
+            return
+        raise ValidationError(lazy_gettext(
+            "This account cannot be used in the line items."))
+
+
+class NotBeforeStart:
+    """The validator to check that the end date is not before the start
+    date."""
+
+    def __call__(self, form: FlaskForm, field: DateField) -> None:
+        assert isinstance(form, ReclassifyForm)
+        if field.data is None or form.start.data is None:
+            return
+        if field.data < form.start.data:
+            raise ValidationError(lazy_gettext(
+                "The end date cannot be earlier than the start date."))
+
+
+class ReclassifyForm(FlaskForm):
+    """The form to move the line items from an account to another."""
+    source = StringField(
+        filters=[strip_text],
+        validators=[ACCOUNT_REQUIRED, AccountExists()])
+    """The code of the account to move the line items from."""
+    target = StringField(
+        filters=[strip_text],
+        validators=[ACCOUNT_REQUIRED, AccountExists(), NotSameAsSource(),
+                    IsSelectableAccount()])
+    """The code of the account to move the line items to."""
+    currency_code = StringField(
+        filters=[strip_text],
+        validators=[CurrencyExists()])
+    """The currency code, or None for all the currencies."""
+    start = DateField(validators=[Optional()])
+    """The first date, or None from the beginning."""
+    end = DateField(validators=[Optional(), NotBeforeStart()])
+    """The last date, or None to the latest."""
+    description = StringField(filters=[strip_text])
+    """The SQL LIKE pattern of the descriptions, or None for all the
+    descriptions."""
+
+    @property
+    def account_options(self) -> list[Account]:
+        """Returns the account options.
+
+        :return: The account options.
+        """
+        return Account.query.order_by(Account.base_code, Account.no).all()
+
+    @property
+    def reclassifier(self) -> Reclassifier:
+        """Returns the bulk reclassification of the validated form.
+
+        :return: The bulk reclassification.
+        """
+        return Reclassifier(
+            Account.find_by_code(self.source.data),
+            Account.find_by_code(self.target.data),
+            currency=None if self.currency_code.data is None
+            else db.session.get(Currency, self.currency_code.data),
+            start=self.start.data, end=self.end.data,
+            description=self.description.data)
@@ -0,0 +1,224 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The bulk reclassification of the line items from an account to another.
+
+The line items are moved in one set-based UPDATE.  The rules that the journal
+entry forms check one line item at a time are checked in the same statement
+instead, so that the line items that the forms would reject are left where
+they are:
+
+* The line items in the closed periods cannot be changed.
+* An offset must stay in the account of its original line item, and an
+  original line item with offsets must keep its account.
+* The target account must be selectable on the debit or credit side of the
+  line item.  Payable line items cannot start from debit, and receivable
+  line items cannot start from credit.
+
+The closed periods are not changed, so their balance snapshots stay valid.
+The change log, the report cache, and the ledger metadata find the changes
+from the statements themselves.
+
+"""
+import datetime as dt
+
+import sqlalchemy as sa
+
+from accounting import db
+from accounting.models import Account, Currency, JournalEntry, \
+    JournalEntryLineItem
+from accounting.utils.period_close import get_closed_date
+
+
+class Reclassifier:
+    """The bulk reclassification of the line items from an account to
+    another."""
+
+    def __init__(self, source: Account, target: Account,
+                 currency: Currency | None = None,
+                 start: dt.date | None = None, end: dt.date | None = None,
+                 description: str | None = None):
+        """Constructs the bulk reclassification, and counts the line items to
+        move.
+
+        :param source: The account to move the line items from.
+        :param target: The account to move the line items to.
+        :param currency: The currency of the line items, or None for all the
+            currencies.
+        :param start: The first date of the line items, or None from the
+            beginning.
+        :param end: The last date of the line items, or None to the latest.
+        :param description: The SQL LIKE pattern of the descriptions, or None
+            for all the descriptions.
+        """
+        self.source: Account = source
+        """The account to move the line items from."""
+        self.target: Account = target
+        """The account to move the line items to."""
+        self.__conditions: list[sa.ColumnElement[bool]] \
+            = self.__filter_conditions(source, currency, start, end,
+                                       description)
+        """The conditions of the line items in the filter."""
+        closed: sa.ColumnElement[bool] = self.__closed_condition()
+        matched: sa.ColumnElement[bool] = self.__matched_condition()
+        side: sa.ColumnElement[bool] = self.__side_condition(target)
+        self.__movable: list[sa.ColumnElement[bool]] \
+            = [sa.not_(closed), sa.not_(matched), side]
+        """The conditions of the line items that can be moved."""
+        row: sa.Row = db.session.execute(
+            sa.select(sa.func.count(),
+                      self.__count_if(sa.and_(*self.__movable)),
+                      self.__count_if(closed),
+                      self.__count_if(sa.and_(sa.not_(closed), matched)),
+                      self.__count_if(sa.and_(sa.not_(closed),
+                                              sa.not_(matched),
+                                              sa.not_(side))))
+            .filter(*self.__conditions)).one()
+        self.total: int = row[0]
+        """The number of the line items in the filter."""
+        self.movable: int = row[1] or 0
+        """The number of the line items that can be moved."""
+        self.in_closed_periods: int = row[2] or 0
+        """The number of the line items that cannot be moved because they
+        are in the closed periods."""
+        self.with_offsets: int = row[3] or 0
+        """The number of the line items that cannot be moved because they are
+        offsets or original line items with offsets, other than those in the
+        closed periods."""
+        self.wrong_side: int = row[4] or 0
+        """The number of the line items that cannot be moved because the
+        target account cannot be used on their debit or credit side, other
+        than those in the closed periods or with offsets."""
+
+    def reclassify(self, updater_pk: int) -> int:
+        """Moves the line items.  The journal entries of the line items are
+        marked as updated, so that the edits based on the earlier versions
+        fail instead of moving the line items back.  The changes are not
+        committed.
+
+        :param updater_pk: The primary key value of the user who moves the
+            line items.
+        :return: The number of the moved line items.
+        """
+        if self.movable == 0:
+            return 0
+        conditions: list[sa.ColumnElement[bool]] \
+            = [*self.__conditions, *self.__movable]
+        db.session.execute(
+            sa.update(JournalEntry)
+            .filter(JournalEntry.id.in_(
+                sa.select(JournalEntryLineItem.journal_entry_id)
+                .filter(*conditions).scalar_subquery()))
+            .values(version=JournalEntry.version + 1,
+                    updated_by_id=updater_pk,
+                    updated_at=sa.func.now())
+            .execution_options(synchronize_session=False))
+        result: sa.CursorResult = db.session.execute(
+            sa.update(JournalEntryLineItem)
+            .filter(*conditions)
+            .values(account_id=self.target.id)
+            .execution_options(synchronize_session=False))
+        return result.rowcount
+
+    @staticmethod
+    def __filter_conditions(source: Account, currency: Currency | None,
+                            start: dt.date | None, end: dt.date | None,
+                            description: str | None) \
+            -> list[sa.ColumnElement[bool]]:
+        """Returns the conditions of the line items in the filter.
+
+        :param source: The account to move the line items from.
+        :param currency: The currency, or None for all the currencies.
+        :param start: The first date, or None from the beginning.
+        :param end: The last date, or None to the latest.
+        :param description: The SQL LIKE pattern of the descriptions, or
+            None for all the descriptions.
+        :return: The conditions of the line items in the filter.
+        """
+        conditions: list[sa.ColumnElement[bool]] \
+            = [JournalEntryLineItem.account_id == source.id]
+        if currency is not None:
+            conditions.append(
+                JournalEntryLineItem.currency_code == currency.code)
+        dates: list[sa.ColumnElement[bool]] = []
+        if start is not None:
+            dates.append(JournalEntry.date >= start)
+        if end is not None:
+            dates.append(JournalEntry.date <= end)
+        if len(dates) > 0:
+            conditions.append(JournalEntryLineItem.journal_entry_id.in_(
+                sa.select(JournalEntry.id).filter(*dates)))
+        if description is not None:
+            conditions.append(
+                JournalEntryLineItem.description.like(description))
+        return conditions
+
+    @staticmethod
+    def __closed_condition() -> sa.ColumnElement[bool]:
+        """Returns the condition of the line items in the closed periods.
+
+        :return: The condition of the line items in the closed periods.
+        """
+        closed_date: dt.date | None = get_closed_date()
+        if closed_date is None:
+            return sa.false()
+        return JournalEntryLineItem.journal_entry_id.in_(
+            sa.select(JournalEntry.id)
+            .filter(JournalEntry.date <= closed_date))
+
+    @staticmethod
+    def __matched_condition() -> sa.ColumnElement[bool]:
+        """Returns the condition of the offsets and the original line items
+        with offsets.  The original line item IDs are selected from a derived
+        table, since some databases do not update a table with a subquery on
+        itself.
+
+        :return: The condition of the offsets and the original line items with
+            offsets.
+        """
+        original_id: sa.Subquery = sa.select(
+                JournalEntryLineItem.original_line_item_id.label("id"))\
+            .filter(JournalEntryLineItem.original_line_item_id.is_not(None))\
+            .distinct().subquery()
+        return sa.or_(JournalEntryLineItem.original_line_item_id.is_not(None),
+                      JournalEntryLineItem.id.in_(sa.select(original_id.c.id)))
+
+    @staticmethod
+    def __side_condition(target: Account) -> sa.ColumnElement[bool]:
+        """Returns the condition of the line items on the sides where the
+        target account can be used.  The moved line items are never offsets,
+        so they follow the same rules as the line items that are not
+        offsets.
+
+        :param target: The account to move the line items to.
+        :return: The condition of the line items on the sides where the target
+            account can be used.
+        """
+        sides: list[bool] = []
+        if target.is_selectable_debit:
+            sides.append(True)
+        if target.is_selectable_credit:
+            sides.append(False)
+        return JournalEntryLineItem.is_debit.in_(sides)
+
+    @staticmethod
+    def __count_if(condition: sa.ColumnElement[bool]) -> sa.ColumnElement[int]:
+        """Returns the SQL expression to count the rows with a condition.
+
+        :param condition: The condition.
+        :return: The SQL expression to count the rows with the condition.
+        """
+        return sa.func.sum(sa.case((condition, 1), else_=0))
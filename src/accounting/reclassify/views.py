@@ -0,0 +1,86 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The views for the bulk reclassification.
+
+"""
+from urllib.parse import parse_qsl, urlencode
+
+from flask import Blueprint, render_template, redirect, session, request, \
+    flash, url_for
+from werkzeug.datastructures import ImmutableMultiDict
+
+from accounting import db
+from accounting.locale import lazy_gettext
+from accounting.utils.cast import s
+from accounting.utils.flash_errors import flash_form_errors
+from accounting.utils.next_uri import inherit_next
+from accounting.utils.permission import has_permission, can_admin
+from accounting.utils.user import get_current_user_pk
+from .reclassifier import Reclassifier
+
+bp: Blueprint = Blueprint("reclassify", __name__)
+"""The view blueprint for the bulk reclassification."""
+
+
+@bp.get("", endpoint="form")
+@has_permission(can_admin)
+def show_reclassify_form() -> str:
+    """Shows the form to move the line items from an account to another.
+
+    :return: The form to move the line items.
+    """
+    from .forms import ReclassifyForm
+    form: ReclassifyForm
+    if "form" in session:
+        form = ReclassifyForm(ImmutableMultiDict(parse_qsl(session["form"])))
+        del session["form"]
+        form.validate()
+    else:
+        form = ReclassifyForm()
+    return render_template("accounting/reclassify/form.html", form=form)
+
+
+@bp.post("", endpoint="reclassify")
+@has_permission(can_admin)
+def reclassify() -> redirect:
+    """Moves the line items from an account to another.
+
+    :return: The redirection to the form.
+    """
+    from .forms import ReclassifyForm
+    form: ReclassifyForm = ReclassifyForm(request.form)
+    if not form.validate():
+        flash_form_errors(form)
+        session["form"] = urlencode(list(request.form.items()))
+        return redirect(inherit_next(url_for("accounting.reclassify.form")))
+    reclassifier: Reclassifier = form.reclassifier
+    if reclassifier.movable == 0:
+        flash(s(lazy_gettext("There is no line item to move.")), "success")
+    else:
+        moved: int = reclassifier.reclassify(get_current_user_pk())
+        db.session.commit()
+        flash(s(lazy_gettext("Moved %(moved)s line items.", moved=moved)),
+              "success")
+    if reclassifier.total > reclassifier.movable:
+        flash(s(lazy_gettext(
+            "Left %(closed)s line items in the closed periods,"
+            " %(offsets)s matched with offsets, and %(side)s on the debit or"
+            " credit side where the target account cannot be used.",
+            closed=reclassifier.in_closed_periods,
+            offsets=reclassifier.with_offsets,
+            side=reclassifier.wrong_side)), "success")
+    return redirect(inherit_next(url_for("accounting.reclassify.form")))
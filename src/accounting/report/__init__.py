@@ -27,11 +27,19 @@ def init_app(app: Flask, url_prefix: str) -> None:
     :param url_prefix: The URL prefix of the accounting application.
     :return: None.
     """
-    from .converters import PeriodConverter, CurrentAccountConverter, \
-        NeedOffsetAccountConverter
+    from .converters import PeriodConverter, ComparativePeriodConverter, \
+        CurrentAccountConverter, NeedOffsetAccountConverter
     app.url_map.converters["period"] = PeriodConverter
+    app.url_map.converters["comparativePeriod"] = ComparativePeriodConverter
     app.url_map.converters["currentAccount"] = CurrentAccountConverter
     app.url_map.converters["needOffsetAccount"] = NeedOffsetAccountConverter
 
+    from . import cache
+    cache.init_app(app)
+
     from .views import bp as report_bp
     app.register_blueprint(report_bp, url_prefix=url_prefix)
+
+    from .api import api_bp as report_api_bp
+    app.register_blueprint(report_api_bp,
+                           url_prefix=f"{url_prefix}/api/reports")
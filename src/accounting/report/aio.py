@@ -0,0 +1,143 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The asyncio report API.
+
+An asyncio service, like an ASGI dashboard, can fetch the report data on a
+SQLAlchemy AsyncSession, for example with aiosqlite, without blocking its
+threads.  The functions run the query-and-aggregate layer of the reports on
+the session with AsyncSession.run_sync().  An AsyncSession cannot be shared
+by concurrent tasks, so that each report fetched concurrently needs its own
+session, for example from an async_sessionmaker.
+
+This module requires the asyncio support of SQLAlchemy, as in the "async"
+extra of the package.  It runs outside the Flask requests, so that the
+locale of the account titles and the currency names is given explicitly.
+
+"""
+import datetime as dt
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from accounting.report.queries import LineItemData, BalanceSheetData, \
+    query_ledger, query_income_expenses, query_trial_balance, \
+    query_income_statement, query_balance_sheet, query_offset_matcher
+from accounting.report.utils.offset_matcher import OffsetMatcher
+
+
+async def get_ledger(session: AsyncSession, currency_code: str,
+                     account_id: int, start: dt.date | None,
+                     end: dt.date | None, locale: str) -> LineItemData:
+    """Returns the brought-forward balance and the line items of an account
+    in a period, for the ledger.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :param locale: The locale of the titles.
+    :return: The brought-forward balance, debit positive and credit negative,
+        and the line items.
+    """
+    return await session.run_sync(query_ledger, currency_code, account_id,
+                                  start, end, locale)
+
+
+async def get_income_expenses(session: AsyncSession, currency_code: str,
+                              account_id: int | None, start: dt.date | None,
+                              end: dt.date | None, locale: str) \
+        -> LineItemData:
+    """Returns the brought-forward balance and the line items of the other
+    side of a current account in a period, for the income and expenses log.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID, or None for all the current assets and
+        liabilities.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :param locale: The locale of the titles.
+    :return: The brought-forward balance, debit positive and credit negative,
+        and the line items.
+    """
+    return await session.run_sync(query_income_expenses, currency_code,
+                                  account_id, start, end, locale)
+
+
+async def get_trial_balance(session: AsyncSession, currency_code: str,
+                            start: dt.date | None, end: dt.date | None) \
+        -> dict[int, Decimal]:
+    """Returns the balances of the accounts in a period, for the trial
+    balance.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :return: The non-zero balances by the account IDs, debit positive and
+        credit negative.
+    """
+    return await session.run_sync(query_trial_balance, currency_code,
+                                  start, end)
+
+
+async def get_income_statement(session: AsyncSession, currency_code: str,
+                               start: dt.date | None, end: dt.date | None) \
+        -> dict[int, Decimal]:
+    """Returns the balances of the nominal accounts in a period, for the
+    income statement.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :return: The non-zero balances by the account IDs, debit positive and
+        credit negative.
+    """
+    return await session.run_sync(query_income_statement, currency_code,
+                                  start, end)
+
+
+async def get_balance_sheet(session: AsyncSession, currency_code: str,
+                            start: dt.date | None, end: dt.date | None) \
+        -> BalanceSheetData:
+    """Returns the balances for the balance sheet.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :return: The balances on the balance sheet.
+    """
+    return await session.run_sync(query_balance_sheet, currency_code,
+                                  start, end)
+
+
+async def get_offset_matcher(session: AsyncSession, currency_code: str,
+                             account_id: int) -> OffsetMatcher:
+    """Returns the matches of the unapplied original line items and the
+    unmatched offsets of an account.  The line items are loaded with their
+    currencies and journal entries.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID.
+    :return: The offset matcher.
+    """
+    return await session.run_sync(query_offset_matcher, currency_code,
+                                  account_id)
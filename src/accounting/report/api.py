@@ -0,0 +1,354 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The read-only JSON API of the reports.
+
+The integrations fetch the report data as JSON, instead of scraping the
+pages or downloading the CSV.  A response has the column header in
+"columns", and the rows as compact arrays in "rows".  The "fields" parameter
+selects and orders the columns, as a comma-separated list.  The amounts are
+strings of decimal numbers, and the balances are debit positive and credit
+negative.
+
+The journal, the ledger, the income and expenses log, and the search are
+paged by a keyset cursor on the date and the number of the journal entry,
+whether the line item is a debit, and the number of the line item.  The next
+page is sought from the cursor in "next", passed back as the "after"
+parameter, instead of counted from the start, so that the cost of a page
+does not grow with its position.  The running balance is carried in the
+signed cursor.  The brought-forward balance is in the first page.
+
+The trial balance, the income statement, and the balance sheet have one row
+per account, and are not paged.
+
+"""
+import datetime as dt
+from collections.abc import Callable
+from decimal import Decimal
+from typing import Any
+
+import sqlalchemy as sa
+from flask import Blueprint, request, abort, current_app
+from itsdangerous import URLSafeSerializer, BadData
+
+from accounting import db
+from accounting.models import Currency, Account
+from accounting.utils.current_account import CurrentAccount
+from accounting.utils.permission import has_permission, can_view
+from accounting.utils.query import parse_query_keywords
+from accounting.utils.read_routing import read_only
+from .cache import cached_query
+from .period import Period
+from .queries import BalanceSheetData, query_trial_balance, \
+    query_income_statement, query_balance_sheet, select_journal, \
+    select_ledger, query_ledger_brought_forward, select_income_expenses, \
+    query_income_expenses_brought_forward
+from .utils.account_lookup import account_lookup
+from .utils.line_item_rows import LineItemKey, LineItemRow, \
+    load_line_item_rows, line_item_key
+
+DEFAULT_LIMIT: int = 100
+"""The default number of the rows in a page."""
+MAX_LIMIT: int = 1000
+"""The maximum number of the rows in a page."""
+Field = Callable[[LineItemRow, Decimal | None], Any]
+"""A column of the line items, from the line item and the running
+balance."""
+
+api_bp: Blueprint = Blueprint("accounting-report-api", __name__)
+"""The view blueprint for the report API."""
+
+__LINE_ITEM_FIELDS: dict[str, Field] = {
+    "id": lambda x, _: x.id,
+    "journal_entry_id": lambda x, _: x.journal_entry.id,
+    "date": lambda x, _: x.journal_entry.date.isoformat(),
+    "journal_entry_no": lambda x, _: x.journal_entry.no,
+    "is_debit": lambda x, _: x.is_debit,
+    "no": lambda x, _: x.no,
+    "currency": lambda x, _: x.currency.code,
+    "account": lambda x, _: x.account.code,
+    "account_title": lambda x, _: x.account.title,
+    "description": lambda x, _: x.description,
+    "debit": lambda x, _: x.debit,
+    "credit": lambda x, _: x.credit,
+    "note": lambda x, _: x.journal_entry.note}
+"""The columns of the journal and the search."""
+__LEDGER_FIELDS: dict[str, Field] = {
+    **__LINE_ITEM_FIELDS,
+    "balance": lambda _, balance: balance}
+"""The columns of the ledger."""
+__INCOME_EXPENSES_FIELDS: dict[str, Field] = {
+    **{x: __LINE_ITEM_FIELDS[x] for x in __LINE_ITEM_FIELDS
+       if x not in {"debit", "credit"}},
+    "income": lambda x, _: x.credit,
+    "expense": lambda x, _: x.debit,
+    "balance": lambda _, balance: balance}
+"""The columns of the income and expenses log."""
+__ACCOUNT_FIELDS: dict[str, Callable[[Account, Decimal], Any]] = {
+    "account": lambda x, _: x.code,
+    "account_title": lambda x, _: x.title,
+    "balance": lambda _, balance: balance}
+"""The columns of the trial balance, the income statement, and the balance
+sheet."""
+
+
+@api_bp.get("journal/<period:period>", endpoint="journal")
+@has_permission(can_view)
+@read_only
+def get_journal(period: Period) -> dict[str, Any]:
+    """Returns a page of the journal.
+
+    :param period: The period.
+    :return: The page of the journal.
+    """
+    return __line_item_page(
+        lambda x: select_journal(db.session, period.start, period.end, x),
+        __LINE_ITEM_FIELDS)
+
+
+@api_bp.get("ledger/<currency:currency>/<account:account>/<period:period>",
+            endpoint="ledger")
+@has_permission(can_view)
+@read_only
+def get_ledger(currency: Currency, account: Account, period: Period) \
+        -> dict[str, Any]:
+    """Returns a page of the ledger.
+
+    :param currency: The currency.
+    :param account: The account.
+    :param period: The period.
+    :return: The page of the ledger.
+    """
+    return __line_item_page(
+        lambda x: select_ledger(db.session, currency.code, account.id,
+                                period.start, period.end, x),
+        __LEDGER_FIELDS,
+        lambda: query_ledger_brought_forward(db.session, currency.code,
+                                             account.id, period.start),
+        lambda x: x.amount if x.is_debit else -x.amount)
+
+
+@api_bp.get("income-expenses/<currency:currency>/<currentAccount:account>/"
+            "<period:period>", endpoint="income-expenses")
+@has_permission(can_view)
+@read_only
+def get_income_expenses(currency: Currency, account: CurrentAccount,
+                        period: Period) -> dict[str, Any]:
+    """Returns a page of the income and expenses log.
+
+    :param currency: The currency.
+    :param account: The account.
+    :param period: The period.
+    :return: The page of the income and expenses log.
+    """
+    account_id: int | None = None \
+        if account.code == CurrentAccount.CURRENT_AL_CODE else account.id
+    return __line_item_page(
+        lambda x: select_income_expenses(db.session, currency.code,
+                                         account_id, period.start,
+                                         period.end, x),
+        __INCOME_EXPENSES_FIELDS,
+        lambda: query_income_expenses_brought_forward(
+            db.session, currency.code, account_id, period.start),
+        lambda x: -x.amount if x.is_debit else x.amount)
+
+
+@api_bp.get("trial-balance/<currency:currency>/<period:period>",
+            endpoint="trial-balance")
+@has_permission(can_view)
+@read_only
+def get_trial_balance(currency: Currency, period: Period) -> dict[str, Any]:
+    """Returns the trial balance.
+
+    :param currency: The currency.
+    :param period: The period.
+    :return: The trial balance.
+    """
+    return __account_rows(cached_query(query_trial_balance, currency.code,
+                                       period.start, period.end))
+
+
+@api_bp.get("income-statement/<currency:currency>/<period:period>",
+            endpoint="income-statement")
+@has_permission(can_view)
+@read_only
+def get_income_statement(currency: Currency, period: Period) \
+        -> dict[str, Any]:
+    """Returns the income statement.
+
+    :param currency: The currency.
+    :param period: The period.
+    :return: The income statement.
+    """
+    return __account_rows(cached_query(query_income_statement, currency.code,
+                                       period.start, period.end))
+
+
+@api_bp.get("balance-sheet/<currency:currency>/<period:period>",
+            endpoint="balance-sheet")
+@has_permission(can_view)
+@read_only
+def get_balance_sheet(currency: Currency, period: Period) -> dict[str, Any]:
+    """Returns the balance sheet.  The accumulated change and the net change
+    of the nominal accounts are added to their owner's equity accounts.
+
+    :param currency: The currency.
+    :param period: The period.
+    :return: The balance sheet.
+    """
+    data: BalanceSheetData = cached_query(query_balance_sheet, currency.code,
+                                          period.start, period.end)
+    balances: dict[int, Decimal] = dict(data.balances)
+    owner_s_equity: dict[str, Account] = account_lookup()\
+        .get_accounts_by_code({Account.ACCUMULATED_CHANGE_CODE,
+                               Account.NET_CHANGE_CODE})
+    for code, amount in [(Account.ACCUMULATED_CHANGE_CODE, data.accumulated),
+                         (Account.NET_CHANGE_CODE, data.current)]:
+        if amount is not None and code in owner_s_equity:
+            account_id: int = owner_s_equity[code].id
+            balances[account_id] \
+                = balances.get(account_id, Decimal("0")) + amount
+    return __account_rows(balances)
+
+
+@api_bp.get("search", endpoint="search")
+@has_permission(can_view)
+@read_only
+def search() -> dict[str, Any]:
+    """Returns a page of the search result.
+
+    :return: The page of the search result.
+    """
+    from .reports.search import select_search
+    keywords: list[str] = parse_query_keywords(request.args.get("q"))
+    if len(keywords) == 0:
+        return {"columns": list(__LINE_ITEM_FIELDS), "rows": [],
+                "next": None}
+    return __line_item_page(lambda x: select_search(keywords, x),
+                            __LINE_ITEM_FIELDS)
+
+
+def __line_item_page(select: Callable[[LineItemKey | None], sa.Select],
+                     fields: dict[str, Field],
+                     brought_forward: Callable[[], Decimal | None]
+                     | None = None,
+                     change: Callable[[LineItemRow], Decimal] | None = None) \
+        -> dict[str, Any]:
+    """Returns a page of the line items after the cursor.
+
+    :param select: The function to return the query of the line items after
+        a sort key.
+    :param fields: The columns.
+    :param brought_forward: The function to query the brought-forward
+        balance, or None if there is no balance.
+    :param change: The function to return the change of the balance by a
+        line item, or None if there is no balance.
+    :return: The page of the line items.
+    """
+    names: list[str] = __get_field_names(fields)
+    limit: int = min(max(request.args.get("limit", DEFAULT_LIMIT, type=int),
+                         1), MAX_LIMIT)
+    after: LineItemKey | None = None
+    balance: Decimal | None = None
+    result: dict[str, Any] = {"columns": names}
+    cursor: str | None = request.args.get("after")
+    if cursor is not None:
+        after, balance = __load_cursor(cursor)
+    elif brought_forward is not None:
+        balance = brought_forward()
+        result["brought_forward"] = balance
+    line_items: list[LineItemRow] \
+        = load_line_item_rows(select(after).limit(limit + 1))
+    has_more: bool = len(line_items) > limit
+    line_items = line_items[:limit]
+    rows: list[list[Any]] = []
+    for line_item in line_items:
+        if change is not None:
+            balance = (balance or Decimal("0")) + change(line_item)
+        rows.append([fields[x](line_item, balance) for x in names])
+    result["rows"] = rows
+    result["next"] = __dump_cursor(line_item_key(line_items[-1]), balance) \
+        if has_more else None
+    return result
+
+
+def __account_rows(balances: dict[int, Decimal]) -> dict[str, Any]:
+    """Returns the rows of the account balances.
+
+    :param balances: The balances by the account IDs.
+    :return: The rows of the account balances.
+    """
+    names: list[str] = __get_field_names(__ACCOUNT_FIELDS)
+    accounts: dict[int, Account] = account_lookup().get_accounts(balances)
+    ids: list[int] = sorted(accounts, key=lambda x: (accounts[x].base_code,
+                                                     accounts[x].no))
+    return {"columns": names,
+            "rows": [[__ACCOUNT_FIELDS[y](accounts[x], balances[x])
+                      for y in names] for x in ids],
+            "next": None}
+
+
+def __get_field_names(fields: dict[str, Any]) -> list[str]:
+    """Returns the names of the selected columns.
+
+    :param fields: The available columns.
+    :return: The names of the selected columns.
+    """
+    if "fields" not in request.args:
+        return list(fields)
+    names: list[str] = [x.strip() for x in request.args["fields"].split(",")
+                        if x.strip() != ""]
+    if len(names) == 0 or any(x not in fields for x in names):
+        abort(400)
+    return names
+
+
+def __dump_cursor(key: LineItemKey, balance: Decimal | None) -> str:
+    """Returns the signed cursor after a line item.
+
+    :param key: The sort key of the line item.
+    :param balance: The running balance at the line item, or None if there
+        is no balance.
+    :return: The cursor.
+    """
+    return __get_serializer().dumps(
+        [key[0].isoformat(), key[1], key[2], key[3],
+         None if balance is None else str(balance)])
+
+
+def __load_cursor(cursor: str) -> tuple[LineItemKey, Decimal | None]:
+    """Returns the sort key and the running balance in a signed cursor.
+
+    :param cursor: The cursor.
+    :return: The sort key, and the running balance or None if there is no
+        balance.
+    """
+    try:
+        date, journal_entry_no, is_debit, no, balance \
+            = __get_serializer().loads(cursor)
+    except (BadData, ValueError):
+        abort(400)
+    return (dt.date.fromisoformat(date), journal_entry_no, is_debit, no), \
+        None if balance is None else Decimal(balance)
+
+
+def __get_serializer() -> URLSafeSerializer:
+    """Returns the serializer of the cursors.
+
+    :return: The serializer of the cursors.
+    """
+    return URLSafeSerializer(current_app.config["SECRET_KEY"],
+                             "accounting-report-cursor")
@@ -0,0 +1,150 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The report bundle.
+
+At the year end, the journal, and the trial balance, the income statement,
+the balance sheet, and the ledger of every account in use in every currency
+are exported in a period into one ZIP file.  The reports are generated in
+parallel by a process pool, each worker with its own application context and
+database engine, and are written into the ZIP file as soon as they are
+finished.
+
+"""
+import multiprocessing
+import zipfile
+from collections.abc import Callable, Iterator
+from typing import IO
+from urllib.parse import unquote
+
+import sqlalchemy as sa
+from flask import Flask, Response, current_app
+from werkzeug.http import parse_options_header
+
+from accounting import db
+from accounting.models import Currency, Account
+from accounting.utils.ledger_metadata import LedgerMetadata, ledger_metadata
+from .period import Period, get_period
+
+Task = tuple[str, str | None, int | None]
+"""A report to export, as its name, the currency code, and the account ID."""
+
+
+class ReportBundle:
+    """The bundle of the reports in a period."""
+
+    def __init__(self, period: Period):
+        """Constructs the bundle of the reports in a period.
+
+        :param period: The period.
+        """
+        self.period: Period = period
+        """The period."""
+        self.tasks: list[Task] = [("journal", None, None)]
+        """The reports to export."""
+        metadata: LedgerMetadata = ledger_metadata()
+        for currency_code in sorted(metadata.currencies):
+            self.tasks.extend([("trial-balance", currency_code, None),
+                               ("income-statement", currency_code, None),
+                               ("balance-sheet", currency_code, None)])
+            select_accounts: sa.Select = sa.select(Account.id)\
+                .filter(Account.id.in_(metadata.account_ids(currency_code)))\
+                .order_by(Account.base_code, Account.no)
+            self.tasks.extend([("ledger", currency_code, x)
+                               for x in db.session.scalars(select_accounts)])
+
+    def write(self, fp: IO[bytes], workers: int = 1,
+              progress: Callable[[str], None] | None = None) -> None:
+        """Writes the reports into a ZIP file.
+
+        :param fp: The file to write the ZIP file into.
+        :param workers: The number of the worker processes, or 1 to export in
+            the current process.
+        :param progress: The callback with the name of each file as soon as
+            it is written, or None to report no progress.
+        :return: None.
+        """
+        with zipfile.ZipFile(fp, "w", compression=zipfile.ZIP_DEFLATED) \
+                as archive:
+            for filename, content in self.__run(workers):
+                archive.writestr(filename, content)
+                if progress is not None:
+                    progress(filename)
+
+    def __run(self, workers: int) -> Iterator[tuple[str, bytes]]:
+        """Exports the reports, in the order that they are finished.  It
+        runs in a request context.
+
+        :param workers: The number of the worker processes, or 1 to export in
+            the current process.
+        :return: The file names and the contents of the reports.
+        """
+        tasks: list[tuple[str, str, str | None, int | None]] \
+            = [(self.period.spec, *x) for x in self.tasks]
+        if workers > 1 \
+                and "fork" in multiprocessing.get_all_start_methods():
+            app: Flask = current_app._get_current_object()
+            context = multiprocessing.get_context("fork")
+            with context.Pool(min(workers, len(tasks)),
+                              initializer=init_worker, initargs=(app,)) \
+                    as pool:
+                yield from pool.imap_unordered(export_report, tasks)
+            return
+        yield from map(export_report, tasks)
+
+
+def init_worker(app: Flask) -> None:
+    """Initializes a worker process, with its own database engine and
+    application context.
+
+    :param app: The Flask application.
+    :return: None.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    app.test_request_context().push()
+
+
+def export_report(task: tuple[str, str, str | None, int | None]) \
+        -> tuple[str, bytes]:
+    """Exports a report as CSV.
+
+    :param task: The period specification, the report name, the currency
+        code, and the account ID.
+    :return: The file name and the content of the report.
+    """
+    from .reports import Journal, TrialBalance, IncomeStatement, \
+        BalanceSheet, Ledger
+    spec, name, currency_code, account_id = task
+    period: Period = get_period(spec)
+    response: Response
+    if name == "journal":
+        response = Journal(period).csv()
+    else:
+        currency: Currency = db.session.get(Currency, currency_code)
+        if name == "trial-balance":
+            response = TrialBalance(currency, period).csv()
+        elif name == "income-statement":
+            response = IncomeStatement(currency, period).csv()
+        elif name == "balance-sheet":
+            response = BalanceSheet(currency, period).csv()
+        else:
+            response = Ledger(currency, db.session.get(Account, account_id),
+                              period).csv()
+    options: dict[str, str] \
+        = parse_options_header(response.headers["Content-Disposition"])[1]
+    return unquote(options["filename"]), response.get_data()
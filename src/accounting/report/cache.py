@@ -0,0 +1,282 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The report cache.
+
+The query results of the reports are cached against the data generation on
+the change counter.  Every committed transaction that changes the journal
+entries, the accounts, the currencies, or the options, or that archives the
+journal entries, increases the generation in the order of the commits, so
+that a cached result is served only when nothing was committed after it was
+queried, even by another process.  The generation is read before the report
+is queried, so that a result is never older than the generation it is cached
+against.
+
+After changes are committed, the hot reports of this month in the default
+currency are queried again on a small background thread pool, each in its
+own request context, as the report exports do, so that they are ready when
+the user comes back to them.  The hot reports are set in the
+ACCOUNTING_WARM_REPORTS configuration, from "income-expenses",
+"trial-balance", "income-statement", and "balance-sheet".  A burst of
+commits is debounced into one warm-up after ACCOUNTING_WARM_DELAY seconds.
+Nothing is warmed up when the configuration is not set, as the background
+threads cannot share an in-memory SQLite database.
+
+"""
+import datetime as dt
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from flask import Flask, current_app
+from flask_babel import get_babel
+
+from accounting import db
+from accounting.change_log.capture import changes_committed, is_changed
+from accounting.change_log.queries import get_generation
+from accounting.utils.current_account import CurrentAccount
+from accounting.utils.options import options
+from accounting.utils.timezone import get_tz_today
+from .period.month_end import month_end
+
+T = TypeVar("T")
+"""The type of the query result."""
+Key = tuple[Any, ...]
+"""The key of a cached result, as the name of the query and its arguments."""
+
+DELAY: float = 1
+"""The default number of seconds to wait for more commits before the
+warm-up."""
+WORKERS: int = 2
+"""The number of the warm-up threads."""
+MAX_ENTRIES: int = 256
+"""The maximum number of the cached results."""
+__CACHE: str = "accounting_report_cache"
+"""The key of the application extension that keeps the report cache."""
+__WARMER: str = "accounting_report_warmer"
+"""The key of the application extension that keeps the report warmer."""
+
+
+class ReportCache:
+    """The report cache."""
+
+    def __init__(self):
+        """Constructs the report cache."""
+        self.__lock: threading.Lock = threading.Lock()
+        """The lock of the cached results."""
+        self.__generation: int = 0
+        """The data generation that the results are cached against."""
+        self.__results: dict[Key, Any] = {}
+        """The cached results."""
+
+    def get(self, generation: int, key: Key) -> Any | None:
+        """Returns a cached result.
+
+        :param generation: The current data generation.
+        :param key: The key.
+        :return: The cached result, or None if it is not cached against the
+            generation.
+        """
+        with self.__lock:
+            if generation != self.__generation:
+                return None
+            return self.__results.get(key)
+
+    def put(self, generation: int, key: Key, result: Any) -> None:
+        """Caches a result.  The results cached against an older generation
+        are discarded.
+
+        :param generation: The data generation when the result is queried.
+        :param key: The key.
+        :param result: The result.
+        :return: None.
+        """
+        with self.__lock:
+            if generation < self.__generation:
+                return
+            if generation > self.__generation:
+                self.__generation = generation
+                self.__results = {}
+            if key not in self.__results \
+                    and len(self.__results) >= MAX_ENTRIES:
+                del self.__results[next(iter(self.__results))]
+            self.__results[key] = result
+
+    @property
+    def locales(self) -> set[str]:
+        """Returns the locales of the cached income and expenses logs.
+
+        :return: The locales of the cached income and expenses logs.
+        """
+        with self.__lock:
+            return {x[-1] for x in self.__results
+                    if x[0] == "query_income_expenses"}
+
+
+class ReportWarmer:
+    """The warmer that queries the hot reports again after commits."""
+
+    def __init__(self, app: Flask, cache: ReportCache):
+        """Constructs the report warmer.
+
+        :param app: The Flask application.
+        :param cache: The report cache.
+        """
+        self.__app: Flask = app
+        """The Flask application."""
+        self.__cache: ReportCache = cache
+        """The report cache."""
+        self.__lock: threading.Lock = threading.Lock()
+        """The lock of the pending warm-up."""
+        self.__timer: threading.Timer | None = None
+        """The pending warm-up, or None if there is none."""
+        self.__executor: ThreadPoolExecutor | None = None
+        """The thread pool, or None before the first warm-up."""
+
+    def schedule(self) -> None:
+        """Schedules a warm-up, replacing the pending one.
+
+        :return: None.
+        """
+        if not self.__app.config.get("ACCOUNTING_WARM_REPORTS"):
+            return
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+            self.__timer = threading.Timer(
+                self.__app.config.get("ACCOUNTING_WARM_DELAY", DELAY),
+                self.__submit)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def __submit(self) -> None:
+        """Submits the hot reports to the thread pool.
+
+        :return: None.
+        """
+        locales: set[str] = self.__cache.locales
+        with self.__lock:
+            if self.__timer is threading.current_thread():
+                self.__timer = None
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(
+                    WORKERS, thread_name_prefix="accounting-warmer")
+            for name in self.__app.config["ACCOUNTING_WARM_REPORTS"]:
+                self.__executor.submit(self.__warm, name, locales)
+
+    def __warm(self, name: str, locales: set[str]) -> None:
+        """Queries a hot report of this month in the default currency again,
+        in its own request context.
+
+        :param name: The name of the report.
+        :param locales: The locales of the cached income and expenses logs.
+        :return: None.
+        """
+        with self.__app.test_request_context():
+            try:
+                generation: int = get_generation(db.session)
+                for query, args in self.__get_queries(name, locales):
+                    self.__cache.put(generation, (query.__name__, *args),
+                                     query(db.session, *args))
+            except Exception:
+                self.__app.logger.exception(
+                    "Failed to warm up the report %s.", name)
+
+    @staticmethod
+    def __get_queries(name: str, locales: set[str]) \
+            -> list[tuple[Callable[..., Any], tuple[Any, ...]]]:
+        """Returns the queries and their arguments of a hot report of this
+        month in the default currency.
+
+        :param name: The name of the report.
+        :param locales: The locales of the cached income and expenses logs.
+        :return: The queries and their arguments after the session.
+        """
+        from .queries import query_income_expenses, query_trial_balance, \
+            query_income_statement, query_balance_sheet
+        today: dt.date = get_tz_today()
+        start: dt.date = dt.date(today.year, today.month, 1)
+        end: dt.date = month_end(today)
+        currency_code: str = options.default_currency_code
+        if name == "income-expenses":
+            account: CurrentAccount = options.default_ie_account
+            account_id: int | None = None \
+                if account.code == CurrentAccount.CURRENT_AL_CODE \
+                else account.id
+            return [(query_income_expenses,
+                     (currency_code, account_id, start, end, x))
+                    for x in {str(get_babel().instance.default_locale),
+                              *locales}]
+        queries: dict[str, Callable[..., Any]] \
+            = {"trial-balance": query_trial_balance,
+               "income-statement": query_income_statement,
+               "balance-sheet": query_balance_sheet}
+        if name not in queries:
+            return []
+        return [(queries[name], (currency_code, start, end))]
+
+
+def report_cache() -> ReportCache:
+    """Returns the report cache of the current application.
+
+    :return: The report cache.
+    """
+    return current_app.extensions[__CACHE]
+
+
+def cached_query(query: Callable[..., T], *args: Any) -> T:
+    """Returns the result of a report query on the current session, from the
+    cache if nothing was committed after it was cached.  A session with its
+    own changes not committed yet does not use the cache.
+
+    :param query: The query function of the reports.
+    :param args: The arguments of the query after the session.
+    :return: The result of the query.
+    """
+    generation: int = get_generation(db.session)
+    if is_changed(db.session):
+        return query(db.session, *args)
+    cache: ReportCache = report_cache()
+    key: Key = (query.__name__, *args)
+    result: T | None = cache.get(generation, key)
+    if result is None:
+        result = query(db.session, *args)
+        cache.put(generation, key, result)
+    return result
+
+
+def __on_changes_committed(app: Flask) -> None:
+    """Schedules a warm-up after changes are committed.
+
+    :param app: The Flask application.
+    :return: None.
+    """
+    warmer: ReportWarmer | None = app.extensions.get(__WARMER)
+    if warmer is not None:
+        warmer.schedule()
+
+
+def init_app(app: Flask) -> None:
+    """Initializes the application.
+
+    :param app: The Flask application.
+    :return: None.
+    """
+    cache: ReportCache = ReportCache()
+    app.extensions[__CACHE] = cache
+    app.extensions[__WARMER] = ReportWarmer(app, cache)
+    changes_committed.connect(__on_changes_committed)
@@ -24,7 +24,8 @@ from werkzeug.routing import BaseConverter
 
 from accounting.models import Account
 from accounting.utils.current_account import CurrentAccount
-from .period import Period, get_period
+from .period import Period, ComparativePeriod, get_period, \
+    get_comparative_period
 
 
 class PeriodConverter(BaseConverter):
@@ -51,6 +52,31 @@ class PeriodConverter(BaseConverter):
         return value.spec
 
 
+class ComparativePeriodConverter(BaseConverter):
+    """The converter to convert the comparative period specification from and
+    to the corresponding comparative period in the routes."""
+
+    def to_python(self, value: str) -> ComparativePeriod:
+        """Converts a comparative period specification to a comparative
+        period.
+
+        :param value: The comparative period specification.
+        :return: The corresponding comparative period.
+        """
+        try:
+            return get_comparative_period(value)
+        except ValueError:
+            abort(404)
+
+    def to_url(self, value: ComparativePeriod) -> str:
+        """Converts a comparative period to its specification.
+
+        :param value: The comparative period.
+        :return: Its specification.
+        """
+        return value.spec
+
+
 class CurrentAccountConverter(BaseConverter):
     """The converter to convert the current account code from and to the
     corresponding account in the routes."""
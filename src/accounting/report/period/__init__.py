@@ -18,5 +18,6 @@
 
 """
 from .chooser import PeriodChooser
-from .parser import get_period
+from .comparative import ComparativePeriod
+from .parser import get_period, get_comparative_period
 from .period import Period
@@ -23,7 +23,7 @@ This file is largely taken from the NanoParma ERP project, first written in
 import datetime as dt
 from collections.abc import Callable
 
-from accounting.models import JournalEntry
+from accounting.utils.ledger_metadata import ledger_metadata
 from accounting.utils.timezone import get_tz_today
 from .period import Period
 from .shortcuts import ThisMonth, LastMonth, SinceLastMonth, ThisYear, \
@@ -62,9 +62,7 @@ class PeriodChooser:
         self.url_template: str = get_url(TemplatePeriod())
         """The URL template."""
 
-        first: JournalEntry | None \
-            = JournalEntry.query.order_by(JournalEntry.date).first()
-        start: dt.date | None = None if first is None else first.date
+        start: dt.date | None = ledger_metadata().start
 
         # Attributes
         self.data_start: dt.date | None = start
@@ -0,0 +1,89 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The comparative period.
+
+"""
+import datetime as dt
+
+from .description import get_desc
+from .month_end import month_end
+from .period import Period
+
+
+class ComparativePeriod:
+    """A range of years divided into the periods to compare side by side."""
+
+    INTERVALS: dict[str, int] = {"monthly": 1, "quarterly": 3, "yearly": 12}
+    """The number of months in each compared period, by the interval."""
+    MAX_YEARS: int = 10
+    """The maximum number of years in the range, so that the number of the
+    compared periods is bounded."""
+
+    def __init__(self, start_year: int, end_year: int, interval: str):
+        """Constructs a comparative period.
+
+        :param start_year: The first year.
+        :param end_year: The last year.
+        :param interval: The interval, either "monthly", "quarterly", or
+            "yearly".
+        :raise ValueError: When the interval is invalid, the years are
+            reversed, or the range is longer than the maximum number of years.
+        """
+        if interval not in self.INTERVALS or start_year > end_year \
+                or end_year - start_year >= self.MAX_YEARS:
+            raise ValueError
+        self.interval: str = interval
+        """The interval."""
+        self.start: dt.date = dt.date(start_year, 1, 1)
+        """The start of the whole range."""
+        self.end: dt.date = dt.date(end_year, 12, 31)
+        """The end of the whole range."""
+        self.spec: str = f"{start_year}-{interval}" \
+            if start_year == end_year \
+            else f"{start_year}-{end_year}-{interval}"
+        """The period specification."""
+        self.desc: str = get_desc(self.start, self.end)
+        """The text description of the whole range."""
+        self.whole: Period = Period(self.start, self.end)
+        """The whole range as a single period."""
+        self.columns: list[Period] = []
+        """The compared periods."""
+        self.column_titles: list[str] = []
+        """The titles of the compared periods."""
+        months: int = self.INTERVALS[interval]
+        for year in range(start_year, end_year + 1):
+            for month in range(1, 13, months):
+                start: dt.date = dt.date(year, month, 1)
+                self.columns.append(
+                    Period(start, month_end(dt.date(year,
+                                                    month + months - 1, 1))))
+                if interval == "monthly":
+                    self.column_titles.append(f"{year}-{month:02d}")
+                elif interval == "quarterly":
+                    self.column_titles.append(f"{year}Q{month // 3 + 1}")
+                else:
+                    self.column_titles.append(str(year))
+
+    def column_of(self, year: int, month: int) -> int:
+        """Returns the index of the compared period of a month.
+
+        :param year: The year.
+        :param month: The month.
+        :return: The index of the compared period.
+        """
+        return ((year - self.start.year) * 12 + month - 1) \
+            // self.INTERVALS[self.interval]
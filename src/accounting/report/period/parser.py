@@ -23,12 +23,15 @@ import re
 from collections.abc import Callable
 from typing import Type
 
+from .comparative import ComparativePeriod
 from .period import Period
 from .shortcuts import ThisMonth, LastMonth, SinceLastMonth, ThisYear, \
     LastYear, Today, Yesterday, AllTime
 
 DATE_SPEC_RE: str = r"(\d{4})(?:-(\d{2})(?:-(\d{2}))?)?"
 """The regular expression of a date specification."""
+COMPARATIVE_SPEC_RE: str = r"(\d{4})(?:-(\d{4}))?-(monthly|quarterly|yearly)"
+"""The regular expression of a comparative period specification."""
 
 
 def get_period(spec: str | None = None) -> Period:
@@ -58,6 +61,23 @@ def get_period(spec: str | None = None) -> Period:
     return Period(start, end)
 
 
+def get_comparative_period(spec: str) -> ComparativePeriod:
+    """Returns a comparative period instance.  The specification is a year or
+    a range of years, followed by the interval, like "2023-monthly",
+    "2023-quarterly", or "2020-2023-yearly".
+
+    :param spec: The comparative period specification.
+    :return: The comparative period instance.
+    :raise ValueError: When the comparative period specification is invalid.
+    """
+    m = re.match(f"^{COMPARATIVE_SPEC_RE}$", spec)
+    if m is None:
+        raise ValueError
+    start: int = int(m[1])
+    end: int = start if m[2] is None else int(m[2])
+    return ComparativePeriod(start, end, m[3])
+
+
 def __parse_spec(text: str) -> tuple[dt.date | None, dt.date | None]:
     """Parses the period specification.
 
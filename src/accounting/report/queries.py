@@ -0,0 +1,543 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The query-and-aggregate layer of the reports.
+
+The functions here take a database session and plain parameters, and return
+plain data.  They do not use the request, the URL or the translations, so
+that they can run on any session outside a Flask request, as the asyncio
+report API does with AsyncSession.run_sync().  The reports compose their
+pages from the same functions on the current session.
+
+"""
+import datetime as dt
+from decimal import Decimal
+from typing import Any
+
+import sqlalchemy as sa
+
+from accounting.models import Currency, Account
+from accounting.report.utils.amount_column import AmountColumn, \
+    running_balances
+from accounting.report.utils.line_item_rows import LineItemKey, \
+    LineItemRow, select_line_item_rows, order_line_item_rows, \
+    after_line_item, load_line_item_rows, build_line_item_rows
+from accounting.report.utils.offset_matcher import OffsetMatcher
+from accounting.utils.archive import line_item_tables
+from accounting.utils.current_account import CurrentAccount
+from accounting.utils.period_close import get_balances, get_snapshot, \
+    get_snapshot_date
+
+
+class LineItemData:
+    """The brought-forward balance and the line items of an account in a
+    period."""
+
+    def __init__(self, brought_forward: Decimal | None,
+                 line_items: list[LineItemRow]):
+        """Constructs the brought-forward balance and the line items.
+
+        :param brought_forward: The brought-forward balance, or None if there
+            is no brought-forward balance.
+        :param line_items: The line items.
+        """
+        self.brought_forward: Decimal | None = brought_forward
+        """The brought-forward balance, or None if there is no
+        brought-forward balance."""
+        self.line_items: list[LineItemRow] = line_items
+        """The line items."""
+
+
+class IncomeExpensesData(LineItemData):
+    """The brought-forward balance, the line items, their running balances,
+    and the totals of the income and expenses log."""
+
+    def __init__(self, brought_forward: Decimal | None,
+                 line_items: list[LineItemRow], balances: list[Decimal],
+                 income: Decimal, expense: Decimal):
+        """Constructs the data of the income and expenses log.
+
+        :param brought_forward: The brought-forward balance, or None if there
+            is no brought-forward balance.
+        :param line_items: The line items.
+        :param balances: The running balance after each line item.
+        :param income: The total income.
+        :param expense: The total expense.
+        """
+        super().__init__(brought_forward, line_items)
+        self.balances: list[Decimal] = balances
+        """The running balance after each line item."""
+        self.income: Decimal = income
+        """The total income."""
+        self.expense: Decimal = expense
+        """The total expense."""
+
+
+class BalanceSheetData:
+    """The balances on the balance sheet."""
+
+    def __init__(self, balances: dict[int, Decimal],
+                 accumulated: Decimal | None, current: Decimal | None):
+        """Constructs the balances on the balance sheet.
+
+        :param balances: The balances of the real accounts by their IDs,
+            debit positive and credit negative.
+        :param accumulated: The accumulated change of the nominal accounts
+            before the period, or None if there is none.
+        :param current: The net change of the nominal accounts in the period,
+            or None if there is none.
+        """
+        self.balances: dict[int, Decimal] = balances
+        """The balances of the real accounts by their IDs, debit positive and
+        credit negative."""
+        self.accumulated: Decimal | None = accumulated
+        """The accumulated change of the nominal accounts before the period,
+        or None if there is none."""
+        self.current: Decimal | None = current
+        """The net change of the nominal accounts in the period, or None if
+        there is none."""
+
+
+def query_ledger(session: sa.orm.Session, currency_code: str,
+                 account_id: int, start: dt.date | None,
+                 end: dt.date | None, locale: str | None = None) \
+        -> LineItemData:
+    """Queries the brought-forward balance and the line items of an account
+    in a period, for the ledger.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :param locale: The locale of the titles, or None for the current locale.
+    :return: The brought-forward balance, debit positive and credit negative,
+        and the line items.
+    """
+    return LineItemData(
+        query_ledger_brought_forward(session, currency_code, account_id,
+                                     start),
+        load_line_item_rows(select_ledger(session, currency_code, account_id,
+                                          start, end), session, locale))
+
+
+def query_ledger_brought_forward(session: sa.orm.Session, currency_code: str,
+                                 account_id: int, start: dt.date | None) \
+        -> Decimal | None:
+    """Queries the brought-forward balance of an account before a period,
+    for the ledger.  Only the real accounts are brought forward.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID.
+    :param start: The start of the period, or None from the beginning.
+    :return: The brought-forward balance, debit positive and credit negative,
+        or None if there is no brought-forward balance.
+    """
+    if start is None:
+        return None
+    is_real: bool = session.scalar(sa.select(Account.real_condition())
+                                   .filter(Account.id == account_id))
+    if not is_real:
+        return None
+    return __brought_forward(session, currency_code,
+                             Account.id == account_id, start)
+
+
+def select_ledger(session: sa.orm.Session, currency_code: str,
+                  account_id: int, start: dt.date | None,
+                  end: dt.date | None, after: LineItemKey | None = None) \
+        -> sa.Select:
+    """Returns the query of the line items of an account in a period, in the
+    order of the ledger.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :param after: The sort key after which to query, or None from the start.
+    :return: The query of the line items.
+    """
+    journal_entry, line_item = line_item_tables(start, session)
+    conditions: list[sa.ColumnElement[bool]] \
+        = [line_item.currency_code == currency_code,
+           line_item.account_id == account_id]
+    if start is not None:
+        conditions.append(journal_entry.date >= start)
+    if end is not None:
+        conditions.append(journal_entry.date <= end)
+    if after is not None:
+        conditions.append(after_line_item(journal_entry, line_item, after,
+                                          True))
+    return order_line_item_rows(
+        select_line_item_rows(journal_entry, line_item).filter(*conditions),
+        journal_entry, line_item, True)
+
+
+def query_income_expenses(session: sa.orm.Session, currency_code: str,
+                          account_id: int | None, start: dt.date | None,
+                          end: dt.date | None, locale: str | None = None,
+                          is_windowed: bool | None = None) \
+        -> IncomeExpensesData:
+    """Queries the brought-forward balance, the line items of the other side
+    of a current account in a period, their running balances, and the totals,
+    for the income and expenses log.  The running balances and the totals
+    are computed by the window functions in the same query as the line
+    items, or in Python when the database does not support the window
+    functions.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID, or None for all the current assets and
+        liabilities.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :param locale: The locale of the titles, or None for the current locale.
+    :param is_windowed: True to compute with the window functions, False to
+        compute in Python, or None to decide by the database.
+    :return: The brought-forward balance, debit positive and credit negative,
+        the line items, their running balances, and the totals.
+    """
+    brought_forward: Decimal | None = query_income_expenses_brought_forward(
+        session, currency_code, account_id, start)
+    if is_windowed is None:
+        is_windowed = __has_window_functions(session)
+    if is_windowed:
+        result: list[sa.Row] = session.execute(select_income_expenses(
+            session, currency_code, account_id, start, end,
+            is_windowed=True)).all()
+        start_balance: Decimal = Decimal("0") if brought_forward is None \
+            else brought_forward
+        return IncomeExpensesData(
+            brought_forward, build_line_item_rows(result, session, locale),
+            [start_balance + x.balance_change for x in result],
+            __window_total(result, "income_total"),
+            __window_total(result, "expense_total"))
+    line_items: list[LineItemRow] = load_line_item_rows(
+        select_income_expenses(session, currency_code, account_id, start,
+                               end), session, locale)
+    incomes: AmountColumn = AmountColumn([x.credit for x in line_items])
+    expenses: AmountColumn = AmountColumn([x.debit for x in line_items])
+    return IncomeExpensesData(
+        brought_forward, line_items,
+        running_balances(incomes, expenses, brought_forward),
+        incomes.total, expenses.total)
+
+
+def query_income_expenses_brought_forward(
+        session: sa.orm.Session, currency_code: str, account_id: int | None,
+        start: dt.date | None) -> Decimal | None:
+    """Queries the brought-forward balance of a current account before a
+    period, for the income and expenses log.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID, or None for all the current assets and
+        liabilities.
+    :param start: The start of the period, or None from the beginning.
+    :return: The brought-forward balance, debit positive and credit negative,
+        or None if there is no brought-forward balance.
+    """
+    if start is None:
+        return None
+    return __brought_forward(session, currency_code,
+                             __current_account_condition(account_id), start)
+
+
+def select_income_expenses(session: sa.orm.Session, currency_code: str,
+                           account_id: int | None, start: dt.date | None,
+                           end: dt.date | None,
+                           after: LineItemKey | None = None,
+                           is_windowed: bool = False) -> sa.Select:
+    """Returns the query of the line items of the other side of a current
+    account in a period, in the order of the income and expenses log.  The
+    journal entries with the current account are found with a semi-join.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID, or None for all the current assets and
+        liabilities.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :param after: The sort key after which to query, or None from the start.
+    :param is_windowed: True to add the window columns of the running balance
+        changes, "balance_change", and the totals, "income_total" and
+        "expense_total", over the queried line items.
+    :return: The query of the line items.
+    """
+    journal_entry, line_item = line_item_tables(start, session)
+    current: Any = sa.orm.aliased(line_item)
+    current_condition: sa.ColumnElement[bool] \
+        = current.account_id.in_(sa.select(Account.id).filter(
+            __current_account_condition(account_id)))
+    conditions: list[sa.ColumnElement[bool]] \
+        = [sa.exists().where(current.journal_entry_id == journal_entry.id,
+                             current.currency_code == currency_code,
+                             current_condition),
+           line_item.currency_code == currency_code,
+           sa.not_(__current_account_condition(account_id))]
+    if start is not None:
+        conditions.append(journal_entry.date >= start)
+    if end is not None:
+        conditions.append(journal_entry.date <= end)
+    if after is not None:
+        conditions.append(after_line_item(journal_entry, line_item, after,
+                                          False))
+    select: sa.Select = select_line_item_rows(journal_entry, line_item)\
+        .join(Account, line_item.account_id == Account.id)\
+        .filter(*conditions)
+    if is_windowed:
+        select = select.add_columns(
+            *__income_expenses_windows(journal_entry, line_item))
+    return order_line_item_rows(select, journal_entry, line_item, False)
+
+
+def select_journal(session: sa.orm.Session, start: dt.date | None,
+                   end: dt.date | None, after: LineItemKey | None = None) \
+        -> sa.Select:
+    """Returns the query of the line items in a period, in the order of the
+    journal.
+
+    :param session: The database session.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :param after: The sort key after which to query, or None from the start.
+    :return: The query of the line items.
+    """
+    journal_entry, line_item = line_item_tables(start, session)
+    conditions: list[sa.ColumnElement[bool]] = []
+    if start is not None:
+        conditions.append(journal_entry.date >= start)
+    if end is not None:
+        conditions.append(journal_entry.date <= end)
+    if after is not None:
+        conditions.append(after_line_item(journal_entry, line_item, after,
+                                          True))
+    return order_line_item_rows(
+        select_line_item_rows(journal_entry, line_item).filter(*conditions),
+        journal_entry, line_item, True)
+
+
+def query_trial_balance(session: sa.orm.Session, currency_code: str,
+                        start: dt.date | None, end: dt.date | None) \
+        -> dict[int, Decimal]:
+    """Queries the balances of the accounts in a period, for the trial
+    balance.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :return: The non-zero balances by the account IDs, debit positive and
+        credit negative.
+    """
+    balances: dict[int, Decimal] \
+        = get_balances(currency_code, start, end, session=session)
+    return {x: balances[x] for x in balances if balances[x] != 0}
+
+
+def query_income_statement(session: sa.orm.Session, currency_code: str,
+                           start: dt.date | None, end: dt.date | None) \
+        -> dict[int, Decimal]:
+    """Queries the balances of the nominal accounts in a period, for the
+    income statement.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :return: The non-zero balances by the account IDs, debit positive and
+        credit negative.
+    """
+    balances: dict[int, Decimal] = get_balances(
+        currency_code, start, end,
+        [sa.not_(Account.real_condition())], session)
+    return {x: balances[x] for x in balances if balances[x] != 0}
+
+
+def query_balance_sheet(session: sa.orm.Session, currency_code: str,
+                        start: dt.date | None, end: dt.date | None) \
+        -> BalanceSheetData:
+    """Queries the balances for the balance sheet.  The balances of the real
+    accounts, and the accumulated and the current period totals of the
+    nominal accounts are queried together in a single scan after the latest
+    snapshot of the closed periods.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :return: The balances on the balance sheet.
+    """
+    is_real: sa.ColumnElement = Account.real_condition()
+    # The closed history before the period is served from the snapshot.
+    snapshot_date: dt.date | None = get_snapshot_date(
+        end if start is None else start - dt.timedelta(days=1), session)
+    journal_entry, line_item = line_item_tables(
+        None if snapshot_date is None
+        else snapshot_date + dt.timedelta(days=1), session)
+    amount: sa.Case = sa.case(
+        (line_item.is_debit, line_item.amount),
+        else_=-line_item.amount)
+    # The nominal accounts are grouped together as NULL.
+    account_id: sa.Label = sa.case((is_real, Account.id)).label("id")
+    columns: list[sa.ColumnElement] \
+        = [account_id, sa.func.sum(amount).label("balance")]
+    if start is not None:
+        columns.extend([
+            sa.func.sum(sa.case((journal_entry.date < start, amount)))
+            .label("accumulated"),
+            sa.func.sum(sa.case((journal_entry.date >= start, amount)))
+            .label("current")])
+    conditions: list[sa.ColumnElement[bool]] \
+        = [line_item.currency_code == currency_code]
+    if end is not None:
+        conditions.append(journal_entry.date <= end)
+    balances: dict[int, Decimal] = {}
+    accumulated: Decimal | None = None
+    current: Decimal | None = None
+    if snapshot_date is not None:
+        conditions.append(journal_entry.date > snapshot_date)
+        balances = get_snapshot(currency_code, snapshot_date, [is_real],
+                                session)
+        nominal: dict[int, Decimal] \
+            = get_snapshot(currency_code, snapshot_date, [sa.not_(is_real)],
+                           session)
+        if len(nominal) > 0:
+            if start is None:
+                current = sum(nominal.values())
+            else:
+                accumulated = sum(nominal.values())
+    select_balances: sa.Select = sa.select(*columns)\
+        .select_from(line_item)\
+        .join(journal_entry, line_item.journal_entry_id == journal_entry.id)\
+        .join(Account, line_item.account_id == Account.id)\
+        .filter(*conditions)\
+        .group_by(account_id)
+    for row in session.execute(select_balances):
+        if row.id is not None:
+            balances[row.id] = balances.get(row.id, Decimal("0")) \
+                + row.balance
+        elif start is None:
+            current = (current or Decimal("0")) + row.balance
+        else:
+            if row.accumulated is not None:
+                accumulated = (accumulated or Decimal("0")) + row.accumulated
+            current = row.current
+    return BalanceSheetData({x: balances[x] for x in balances
+                             if balances[x] != 0}, accumulated, current)
+
+
+def query_offset_matcher(session: sa.orm.Session, currency_code: str,
+                         account_id: int) -> OffsetMatcher:
+    """Queries and matches the unapplied original line items and the
+    unmatched offsets of an account.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_id: The account ID.
+    :return: The offset matcher.
+    """
+    return OffsetMatcher(session.get(Currency, currency_code),
+                         session.get(Account, account_id), session)
+
+
+def __income_expenses_windows(journal_entry: Any, line_item: Any) \
+        -> list[sa.Label]:
+    """Returns the window columns of the running balance changes and the
+    totals of the income and expenses log.
+
+    :param journal_entry: The journal entry entity from line_item_tables().
+    :param line_item: The line item entity from line_item_tables().
+    :return: The window columns.
+    """
+    amount_type: sa.Numeric = sa.Numeric(14, 2)
+    order_by: list[sa.ColumnElement] \
+        = [journal_entry.date, journal_entry.no, line_item.is_debit,
+           line_item.no]
+    change: sa.Case = sa.case((line_item.is_debit, -line_item.amount),
+                              else_=line_item.amount)
+    return [sa.type_coerce(sa.func.sum(change)
+                           .over(order_by=order_by, rows=(None, 0)),
+                           amount_type).label("balance_change"),
+            sa.type_coerce(sa.func.sum(sa.case((sa.not_(line_item.is_debit),
+                                                line_item.amount))).over(),
+                           amount_type).label("income_total"),
+            sa.type_coerce(sa.func.sum(sa.case((line_item.is_debit,
+                                                line_item.amount))).over(),
+                           amount_type).label("expense_total")]
+
+
+def __window_total(result: list[sa.Row], name: str) -> Decimal:
+    """Returns a total from its window column, as the total of an amount
+    column.
+
+    :param result: The result of the query.
+    :param name: The name of the window column.
+    :return: The total, or 0 without any decimal place if there is no amount.
+    """
+    total: Decimal | None = None if len(result) == 0 \
+        else getattr(result[0], name)
+    return Decimal("0") if total is None else total
+
+
+def __has_window_functions(session: sa.orm.Session) -> bool:
+    """Returns whether the database supports the window functions.
+
+    :param session: The database session.
+    :return: True if the database supports the window functions, or False
+        otherwise.
+    """
+    dialect: sa.Dialect = session.get_bind().dialect
+    if dialect.name == "sqlite":
+        return dialect.dbapi.sqlite_version_info >= (3, 25)
+    if dialect.name in {"mysql", "mariadb"}:
+        return dialect.server_version_info >= \
+            ((10, 2) if dialect.is_mariadb else (8, 0))
+    return True
+
+
+def __current_account_condition(account_id: int | None) \
+        -> sa.ColumnElement[bool]:
+    """Returns the condition of a current account.
+
+    :param account_id: The account ID, or None for all the current assets and
+        liabilities.
+    :return: The condition of the current account.
+    """
+    return CurrentAccount.sql_condition() if account_id is None \
+        else Account.id == account_id
+
+
+def __brought_forward(session: sa.orm.Session, currency_code: str,
+                      account_condition: sa.ColumnElement[bool],
+                      start: dt.date) -> Decimal | None:
+    """Returns the brought-forward balance before a period.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param account_condition: The condition of the accounts.
+    :param start: The start of the period.
+    :return: The brought-forward balance, debit positive and credit negative,
+        or None if there is no line item before the period.
+    """
+    balances: dict[int, Decimal] \
+        = get_balances(currency_code, None, start - dt.timedelta(days=1),
+                       [account_condition], session)
+    if len(balances) == 0:
+        return None
+    return sum(balances.values())
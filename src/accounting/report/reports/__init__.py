@@ -18,6 +18,7 @@
 
 """
 from .balance_sheet import BalanceSheet
+from .comparative import ComparativeStatement
 from .income_expenses import IncomeExpenses
 from .income_statement import IncomeStatement
 from .journal import Journal
@@ -19,18 +19,20 @@
 """
 from decimal import Decimal
 
-import sqlalchemy as sa
 from flask import render_template, Response
 
-from accounting import db
 from accounting.locale import gettext
-from accounting.models import Currency, BaseAccount, Account, JournalEntry, \
-    JournalEntryLineItem
+from accounting.models import Currency, BaseAccount, Account
+from accounting.report.cache import cached_query
 from accounting.report.period import Period, PeriodChooser
+from accounting.report.queries import BalanceSheetData, query_balance_sheet
+from accounting.report.utils.account_lookup import AccountLookup, \
+    account_lookup
+from accounting.report.utils.amount_column import AmountColumn
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
 from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
-    period_spec
+    ExportFormat, period_spec
 from accounting.report.utils.option_link import OptionLink
 from accounting.report.utils.report_chooser import ReportChooser
 from accounting.report.utils.report_type import ReportType
@@ -68,14 +70,19 @@ class Subsection:
         """The title account."""
         self.accounts: list[ReportAccount] = []
         """The accounts in the subsection."""
+        self.__amounts: AmountColumn | None = None
+        """The amounts of the accounts, collected on the first access."""
 
     @property
     def total(self) -> Decimal:
-        """Returns the total of the subsection.
+        """Returns the total of the subsection.  It is added up only once,
+        after the accounts are collected.
 
         :return: The total of the subsection.
         """
-        return sum([x.amount for x in self.accounts])
+        if self.__amounts is None:
+            self.__amounts = AmountColumn([x.amount for x in self.accounts])
+        return self.__amounts.total
 
 
 class Section:
@@ -90,14 +97,19 @@ class Section:
         """The title account."""
         self.subsections: list[Subsection] = []
         """The subsections in the section."""
+        self.__amounts: AmountColumn | None = None
+        """The totals of the subsections, collected on the first access."""
 
     @property
     def total(self) -> Decimal:
-        """Returns the total of the section.
+        """Returns the total of the section.  It is added up only once,
+        after the subsections are collected.
 
         :return: The total of the section.
         """
-        return sum([x.total for x in self.subsections])
+        if self.__amounts is None:
+            self.__amounts = AmountColumn([x.total for x in self.subsections])
+        return self.__amounts.total
 
 
 class AccountCollector:
@@ -121,109 +133,37 @@ class AccountCollector:
 
         :return: The balances.
         """
-        sub_conditions: list[sa.BinaryExpression] \
-            = [Account.base_code.startswith(x) for x in {"1", "2", "3"}]
-        conditions: list[sa.BinaryExpression] \
-            = [JournalEntryLineItem.currency_code == self.__currency.code,
-               sa.or_(*sub_conditions)]
-        if self.__period.end is not None:
-            conditions.append(JournalEntry.date <= self.__period.end)
-        balance_func: sa.Function = sa.func.sum(sa.case(
-            (JournalEntryLineItem.is_debit, JournalEntryLineItem.amount),
-            else_=-JournalEntryLineItem.amount)).label("balance")
-        select_balance: sa.Select \
-            = sa.select(Account.id, Account.base_code, Account.no,
-                        balance_func)\
-            .join(JournalEntry).join(Account)\
-            .filter(*conditions)\
-            .group_by(Account.id, Account.base_code, Account.no)\
-            .having(balance_func != 0)\
-            .order_by(Account.base_code, Account.no)
-        account_balances: list[sa.Row] \
-            = db.session.execute(select_balance).all()
-        self.__all_accounts: list[Account] = Account.query\
-            .filter(sa.or_(Account.id.in_({x.id for x in account_balances}),
-                           Account.base_code == "3351",
-                           Account.base_code == "3353")).all()
-        """The accounts."""
-        account_by_id: dict[int, Account] \
-            = {x.id: x for x in self.__all_accounts}
+        data: BalanceSheetData = cached_query(
+            query_balance_sheet, self.__currency.code, self.__period.start,
+            self.__period.end)
+        balances: dict[int, Decimal] = data.balances
+        accumulated: Decimal | None = data.accumulated
+        current: Decimal | None = data.current
+        lookup: AccountLookup = account_lookup()
+        accounts: dict[int, Account] = lookup.get_accounts(balances)
+        self.__owner_s_equity: dict[str, Account] \
+            = lookup.get_accounts_by_code({Account.ACCUMULATED_CHANGE_CODE,
+                                           Account.NET_CHANGE_CODE})
+        """The owner's equity accounts, by their codes."""
         self.accounts: list[ReportAccount] \
-            = [ReportAccount(account=account_by_id[x.id],
-                             amount=x.balance,
+            = [ReportAccount(account=accounts[x],
+                             amount=balances[x],
                              url=ledger_url(self.__currency,
-                                            account_by_id[x.id],
+                                            accounts[x],
                                             self.__period))
-               for x in account_balances]
+               for x in balances]
         """The accounts on the balance sheet."""
-        self.__add_accumulated()
-        self.__add_current_period()
+        if self.__period.start is not None:
+            self.__add_owner_s_equity(Account.ACCUMULATED_CHANGE_CODE,
+                                      accumulated, self.__period)
+        self.__add_owner_s_equity(Account.NET_CHANGE_CODE, current,
+                                  self.__period)
         self.accounts.sort(key=lambda x: (x.account.base_code, x.account.no))
         for balance in self.accounts:
             if not balance.account.base_code.startswith("1"):
                 balance.amount = -balance.amount
         return self.accounts
 
-    def __add_accumulated(self) -> None:
-        """Adds the accumulated profit or loss to the balances.
-
-        :return: None.
-        """
-        self.__add_owner_s_equity(Account.ACCUMULATED_CHANGE_CODE,
-                                  self.__query_accumulated(),
-                                  self.__period)
-
-    def __query_accumulated(self) -> Decimal | None:
-        """Queries and returns the accumulated profit or loss.
-
-        :return: The accumulated profit or loss.
-        """
-        if self.__period.start is None:
-            return None
-        conditions: list[sa.BinaryExpression] \
-            = [JournalEntryLineItem.currency_code == self.__currency.code,
-               JournalEntry.date < self.__period.start]
-        return self.__query_balance(conditions)
-
-    def __add_current_period(self) -> None:
-        """Adds the accumulated profit or loss to the balances.
-
-        :return: None.
-        """
-        self.__add_owner_s_equity(Account.NET_CHANGE_CODE,
-                                  self.__query_current_period(),
-                                  self.__period)
-
-    def __query_current_period(self) -> Decimal | None:
-        """Queries and returns the net income or loss for current period.
-
-        :return: The net income or loss for current period.
-        """
-        conditions: list[sa.BinaryExpression] \
-            = [JournalEntryLineItem.currency_code == self.__currency.code]
-        if self.__period.start is not None:
-            conditions.append(JournalEntry.date >= self.__period.start)
-        if self.__period.end is not None:
-            conditions.append(JournalEntry.date <= self.__period.end)
-        return self.__query_balance(conditions)
-
-    @staticmethod
-    def __query_balance(conditions: list[sa.BinaryExpression])\
-            -> Decimal:
-        """Queries the balance.
-
-        :param conditions: The SQL conditions for the balance.
-        :return: The balance.
-        """
-        conditions.extend([sa.not_(Account.base_code.startswith(x))
-                           for x in {"1", "2", "3"}])
-        balance_func: sa.Function = sa.func.sum(sa.case(
-            (JournalEntryLineItem.is_debit, JournalEntryLineItem.amount),
-            else_=-JournalEntryLineItem.amount))
-        select_balance: sa.Select = sa.select(balance_func)\
-            .join(JournalEntry).join(Account).filter(*conditions)
-        return db.session.scalar(select_balance)
-
     def __add_owner_s_equity(self, code: str, amount: Decimal | None,
                              period: Period) -> None:
         """Adds an owner's equity balance.
@@ -237,19 +177,14 @@ class AccountCollector:
             return
         url: str = income_statement_url(self.__currency, period)
         # There is an existing balance.
-        account_balance_by_code: dict[str, ReportAccount] \
-            = {x.account.code: x for x in self.accounts}
-        if code in account_balance_by_code:
-            balance: ReportAccount = account_balance_by_code[code]
-            balance.amount = balance.amount + amount
-            balance.url = url
-            return
+        for balance in self.accounts:
+            if balance.account.code == code:
+                balance.amount = balance.amount + amount
+                balance.url = url
+                return
         # Add a new balance
-        account_by_code: dict[str, Account] \
-            = {x.code: x for x in self.__all_accounts}
-        self.accounts.append(ReportAccount(account=account_by_code[code],
-                                           amount=amount,
-                                           url=url))
+        self.accounts.append(ReportAccount(
+            account=self.__owner_s_equity[code], amount=amount, url=url))
 
 
 class CSVHalfRow:
@@ -404,15 +339,18 @@ class BalanceSheet(BaseReport):
         self.__liabilities = sections["2"]
         self.__owner_s_equity = sections["3"]
 
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = "balance-sheet-{currency}-{period}.csv"\
             .format(currency=self.__currency.code,
                     period=period_spec(self.__period))
-        return csv_download(filename, self.__get_csv_rows())
+        return csv_download(filename, self.__get_csv_rows(), export_format)
 
     def __get_csv_rows(self) -> list[CSVRow]:
         """Composes and returns the CSV rows.
@@ -0,0 +1,420 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The comparative statements.
+
+The trial balance, the income statement, and the balance sheet of each month,
+quarter, or year are shown side by side.  All the compared periods are
+queried at once, grouped by the account and the month.
+
+"""
+from decimal import Decimal
+
+import sqlalchemy as sa
+from flask import Response, render_template
+
+from accounting import db
+from accounting.locale import gettext
+from accounting.models import Currency, BaseAccount, Account
+from accounting.report.period import ComparativePeriod
+from accounting.report.utils.account_lookup import account_lookup
+from accounting.report.utils.amount_column import AmountColumn, to_cents, \
+    from_cents
+from accounting.report.utils.base_page_params import BasePageParams
+from accounting.report.utils.base_report import BaseReport
+from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
+    ExportFormat
+from accounting.report.utils.option_link import OptionLink
+from accounting.report.utils.report_chooser import ReportChooser
+from accounting.report.utils.report_type import ReportType
+from accounting.report.utils.urls import ledger_url, comparative_url
+from accounting.utils.archive import line_item_tables
+
+
+class ReportAccount:
+    """An account in the report."""
+
+    def __init__(self, account: Account, amounts: list[Decimal], url: str):
+        """Constructs an account in the report.
+
+        :param account: The account.
+        :param amounts: The amounts in the compared periods.
+        :param url: The URL to the ledger of the account.
+        """
+        self.account: Account = account
+        """The account."""
+        self.amounts: list[Decimal] = amounts
+        """The amounts in the compared periods."""
+        self.url: str = url
+        """The URL to the ledger of the account."""
+
+
+class Section:
+    """A section."""
+
+    def __init__(self, title: BaseAccount):
+        """Constructs a section.
+
+        :param title: The title account.
+        """
+        self.title: BaseAccount = title
+        """The title account."""
+        self.accounts: list[ReportAccount] = []
+        """The accounts in the section."""
+        self.__totals: list[Decimal] | None = None
+        """The totals in the compared periods, added up on the first
+        access."""
+
+    @property
+    def totals(self) -> list[Decimal]:
+        """Returns the totals of the section in the compared periods.
+
+        :return: The totals of the section in the compared periods.
+        """
+        if self.__totals is None:
+            self.__totals = [AmountColumn(x).total
+                             for x in zip(*[x.amounts
+                                            for x in self.accounts])]
+        return self.__totals
+
+
+class CSVRow(BaseCSVRow):
+    """A row in the CSV."""
+
+    def __init__(self, text: str | None, amounts: list[str | Decimal | None]):
+        """Constructs a row in the CSV.
+
+        :param text: The text.
+        :param amounts: The amounts in the compared periods.
+        """
+        self.text: str | None = text
+        """The text."""
+        self.amounts: list[str | Decimal | None] = amounts
+        """The amounts in the compared periods."""
+
+    @property
+    def values(self) -> list[str | Decimal | None]:
+        """Returns the values of the row.
+
+        :return: The values of the row.
+        """
+        return [self.text, *self.amounts]
+
+
+class PageParams(BasePageParams):
+    """The HTML page parameters."""
+
+    def __init__(self, report_type: ReportType, currency: Currency,
+                 period: ComparativePeriod, sections: list[Section],
+                 net: list[Decimal] | None):
+        """Constructs the HTML page parameters.
+
+        :param report_type: The report type.
+        :param currency: The currency.
+        :param period: The comparative period.
+        :param sections: The sections.
+        :param net: The net income or loss in the compared periods, or None
+            if this is not an income statement.
+        """
+        self.report_type: ReportType = report_type
+        """The report type."""
+        self.currency: Currency = currency
+        """The currency."""
+        self.period: ComparativePeriod = period
+        """The comparative period."""
+        self.sections: list[Section] = sections
+        """The sections."""
+        self.net: list[Decimal] | None = net
+        """The net income or loss in the compared periods, or None if this is
+        not an income statement."""
+
+    @property
+    def has_data(self) -> bool:
+        """Returns whether there is any data on the page.
+
+        :return: True if there is any data, or False otherwise.
+        """
+        return len(self.sections) > 0
+
+    @property
+    def report_chooser(self) -> ReportChooser:
+        """Returns the report chooser.
+
+        :return: The report chooser.
+        """
+        return ReportChooser(self.report_type,
+                             currency=self.currency,
+                             period=self.period.whole)
+
+    @property
+    def currency_options(self) -> list[OptionLink]:
+        """Returns the currency options.
+
+        :return: The currency options.
+        """
+        return self._get_currency_options(
+            lambda x: comparative_url(self.report_type, x, self.period),
+            self.currency)
+
+    @property
+    def interval_options(self) -> list[OptionLink]:
+        """Returns the interval options.
+
+        :return: The interval options.
+        """
+        titles: dict[str, str] = {"monthly": gettext("Monthly"),
+                                  "quarterly": gettext("Quarterly"),
+                                  "yearly": gettext("Yearly")}
+        options: list[OptionLink] = []
+        for interval in ComparativePeriod.INTERVALS:
+            period: ComparativePeriod = ComparativePeriod(
+                self.period.start.year, self.period.end.year, interval)
+            options.append(OptionLink(
+                titles[interval],
+                comparative_url(self.report_type, self.currency, period),
+                interval == self.period.interval))
+        return options
+
+
+class ComparativeStatement(BaseReport):
+    """A comparative statement."""
+
+    def __init__(self, report_type: ReportType, currency: Currency,
+                 period: ComparativePeriod):
+        """Constructs a comparative statement.
+
+        :param report_type: The report type, either the trial balance, the
+            income statement, or the balance sheet.
+        :param currency: The currency.
+        :param period: The comparative period.
+        """
+        self.__report_type: ReportType = report_type
+        """The report type."""
+        self.__currency: Currency = currency
+        """The currency."""
+        self.__period: ComparativePeriod = period
+        """The comparative period."""
+        self.__sections: list[Section]
+        """The sections."""
+        self.__net: list[Decimal] | None = None
+        """The net income or loss in the compared periods, or None if this is
+        not an income statement."""
+        self.__set_data()
+
+    def __set_data(self) -> None:
+        """Queries and sets the data sections in the comparative statement.
+
+        :return: None.
+        """
+        before, deltas = self.__query_deltas()
+        balances: dict[int, list[int]]
+        if self.__report_type == ReportType.BALANCE_SHEET:
+            balances = self.__get_balance_sheet_balances(before, deltas)
+        elif self.__report_type == ReportType.INCOME_STATEMENT:
+            balances = {x: [-y for y in deltas[x]] for x in deltas}
+        else:
+            balances = deltas
+        balances = {x: balances[x] for x in balances
+                    if any([y != 0 for y in balances[x]])}
+        accounts: dict[int, Account] = account_lookup().get_accounts(balances)
+        titles: dict[str, BaseAccount] \
+            = {x.code: x for x in BaseAccount.query
+               .filter(BaseAccount.code.in_({x.base_code[0]
+                                             for x in accounts.values()}))
+               .all()}
+        sections: dict[str, Section] = {x: Section(titles[x]) for x in titles}
+        for account in sorted(accounts.values(),
+                              key=lambda x: (x.base_code, x.no)):
+            amounts: list[Decimal] \
+                = [from_cents(x) for x in balances[account.id]]
+            sections[account.base_code[0]].accounts.append(
+                ReportAccount(account, amounts,
+                              ledger_url(self.__currency, account,
+                                         self.__period.whole)))
+        self.__sections = sorted(sections.values(), key=lambda x: x.title.code)
+        if self.__report_type == ReportType.INCOME_STATEMENT \
+                and len(self.__sections) > 0:
+            self.__net = [AmountColumn(x).total
+                          for x in zip(*[x.totals for x in self.__sections])]
+
+    def __query_deltas(self) -> tuple[dict[int, int], dict[int, list[int]]]:
+        """Queries the changes of the accounts in all the compared periods at
+        once, grouped by the account and the month.
+
+        :return: The balances before the comparative period, and the changes
+            in each compared period, in scaled integers, by the account ID.
+        """
+        journal_entry, line_item = line_item_tables(
+            None if self.__report_type == ReportType.BALANCE_SHEET
+            else self.__period.start)
+        conditions: list[sa.BinaryExpression] \
+            = [line_item.currency_code == self.__currency.code,
+               journal_entry.date <= self.__period.end]
+        if self.__report_type == ReportType.INCOME_STATEMENT:
+            conditions.append(sa.not_(Account.real_condition()))
+        if self.__report_type != ReportType.BALANCE_SHEET:
+            conditions.append(journal_entry.date >= self.__period.start)
+        is_before: sa.BinaryExpression \
+            = journal_entry.date < self.__period.start
+        year: sa.Case = sa.case(
+            (is_before, 0),
+            else_=sa.extract("year", journal_entry.date)).label("year")
+        month: sa.Case = sa.case(
+            (is_before, 0),
+            else_=sa.extract("month", journal_entry.date)).label("month")
+        balance_func: sa.Function = sa.func.sum(sa.case(
+            (line_item.is_debit, line_item.amount),
+            else_=-line_item.amount)).label("balance")
+        select_deltas: sa.Select \
+            = sa.select(Account.id, year, month, balance_func)\
+            .select_from(line_item)\
+            .join(journal_entry,
+                  line_item.journal_entry_id == journal_entry.id)\
+            .join(Account, line_item.account_id == Account.id)\
+            .filter(*conditions)\
+            .group_by(Account.id, year, month)
+        size: int = len(self.__period.columns)
+        before: dict[int, int] = {}
+        deltas: dict[int, list[int]] = {}
+        for row in db.session.execute(select_deltas):
+            if row.id not in deltas:
+                deltas[row.id] = [0] * size
+            cents: int = to_cents(row.balance)
+            if row.year == 0:
+                before[row.id] = cents
+            else:
+                column: int = self.__period.column_of(int(row.year),
+                                                      int(row.month))
+                deltas[row.id][column] = deltas[row.id][column] + cents
+        return before, deltas
+
+    def __get_balance_sheet_balances(self, before: dict[int, int],
+                                     deltas: dict[int, list[int]]) \
+            -> dict[int, list[int]]:
+        """Returns the cumulative balance sheet balances at the end of each
+        compared period, built from the changes.  The nominal accounts are
+        closed to the accumulated change before the comparative period, and to
+        the net change since the start of the comparative period.
+
+        :param before: The balances before the comparative period.
+        :param deltas: The changes in each compared period.
+        :return: The balances at the end of each compared period, in scaled
+            integers, by the account ID.
+        """
+        size: int = len(self.__period.columns)
+        codes: dict[int, str] \
+            = {x.id: x.base_code for x in db.session.execute(
+                sa.select(Account.id, Account.base_code)
+                .filter(Account.id.in_(deltas)))}
+        balances: dict[int, list[int]] = {}
+        accumulated: int = 0
+        net: list[int] = [0] * size
+
+        for account_id in deltas:
+            if codes[account_id][0] not in {"1", "2", "3"}:
+                accumulated = accumulated + before.get(account_id, 0)
+                for i in range(size):
+                    net[i] = net[i] + deltas[account_id][i]
+                continue
+            balances[account_id] \
+                = self.__accumulate(before.get(account_id, 0),
+                                    deltas[account_id])
+
+        def add_owner_s_equity(code: str, amounts: list[int]) -> None:
+            """Adds the closed nominal balances to an owner's equity account.
+
+            :param code: The code of the owner's equity account.
+            :param amounts: The closed nominal balances.
+            :return: None.
+            """
+            if all([x == 0 for x in amounts]):
+                return
+            account: Account = account_lookup().get_account_by_code(code)
+            if account.id not in balances:
+                balances[account.id] = amounts
+                codes[account.id] = account.base_code
+                return
+            balances[account.id] = [x + y for x, y
+                                    in zip(balances[account.id], amounts)]
+
+        add_owner_s_equity(Account.ACCUMULATED_CHANGE_CODE,
+                           [accumulated] * size)
+        add_owner_s_equity(Account.NET_CHANGE_CODE,
+                           self.__accumulate(0, net))
+        for account_id in balances:
+            if not codes[account_id].startswith("1"):
+                balances[account_id] = [-x for x in balances[account_id]]
+        return balances
+
+    @staticmethod
+    def __accumulate(start: int, deltas: list[int]) -> list[int]:
+        """Accumulates the changes into the balances.
+
+        :param start: The starting balance.
+        :param deltas: The changes.
+        :return: The balance after each change.
+        """
+        balances: list[int] = []
+        balance: int = start
+        for delta in deltas:
+            balance = balance + delta
+            balances.append(balance)
+        return balances
+
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
+
+        :param export_format: The export format.
+        :return: The response of the report for download.
+        """
+        filename: str = "{report}-{currency}-{period}.csv"\
+            .format(report=self.__report_type.value,
+                    currency=self.__currency.code,
+                    period=self.__period.spec)
+        return csv_download(filename, self.__get_csv_rows(), export_format)
+
+    def __get_csv_rows(self) -> list[CSVRow]:
+        """Composes and returns the CSV rows.
+
+        :return: The CSV rows.
+        """
+        total_str: str = gettext("Total")
+        rows: list[CSVRow] = [CSVRow(gettext("Account"),
+                                     self.__period.column_titles)]
+        for section in self.__sections:
+            rows.append(CSVRow(str(section.title), []))
+            rows.extend([CSVRow(f" {str(x.account)}", x.amounts)
+                         for x in section.accounts])
+            rows.append(CSVRow(f" {total_str}", section.totals))
+        if self.__net is not None:
+            rows.append(CSVRow(
+                gettext("Net Income or Loss for Current Period"), self.__net))
+        return rows
+
+    def html(self) -> str:
+        """Composes and returns the report as HTML.
+
+        :return: The report as HTML.
+        """
+        params: PageParams = PageParams(report_type=self.__report_type,
+                                        currency=self.__currency,
+                                        period=self.__period,
+                                        sections=self.__sections,
+                                        net=self.__net)
+        return render_template("accounting/report/comparative.html",
+                               report=params)
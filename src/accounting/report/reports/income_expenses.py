@@ -20,34 +20,37 @@
 import datetime as dt
 from decimal import Decimal
 
-import sqlalchemy as sa
 from flask import url_for, render_template, Response
-from sqlalchemy.orm import selectinload
+from flask_babel import get_locale
 
-from accounting import db
 from accounting.locale import gettext
-from accounting.models import Currency, Account, JournalEntry, \
-    JournalEntryLineItem
+from accounting.models import Currency, Account
+from accounting.report.cache import cached_query
 from accounting.report.period import Period, PeriodChooser
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
 from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
-    period_spec
+    ExportFormat, period_spec
+from accounting.report.queries import IncomeExpensesData, \
+    query_income_expenses
+from accounting.report.utils.line_item_rows import AccountRow, \
+    JournalEntryRow, LineItemRow
 from accounting.report.utils.option_link import OptionLink
 from accounting.report.utils.report_chooser import ReportChooser
 from accounting.report.utils.report_type import ReportType
 from accounting.report.utils.urls import income_expenses_url
 from accounting.utils.current_account import CurrentAccount
+from accounting.utils.ledger_metadata import ledger_metadata
 from accounting.utils.pagination import Pagination
 
 
 class ReportLineItem:
     """A line item in the report."""
 
-    def __init__(self, line_item: JournalEntryLineItem | None = None):
+    def __init__(self, line_item: LineItemRow | None = None):
         """Constructs the line item in the report.
 
-        :param line_item: The journal entry line item.
+        :param line_item: The journal entry line item row.
         """
         self.is_brought_forward: bool = False
         """Whether this is the brought-forward line item."""
@@ -55,7 +58,7 @@ class ReportLineItem:
         """Whether this is the total line item."""
         self.date: dt.date | None = None
         """The date."""
-        self.account: Account | None = None
+        self.account: Account | AccountRow | None = None
         """The account."""
         self.description: str | None = None
         """The description."""
@@ -67,17 +70,28 @@ class ReportLineItem:
         """The balance."""
         self.note: str | None = None
         """The note."""
-        self.url: str | None = None
-        """The URL to the journal entry line item."""
+        self.__journal_entry: JournalEntryRow | None = None
+        """The journal entry."""
         if line_item is not None:
             self.date = line_item.journal_entry.date
             self.account = line_item.account
             self.description = line_item.description
-            self.income = None if line_item.is_debit else line_item.amount
-            self.expense = line_item.amount if line_item.is_debit else None
+            self.income = line_item.credit
+            self.expense = line_item.debit
             self.note = line_item.journal_entry.note
-            self.url = url_for("accounting.journal-entry.detail",
-                               journal_entry=line_item.journal_entry)
+            self.__journal_entry = line_item.journal_entry
+
+    @property
+    def url(self) -> str | None:
+        """Returns the URL to the journal entry line item.
+
+        :return: The URL to the journal entry line item, or None if this is
+            not a journal entry line item, or if it is archived.
+        """
+        if self.__journal_entry is None or self.__journal_entry.is_archived:
+            return None
+        return url_for("accounting.journal-entry.detail",
+                       journal_entry=self.__journal_entry)
 
 
 class LineItemCollector:
@@ -103,28 +117,26 @@ class LineItemCollector:
         """The line items."""
         self.total: ReportLineItem | None
         """The total line item."""
-        self.brought_forward = self.__get_brought_forward()
-        self.line_items = self.__query_line_items()
+        self.__data: IncomeExpensesData = cached_query(
+            query_income_expenses, currency.code,
+            None if account.code == CurrentAccount.CURRENT_AL_CODE
+            else account.id, period.start, period.end, str(get_locale()))
+        """The data of the income and expenses log."""
+        self.brought_forward = self.__get_brought_forward(
+            self.__data.brought_forward)
+        self.line_items = [ReportLineItem(x) for x in self.__data.line_items]
         self.total = self.__get_total()
         self.__populate_balance()
 
-    def __get_brought_forward(self) -> ReportLineItem | None:
-        """Queries, composes and returns the brought-forward line item.
+    def __get_brought_forward(self, balance: Decimal | None) \
+            -> ReportLineItem | None:
+        """Composes and returns the brought-forward line item.
 
+        :param balance: The brought-forward balance, or None if there is no
+            brought-forward balance.
         :return: The brought-forward line item, or None if the period starts
             from the beginning.
         """
-        if self.__period.start is None:
-            return None
-        balance_func: sa.Function = sa.func.sum(sa.case(
-            (JournalEntryLineItem.is_debit, JournalEntryLineItem.amount),
-            else_=-JournalEntryLineItem.amount))
-        select: sa.Select = sa.Select(balance_func)\
-            .join(JournalEntry).join(Account)\
-            .filter(JournalEntryLineItem.currency_code == self.__currency.code,
-                    self.__account_condition,
-                    JournalEntry.date < self.__period.start)
-        balance: int | None = db.session.scalar(select)
         if balance is None:
             return None
         line_item: ReportLineItem = ReportLineItem()
@@ -139,42 +151,6 @@ class LineItemCollector:
         line_item.balance = balance
         return line_item
 
-    def __query_line_items(self) -> list[ReportLineItem]:
-        """Queries and returns the line items.
-
-        :return: The line items.
-        """
-        conditions: list[sa.BinaryExpression] \
-            = [JournalEntryLineItem.currency_code == self.__currency.code,
-               self.__account_condition]
-        if self.__period.start is not None:
-            conditions.append(JournalEntry.date >= self.__period.start)
-        if self.__period.end is not None:
-            conditions.append(JournalEntry.date <= self.__period.end)
-        journal_entry_with_account: sa.Select = sa.Select(JournalEntry.id).\
-            join(JournalEntryLineItem).join(Account).filter(*conditions)
-
-        return [ReportLineItem(x)
-                for x in JournalEntryLineItem.query
-                .join(JournalEntry).join(Account)
-                .filter(JournalEntryLineItem.journal_entry_id
-                        .in_(journal_entry_with_account),
-                        JournalEntryLineItem.currency_code
-                        == self.__currency.code,
-                        sa.not_(self.__account_condition))
-                .order_by(JournalEntry.date,
-                          JournalEntry.no,
-                          JournalEntryLineItem.is_debit,
-                          JournalEntryLineItem.no)
-                .options(selectinload(JournalEntryLineItem.account),
-                         selectinload(JournalEntryLineItem.journal_entry))]
-
-    @property
-    def __account_condition(self) -> sa.BinaryExpression:
-        if self.__account.code == CurrentAccount.CURRENT_AL_CODE:
-            return CurrentAccount.sql_condition()
-        return Account.id == self.__account.id
-
     def __get_total(self) -> ReportLineItem | None:
         """Composes the total line item.
 
@@ -185,14 +161,11 @@ class LineItemCollector:
         line_item: ReportLineItem = ReportLineItem()
         line_item.is_total = True
         line_item.description = gettext("Total")
-        line_item.income = sum([x.income for x in self.line_items
-                                if x.income is not None])
-        line_item.expense = sum([x.expense for x in self.line_items
-                                 if x.expense is not None])
-        line_item.balance = line_item.income - line_item.expense
-        if self.brought_forward is not None:
-            line_item.balance \
-                = self.brought_forward.balance + line_item.balance
+        line_item.income = self.__data.income
+        line_item.expense = self.__data.expense
+        line_item.balance = self.__data.balances[-1] \
+            if len(self.__data.balances) > 0 \
+            else self.brought_forward.balance
         return line_item
 
     def __populate_balance(self) -> None:
@@ -200,13 +173,7 @@ class LineItemCollector:
 
         :return: None.
         """
-        balance: Decimal = 0 if self.brought_forward is None \
-            else self.brought_forward.balance
-        for line_item in self.line_items:
-            if line_item.income is not None:
-                balance = balance + line_item.income
-            if line_item.expense is not None:
-                balance = balance - line_item.expense
+        for line_item, balance in zip(self.line_items, self.__data.balances):
             line_item.balance = balance
 
 
@@ -343,18 +310,17 @@ class PageParams(BasePageParams):
                           income_expenses_url(self.currency, current_al,
                                               self.period),
                           self.account.id == 0)]
-        in_use: sa.Select = sa.Select(JournalEntryLineItem.account_id)\
-            .join(Account)\
-            .filter(JournalEntryLineItem.currency_code == self.currency.code,
-                    CurrentAccount.sql_condition())\
-            .group_by(JournalEntryLineItem.account_id)
+        in_use: set[int] \
+            = ledger_metadata().account_ids(self.currency.code)
         options.extend([OptionLink(str(x),
                                    income_expenses_url(
                                        self.currency,
                                        CurrentAccount(x),
                                        self.period),
                                    x.id == self.account.id)
-                        for x in Account.query.filter(Account.id.in_(in_use))
+                        for x in Account.query
+                       .filter(Account.id.in_(in_use),
+                               CurrentAccount.sql_condition())
                        .order_by(Account.base_code, Account.no).all()])
         return options
 
@@ -386,15 +352,18 @@ class IncomeExpenses(BaseReport):
         self.__total: ReportLineItem | None = collector.total
         """The total line item."""
 
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = "income-expenses-{currency}-{account}-{period}.csv"\
             .format(currency=self.__currency.code, account=self.__account.code,
                     period=period_spec(self.__period))
-        return csv_download(filename, self.__get_csv_rows())
+        return csv_download(filename, self.__get_csv_rows(), export_format)
 
     def __get_csv_rows(self) -> list[CSVRow]:
         """Composes and returns the CSV rows.
@@ -19,18 +19,20 @@
 """
 from decimal import Decimal
 
-import sqlalchemy as sa
 from flask import render_template, Response
 
-from accounting import db
 from accounting.locale import gettext
-from accounting.models import Currency, BaseAccount, Account, JournalEntry, \
-    JournalEntryLineItem
+from accounting.models import Currency, BaseAccount, Account
+from accounting.report.cache import cached_query
 from accounting.report.period import Period, PeriodChooser
+from accounting.report.queries import query_income_statement
+from accounting.report.utils.account_lookup import account_lookup
+from accounting.report.utils.amount_column import AmountColumn, \
+    running_balances
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
 from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
-    period_spec
+    ExportFormat, period_spec
 from accounting.report.utils.option_link import OptionLink
 from accounting.report.utils.report_chooser import ReportChooser
 from accounting.report.utils.report_type import ReportType
@@ -81,14 +83,19 @@ class Subsection:
         """The title account."""
         self.accounts: list[ReportAccount] = []
         """The accounts in the subsection."""
+        self.__amounts: AmountColumn | None = None
+        """The amounts of the accounts, collected on the first access."""
 
     @property
     def total(self) -> Decimal:
-        """Returns the total of the subsection.
+        """Returns the total of the subsection.  It is added up only once,
+        after the accounts are collected.
 
         :return: The total of the subsection.
         """
-        return sum([x.amount for x in self.accounts])
+        if self.__amounts is None:
+            self.__amounts = AmountColumn([x.amount for x in self.accounts])
+        return self.__amounts.total
 
 
 class Section:
@@ -107,14 +114,19 @@ class Section:
         self.accumulated: AccumulatedTotal \
             = AccumulatedTotal(accumulated_title)
         """The accumulated total."""
+        self.__amounts: AmountColumn | None = None
+        """The totals of the subsections, collected on the first access."""
 
     @property
     def total(self) -> Decimal:
-        """Returns the total of the section.
+        """Returns the total of the section.  It is added up only once,
+        after the subsections are collected.
 
         :return: The total of the section.
         """
-        return sum([x.total for x in self.subsections])
+        if self.__amounts is None:
+            self.__amounts = AmountColumn([x.total for x in self.subsections])
+        return self.__amounts.total
 
 
 class CSVRow(BaseCSVRow):
@@ -244,54 +256,41 @@ class IncomeStatement(BaseReport):
 
         self.__has_data = len(balances) > 0
         self.__sections = sorted(sections.values(), key=lambda x: x.title.code)
-        total: Decimal = Decimal("0")
-        for section in self.__sections:
-            total = total + section.total
-            section.accumulated.amount = total
+        accumulated: list[Decimal] = running_balances(
+            AmountColumn([x.total for x in self.__sections]))
+        for section, amount in zip(self.__sections, accumulated):
+            section.accumulated.amount = amount
 
     def __query_balances(self) -> list[ReportAccount]:
         """Queries and returns the balances.
 
         :return: The balances.
         """
-        sub_conditions: list[sa.BinaryExpression] \
-            = [Account.base_code.startswith(str(x)) for x in range(4, 10)]
-        conditions: list[sa.BinaryExpression] \
-            = [JournalEntryLineItem.currency_code == self.__currency.code,
-               sa.or_(*sub_conditions)]
-        if self.__period.start is not None:
-            conditions.append(JournalEntry.date >= self.__period.start)
-        if self.__period.end is not None:
-            conditions.append(JournalEntry.date <= self.__period.end)
-        balance_func: sa.Function = sa.func.sum(sa.case(
-            (JournalEntryLineItem.is_debit, -JournalEntryLineItem.amount),
-            else_=JournalEntryLineItem.amount)).label("balance")
-        select_balances: sa.Select = sa.select(Account.id, balance_func)\
-            .join(JournalEntry).join(Account)\
-            .filter(*conditions)\
-            .group_by(Account.id)\
-            .having(balance_func != 0)\
-            .order_by(Account.base_code, Account.no)
-        balances: list[sa.Row] = db.session.execute(select_balances).all()
+        balances: dict[int, Decimal] \
+            = cached_query(query_income_statement, self.__currency.code,
+                           self.__period.start, self.__period.end)
         accounts: dict[int, Account] \
-            = {x.id: x for x in Account.query
-               .filter(Account.id.in_([x.id for x in balances])).all()}
-        return [ReportAccount(account=accounts[x.id],
-                              amount=x.balance,
+            = account_lookup().get_accounts(balances)
+        return [ReportAccount(account=accounts[x],
+                              amount=-balances[x],
                               url=ledger_url(self.__currency,
-                                             accounts[x.id],
+                                             accounts[x],
                                              self.__period))
-                for x in balances]
+                for x in sorted(accounts, key=lambda x: (
+                    accounts[x].base_code, accounts[x].no))]
 
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = "income-statement-{currency}-{period}.csv"\
             .format(currency=self.__currency.code,
                     period=period_spec(self.__period))
-        return csv_download(filename, self.__get_csv_rows())
+        return csv_download(filename, self.__get_csv_rows(), export_format)
 
     def __get_csv_rows(self) -> list[CSVRow]:
         """Composes and returns the CSV rows.
@@ -18,52 +18,27 @@
 
 """
 import datetime as dt
+from collections.abc import Iterator
 from decimal import Decimal
 
-import sqlalchemy as sa
 from flask import render_template, Response
-from sqlalchemy.orm import selectinload
 
+from accounting import db
 from accounting.locale import gettext
-from accounting.models import Currency, Account, JournalEntry, \
-    JournalEntryLineItem
 from accounting.report.period import Period, PeriodChooser
+from accounting.report.queries import select_journal
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
 from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
-    period_spec
+    ExportFormat, period_spec
+from accounting.report.utils.line_item_rows import LineItemRow, \
+    load_line_item_rows
 from accounting.report.utils.report_chooser import ReportChooser
 from accounting.report.utils.report_type import ReportType
 from accounting.report.utils.urls import journal_url
 from accounting.utils.pagination import Pagination
 
 
-class ReportLineItem:
-    """A line item in the report."""
-
-    def __init__(self, line_item: JournalEntryLineItem):
-        """Constructs the line item in the report.
-
-        :param line_item: The journal entry line item.
-        """
-        self.line_item: JournalEntryLineItem = line_item
-        """The journal entry line item."""
-        self.journal_entry: JournalEntry = line_item.journal_entry
-        """The journal entry."""
-        self.currency: Currency = line_item.currency
-        """The account."""
-        self.account: Account = line_item.account
-        """The account."""
-        self.description: str | None = line_item.description
-        """The description."""
-        self.debit: Decimal | None = line_item.debit
-        """The debit amount."""
-        self.credit: Decimal | None = line_item.credit
-        """The credit amount."""
-        self.amount: Decimal = line_item.amount
-        """The amount."""
-
-
 class CSVRow(BaseCSVRow):
     """A row in the CSV."""
 
@@ -113,8 +88,8 @@ class PageParams(BasePageParams):
     """The HTML page parameters."""
 
     def __init__(self, period: Period,
-                 pagination: Pagination[JournalEntryLineItem],
-                 line_items: list[JournalEntryLineItem]):
+                 pagination: Pagination[LineItemRow],
+                 line_items: list[LineItemRow]):
         """Constructs the HTML page parameters.
 
         :param period: The period.
@@ -123,9 +98,9 @@ class PageParams(BasePageParams):
         """
         self.period: Period = period
         """The period."""
-        self.pagination: Pagination[JournalEntryLineItem] = pagination
+        self.pagination: Pagination[LineItemRow] = pagination
         """The pagination."""
-        self.line_items: list[JournalEntryLineItem] = line_items
+        self.line_items: list[LineItemRow] = line_items
         """The line items."""
         self.period_chooser: PeriodChooser = PeriodChooser(
             lambda x: journal_url(x))
@@ -149,21 +124,19 @@ class PageParams(BasePageParams):
                              period=self.period)
 
 
-def get_csv_rows(line_items: list[JournalEntryLineItem]) -> list[CSVRow]:
-    """Composes and returns the CSV rows from the line items.
+def get_csv_rows(line_items: list[LineItemRow]) -> Iterator[CSVRow]:
+    """Composes the CSV rows from the line items one by one, so that a long
+    journal is written while it is being downloaded.
 
     :param line_items: The line items.
     :return: The CSV rows.
     """
-    rows: list[CSVRow] = [CSVRow(gettext("Date"), gettext("Currency"),
-                                 gettext("Account"), gettext("Description"),
-                                 gettext("Debit"), gettext("Credit"),
-                                 gettext("Note"))]
-    rows.extend([CSVRow(x.journal_entry.date, x.currency.code,
-                        str(x.account), x.description,
-                        x.debit, x.credit, x.journal_entry.note)
-                 for x in line_items])
-    return rows
+    yield CSVRow(gettext("Date"), gettext("Currency"), gettext("Account"),
+                 gettext("Description"), gettext("Debit"), gettext("Credit"),
+                 gettext("Note"))
+    for x in line_items:
+        yield CSVRow(x.journal_entry.date, x.currency.code, str(x.account),
+                     x.description, x.debit, x.credit, x.journal_entry.note)
 
 
 class Journal(BaseReport):
@@ -176,46 +149,36 @@ class Journal(BaseReport):
         """
         self.__period: Period = period
         """The period."""
-        self.__line_items: list[JournalEntryLineItem] \
-            = self.__query_line_items()
+        self.__line_items: list[LineItemRow] = self.__query_line_items()
         """The line items."""
 
-    def __query_line_items(self) -> list[JournalEntryLineItem]:
+    def __query_line_items(self) -> list[LineItemRow]:
         """Queries and returns the line items.
 
         :return: The line items.
         """
-        conditions: list[sa.BinaryExpression] = []
-        if self.__period.start is not None:
-            conditions.append(JournalEntry.date >= self.__period.start)
-        if self.__period.end is not None:
-            conditions.append(JournalEntry.date <= self.__period.end)
-        return JournalEntryLineItem.query.join(JournalEntry)\
-            .filter(*conditions)\
-            .order_by(JournalEntry.date,
-                      JournalEntry.no,
-                      JournalEntryLineItem.is_debit.desc(),
-                      JournalEntryLineItem.no)\
-            .options(selectinload(JournalEntryLineItem.account),
-                     selectinload(JournalEntryLineItem.currency),
-                     selectinload(JournalEntryLineItem.journal_entry)).all()
-
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+        return load_line_item_rows(select_journal(
+            db.session, self.__period.start, self.__period.end))
+
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = f"journal-{period_spec(self.__period)}.csv"
-        return csv_download(filename, get_csv_rows(self.__line_items))
+        return csv_download(filename, get_csv_rows(self.__line_items),
+                            export_format)
 
     def html(self) -> str:
         """Composes and returns the report as HTML.
 
         :return: The report as HTML.
         """
-        pagination: Pagination[JournalEntryLineItem] \
-            = Pagination[JournalEntryLineItem](self.__line_items,
-                                               is_reversed=True)
+        pagination: Pagination[LineItemRow] \
+            = Pagination[LineItemRow](self.__line_items, is_reversed=True)
         params: PageParams = PageParams(period=self.__period,
                                         pagination=pagination,
                                         line_items=pagination.list)
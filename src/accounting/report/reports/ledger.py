@@ -20,33 +20,36 @@
 import datetime as dt
 from decimal import Decimal
 
-import sqlalchemy as sa
 from flask import url_for, render_template, Response
-from sqlalchemy.orm import selectinload
 
 from accounting import db
 from accounting.locale import gettext
-from accounting.models import Currency, Account, JournalEntry, \
-    JournalEntryLineItem
+from accounting.models import Currency, Account
 from accounting.report.period import Period, PeriodChooser
+from accounting.report.utils.amount_column import AmountColumn, \
+    running_balances
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
 from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
-    period_spec
+    ExportFormat, period_spec
+from accounting.report.queries import LineItemData, query_ledger
+from accounting.report.utils.line_item_rows import JournalEntryRow, \
+    LineItemRow
 from accounting.report.utils.option_link import OptionLink
 from accounting.report.utils.report_chooser import ReportChooser
 from accounting.report.utils.report_type import ReportType
 from accounting.report.utils.urls import ledger_url
+from accounting.utils.ledger_metadata import ledger_metadata
 from accounting.utils.pagination import Pagination
 
 
 class ReportLineItem:
     """A line item in the report."""
 
-    def __init__(self, line_item: JournalEntryLineItem | None = None):
+    def __init__(self, line_item: LineItemRow | None = None):
         """Constructs the line item in the report.
 
-        :param line_item: The journal entry line item.
+        :param line_item: The journal entry line item row.
         """
         self.is_brought_forward: bool = False
         """Whether this is the brought-forward line item."""
@@ -64,16 +67,27 @@ class ReportLineItem:
         """The balance."""
         self.note: str | None = None
         """The note."""
-        self.url: str | None = None
-        """The URL to the journal entry line item."""
+        self.__journal_entry: JournalEntryRow | None = None
+        """The journal entry."""
         if line_item is not None:
             self.date = line_item.journal_entry.date
             self.description = line_item.description
-            self.debit = line_item.amount if line_item.is_debit else None
-            self.credit = None if line_item.is_debit else line_item.amount
+            self.debit = line_item.debit
+            self.credit = line_item.credit
             self.note = line_item.journal_entry.note
-            self.url = url_for("accounting.journal-entry.detail",
-                               journal_entry=line_item.journal_entry)
+            self.__journal_entry = line_item.journal_entry
+
+    @property
+    def url(self) -> str | None:
+        """Returns the URL to the journal entry line item.
+
+        :return: The URL to the journal entry line item, or None if this is
+            not a journal entry line item, or if it is archived.
+        """
+        if self.__journal_entry is None or self.__journal_entry.is_archived:
+            return None
+        return url_for("accounting.journal-entry.detail",
+                       journal_entry=self.__journal_entry)
 
 
 class LineItemCollector:
@@ -98,29 +112,34 @@ class LineItemCollector:
         """The line items."""
         self.total: ReportLineItem | None
         """The total line item."""
-        self.brought_forward = self.__get_brought_forward()
-        self.line_items = self.__query_line_items()
+        data: LineItemData = query_ledger(db.session, currency.code,
+                                          account.id, period.start,
+                                          period.end)
+        self.brought_forward = self.__get_brought_forward(
+            data.brought_forward)
+        self.line_items = [ReportLineItem(x) for x in data.line_items]
+        self.__debits: AmountColumn \
+            = AmountColumn([x.debit for x in self.line_items])
+        """The debit amounts of the line items."""
+        self.__credits: AmountColumn \
+            = AmountColumn([x.credit for x in self.line_items])
+        """The credit amounts of the line items."""
+        self.__balances: list[Decimal] \
+            = running_balances(self.__debits, self.__credits,
+                               self.__brought_forward_balance)
+        """The running balances of the line items."""
         self.total = self.__get_total()
         self.__populate_balance()
 
-    def __get_brought_forward(self) -> ReportLineItem | None:
-        """Queries, composes and returns the brought-forward line item.
+    def __get_brought_forward(self, balance: Decimal | None) \
+            -> ReportLineItem | None:
+        """Composes and returns the brought-forward line item.
 
+        :param balance: The brought-forward balance, or None if there is no
+            brought-forward balance.
         :return: The brought-forward line item, or None if the report starts
             from the beginning.
         """
-        if self.__period.start is None:
-            return None
-        if self.__account.is_nominal:
-            return None
-        balance_func: sa.Function = sa.func.sum(sa.case(
-            (JournalEntryLineItem.is_debit, JournalEntryLineItem.amount),
-            else_=-JournalEntryLineItem.amount))
-        select: sa.Select = sa.Select(balance_func).join(JournalEntry)\
-            .filter(JournalEntryLineItem.currency_code == self.__currency.code,
-                    JournalEntryLineItem.account_id == self.__account.id,
-                    JournalEntry.date < self.__period.start)
-        balance: int | None = db.session.scalar(select)
         if balance is None:
             return None
         line_item: ReportLineItem = ReportLineItem()
@@ -134,28 +153,6 @@ class LineItemCollector:
         line_item.balance = balance
         return line_item
 
-    def __query_line_items(self) -> list[ReportLineItem]:
-        """Queries and returns the line items.
-
-        :return: The line items.
-        """
-        conditions: list[sa.BinaryExpression] \
-            = [JournalEntryLineItem.currency_code == self.__currency.code,
-               JournalEntryLineItem.account_id == self.__account.id]
-        if self.__period.start is not None:
-            conditions.append(JournalEntry.date >= self.__period.start)
-        if self.__period.end is not None:
-            conditions.append(JournalEntry.date <= self.__period.end)
-        return [ReportLineItem(x) for x in JournalEntryLineItem.query
-                .join(JournalEntry)
-                .filter(*conditions)
-                .order_by(JournalEntry.date,
-                          JournalEntry.no,
-                          JournalEntryLineItem.is_debit.desc(),
-                          JournalEntryLineItem.no)
-                .options(selectinload(JournalEntryLineItem.journal_entry))
-                .all()]
-
     def __get_total(self) -> ReportLineItem | None:
         """Composes the total line item.
 
@@ -166,14 +163,10 @@ class LineItemCollector:
         line_item: ReportLineItem = ReportLineItem()
         line_item.is_total = True
         line_item.description = gettext("Total")
-        line_item.debit = sum([x.debit for x in self.line_items
-                               if x.debit is not None])
-        line_item.credit = sum([x.credit for x in self.line_items
-                                if x.credit is not None])
-        line_item.balance = line_item.debit - line_item.credit
-        if self.brought_forward is not None:
-            line_item.balance \
-                = self.brought_forward.balance + line_item.balance
+        line_item.debit = self.__debits.total
+        line_item.credit = self.__credits.total
+        line_item.balance = self.__balances[-1] \
+            if len(self.__balances) > 0 else self.brought_forward.balance
         return line_item
 
     def __populate_balance(self) -> None:
@@ -183,15 +176,20 @@ class LineItemCollector:
         """
         if self.__account.is_nominal:
             return None
-        balance: Decimal = 0 if self.brought_forward is None \
-            else self.brought_forward.balance
-        for line_item in self.line_items:
-            if line_item.debit is not None:
-                balance = balance + line_item.debit
-            if line_item.credit is not None:
-                balance = balance - line_item.credit
+        for line_item, balance in zip(self.line_items, self.__balances):
             line_item.balance = balance
 
+    @property
+    def __brought_forward_balance(self) -> Decimal | None:
+        """Returns the brought-forward balance.
+
+        :return: The brought-forward balance, or None if there is no
+            brought-forward line item.
+        """
+        if self.brought_forward is None:
+            return None
+        return self.brought_forward.balance
+
 
 class CSVRow(BaseCSVRow):
     """A row in the CSV."""
@@ -309,9 +307,8 @@ class PageParams(BasePageParams):
 
         :return: The account options.
         """
-        in_use: sa.Select = sa.Select(JournalEntryLineItem.account_id)\
-            .filter(JournalEntryLineItem.currency_code == self.currency.code)\
-            .group_by(JournalEntryLineItem.account_id)
+        in_use: set[int] \
+            = ledger_metadata().account_ids(self.currency.code)
         return [OptionLink(str(x), ledger_url(self.currency, x, self.period),
                            x.id == self.account.id)
                 for x in Account.query.filter(Account.id.in_(in_use))
@@ -344,15 +341,18 @@ class Ledger(BaseReport):
         self.__total: ReportLineItem | None = collector.total
         """The total line item."""
 
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = "ledger-{currency}-{account}-{period}.csv"\
             .format(currency=self.__currency.code, account=self.__account.code,
                     period=period_spec(self.__period))
-        return csv_download(filename, self.__get_csv_rows())
+        return csv_download(filename, self.__get_csv_rows(), export_format)
 
     def __get_csv_rows(self) -> list[CSVRow]:
         """Composes and returns the CSV rows.
@@ -19,19 +19,22 @@
 """
 import datetime as dt
 from decimal import Decimal
+from typing import Any
 
 import sqlalchemy as sa
 from flask import Response, render_template, request
-from sqlalchemy.orm import selectinload
 
 from accounting.locale import gettext
-from accounting.models import Currency, CurrencyL10n, Account, AccountL10n, \
-    JournalEntry, JournalEntryLineItem
+from accounting.models import Currency, CurrencyL10n, Account, AccountL10n
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
-from accounting.report.utils.csv_export import csv_download
+from accounting.report.utils.csv_export import csv_download, ExportFormat
+from accounting.report.utils.line_item_rows import LineItemKey, \
+    LineItemRow, select_line_item_rows, order_line_item_rows, \
+    after_line_item, load_line_item_rows
 from accounting.report.utils.report_chooser import ReportChooser
 from accounting.report.utils.report_type import ReportType
+from accounting.utils.archive import line_item_tables
 from accounting.utils.pagination import Pagination
 from accounting.utils.query import parse_query_keywords
 from .journal import get_csv_rows
@@ -42,10 +45,10 @@ class LineItemCollector:
 
     def __init__(self):
         """Constructs the line item collector."""
-        self.line_items: list[JournalEntryLineItem] = self.__query_line_items()
+        self.line_items: list[LineItemRow] = self.__query_line_items()
         """The line items."""
 
-    def __query_line_items(self) -> list[JournalEntryLineItem]:
+    def __query_line_items(self) -> list[LineItemRow]:
         """Queries and returns the line items.
 
         :return: The line items.
@@ -53,121 +56,131 @@ class LineItemCollector:
         keywords: list[str] = parse_query_keywords(request.args.get("q"))
         if len(keywords) == 0:
             return []
-        conditions: list[sa.BinaryExpression] = []
-        for k in keywords:
-            sub_conditions: list[sa.BinaryExpression] \
-                = [JournalEntryLineItem.description.icontains(k),
-                   JournalEntryLineItem.account_id.in_(
-                       self.__get_account_condition(k)),
-                   JournalEntryLineItem.currency_code.in_(
-                       self.__get_currency_condition(k)),
-                   JournalEntryLineItem.journal_entry_id.in_(
-                       self.__get_journal_entry_condition(k))]
-            try:
-                sub_conditions.append(
-                    JournalEntryLineItem.amount == Decimal(k))
-            except ArithmeticError:
-                pass
-            conditions.append(sa.or_(*sub_conditions))
-        return JournalEntryLineItem.query.join(JournalEntry)\
-            .filter(*conditions)\
-            .order_by(JournalEntry.date,
-                      JournalEntry.no,
-                      JournalEntryLineItem.is_debit,
-                      JournalEntryLineItem.no)\
-            .options(selectinload(JournalEntryLineItem.account),
-                     selectinload(JournalEntryLineItem.currency),
-                     selectinload(JournalEntryLineItem.journal_entry)).all()
-
-    @staticmethod
-    def __get_account_condition(k: str) -> sa.Select:
-        """Composes and returns the condition to filter the account.
-
-        :param k: The keyword.
-        :return: The condition to filter the account.
-        """
-        code: sa.BinaryExpression = Account.base_code + "-" \
-            + sa.func.substr("000" + sa.cast(Account.no, sa.String),
-                             sa.func.char_length(sa.cast(Account.no,
-                                                         sa.String)) + 1)
-        select_l10n: sa.Select = sa.select(AccountL10n.account_id)\
-            .filter(AccountL10n.title.icontains(k))
-        conditions: list[sa.BinaryExpression] \
-            = [Account.base_code.contains(k),
-               Account.title_l10n.icontains(k),
-               code.contains(k),
-               Account.id.in_(select_l10n)]
-        if k in gettext("Needs Offset"):
-            conditions.append(Account.is_need_offset)
-        return sa.select(Account.id).filter(sa.or_(*conditions))
-
-    @staticmethod
-    def __get_currency_condition(k: str) -> sa.Select:
-        """Composes and returns the condition to filter the currency.
-
-        :param k: The keyword.
-        :return: The condition to filter the currency.
-        """
-        select_l10n: sa.Select = sa.select(CurrencyL10n.currency_code)\
-            .filter(CurrencyL10n.name.icontains(k))
-        return sa.select(Currency.code).filter(
-            sa.or_(Currency.code.icontains(k),
-                   Currency.name_l10n.icontains(k),
-                   Currency.code.in_(select_l10n)))
-
-    @staticmethod
-    def __get_journal_entry_condition(k: str) -> sa.Select:
-        """Composes and returns the condition to filter the journal entry.
-
-        :param k: The keyword.
-        :return: The condition to filter the journal entry.
-        """
-        conditions: list[sa.BinaryExpression] \
-            = [JournalEntry.note.icontains(k)]
-        date: dt.datetime
-        try:
-            date = dt.datetime.strptime(k, "%Y")
-            conditions.append(
-                sa.extract("year", JournalEntry.date) == date.year)
-        except ValueError:
-            pass
-        try:
-            date = dt.datetime.strptime(k, "%Y/%m")
-            conditions.append(sa.and_(
-                sa.extract("year", JournalEntry.date) == date.year,
-                sa.extract("month", JournalEntry.date) == date.month))
-        except ValueError:
-            pass
-        try:
-            date = dt.datetime.strptime(f"2000/{k}", "%Y/%m/%d")
-            conditions.append(sa.and_(
-                sa.extract("month", JournalEntry.date) == date.month,
-                sa.extract("day", JournalEntry.date) == date.day))
-        except ValueError:
-            pass
+        return load_line_item_rows(select_search(keywords))
+
+
+def select_search(keywords: list[str], after: LineItemKey | None = None) \
+        -> sa.Select:
+    """Returns the query of the line items that match all the keywords, in
+    the order of the search result.
+
+    :param keywords: The keywords.
+    :param after: The sort key after which to query, or None from the start.
+    :return: The query of the line items.
+    """
+    journal_entry, line_item = line_item_tables(None)
+    conditions: list[sa.ColumnElement[bool]] = []
+    for k in keywords:
+        sub_conditions: list[sa.ColumnElement[bool]] \
+            = [line_item.description.icontains(k),
+               line_item.account_id.in_(__get_account_condition(k)),
+               line_item.currency_code.in_(__get_currency_condition(k)),
+               line_item.journal_entry_id.in_(
+                   __get_journal_entry_condition(journal_entry, k))]
         try:
-            date = dt.datetime.strptime(k, "%Y/%m/%d")
-            conditions.append(sa.and_(
-                sa.extract("year", JournalEntry.date) == date.year,
-                sa.extract("month", JournalEntry.date) == date.month,
-                sa.extract("day", JournalEntry.date) == date.day))
-        except ValueError:
+            sub_conditions.append(line_item.amount == Decimal(k))
+        except ArithmeticError:
             pass
-        return sa.select(JournalEntry.id).filter(sa.or_(*conditions))
+        conditions.append(sa.or_(*sub_conditions))
+    if after is not None:
+        conditions.append(after_line_item(journal_entry, line_item, after,
+                                          False))
+    return order_line_item_rows(
+        select_line_item_rows(journal_entry, line_item).filter(*conditions),
+        journal_entry, line_item, False)
+
+
+def __get_account_condition(k: str) -> sa.Select:
+    """Composes and returns the condition to filter the account.
+
+    :param k: The keyword.
+    :return: The condition to filter the account.
+    """
+    code: sa.BinaryExpression = Account.base_code + "-" \
+        + sa.func.substr("000" + sa.cast(Account.no, sa.String),
+                         sa.func.char_length(sa.cast(Account.no,
+                                                     sa.String)) + 1)
+    select_l10n: sa.Select = sa.select(AccountL10n.account_id)\
+        .filter(AccountL10n.title.icontains(k))
+    conditions: list[sa.BinaryExpression] \
+        = [Account.base_code.contains(k),
+           Account.title_l10n.icontains(k),
+           code.contains(k),
+           Account.id.in_(select_l10n)]
+    if k in gettext("Needs Offset"):
+        conditions.append(Account.is_need_offset)
+    return sa.select(Account.id).filter(sa.or_(*conditions))
+
+
+def __get_currency_condition(k: str) -> sa.Select:
+    """Composes and returns the condition to filter the currency.
+
+    :param k: The keyword.
+    :return: The condition to filter the currency.
+    """
+    select_l10n: sa.Select = sa.select(CurrencyL10n.currency_code)\
+        .filter(CurrencyL10n.name.icontains(k))
+    return sa.select(Currency.code).filter(
+        sa.or_(Currency.code.icontains(k),
+               Currency.name_l10n.icontains(k),
+               Currency.code.in_(select_l10n)))
+
+
+def __get_journal_entry_condition(journal_entry: Any, k: str) \
+        -> sa.Select:
+    """Composes and returns the condition to filter the journal entry.
+
+    :param journal_entry: The journal entry entity from
+        line_item_tables().
+    :param k: The keyword.
+    :return: The condition to filter the journal entry.
+    """
+    conditions: list[sa.BinaryExpression] \
+        = [journal_entry.note.icontains(k)]
+    date: dt.datetime
+    try:
+        date = dt.datetime.strptime(k, "%Y")
+        conditions.append(
+            sa.extract("year", journal_entry.date) == date.year)
+    except ValueError:
+        pass
+    try:
+        date = dt.datetime.strptime(k, "%Y/%m")
+        conditions.append(sa.and_(
+            sa.extract("year", journal_entry.date) == date.year,
+            sa.extract("month", journal_entry.date) == date.month))
+    except ValueError:
+        pass
+    try:
+        date = dt.datetime.strptime(f"2000/{k}", "%Y/%m/%d")
+        conditions.append(sa.and_(
+            sa.extract("month", journal_entry.date) == date.month,
+            sa.extract("day", journal_entry.date) == date.day))
+    except ValueError:
+        pass
+    try:
+        date = dt.datetime.strptime(k, "%Y/%m/%d")
+        conditions.append(sa.and_(
+            sa.extract("year", journal_entry.date) == date.year,
+            sa.extract("month", journal_entry.date) == date.month,
+            sa.extract("day", journal_entry.date) == date.day))
+    except ValueError:
+        pass
+    return sa.select(journal_entry.id).filter(sa.or_(*conditions))
 
 
 class PageParams(BasePageParams):
     """The HTML page parameters."""
 
-    def __init__(self, pagination: Pagination[JournalEntryLineItem],
-                 line_items: list[JournalEntryLineItem]):
+    def __init__(self, pagination: Pagination[LineItemRow],
+                 line_items: list[LineItemRow]):
         """Constructs the HTML page parameters.
 
         :param line_items: The search result line items.
         """
-        self.pagination: Pagination[JournalEntryLineItem] = pagination
+        self.pagination: Pagination[LineItemRow] = pagination
         """The pagination."""
-        self.line_items: list[JournalEntryLineItem] = line_items
+        self.line_items: list[LineItemRow] = line_items
         """The line items."""
 
     @property
@@ -192,26 +205,28 @@ class Search(BaseReport):
 
     def __init__(self):
         """Constructs a search."""
-        self.__line_items: list[JournalEntryLineItem] \
-            = LineItemCollector().line_items
+        self.__line_items: list[LineItemRow] = LineItemCollector().line_items
         """The line items."""
 
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = "search-{q}.csv".format(q=request.args["q"])
-        return csv_download(filename, get_csv_rows(self.__line_items))
+        return csv_download(filename, get_csv_rows(self.__line_items),
+                            export_format)
 
     def html(self) -> str:
         """Composes and returns the report as HTML.
 
         :return: The report as HTML.
         """
-        pagination: Pagination[JournalEntryLineItem] \
-            = Pagination[JournalEntryLineItem](self.__line_items,
-                                               is_reversed=True)
+        pagination: Pagination[LineItemRow] \
+            = Pagination[LineItemRow](self.__line_items, is_reversed=True)
         params: PageParams = PageParams(pagination=pagination,
                                         line_items=pagination.list)
         return render_template("accounting/report/search.html",
@@ -19,18 +19,19 @@
 """
 from decimal import Decimal
 
-import sqlalchemy as sa
 from flask import Response, render_template
 
-from accounting import db
 from accounting.locale import gettext
-from accounting.models import Currency, Account, JournalEntry, \
-    JournalEntryLineItem
+from accounting.models import Currency, Account
+from accounting.report.cache import cached_query
 from accounting.report.period import Period, PeriodChooser
+from accounting.report.queries import query_trial_balance
+from accounting.report.utils.account_lookup import account_lookup
+from accounting.report.utils.amount_column import AmountColumn
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
 from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
-    period_spec
+    ExportFormat, period_spec
 from accounting.report.utils.option_link import OptionLink
 from accounting.report.utils.report_chooser import ReportChooser
 from accounting.report.utils.report_type import ReportType
@@ -178,44 +179,34 @@ class TrialBalance(BaseReport):
 
         :return: None.
         """
-        conditions: list[sa.BinaryExpression] \
-            = [JournalEntryLineItem.currency_code == self.__currency.code]
-        if self.__period.start is not None:
-            conditions.append(JournalEntry.date >= self.__period.start)
-        if self.__period.end is not None:
-            conditions.append(JournalEntry.date <= self.__period.end)
-        balance_func: sa.Function = sa.func.sum(sa.case(
-            (JournalEntryLineItem.is_debit, JournalEntryLineItem.amount),
-            else_=-JournalEntryLineItem.amount)).label("balance")
-        select_balances: sa.Select = sa.select(Account.id, balance_func)\
-            .join(JournalEntry).join(Account)\
-            .filter(*conditions)\
-            .group_by(Account.id)\
-            .having(balance_func != 0)\
-            .order_by(Account.base_code, Account.no)
-        balances: list[sa.Row] = db.session.execute(select_balances).all()
+        balances: dict[int, Decimal] \
+            = cached_query(query_trial_balance, self.__currency.code,
+                           self.__period.start, self.__period.end)
         accounts: dict[int, Account] \
-            = {x.id: x for x in Account.query
-               .filter(Account.id.in_([x.id for x in balances])).all()}
-        self.__accounts = [ReportAccount(account=accounts[x.id],
-                                         amount=x.balance,
+            = account_lookup().get_accounts(balances)
+        self.__accounts = [ReportAccount(account=accounts[x],
+                                         amount=balances[x],
                                          url=ledger_url(self.__currency,
-                                                        accounts[x.id],
+                                                        accounts[x],
                                                         self.__period))
-                           for x in balances]
+                           for x in sorted(accounts, key=lambda x: (
+                               accounts[x].base_code, accounts[x].no))]
         self.__total = Total(
-            sum([x.debit for x in self.__accounts if x.debit is not None]),
-            sum([x.credit for x in self.__accounts if x.credit is not None]))
+            AmountColumn([x.debit for x in self.__accounts]).total,
+            AmountColumn([x.credit for x in self.__accounts]).total)
 
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = "trial-balance-{currency}-{period}.csv"\
             .format(currency=self.__currency.code,
                     period=period_spec(self.__period))
-        return csv_download(filename, self.__get_csv_rows())
+        return csv_download(filename, self.__get_csv_rows(), export_format)
 
     def __get_csv_rows(self) -> list[CSVRow]:
         """Composes and returns the CSV rows.
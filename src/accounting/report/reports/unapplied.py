@@ -28,7 +28,8 @@ from accounting.models import Currency, Account, JournalEntry, \
     JournalEntryLineItem
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
-from accounting.report.utils.csv_export import BaseCSVRow, csv_download
+from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
+    ExportFormat
 from accounting.report.utils.option_link import OptionLink
 from accounting.report.utils.report_chooser import ReportChooser
 from accounting.report.utils.report_type import ReportType
@@ -191,14 +192,18 @@ class UnappliedOriginalLineItems(BaseReport):
                 else net_balances[line_item.id]
         return line_items
 
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = "unapplied-{currency}-{account}.csv"\
             .format(currency=self.__currency.code, account=self.__account.code)
-        return csv_download(filename, get_csv_rows(self.__line_items))
+        return csv_download(filename, get_csv_rows(self.__line_items),
+                            export_format)
 
     def html(self) -> str:
         """Composes and returns the report as HTML.
@@ -27,7 +27,8 @@ from accounting.locale import gettext
 from accounting.models import Currency, Account, JournalEntryLineItem
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
-from accounting.report.utils.csv_export import BaseCSVRow, csv_download
+from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
+    ExportFormat
 from accounting.report.utils.offset_matcher import OffsetMatcher, OffsetPair
 from accounting.report.utils.option_link import OptionLink
 from accounting.report.utils.report_chooser import ReportChooser
@@ -187,14 +188,18 @@ class UnmatchedOffsets(BaseReport):
         self.__matched_pairs: list[OffsetPair] = offset_matcher.matched_pairs
         """A list of matched pairs."""
 
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = "unmatched-{currency}-{account}.csv"\
             .format(currency=self.__currency.code, account=self.__account.code)
-        return csv_download(filename, get_csv_rows(self.__line_items))
+        return csv_download(filename, get_csv_rows(self.__line_items),
+                            export_format)
 
     def html(self) -> str:
         """Composes and returns the report as HTML.
@@ -26,7 +26,8 @@ from accounting.locale import gettext
 from accounting.models import Currency, Account
 from accounting.report.utils.base_page_params import BasePageParams
 from accounting.report.utils.base_report import BaseReport
-from accounting.report.utils.csv_export import BaseCSVRow, csv_download
+from accounting.report.utils.csv_export import BaseCSVRow, csv_download, \
+    ExportFormat
 from accounting.report.utils.option_link import OptionLink
 from accounting.report.utils.report_chooser import ReportChooser
 from accounting.report.utils.report_type import ReportType
@@ -138,13 +139,17 @@ class AccountsWithUnmatchedOffsets(BaseReport):
             = get_accounts_with_unmatched(currency)
         """The accounts."""
 
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
         filename: str = "unmatched-accounts.csv"
-        return csv_download(filename, get_csv_rows(self.__accounts))
+        return csv_download(filename, get_csv_rows(self.__accounts),
+                            export_format)
 
     def html(self) -> str:
         """Composes and returns the report as HTML.
@@ -0,0 +1,119 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The per-request account lookups for the reports.
+
+A report looks up the same accounts several times in a request, for the
+report itself, the URL and the report chooser.  The accounts are cached in
+the request context, so that each account is queried at most once in a
+request.
+
+"""
+import re
+from collections.abc import Iterable
+
+import sqlalchemy as sa
+from flask import g, has_request_context
+
+from accounting.models import Account
+
+
+class AccountLookup:
+    """The account lookup cache."""
+
+    def __init__(self):
+        """Constructs the account lookup cache."""
+        self.__by_id: dict[int, Account] = {}
+        """The accounts by their ID."""
+        self.__by_code: dict[str, Account | None] = {}
+        """The accounts by their code, or None if the account does not
+        exist."""
+
+    def get_accounts(self, ids: Iterable[int]) -> dict[int, Account]:
+        """Returns the accounts by their ID.
+
+        :param ids: The account IDs.
+        :return: The accounts by their ID.
+        """
+        ids = set(ids)
+        missing: set[int] = ids - self.__by_id.keys()
+        if len(missing) > 0:
+            for account in Account.query.filter(Account.id.in_(missing)):
+                self.__add(account)
+        return {x: self.__by_id[x] for x in ids if x in self.__by_id}
+
+    def get_account_by_code(self, code: str) -> Account | None:
+        """Returns an account by its code.
+
+        :param code: The account code.
+        :return: The account, or None if the account does not exist.
+        """
+        if code not in self.__by_code:
+            m = re.match(r"^([1-9]{4})-(\d{3})$", code)
+            account: Account | None = None if m is None \
+                else Account.query.filter(Account.base_code == m[1],
+                                          Account.no == int(m[2])).first()
+            if account is None:
+                self.__by_code[code] = None
+            else:
+                self.__add(account)
+        return self.__by_code[code]
+
+    def get_accounts_by_code(self, codes: Iterable[str]) \
+            -> dict[str, Account]:
+        """Returns the accounts by their code, in one query.
+
+        :param codes: The account codes.
+        :return: The accounts by their code.
+        """
+        codes = set(codes)
+        missing: set[str] = codes - self.__by_code.keys()
+        conditions: list[sa.ColumnElement] = []
+        for code in missing:
+            m = re.match(r"^([1-9]{4})-(\d{3})$", code)
+            if m is not None:
+                conditions.append(sa.and_(Account.base_code == m[1],
+                                          Account.no == int(m[2])))
+        if len(conditions) > 0:
+            for account in Account.query.filter(sa.or_(*conditions)):
+                self.__add(account)
+        for code in missing:
+            if code not in self.__by_code:
+                self.__by_code[code] = None
+        return {x: self.__by_code[x] for x in codes
+                if self.__by_code[x] is not None}
+
+    def __add(self, account: Account) -> None:
+        """Adds an account to the cache.
+
+        :param account: The account.
+        :return: None.
+        """
+        self.__by_id[account.id] = account
+        self.__by_code[account.code] = account
+
+
+def account_lookup() -> AccountLookup:
+    """Returns the account lookup cache of the current request.  A new one is
+    returned each time when there is no request, like in the console commands.
+
+    :return: The account lookup cache.
+    """
+    if not has_request_context():
+        return AccountLookup()
+    if "_accounting_account_lookup" not in g:
+        setattr(g, "_accounting_account_lookup", AccountLookup())
+    return getattr(g, "_accounting_account_lookup")
@@ -0,0 +1,139 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The integer-cent amount columns for the report totals.
+
+The amounts are stored as Numeric(14, 2) in the database.  The report totals
+and running balances are added up as scaled integers in compact array
+columns, and are converted back to Decimal only when they are rendered.
+
+"""
+from array import array
+from decimal import Decimal
+from typing import Iterable
+
+SCALE: int = 2
+"""The number of decimal places of the amounts, as in Numeric(14, 2)."""
+
+
+def to_cents(amount: Decimal | None) -> int:
+    """Converts an amount to its scaled integer.
+
+    :param amount: The amount, or None for no amount.
+    :return: The scaled integer of the amount.
+    """
+    if amount is None:
+        return 0
+    return int(amount.scaleb(SCALE))
+
+
+def from_cents(cents: int, places: int = SCALE) -> Decimal:
+    """Converts a scaled integer back to the amount.
+
+    :param cents: The scaled integer.
+    :param places: The number of decimal places of the amount.
+    :return: The amount.
+    """
+    return Decimal(cents).scaleb(-SCALE).quantize(Decimal(1).scaleb(-places))
+
+
+def decimal_places(amount: Decimal | None) -> int:
+    """Returns the number of decimal places of an amount.  Like the Decimal
+    arithmetic, the sum of the amounts has the most decimal places of them.
+
+    :param amount: The amount, or None for no amount.
+    :return: The number of decimal places of the amount.
+    """
+    if amount is None:
+        return 0
+    return max(-amount.as_tuple().exponent, 0)
+
+
+class AmountColumn:
+    """A column of amounts, stored as scaled integers."""
+
+    def __init__(self, amounts: Iterable[Decimal | None] = ()):
+        """Constructs a column of amounts.
+
+        :param amounts: The amounts.  None is counted as zero.
+        """
+        self.cents: array = array("q")
+        """The scaled integers of the amounts."""
+        self.places: array = array("b")
+        """The numbers of decimal places of the amounts."""
+        self.__total: int | None = None
+        """The cached total, in scaled integer."""
+        for amount in amounts:
+            self.append(amount)
+
+    def __len__(self) -> int:
+        """Returns the number of amounts in the column.
+
+        :return: The number of amounts in the column.
+        """
+        return len(self.cents)
+
+    def append(self, amount: Decimal | None) -> None:
+        """Appends an amount to the column.
+
+        :param amount: The amount.  None is counted as zero.
+        :return: None.
+        """
+        self.cents.append(to_cents(amount))
+        self.places.append(decimal_places(amount))
+        self.__total = None
+
+    @property
+    def total_cents(self) -> int:
+        """Returns the total of the column, in scaled integer.  The total is
+        added up only once.
+
+        :return: The total of the column, in scaled integer.
+        """
+        if self.__total is None:
+            self.__total = sum(self.cents)
+        return self.__total
+
+    @property
+    def total(self) -> Decimal:
+        """Returns the total of the column.
+
+        :return: The total of the column.
+        """
+        return from_cents(self.total_cents, max(self.places, default=0))
+
+
+def running_balances(increases: AmountColumn,
+                     decreases: AmountColumn | None = None,
+                     start: Decimal | None = None) -> list[Decimal]:
+    """Computes the running balances of the amount columns in a single pass.
+
+    :param increases: The amounts that increase the balance.
+    :param decreases: The amounts that decrease the balance, or None if there
+        is none.
+    :param start: The starting balance, or None to start from zero.
+    :return: The balance after each row.
+    """
+    if decreases is None:
+        decreases = AmountColumn([None] * len(increases))
+    balance: int = to_cents(start)
+    places: int = decimal_places(start)
+    balances: list[Decimal] = []
+    for i in range(len(increases)):
+        balance = balance + increases.cents[i] - decreases.cents[i]
+        places = max(places, increases.places[i], decreases.places[i])
+        balances.append(from_cents(balance, places))
+    return balances
@@ -23,12 +23,11 @@ from typing import Type
 from urllib.parse import urlparse, ParseResult, parse_qsl, urlencode, \
     urlunparse
 
-import sqlalchemy as sa
 from flask import request
 
-from accounting import db
-from accounting.models import Currency, JournalEntryLineItem
+from accounting.models import Currency
 from accounting.utils.journal_entry_types import JournalEntryType
+from accounting.utils.ledger_metadata import ledger_metadata
 from .option_link import OptionLink
 from .report_chooser import ReportChooser
 
@@ -81,9 +80,7 @@ class BasePageParams(ABC):
         :param active_currency: The active currency.
         :return: The currency options.
         """
-        in_use: set[str] = set(db.session.scalars(
-            sa.select(JournalEntryLineItem.currency_code)
-            .group_by(JournalEntryLineItem.currency_code)).all())
+        in_use: set[str] = set(ledger_metadata().currencies)
         return [OptionLink(str(x), get_url(x), x.code == active_currency.code)
                 for x in Currency.query.filter(Currency.code.in_(in_use))
                 .order_by(Currency.code).all()]
@@ -21,14 +21,19 @@ from abc import ABC, abstractmethod
 
 from flask import Response
 
+from .csv_export import ExportFormat
+
 
 class BaseReport(ABC):
     """The base report class."""
 
     @abstractmethod
-    def csv(self) -> Response:
-        """Returns the report as CSV for download.
+    def csv(self, export_format: ExportFormat = ExportFormat.CSV) \
+            -> Response:
+        """Returns the report as CSV for download, or in another export
+        format.
 
+        :param export_format: The export format.
         :return: The response of the report for download.
         """
 
@@ -16,17 +16,27 @@
 #  limitations under the License.
 """The utilities to export the report as CSV for download.
 
+Besides the plain CSV, a report can be exported as gzip-compressed CSV, or as
+JSON Lines with or without gzip compression, from the same rows.  These are
+streamed, so that a large report is downloaded while its rows are still being
+written, and the compressed ones are compressed incrementally.
+
 """
 import csv
 import datetime as dt
+import json
+import zlib
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from decimal import Decimal
+from enum import Enum
 from io import StringIO
 from urllib.parse import quote
 
-from flask import Response
+from flask import Response, stream_with_context
 
 from accounting.report.period import Period
+from accounting.utils.format_context import FormatContext, format_context
 
 
 class BaseCSVRow(ABC):
@@ -41,16 +51,65 @@ class BaseCSVRow(ABC):
         """
 
 
-def csv_download(filename: str, rows: list[BaseCSVRow]) -> Response:
-    """Exports the data rows as a CSV file for download.
+class ExportFormat(Enum):
+    """The export formats."""
+    CSV: str = "csv"
+    """The CSV."""
+    CSV_GZ: str = "csv.gz"
+    """The gzip-compressed CSV."""
+    JSONL: str = "jsonl"
+    """The JSON Lines."""
+    JSONL_GZ: str = "jsonl.gz"
+    """The gzip-compressed JSON Lines."""
+
+    @property
+    def is_compressed(self) -> bool:
+        """Returns whether the format is gzip-compressed.
+
+        :return: True if the format is gzip-compressed, or False otherwise.
+        """
+        return self.value.endswith(".gz")
+
+    @property
+    def mimetype(self) -> str:
+        """Returns the media type.
+
+        :return: The media type.
+        """
+        if self.is_compressed:
+            return "application/gzip"
+        if self is ExportFormat.JSONL:
+            return "application/jsonl"
+        return "text/csv"
+
+
+CHUNK_SIZE: int = 64 * 1024
+"""The number of characters written before they are sent as a chunk."""
 
-    :param filename: The download file name.
+
+def csv_download(filename: str, rows: Iterable[BaseCSVRow],
+                 export_format: ExportFormat = ExportFormat.CSV) -> Response:
+    """Exports the data rows as a CSV file for download, or in another
+    export format.  The formats other than the plain CSV are streamed.
+
+    :param filename: The download file name, with the ".csv" extension.
     :param rows: The data rows.
-    :return: The response for download the CSV file.
+    :param export_format: The export format.
+    :return: The response for download the file.
     """
+    if export_format is not ExportFormat.CSV:
+        filename = f"{filename.removesuffix('.csv')}.{export_format.value}"
+        response: Response = Response(
+            stream_with_context(__stream(rows, export_format)),
+            mimetype=export_format.mimetype)
+        response.headers["Content-Disposition"] \
+            = f"attachment; filename={quote(filename)}"
+        return response
     with StringIO() as fp:
         writer = csv.writer(fp)
-        writer.writerows([x.values for x in rows])
+        context: FormatContext = format_context()
+        writer.writerows([[context.csv_value(y) for y in x.values]
+                          for x in rows])
         fp.seek(0)
         response: Response = Response(fp.read(), mimetype="text/csv")
         response.headers["Content-Disposition"] \
@@ -58,6 +117,54 @@ def csv_download(filename: str, rows: list[BaseCSVRow]) -> Response:
         return response
 
 
+def __stream(rows: Iterable[BaseCSVRow], export_format: ExportFormat) \
+        -> Iterator[bytes]:
+    """Writes the data rows in an export format, chunk by chunk.
+
+    :param rows: The data rows.
+    :param export_format: The export format.
+    :return: The chunks of the file.
+    """
+    context: FormatContext = format_context()
+    compressor: zlib._Compress | None = None
+    if export_format.is_compressed:
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+    def encode(text: str) -> bytes:
+        """Encodes and compresses the written text.
+
+        :param text: The written text.
+        :return: The encoded and compressed text.
+        """
+        data: bytes = text.encode("utf-8")
+        return data if compressor is None else compressor.compress(data)
+
+    with StringIO() as fp:
+        writer = csv.writer(fp)
+        is_csv: bool = export_format in {ExportFormat.CSV,
+                                         ExportFormat.CSV_GZ}
+        for row in rows:
+            values: list[str | Decimal | None] \
+                = [context.csv_value(x) for x in row.values]
+            if is_csv:
+                writer.writerow(values)
+            else:
+                fp.write(json.dumps([None if x is None else str(x)
+                                     for x in values], ensure_ascii=False))
+                fp.write("\n")
+            if fp.tell() >= CHUNK_SIZE:
+                chunk: bytes = encode(fp.getvalue())
+                fp.seek(0)
+                fp.truncate()
+                if len(chunk) > 0:
+                    yield chunk
+        chunk = encode(fp.getvalue())
+        if compressor is not None:
+            chunk = chunk + compressor.flush()
+        if len(chunk) > 0:
+            yield chunk
+
+
 def period_spec(period: Period) -> str:
     """Constructs the period specification to be used in the filename.
 
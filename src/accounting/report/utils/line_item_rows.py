@@ -0,0 +1,410 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The lightweight line item rows for the reports.
+
+The reports only need a few columns of the journal entry line items.  Instead
+of hydrating the full ORM entities with their eagerly-loaded relationships,
+the columns are selected with SQLAlchemy Core into compact row records, and
+the account and currency titles are resolved from in-memory lookups.
+
+"""
+import datetime as dt
+from decimal import Decimal
+from typing import Any
+
+import sqlalchemy as sa
+from babel import Locale
+from flask_babel import get_locale, get_babel
+
+from accounting import db
+from accounting.models import Currency, CurrencyL10n, Account, AccountL10n, \
+    JournalEntry, JournalEntryLineItem
+from accounting.utils.archive import is_archived_column
+
+LineItemKey = tuple[dt.date, int, bool, int]
+"""The sort key of a line item, as the date and the number of its journal
+entry, whether it is a debit line item, and its number."""
+
+
+class AccountRow:
+    """An account in the report rows."""
+    __slots__ = ("id", "base_code", "no", "title", "is_need_offset")
+
+    def __init__(self, id: int, base_code: str, no: int, title: str,
+                 is_need_offset: bool):
+        """Constructs an account in the report rows.
+
+        :param id: The account ID.
+        :param base_code: The code of the base account.
+        :param no: The account number under the base account.
+        :param title: The title in the current locale.
+        :param is_need_offset: Whether the account needs offset.
+        """
+        self.id: int = id
+        """The account ID."""
+        self.base_code: str = base_code
+        """The code of the base account."""
+        self.no: int = no
+        """The account number under the base account."""
+        self.title: str = title
+        """The title in the current locale."""
+        self.is_need_offset: bool = is_need_offset
+        """Whether the account needs offset."""
+
+    def __str__(self) -> str:
+        """Returns the string representation of the account.
+
+        :return: The string representation of the account.
+        """
+        return f"{self.code} {self.title}"
+
+    @property
+    def code(self) -> str:
+        """Returns the code.
+
+        :return: The code.
+        """
+        return f"{self.base_code}-{self.no:03d}"
+
+    @property
+    def is_real(self) -> bool:
+        """Returns whether the account is a real account.
+
+        :return: True if the account is a real account, or False otherwise.
+        """
+        return self.base_code[0] in {"1", "2", "3"}
+
+    @property
+    def is_nominal(self) -> bool:
+        """Returns whether the account is a nominal account.
+
+        :return: True if the account is a nominal account, or False otherwise.
+        """
+        return not self.is_real
+
+
+class CurrencyRow:
+    """A currency in the report rows."""
+    __slots__ = ("code", "name")
+
+    def __init__(self, code: str, name: str):
+        """Constructs a currency in the report rows.
+
+        :param code: The currency code.
+        :param name: The name in the current locale.
+        """
+        self.code: str = code
+        """The currency code."""
+        self.name: str = name
+        """The name in the current locale."""
+
+    def __str__(self) -> str:
+        """Returns the string representation of the currency.
+
+        :return: The string representation of the currency.
+        """
+        return f"{self.name.title()} ({self.code})"
+
+
+class JournalEntryRow:
+    """A journal entry in the report rows."""
+    __slots__ = ("id", "date", "no", "note", "is_archived")
+
+    def __init__(self, id: int, date: dt.date, no: int, note: str | None,
+                 is_archived: bool = False):
+        """Constructs a journal entry in the report rows.
+
+        :param id: The journal entry ID.
+        :param date: The date.
+        :param no: The journal entry number under the date.
+        :param note: The note.
+        :param is_archived: Whether the journal entry is archived.
+        """
+        self.id: int = id
+        """The journal entry ID."""
+        self.date: dt.date = date
+        """The date."""
+        self.no: int = no
+        """The journal entry number under the date."""
+        self.note: str | None = note
+        """The note."""
+        self.is_archived: bool = is_archived
+        """Whether the journal entry is archived."""
+
+
+class LineItemRow:
+    """A journal entry line item in the report rows."""
+    __slots__ = ("id", "journal_entry", "currency", "account", "is_debit",
+                 "no", "description", "amount")
+
+    def __init__(self, id: int, journal_entry: JournalEntryRow,
+                 currency: CurrencyRow, account: AccountRow, is_debit: bool,
+                 no: int, description: str | None, amount: Decimal):
+        """Constructs a journal entry line item in the report rows.
+
+        :param id: The line item ID.
+        :param journal_entry: The journal entry.
+        :param currency: The currency.
+        :param account: The account.
+        :param is_debit: True for a debit line item, or False for a credit
+            line item.
+        :param no: The line item number under the journal entry and debit or
+            credit.
+        :param description: The description.
+        :param amount: The amount.
+        """
+        self.id: int = id
+        """The line item ID."""
+        self.journal_entry: JournalEntryRow = journal_entry
+        """The journal entry."""
+        self.currency: CurrencyRow = currency
+        """The currency."""
+        self.account: AccountRow = account
+        """The account."""
+        self.is_debit: bool = is_debit
+        """True for a debit line item, or False for a credit line item."""
+        self.no: int = no
+        """The line item number under the journal entry and debit or
+        credit."""
+        self.description: str | None = description
+        """The description."""
+        self.amount: Decimal = amount
+        """The amount."""
+
+    @property
+    def debit(self) -> Decimal | None:
+        """Returns the debit amount.
+
+        :return: The debit amount, or None if this is not a debit line item.
+        """
+        return self.amount if self.is_debit else None
+
+    @property
+    def credit(self) -> Decimal | None:
+        """Returns the credit amount.
+
+        :return: The credit amount, or None if this is not a credit line item.
+        """
+        return None if self.is_debit else self.amount
+
+
+def select_line_item_rows(journal_entry: Any = JournalEntry,
+                          line_item: Any = JournalEntryLineItem) -> sa.Select:
+    """Returns the base query of the line item rows.  The journal entries are
+    joined, so that the callers can filter and order by their columns.
+
+    :param journal_entry: The journal entry entity from line_item_tables().
+    :param line_item: The line item entity from line_item_tables().
+    :return: The base query of the line item rows.
+    """
+    return sa.select(line_item.id,
+                     line_item.journal_entry_id,
+                     line_item.currency_code,
+                     line_item.account_id,
+                     line_item.is_debit,
+                     line_item.no,
+                     line_item.description,
+                     line_item.amount,
+                     journal_entry.date,
+                     journal_entry.no.label("journal_entry_no"),
+                     journal_entry.note,
+                     is_archived_column(journal_entry).label("is_archived"))\
+        .select_from(line_item)\
+        .join(journal_entry, line_item.journal_entry_id == journal_entry.id)
+
+
+def order_line_item_rows(select: sa.Select, journal_entry: Any,
+                         line_item: Any, is_debit_first: bool) -> sa.Select:
+    """Orders the query of the line item rows by their sort keys.
+
+    :param select: The query from select_line_item_rows().
+    :param journal_entry: The journal entry entity from line_item_tables().
+    :param line_item: The line item entity from line_item_tables().
+    :param is_debit_first: True to put the debit line items first, or False
+        to put the credit line items first.
+    :return: The ordered query.
+    """
+    return select.order_by(journal_entry.date,
+                           journal_entry.no,
+                           line_item.is_debit.desc() if is_debit_first
+                           else line_item.is_debit,
+                           line_item.no)
+
+
+def after_line_item(journal_entry: Any, line_item: Any, key: LineItemKey,
+                    is_debit_first: bool) -> sa.ColumnElement[bool]:
+    """Returns the condition of the line items after a sort key, so that the
+    next page is sought from the key instead of counted from the start.
+
+    :param journal_entry: The journal entry entity from line_item_tables().
+    :param line_item: The line item entity from line_item_tables().
+    :param key: The sort key of the last line item in the previous page.
+    :param is_debit_first: True if the debit line items are put first, or
+        False if the credit line items are put first.
+    :return: The condition of the line items after the sort key.
+    """
+    date, journal_entry_no, is_debit, no = key
+    later_side: sa.ColumnElement[bool] \
+        = line_item.is_debit == (not is_debit) \
+        if is_debit == is_debit_first else sa.false()
+    return sa.and_(
+        journal_entry.date >= date,
+        sa.or_(journal_entry.date > date,
+               journal_entry.no > journal_entry_no,
+               sa.and_(journal_entry.no == journal_entry_no,
+                       sa.or_(later_side,
+                              sa.and_(line_item.is_debit == is_debit,
+                                      line_item.no > no)))))
+
+
+def line_item_key(line_item: LineItemRow) -> LineItemKey:
+    """Returns the sort key of a line item.
+
+    :param line_item: The line item.
+    :return: The sort key of the line item.
+    """
+    return (line_item.journal_entry.date, line_item.journal_entry.no,
+            line_item.is_debit, line_item.no)
+
+
+def load_line_item_rows(select: sa.Select,
+                        session: sa.orm.Session | None = None,
+                        locale: str | None = None) -> list[LineItemRow]:
+    """Executes the query of the line item rows, and returns the rows with
+    their journal entries, currencies and accounts resolved.
+
+    :param select: The query from select_line_item_rows(), with the conditions
+        and the order applied.
+    :param session: The database session, or None for the current one.
+    :param locale: The locale of the titles, or None for the current locale.
+    :return: The line item rows.
+    """
+    session = db.session if session is None else session
+    return build_line_item_rows(session.execute(select).all(), session,
+                                locale)
+
+
+def build_line_item_rows(result: list[sa.Row],
+                         session: sa.orm.Session | None = None,
+                         locale: str | None = None) -> list[LineItemRow]:
+    """Returns the line item rows from the result of their query, with their
+    journal entries, currencies and accounts resolved.  The extra columns in
+    the result are left to the caller.
+
+    :param result: The result of the query from select_line_item_rows().
+    :param session: The database session, or None for the current one.
+    :param locale: The locale of the titles, or None for the current locale.
+    :return: The line item rows.
+    """
+    session = db.session if session is None else session
+    accounts: dict[int, AccountRow] \
+        = get_account_rows({x.account_id for x in result}, session, locale)
+    currencies: dict[str, CurrencyRow] \
+        = get_currency_rows({x.currency_code for x in result}, session,
+                            locale)
+    journal_entries: dict[int, JournalEntryRow] = {}
+    rows: list[LineItemRow] = []
+    for x in result:
+        journal_entry: JournalEntryRow | None \
+            = journal_entries.get(x.journal_entry_id)
+        if journal_entry is None:
+            journal_entry = JournalEntryRow(x.journal_entry_id, x.date,
+                                            x.journal_entry_no, x.note,
+                                            x.is_archived)
+            journal_entries[x.journal_entry_id] = journal_entry
+        rows.append(LineItemRow(x.id, journal_entry,
+                                currencies[x.currency_code],
+                                accounts[x.account_id], x.is_debit, x.no,
+                                x.description, x.amount))
+    return rows
+
+
+def get_account_rows(ids: set[int], session: sa.orm.Session | None = None,
+                     locale: str | None = None) -> dict[int, AccountRow]:
+    """Returns the accounts with their titles in a locale.
+
+    :param ids: The account IDs.
+    :param session: The database session, or None for the current one.
+    :param locale: The locale of the titles, or None for the current locale.
+    :return: The accounts by their IDs.
+    """
+    if len(ids) == 0:
+        return {}
+    if locale is None:
+        locale = __get_l10n_locale()
+    if locale is None:
+        select: sa.Select = sa.select(Account.id, Account.base_code,
+                                      Account.no,
+                                      Account.title_l10n.label("title"),
+                                      Account.is_need_offset)
+    else:
+        select: sa.Select = sa.select(
+            Account.id, Account.base_code, Account.no,
+            sa.func.coalesce(AccountL10n.title,
+                             Account.title_l10n).label("title"),
+            Account.is_need_offset)\
+            .outerjoin(AccountL10n,
+                       sa.and_(AccountL10n.account_id == Account.id,
+                               AccountL10n.locale == locale))
+    select = select.filter(Account.id.in_(ids))
+    return {x.id: AccountRow(x.id, x.base_code, x.no, x.title,
+                             x.is_need_offset)
+            for x in (db.session if session is None else session)
+            .execute(select)}
+
+
+def get_currency_rows(codes: set[str],
+                      session: sa.orm.Session | None = None,
+                      locale: str | None = None) -> dict[str, CurrencyRow]:
+    """Returns the currencies with their names in a locale.
+
+    :param codes: The currency codes.
+    :param session: The database session, or None for the current one.
+    :param locale: The locale of the names, or None for the current locale.
+    :return: The currencies by their codes.
+    """
+    if len(codes) == 0:
+        return {}
+    if locale is None:
+        locale = __get_l10n_locale()
+    if locale is None:
+        select: sa.Select = sa.select(Currency.code,
+                                      Currency.name_l10n.label("name"))
+    else:
+        select: sa.Select = sa.select(
+            Currency.code,
+            sa.func.coalesce(CurrencyL10n.name,
+                             Currency.name_l10n).label("name"))\
+            .outerjoin(CurrencyL10n,
+                       sa.and_(CurrencyL10n.currency_code == Currency.code,
+                               CurrencyL10n.locale == locale))
+    select = select.filter(Currency.code.in_(codes))
+    return {x.code: CurrencyRow(x.code, x.name)
+            for x in (db.session if session is None else session)
+            .execute(select)}
+
+
+def __get_l10n_locale() -> str | None:
+    """Returns the locale of the localized titles to look up.
+
+    :return: The current locale, or None if the current locale is the default
+        locale and the titles are not localized.
+    """
+    current_locale: Locale = get_locale()
+    if current_locale == get_babel().instance.default_locale:
+        return None
+    return str(current_locale)
@@ -17,16 +17,20 @@
 """The forms for the unmatched offset management.
 
 """
+import datetime as dt
 from decimal import Decimal
 
 import sqlalchemy as sa
 from flask_babel import LazyString
 from sqlalchemy.orm import selectinload
 
+from accounting import db
 from accounting.locale import lazy_gettext
 from accounting.models import Currency, Account, JournalEntry, \
     JournalEntryLineItem
 from accounting.report.utils.unapplied import get_net_balances
+from accounting.utils.concurrency import touch
+from accounting.utils.period_close import get_closed_date
 
 
 class OffsetPair:
@@ -48,16 +52,21 @@ class OffsetPair:
 class OffsetMatcher:
     """The offset matcher."""
 
-    def __init__(self, currency: Currency, account: Account):
+    def __init__(self, currency: Currency, account: Account,
+                 session: sa.orm.Session | None = None):
         """Constructs the offset matcher.
 
         :param currency: The currency.
         :param account: The account.
+        :param session: The database session, or None for the current one.
         """
         self.__currency: Account = currency
         """The currency."""
         self.__account: Account = account
         """The account."""
+        self.__session: sa.orm.Session \
+            = db.session if session is None else session
+        """The database session."""
         self.matched_pairs: list[OffsetPair] = []
         """A list of matched pairs."""
         self.line_items: list[JournalEntryLineItem] = []
@@ -69,15 +78,24 @@ class OffsetMatcher:
         self.__find_matches()
 
     def __find_matches(self) -> None:
-        """Finds the matched original line items and their offsets.
+        """Finds the matched original line items and their offsets.  The line
+        items in the closed periods are not matched, since their journal
+        entries cannot be changed.
 
         :return: None.
         """
         self.__get_line_items()
         if len(self.unapplied) == 0 or len(self.unmatched) == 0:
             return
+        closed_date: dt.date | None = get_closed_date(self.__session)
+        originals: list[JournalEntryLineItem] = self.unapplied.copy()
         remains: list[JournalEntryLineItem] = self.unmatched.copy()
-        for original_item in self.unapplied:
+        if closed_date is not None:
+            originals = [x for x in originals
+                         if x.journal_entry.date > closed_date]
+            remains = [x for x in remains
+                       if x.journal_entry.date > closed_date]
+        for original_item in originals:
             offset_candidates: list[JournalEntryLineItem] \
                 = [x for x in remains
                    if (x.journal_entry.date > original_item.journal_entry.date
@@ -104,24 +122,27 @@ class OffsetMatcher:
             account.
         """
         net_balances: dict[int, Decimal | None] \
-            = get_net_balances(self.__currency, self.__account)
+            = get_net_balances(self.__currency, self.__account,
+                               self.__session)
         unmatched_offset_condition: sa.BinaryExpression \
             = sa.and_(Account.id == self.__account.id,
                       JournalEntryLineItem.currency_code
                       == self.__currency.code,
                       JournalEntryLineItem.original_line_item_id.is_(None),
-                      sa.or_(sa.and_(Account.base_code.startswith("2"),
+                      sa.or_(sa.and_(Account.account_class == 2,
                                      JournalEntryLineItem.is_debit),
-                             sa.and_(Account.base_code.startswith("1"),
+                             sa.and_(Account.account_class == 1,
                                      sa.not_(JournalEntryLineItem.is_debit))))
-        self.line_items = JournalEntryLineItem.query \
-            .join(Account).join(JournalEntry) \
+        self.line_items = list(self.__session.scalars(
+            sa.select(JournalEntryLineItem)
+            .join(Account).join(JournalEntry)
             .filter(sa.or_(JournalEntryLineItem.id.in_(net_balances),
-                           unmatched_offset_condition)) \
+                           unmatched_offset_condition))
             .order_by(JournalEntry.date, JournalEntry.no,
-                      JournalEntryLineItem.is_debit, JournalEntryLineItem.no) \
+                      JournalEntryLineItem.is_debit, JournalEntryLineItem.no)
             .options(selectinload(JournalEntryLineItem.currency),
-                     selectinload(JournalEntryLineItem.journal_entry)).all()
+                     selectinload(JournalEntryLineItem.journal_entry)))
+            .unique())
         for line_item in self.line_items:
             line_item.is_offset = line_item.id not in net_balances
         self.unapplied = [x for x in self.line_items if not x.is_offset]
@@ -170,9 +191,13 @@ class OffsetMatcher:
             total=len(self.unmatched))
 
     def match(self) -> None:
-        """Matches the original line items with offsets.
+        """Matches the original line items with offsets.  The journal entries
+        on both sides are marked as updated, so that a concurrent change to
+        any of them fails the commit instead of being overwritten.
 
         :return: None.
         """
         for pair in self.matched_pairs:
             pair.offset.original_line_item_id = pair.original_line_item.id
+            touch(pair.offset.journal_entry)
+            touch(pair.original_line_item.journal_entry)
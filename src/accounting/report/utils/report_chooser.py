@@ -32,6 +32,7 @@ from accounting.report.period import Period, get_period
 from accounting.template_globals import default_currency_code
 from accounting.utils.current_account import CurrentAccount
 from accounting.utils.permission import can_edit
+from .account_lookup import account_lookup
 from .option_link import OptionLink
 from .report_type import ReportType
 from .urls import journal_url, ledger_url, income_expenses_url, \
@@ -61,8 +62,9 @@ class ReportChooser:
             Currency, default_currency_code()) \
             if currency is None else currency
         """The currency."""
-        self.__account: Account = Account.cash() if account is None \
-            else account
+        self.__account: Account \
+            = account_lookup().get_account_by_code(Account.CASH_CODE) \
+            if account is None else account
         """The currency."""
         self.__reports: list[OptionLink] = []
         """The links to the reports."""
@@ -93,7 +95,7 @@ class ReportChooser:
         """
         account: Account = self.__account
         if not re.match(r"[12][12]", account.base_code):
-            account: Account = Account.cash()
+            account = account_lookup().get_account_by_code(Account.CASH_CODE)
         return OptionLink(gettext("Income and Expenses Log"),
                           income_expenses_url(self.__currency,
                                               CurrentAccount(account),
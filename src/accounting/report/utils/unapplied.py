@@ -48,9 +48,9 @@ def get_accounts_with_unapplied(currency: Currency) -> list[Account]:
               isouter=True)\
         .filter(Account.is_need_offset,
                 JournalEntryLineItem.currency_code == currency.code,
-                sa.or_(sa.and_(Account.base_code.startswith("2"),
+                sa.or_(sa.and_(Account.account_class == 2,
                                sa.not_(JournalEntryLineItem.is_debit)),
-                       sa.and_(Account.base_code.startswith("1"),
+                       sa.and_(Account.account_class == 1,
                                JournalEntryLineItem.is_debit)))\
         .group_by(JournalEntryLineItem.id)\
         .having(sa.or_(sa.func.count(offset.c.id) == 0, net_balance != 0))
@@ -71,12 +71,14 @@ def get_accounts_with_unapplied(currency: Currency) -> list[Account]:
     return accounts
 
 
-def get_net_balances(currency: Currency, account: Account) \
+def get_net_balances(currency: Currency, account: Account,
+                     session: sa.orm.Session | None = None) \
         -> dict[int, Decimal | None]:
     """Returns the net balances of the unapplied line items of the account.
 
     :param currency: The currency.
     :param account: The account.
+    :param session: The database session, or None for the current one.
     :return: The net balances of the unapplied line items of the account.
     """
     offset: sa.Alias = offset_alias()
@@ -94,11 +96,12 @@ def get_net_balances(currency: Currency, account: Account) \
               isouter=True) \
         .filter(Account.id == account.id,
                 JournalEntryLineItem.currency_code == currency.code,
-                sa.or_(sa.and_(Account.base_code.startswith("2"),
+                sa.or_(sa.and_(Account.account_class == 2,
                                sa.not_(JournalEntryLineItem.is_debit)),
-                       sa.and_(Account.base_code.startswith("1"),
+                       sa.and_(Account.account_class == 1,
                                JournalEntryLineItem.is_debit))) \
         .group_by(JournalEntryLineItem.id) \
         .having(sa.or_(sa.func.count(offset.c.id) == 0, net_balance != 0))
     return {x.id: x.net_balance
-            for x in db.session.execute(select_net_balances).all()}
+            for x in (db.session if session is None else session)
+            .execute(select_net_balances).all()}
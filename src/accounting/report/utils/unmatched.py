@@ -39,9 +39,9 @@ def get_accounts_with_unmatched(currency: Currency) -> list[Account]:
         .filter(Account.is_need_offset,
                 JournalEntryLineItem.currency_code == currency.code,
                 JournalEntryLineItem.original_line_item_id.is_(None),
-                sa.or_(sa.and_(Account.base_code.startswith("2"),
+                sa.or_(sa.and_(Account.account_class == 2,
                                JournalEntryLineItem.is_debit),
-                       sa.and_(Account.base_code.startswith("1"),
+                       sa.and_(Account.account_class == 1,
                                sa.not_(JournalEntryLineItem.is_debit))))\
         .group_by(Account.id)\
         .having(count_func > 0)
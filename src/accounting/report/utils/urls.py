@@ -20,10 +20,11 @@
 from flask import url_for
 
 from accounting.models import Currency, Account
-from accounting.report.period import Period
+from accounting.report.period import Period, ComparativePeriod
 from accounting.template_globals import default_currency_code
 from accounting.utils.current_account import CurrentAccount
 from accounting.utils.options import options
+from .report_type import ReportType
 
 
 def journal_url(period: Period) \
@@ -113,6 +114,20 @@ def balance_sheet_url(currency: Currency, period: Period) -> str:
                    currency=currency, period=period)
 
 
+def comparative_url(report_type: ReportType, currency: Currency,
+                    period: ComparativePeriod) -> str:
+    """Returns the URL of a comparative statement.
+
+    :param report_type: The report type, either the trial balance, the income
+        statement, or the balance sheet.
+    :param currency: The currency.
+    :param period: The comparative period.
+    :return: The URL of the comparative statement.
+    """
+    return url_for(f"accounting-report.{report_type.value}-comparative",
+                   currency=currency, period=period)
+
+
 def unapplied_url(currency: Currency, account: Account | None) -> str:
     """Returns the URL of the unapplied original line items.
 
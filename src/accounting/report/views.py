@@ -17,26 +17,27 @@
 """The views for the report management.
 
 """
-from flask import Blueprint, request, Response, redirect, flash
+from tempfile import TemporaryFile
+
+from flask import Blueprint, request, Response, redirect, flash, \
+    current_app, send_file
 
 from accounting import db
 from accounting.locale import lazy_gettext
 from accounting.models import Currency, Account
 from accounting.template_globals import default_currency_code
 from accounting.utils.cast import s
+from accounting.utils.concurrency import try_commit
 from accounting.utils.current_account import CurrentAccount
 from accounting.utils.next_uri import or_next
 from accounting.utils.options import options
-from accounting.utils.permission import has_permission, can_view, can_edit
-from .period import Period, get_period
-from .reports import Journal, Ledger, IncomeExpenses, TrialBalance, \
-    IncomeStatement, BalanceSheet, Search
-from .reports.unapplied import UnappliedOriginalLineItems
-from .reports.unapplied_accounts import AccountsWithUnappliedOriginalLineItems
-from .reports.unmatched import UnmatchedOffsets
-from .reports.unmatched_accounts import AccountsWithUnmatchedOffsets
+from accounting.utils.permission import has_permission, can_view, \
+    can_edit, can_admin
+from accounting.utils.read_routing import read_only
+from .period import Period, ComparativePeriod, get_period
 from .template_filters import format_amount
-from .utils.offset_matcher import OffsetMatcher
+from .utils.csv_export import ExportFormat
+from .utils.report_type import ReportType
 from .utils.urls import unmatched_url
 
 bp: Blueprint = Blueprint("accounting-report", __name__)
@@ -46,6 +47,7 @@ bp.add_app_template_filter(format_amount, "accounting_report_format_amount")
 
 @bp.get("", endpoint="default")
 @has_permission(can_view)
+@read_only
 def get_default_report() -> str | Response:
     """Returns the income and expenses log in the default period.
 
@@ -56,6 +58,7 @@ def get_default_report() -> str | Response:
 
 @bp.get("journal", endpoint="journal-default")
 @has_permission(can_view)
+@read_only
 def get_default_journal() -> str | Response:
     """Returns the journal in the default period.
 
@@ -66,6 +69,7 @@ def get_default_journal() -> str | Response:
 
 @bp.get("journal/<period:period>", endpoint="journal")
 @has_permission(can_view)
+@read_only
 def get_journal(period: Period) -> str | Response:
     """Returns the journal.
 
@@ -81,14 +85,17 @@ def __get_journal(period: Period) -> str | Response:
     :param period: The period.
     :return: The journal in the period.
     """
+    from .reports import Journal
     report: Journal = Journal(period)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
 @bp.get("ledger", endpoint="ledger-default")
 @has_permission(can_view)
+@read_only
 def get_default_ledger() -> str | Response:
     """Returns the ledger in the default currency, cash, and default period.
 
@@ -101,6 +108,7 @@ def get_default_ledger() -> str | Response:
 @bp.get("ledger/<currency:currency>/<account:account>/<period:period>",
         endpoint="ledger")
 @has_permission(can_view)
+@read_only
 def get_ledger(currency: Currency, account: Account, period: Period) \
         -> str | Response:
     """Returns the ledger.
@@ -122,14 +130,17 @@ def __get_ledger(currency: Currency, account: Account, period: Period) \
     :param period: The period.
     :return: The ledger in the period.
     """
+    from .reports import Ledger
     report: Ledger = Ledger(currency, account, period)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
 @bp.get("income-expenses", endpoint="income-expenses-default")
 @has_permission(can_view)
+@read_only
 def get_default_income_expenses() -> str | Response:
     """Returns the income and expenses log in the default period.
 
@@ -144,6 +155,7 @@ def get_default_income_expenses() -> str | Response:
 @bp.get("income-expenses/<currency:currency>/<currentAccount:account>/"
         "<period:period>", endpoint="income-expenses")
 @has_permission(can_view)
+@read_only
 def get_income_expenses(currency: Currency, account: CurrentAccount,
                         period: Period) -> str | Response:
     """Returns the income and expenses log.
@@ -165,14 +177,17 @@ def __get_income_expenses(currency: Currency, account: CurrentAccount,
     :param period: The period.
     :return: The income and expenses log in the period.
     """
+    from .reports import IncomeExpenses
     report: IncomeExpenses = IncomeExpenses(currency, account, period)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
 @bp.get("trial-balance", endpoint="trial-balance-default")
 @has_permission(can_view)
+@read_only
 def get_default_trial_balance() -> str | Response:
     """Returns the trial balance in the default period.
 
@@ -185,6 +200,7 @@ def get_default_trial_balance() -> str | Response:
 @bp.get("trial-balance/<currency:currency>/<period:period>",
         endpoint="trial-balance")
 @has_permission(can_view)
+@read_only
 def get_trial_balance(currency: Currency, period: Period) -> str | Response:
     """Returns the trial balance.
 
@@ -202,14 +218,34 @@ def __get_trial_balance(currency: Currency, period: Period) -> str | Response:
     :param period: The period.
     :return: The trial balance in the period.
     """
+    from .reports import TrialBalance
     report: TrialBalance = TrialBalance(currency, period)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
+@bp.get("trial-balance/<currency:currency>/compare/"
+        "<comparativePeriod:period>", endpoint="trial-balance-comparative")
+@has_permission(can_view)
+@read_only
+def get_comparative_trial_balance(currency: Currency,
+                                  period: ComparativePeriod) \
+        -> str | Response:
+    """Returns the comparative trial balance.
+
+    :param currency: The currency.
+    :param period: The comparative period.
+    :return: The comparative trial balance.
+    """
+    return __get_comparative_statement(ReportType.TRIAL_BALANCE, currency,
+                                       period)
+
+
 @bp.get("income-statement", endpoint="income-statement-default")
 @has_permission(can_view)
+@read_only
 def get_default_income_statement() -> str | Response:
     """Returns the income statement in the default period.
 
@@ -222,6 +258,7 @@ def get_default_income_statement() -> str | Response:
 @bp.get("income-statement/<currency:currency>/<period:period>",
         endpoint="income-statement")
 @has_permission(can_view)
+@read_only
 def get_income_statement(currency: Currency, period: Period) -> str | Response:
     """Returns the income statement.
 
@@ -240,14 +277,34 @@ def __get_income_statement(currency: Currency, period: Period) \
     :param period: The period.
     :return: The income statement in the period.
     """
+    from .reports import IncomeStatement
     report: IncomeStatement = IncomeStatement(currency, period)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
+@bp.get("income-statement/<currency:currency>/compare/"
+        "<comparativePeriod:period>", endpoint="income-statement-comparative")
+@has_permission(can_view)
+@read_only
+def get_comparative_income_statement(currency: Currency,
+                                     period: ComparativePeriod) \
+        -> str | Response:
+    """Returns the comparative income statement.
+
+    :param currency: The currency.
+    :param period: The comparative period.
+    :return: The comparative income statement.
+    """
+    return __get_comparative_statement(ReportType.INCOME_STATEMENT, currency,
+                                       period)
+
+
 @bp.get("balance-sheet", endpoint="balance-sheet-default")
 @has_permission(can_view)
+@read_only
 def get_default_balance_sheet() -> str | Response:
     """Returns the balance sheet in the default period.
 
@@ -260,6 +317,7 @@ def get_default_balance_sheet() -> str | Response:
 @bp.get("balance-sheet/<currency:currency>/<period:period>",
         endpoint="balance-sheet")
 @has_permission(can_view)
+@read_only
 def get_balance_sheet(currency: Currency, period: Period) \
         -> str | Response:
     """Returns the balance sheet.
@@ -279,14 +337,52 @@ def __get_balance_sheet(currency: Currency, period: Period) \
     :param period: The period.
     :return: The balance sheet in the period.
     """
+    from .reports import BalanceSheet
     report: BalanceSheet = BalanceSheet(currency, period)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
+    return report.html()
+
+
+@bp.get("balance-sheet/<currency:currency>/compare/"
+        "<comparativePeriod:period>", endpoint="balance-sheet-comparative")
+@has_permission(can_view)
+@read_only
+def get_comparative_balance_sheet(currency: Currency,
+                                  period: ComparativePeriod) \
+        -> str | Response:
+    """Returns the comparative balance sheet.
+
+    :param currency: The currency.
+    :param period: The comparative period.
+    :return: The comparative balance sheet.
+    """
+    return __get_comparative_statement(ReportType.BALANCE_SHEET, currency,
+                                       period)
+
+
+def __get_comparative_statement(report_type: ReportType, currency: Currency,
+                                period: ComparativePeriod) -> str | Response:
+    """Returns a comparative statement.
+
+    :param report_type: The report type.
+    :param currency: The currency.
+    :param period: The comparative period.
+    :return: The comparative statement.
+    """
+    from .reports import ComparativeStatement
+    report: ComparativeStatement \
+        = ComparativeStatement(report_type, currency, period)
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
 @bp.get("unapplied", endpoint="unapplied-accounts-default")
 @has_permission(can_view)
+@read_only
 def get_default_unapplied_accounts() -> str | Response:
     """Returns the accounts with unapplied original line items.
 
@@ -298,6 +394,7 @@ def get_default_unapplied_accounts() -> str | Response:
 
 @bp.get("unapplied/<currency:currency>", endpoint="unapplied-accounts")
 @has_permission(can_view)
+@read_only
 def get_unapplied_accounts(currency: Currency) -> str | Response:
     """Returns the accounts with unapplied original line items.
 
@@ -313,16 +410,20 @@ def __get_unapplied_accounts(currency: Currency) -> str | Response:
     :param currency: The currency.
     :return: The accounts with unapplied original line items.
     """
+    from .reports.unapplied_accounts import \
+        AccountsWithUnappliedOriginalLineItems
     report: AccountsWithUnappliedOriginalLineItems \
         = AccountsWithUnappliedOriginalLineItems(currency)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
 @bp.get("unapplied/<currency:currency>/<needOffsetAccount:account>",
         endpoint="unapplied")
 @has_permission(can_view)
+@read_only
 def get_unapplied(currency: Currency, account: Account) -> str | Response:
     """Returns the unapplied original line items.
 
@@ -330,15 +431,18 @@ def get_unapplied(currency: Currency, account: Account) -> str | Response:
     :param account: The Account.
     :return: The unapplied original line items in the period.
     """
+    from .reports.unapplied import UnappliedOriginalLineItems
     report: UnappliedOriginalLineItems \
         = UnappliedOriginalLineItems(currency, account)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
 @bp.get("unmatched", endpoint="unmatched-accounts-default")
 @has_permission(can_edit)
+@read_only
 def get_default_unmatched_accounts() -> str | Response:
     """Returns the accounts with unmatched offsets.
 
@@ -350,6 +454,7 @@ def get_default_unmatched_accounts() -> str | Response:
 
 @bp.get("unmatched/<currency:currency>", endpoint="unmatched-accounts")
 @has_permission(can_edit)
+@read_only
 def get_unmatched_accounts(currency: Currency) -> str | Response:
     """Returns the accounts with unmatched offsets.
 
@@ -365,16 +470,19 @@ def __get_unmatched_accounts(currency: Currency) -> str | Response:
     :param currency: The currency.
     :return: The accounts with unmatched offsets.
     """
+    from .reports.unmatched_accounts import AccountsWithUnmatchedOffsets
     report: AccountsWithUnmatchedOffsets \
         = AccountsWithUnmatchedOffsets(currency)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
 @bp.get("unmatched/<currency:currency>/<needOffsetAccount:account>",
         endpoint="unmatched")
 @has_permission(can_edit)
+@read_only
 def get_unmatched(currency: Currency, account: Account) -> str | Response:
     """Returns the unmatched offsets.
 
@@ -382,9 +490,11 @@ def get_unmatched(currency: Currency, account: Account) -> str | Response:
     :param account: The Account.
     :return: The unmatched offsets in the period.
     """
+    from .reports.unmatched import UnmatchedOffsets
     report: UnmatchedOffsets = UnmatchedOffsets(currency, account)
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
 
 
@@ -396,6 +506,7 @@ def match_offsets(currency: Currency, account: Account) -> redirect:
 
     :return: Redirection to the view of the unmatched offsets.
     """
+    from .utils.offset_matcher import OffsetMatcher
     matcher: OffsetMatcher = OffsetMatcher(currency, account)
     if len(matcher.matched_pairs) == 0:
         flash(s(lazy_gettext("No more offset to match automatically.")),
@@ -403,7 +514,10 @@ def match_offsets(currency: Currency, account: Account) -> redirect:
         return redirect(or_next(
             unmatched_url(currency, account)))
     matcher.match()
-    db.session.commit()
+    if not try_commit():
+        flash(s(lazy_gettext("The offsets were changed by someone else."
+                             "  Please try again.")), "error")
+        return redirect(or_next(unmatched_url(currency, account)))
     flash(s(lazy_gettext("Matched %(matches)s offsets.",
                          matches=len(matcher.matched_pairs))), "success")
     return redirect(or_next(unmatched_url(currency, account)))
@@ -411,12 +525,67 @@ def match_offsets(currency: Currency, account: Account) -> redirect:
 
 @bp.get("search", endpoint="search")
 @has_permission(can_view)
+@read_only
 def search() -> str | Response:
     """Returns the search result.
 
     :return: The search result.
     """
+    from .reports import Search
     report: Search = Search()
-    if "as" in request.args and request.args["as"] == "csv":
-        return report.csv()
+    export_format: ExportFormat | None = __get_export_format()
+    if export_format is not None:
+        return report.csv(export_format)
     return report.html()
+
+
+@bp.get("export", endpoint="export-default")
+@has_permission(can_admin)
+@read_only
+def export_default_reports() -> Response:
+    """Exports all the reports of last year into a ZIP file.
+
+    :return: The ZIP file of all the reports of last year.
+    """
+    return __export_reports(get_period("last-year"))
+
+
+@bp.get("export/<period:period>", endpoint="export")
+@has_permission(can_admin)
+@read_only
+def export_reports(period: Period) -> Response:
+    """Exports all the reports in a period into a ZIP file.
+
+    :param period: The period.
+    :return: The ZIP file of all the reports in the period.
+    """
+    return __export_reports(period)
+
+
+def __export_reports(period: Period) -> Response:
+    """Exports all the reports in a period into a ZIP file.  The reports are
+    exported in the current process, unless the ACCOUNTING_EXPORT_WORKERS
+    configuration is set.
+
+    :param period: The period.
+    :return: The ZIP file of all the reports in the period.
+    """
+    from .bundle import ReportBundle
+    fp = TemporaryFile()
+    ReportBundle(period).write(
+        fp, current_app.config.get("ACCOUNTING_EXPORT_WORKERS", 1))
+    fp.seek(0)
+    return send_file(fp, mimetype="application/zip", as_attachment=True,
+                     download_name=f"reports-{period.spec}.zip")
+
+
+def __get_export_format() -> ExportFormat | None:
+    """Returns the export format requested in the "as" query parameter.
+
+    :return: The export format, or None if the report is not requested as
+        a download.
+    """
+    try:
+        return ExportFormat(request.args["as"])
+    except (KeyError, ValueError):
+        return None
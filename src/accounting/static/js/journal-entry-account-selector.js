@@ -40,6 +40,12 @@ class JournalEntryAccountSelector {
      */
     #debitCredit;
 
+    /**
+     * The URL to look up the accounts
+     * @type {string}
+     */
+    #url;
+
     /**
      * The button to clear the account
      * @type {HTMLButtonElement}
@@ -68,7 +74,7 @@ class JournalEntryAccountSelector {
      * The options
      * @type {JournalEntryAccountOption[]}
      */
-    #options;
+    #options = [];
 
     /**
      * The more item to show all accounts
@@ -82,6 +88,18 @@ class JournalEntryAccountSelector {
      */
     #isShowMore = false;
 
+    /**
+     * The looked-up accounts, by the lookup URL
+     * @type {Map<string, Promise<{accounts: {code: string, title: string, text: string, is_in_use: boolean, is_need_offset: boolean}[], has_more: boolean}>>}
+     */
+    #cache = new Map();
+
+    /**
+     * The sequence number of the latest lookup, to discard the results of the earlier lookups
+     * @type {number}
+     */
+    #lookupNo = 0;
+
     /**
      * Constructs an account selector.
      *
@@ -92,10 +110,10 @@ class JournalEntryAccountSelector {
         this.lineItemEditor = lineItemEditor
         this.#debitCredit = debitCredit;
         const prefix = `accounting-account-selector-${debitCredit}`;
+        this.#url = document.getElementById(`${prefix}-modal`).dataset.url;
         this.#query = document.getElementById(`${prefix}-query`);
         this.#queryNoResult = document.getElementById(`${prefix}-option-no-result`);
         this.#optionList = document.getElementById(`${prefix}-option-list`);
-        this.#options = Array.from(document.getElementsByClassName(`${prefix}-option`)).map((element) => new JournalEntryAccountOption(this, element));
         this.#more = document.getElementById(`${prefix}-more`);
         this.#clearButton = document.getElementById(`${prefix}-btn-clear`);
 
@@ -112,18 +130,31 @@ class JournalEntryAccountSelector {
      * Filters the options.
      *
      */
-    #filterOptions() {
-        const codesInUse = this.#getCodesUsedInForm();
-        let isAnyMatched = false;
-        for (const option of this.#options) {
-            if (option.isMatched(this.#isShowMore, codesInUse, this.#query.value)) {
-                option.setShown(true);
-                isAnyMatched = true;
-            } else {
-                option.setShown(false);
+    async #filterOptions() {
+        const lookupNo = ++this.#lookupNo;
+        const query = this.#query.value.trim();
+        const result = await this.#lookup(query);
+        if (lookupNo !== this.#lookupNo) {
+            return;
+        }
+        const accounts = [];
+        const codes = new Set();
+        for (const account of this.#getAccountsUsedInForm()) {
+            if (!codes.has(account.code) && (query === "" || account.text.toLowerCase().includes(query.toLowerCase()))) {
+                accounts.push({code: account.code, title: account.title, text: account.text, is_need_offset: account.isNeedOffset});
+                codes.add(account.code);
             }
         }
-        if (!isAnyMatched && this.#isShowMore) {
+        accounts.push(...result.accounts.filter((account) => !codes.has(account.code)));
+        for (const option of this.#options) {
+            option.remove();
+        }
+        this.#options = accounts.map((account) => new JournalEntryAccountOption(this, account));
+        for (const option of this.#options) {
+            option.setActive(this.lineItemEditor.account !== null && option.code === this.lineItemEditor.account.code);
+            this.#optionList.insertBefore(option.element, this.#more);
+        }
+        if (this.#options.length === 0 && this.#isShowMore) {
             this.#optionList.classList.add("d-none");
             this.#queryNoResult.classList.remove("d-none");
         } else {
@@ -133,14 +164,37 @@ class JournalEntryAccountSelector {
     }
 
     /**
-     * Returns the account codes that are used in the form.
+     * Looks up the accounts on the server.  The results are cached.
      *
-     * @return {string[]} the account codes that are used in the form
+     * @param query {string} the query term
+     * @return {Promise<{accounts: {code: string, title: string, text: string, is_in_use: boolean, is_need_offset: boolean}[], has_more: boolean}>} the matched accounts
      */
-    #getCodesUsedInForm() {
-        const inUse = this.lineItemEditor.form.getAccountCodesUsed(this.#debitCredit);
+    #lookup(query) {
+        const params = new URLSearchParams();
+        if (query !== "") {
+            params.set("q", query);
+        }
+        if (this.#isShowMore) {
+            params.set("all", "1");
+        }
+        const url = `${this.#url}?${params.toString()}`;
+        if (!this.#cache.has(url)) {
+            const result = fetch(url).then((response) => response.json());
+            result.catch(() => this.#cache.delete(url));
+            this.#cache.set(url, result);
+        }
+        return this.#cache.get(url);
+    }
+
+    /**
+     * Returns the accounts that are used in the form.
+     *
+     * @return {JournalEntryAccount[]} the accounts that are used in the form
+     */
+    #getAccountsUsedInForm() {
+        const inUse = this.lineItemEditor.form.getAccountsUsed(this.#debitCredit);
         if (this.lineItemEditor.account !== null) {
-            inUse.push(this.lineItemEditor.account.code);
+            inUse.push(this.lineItemEditor.account);
         }
         return inUse
     }
@@ -154,9 +208,6 @@ class JournalEntryAccountSelector {
         this.#isShowMore = false;
         this.#more.classList.remove("d-none");
         this.#filterOptions();
-        for (const option of this.#options) {
-            option.setActive(this.lineItemEditor.account !== null && option.code === this.lineItemEditor.account.code);
-        }
         if (this.lineItemEditor.account === null) {
             this.#clearButton.classList.add("btn-secondary");
             this.#clearButton.classList.remove("btn-danger");
@@ -194,7 +245,7 @@ class JournalEntryAccountOption {
      * The element
      * @type {HTMLLIElement}
      */
-    #element;
+    element;
 
     /**
      * The account code
@@ -214,94 +265,37 @@ class JournalEntryAccountOption {
      */
     text;
 
-    /**
-     * Whether the account is in use
-     * @type {boolean}
-     */
-    #isInUse;
-
     /**
      * Whether line items in the account need offset
      * @type {boolean}
      */
     isNeedOffset;
 
-    /**
-     * The values to query against
-     * @type {string[]}
-     */
-    #queryValues;
-
     /**
      * Constructs the account in the account selector.
      *
      * @param selector {JournalEntryAccountSelector} the account selector
-     * @param element {HTMLLIElement} the element
+     * @param account {{code: string, title: string, text: string, is_need_offset: boolean}} the account
      */
-    constructor(selector, element) {
-        this.#element = element;
-        this.code = element.dataset.code;
-        this.title = element.dataset.title;
-        this.text = element.dataset.text;
-        this.#isInUse = element.classList.contains("accounting-account-is-in-use");
-        this.isNeedOffset = element.classList.contains("accounting-account-is-need-offset");
-        this.#queryValues = JSON.parse(element.dataset.queryValues);
-
-        this.#element.onclick = () => selector.lineItemEditor.saveAccount(this);
+    constructor(selector, account) {
+        this.code = account.code;
+        this.title = account.title;
+        this.text = account.text;
+        this.isNeedOffset = account.is_need_offset;
+        this.element = document.createElement("li");
+        this.element.className = "list-group-item accounting-clickable";
+        this.element.innerText = account.text;
+        this.element.dataset.bsToggle = "modal";
+        this.element.dataset.bsTarget = "#accounting-line-item-editor-modal";
+        this.element.onclick = () => selector.lineItemEditor.saveAccount(this);
     }
 
     /**
-     * Returns whether the account matches the query.
+     * Removes the option from the option list.
      *
-     * @param isShowMore {boolean} true to show all accounts, or false to show only those in use
-     * @param codesInUse {string[]} the account codes that are used in the form
-     * @param query {string} the query term
-     * @return {boolean} true if the option matches, or false otherwise
      */
-    isMatched(isShowMore, codesInUse, query) {
-        return this.#isInUseMatched(isShowMore, codesInUse) && this.#isQueryMatched(query);
-    }
-
-    /**
-     * Returns whether the account matches the "in-use" condition.
-     *
-     * @param isShowMore {boolean} true to show all accounts, or false to show only those in use
-     * @param codesInUse {string[]} the account codes that are used in the form
-     * @return {boolean} true if the option matches, or false otherwise
-     */
-    #isInUseMatched(isShowMore, codesInUse) {
-        return isShowMore || this.#isInUse || codesInUse.includes(this.code);
-    }
-
-    /**
-     * Returns whether the account matches the query term.
-     *
-     * @param query {string} the query term
-     * @return {boolean} true if the option matches, or false otherwise
-     */
-    #isQueryMatched(query) {
-        if (query === "") {
-            return true;
-        }
-        for (const queryValue of this.#queryValues) {
-            if (queryValue.toLowerCase().includes(query.toLowerCase())) {
-                return true;
-            }
-        }
-        return false;
-    }
-
-    /**
-     * Sets whether the option is shown.
-     *
-     * @param isShown {boolean} true to show, or false otherwise
-     */
-    setShown(isShown) {
-        if (isShown) {
-            this.#element.classList.remove("d-none");
-        } else {
-            this.#element.classList.add("d-none");
-        }
+    remove() {
+        this.element.remove();
     }
 
     /**
@@ -311,9 +305,9 @@ class JournalEntryAccountOption {
      */
     setActive(isActive) {
         if (isActive) {
-            this.#element.classList.add("active");
+            this.element.classList.add("active");
         } else {
-            this.#element.classList.remove("active");
+            this.element.classList.remove("active");
         }
     }
 }
@@ -201,14 +201,14 @@ class JournalEntryForm {
     }
 
     /**
-     * Returns the account codes used in the form.
+     * Returns the accounts used in the form.
      *
      * @param debitCredit {string} either "debit" or "credit"
-     * @return {string[]} the account codes used in the form
+     * @return {JournalEntryAccount[]} the accounts used in the form
      */
-    getAccountCodesUsed(debitCredit) {
+    getAccountsUsed(debitCredit) {
         return this.getLineItems(debitCredit).filter((lineItem) => lineItem.account !== null)
-            .map((lineItem) => lineItem.account.code);
+            .map((lineItem) => lineItem.account);
     }
 
     /**
@@ -534,22 +534,27 @@ class JournalEntryLineItemEditor {
         }
         this.#accountText.innerText = this.account.text;
         this.#amountInput.value = lineItem.amount === null? "": String(lineItem.amount);
-        const maxAmount = this.#getMaxAmount();
-        this.#amountInput.max = maxAmount === null? "": maxAmount;
+        this.#amountInput.max = "";
         this.#amountInput.min = lineItem.amountMin === null? "": String(lineItem.amountMin);
         this.#validate();
+        this.#getMaxAmount().then((maxAmount) => {
+            if (maxAmount !== null && this.lineItem === lineItem) {
+                this.#amountInput.max = String(maxAmount);
+                this.#validateAmount();
+            }
+        });
     }
 
     /**
      * Finds out the max amount.
      *
-     * @return {Decimal|null} the max amount
+     * @return {Promise<Decimal|null>} the max amount
      */
-    #getMaxAmount() {
+    async #getMaxAmount() {
         if (this.originalLineItemId === null) {
             return null;
         }
-        return this.originalLineItemSelector.getNetBalance(this.lineItem, this.form, this.originalLineItemId);
+        return await this.originalLineItemSelector.getNetBalance(this.lineItem, this.form, this.originalLineItemId);
     }
 
     /**
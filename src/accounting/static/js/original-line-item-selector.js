@@ -40,6 +40,18 @@ class OriginalLineItemSelector {
      */
     #prefix = "accounting-original-line-item-selector";
 
+    /**
+     * The URLs to look up the original line items, by the side of the line item to offset them
+     * @type {{debit: string, credit: string}}
+     */
+    #urls;
+
+    /**
+     * The ID of the existing line items on the form
+     * @type {number[]}
+     */
+    #lineItemIdOnForm;
+
     /**
      * The query input
      * @type {HTMLInputElement}
@@ -59,16 +71,46 @@ class OriginalLineItemSelector {
     #optionList;
 
     /**
-     * The options
+     * The options in the loaded pages
      * @type {OriginalLineItem[]}
      */
-    #options;
+    #options = [];
+
+    /**
+     * The net balances of the looked-up original line items, without the offset amounts on the form, by their ID
+     * @type {Object.<string, Decimal>}
+     */
+    #bareNetBalances = {};
+
+    /**
+     * The looked-up pages, by their URL
+     * @type {Map<string, Promise<{line_items: Object[], has_more: boolean}>>}
+     */
+    #cache = new Map();
+
+    /**
+     * The last loaded page
+     * @type {number}
+     */
+    #page = 0;
+
+    /**
+     * Whether there are more pages to load
+     * @type {boolean}
+     */
+    #hasMore = false;
+
+    /**
+     * Whether a page is loading
+     * @type {boolean}
+     */
+    #isLoading = false;
 
     /**
-     * The options by their ID
-     * @type {Object.<string, OriginalLineItem>}
+     * The sequence number of the current search, to discard the pages of the earlier searches
+     * @type {number}
      */
-    #optionById;
+    #searchNo = 0;
 
     /**
      * The currency code
@@ -88,15 +130,18 @@ class OriginalLineItemSelector {
      */
     constructor(lineItemEditor) {
         this.lineItemEditor = lineItemEditor;
+        const modal = document.getElementById(`${this.#prefix}-modal`);
+        this.#urls = {debit: modal.dataset.debitUrl, credit: modal.dataset.creditUrl};
+        this.#lineItemIdOnForm = JSON.parse(modal.dataset.lineItemIdOnForm);
         this.#query = document.getElementById(`${this.#prefix}-query`);
         this.#queryNoResult = document.getElementById(`${this.#prefix}-option-no-result`);
         this.#optionList = document.getElementById(`${this.#prefix}-option-list`);
-        this.#options = Array.from(document.getElementsByClassName(`${this.#prefix}-option`)).map((element) => new OriginalLineItem(this, element));
-        this.#optionById = {};
-        for (const option of this.#options) {
-            this.#optionById[option.id] = option;
-        }
-        this.#query.oninput = () => this.#filterOptions();
+        this.#query.oninput = () => this.#search();
+        this.#optionList.onscroll = () => {
+            if (this.#optionList.scrollTop + this.#optionList.clientHeight >= this.#optionList.scrollHeight - 50) {
+                this.#loadNextPage();
+            }
+        };
     }
 
     /**
@@ -105,9 +150,15 @@ class OriginalLineItemSelector {
      * @param currentLineItem {LineItemSubForm} the line item sub-form that is currently editing
      * @param form {JournalEntryForm} the journal entry form
      * @param originalLineItemId {string} the ID of the original line item
-     * @return {Decimal} the net balance of the original line item
+     * @return {Promise<Decimal|null>} the net balance of the original line item, or null if it is not available
      */
-    getNetBalance(currentLineItem, form, originalLineItemId) {
+    async getNetBalance(currentLineItem, form, originalLineItemId) {
+        if (!(originalLineItemId in this.#bareNetBalances)) {
+            await this.#lookup(this.#getUrl(this.lineItemEditor.debitCredit, {id: originalLineItemId}));
+        }
+        if (!(originalLineItemId in this.#bareNetBalances)) {
+            return null;
+        }
         const otherLineItems = form.getLineItems().filter((lineItem) => lineItem !== currentLineItem);
         let otherOffset = new Decimal(0);
         for (const otherLineItem of otherLineItems) {
@@ -118,14 +169,15 @@ class OriginalLineItemSelector {
                 }
             }
         }
-        return this.#optionById[originalLineItemId].bareNetBalance.minus(otherOffset);
+        return this.#bareNetBalances[originalLineItemId].minus(otherOffset);
     }
 
     /**
-     * Updates the net balances, subtracting the offset amounts on the form but the currently editing line item
+     * Returns the offset amounts on the form but the currently editing line item, by the original line item ID
      *
+     * @return {Object.<string, Decimal>} the offset amounts on the form, by the original line item ID
      */
-    #updateNetBalances() {
+    #getOtherOffsets() {
         const otherLineItems = this.lineItemEditor.form.getLineItems().filter((lineItem) => lineItem !== this.lineItemEditor.lineItem);
         const otherOffsets = {}
         for (const otherLineItem of otherLineItems) {
@@ -139,36 +191,106 @@ class OriginalLineItemSelector {
             }
             otherOffsets[otherOriginalLineItemId] = otherOffsets[otherOriginalLineItemId].plus(amount);
         }
-        for (const option of this.#options) {
-            if (option.id in otherOffsets) {
-                option.updateNetBalance(otherOffsets[option.id]);
-            } else {
-                option.resetNetBalance();
-            }
+        return otherOffsets;
+    }
+
+    /**
+     * Returns the URL to look up the original line items.
+     *
+     * @param debitCredit {string} either "debit" or "credit", the side of the line item to offset the original line items
+     * @param args {Object.<string, string|number>} the additional query arguments
+     * @return {string} the URL to look up the original line items
+     */
+    #getUrl(debitCredit, args) {
+        const params = new URLSearchParams();
+        for (const lineItemId of this.#lineItemIdOnForm) {
+            params.append("exclude", String(lineItemId));
+        }
+        for (const [key, value] of Object.entries(args)) {
+            params.set(key, String(value));
         }
+        return `${this.#urls[debitCredit]}?${params.toString()}`;
     }
 
     /**
-     * Filters the options.
+     * Looks up the original line items on the server.  The results are cached.
+     *
+     * @param url {string} the URL to look up the original line items
+     * @return {Promise<{line_items: Object[], has_more: boolean}>} the original line items in the page
+     */
+    async #lookup(url) {
+        if (!this.#cache.has(url)) {
+            const result = fetch(url).then((response) => response.json());
+            result.catch(() => this.#cache.delete(url));
+            this.#cache.set(url, result);
+        }
+        const result = await this.#cache.get(url);
+        for (const lineItem of result.line_items) {
+            this.#bareNetBalances[String(lineItem.id)] = new Decimal(lineItem.net_balance);
+        }
+        return result;
+    }
+
+    /**
+     * Starts a new search from the first page.
      *
      */
-    #filterOptions() {
-        let isAnyMatched = false;
+    #search() {
+        this.#searchNo++;
         for (const option of this.#options) {
-            if (option.isMatched(this.#debitCredit, this.#currencyCode, this.#query.value)) {
-                option.setShown(true);
-                isAnyMatched = true;
-            } else {
-                option.setShown(false);
+            option.remove();
+        }
+        this.#options = [];
+        this.#page = 0;
+        this.#hasMore = true;
+        this.#isLoading = false;
+        this.#loadNextPage();
+    }
+
+    /**
+     * Loads the next page of the original line items.
+     *
+     */
+    async #loadNextPage() {
+        if (this.#isLoading || !this.#hasMore) {
+            return;
+        }
+        const searchNo = this.#searchNo;
+        this.#isLoading = true;
+        const args = {currency: this.#currencyCode, date: this.lineItemEditor.form.date, page: this.#page + 1};
+        const query = this.#query.value.trim();
+        if (query !== "") {
+            args.q = query;
+        }
+        const result = await this.#lookup(this.#getUrl(this.#debitCredit, args));
+        if (searchNo !== this.#searchNo) {
+            return;
+        }
+        this.#page++;
+        this.#hasMore = result.has_more;
+        this.#isLoading = false;
+        const otherOffsets = this.#getOtherOffsets();
+        for (const lineItem of result.line_items) {
+            const option = new OriginalLineItem(this, lineItem);
+            if (option.id in otherOffsets) {
+                option.updateNetBalance(otherOffsets[option.id]);
+            }
+            if (option.netBalance.greaterThan(0)) {
+                option.setActive(option.id === this.lineItemEditor.originalLineItemId);
+                this.#optionList.appendChild(option.element);
+                this.#options.push(option);
             }
         }
-        if (!isAnyMatched) {
+        if (this.#options.length === 0 && !this.#hasMore) {
             this.#optionList.classList.add("d-none");
             this.#queryNoResult.classList.remove("d-none");
         } else {
             this.#optionList.classList.remove("d-none");
             this.#queryNoResult.classList.add("d-none");
         }
+        if (this.#optionList.scrollHeight <= this.#optionList.clientHeight) {
+            this.#loadNextPage();
+        }
     }
 
     /**
@@ -178,12 +300,8 @@ class OriginalLineItemSelector {
     onOpen() {
         this.#currencyCode = this.lineItemEditor.currencyCode;
         this.#debitCredit = this.lineItemEditor.debitCredit;
-        for (const option of this.#options) {
-            option.setActive(option.id === this.lineItemEditor.originalLineItemId);
-        }
         this.#query.value = "";
-        this.#updateNetBalances();
-        this.#filterOptions();
+        this.#search();
     }
 }
 
@@ -193,17 +311,11 @@ class OriginalLineItemSelector {
  */
 class OriginalLineItem {
 
-    /**
-     * The journal entry form
-     * @type {JournalEntryForm}
-     */
-    #form;
-
     /**
      * The element
      * @type {HTMLLIElement}
      */
-    #element;
+    element;
 
     /**
      * The ID
@@ -217,18 +329,6 @@ class OriginalLineItem {
      */
     date;
 
-    /**
-     * Either "debit" or "credit"
-     * @type {string}
-     */
-    #debitCredit;
-
-    /**
-     * The currency code
-     * @type {string}
-     */
-    #currencyCode;
-
     /**
      * The account
      * @type {JournalEntryAccount}
@@ -265,44 +365,42 @@ class OriginalLineItem {
      */
     text;
 
-    /**
-     * The values to query against
-     * @type {string[]}
-     */
-    #queryValues;
-
     /**
      * Constructs an original line item.
      *
      * @param selector {OriginalLineItemSelector} the original line item selector
-     * @param element {HTMLLIElement} the element
-     */
-    constructor(selector, element) {
-        this.#form = selector.lineItemEditor.form;
-        this.#element = element;
-        this.id = element.dataset.id;
-        this.date = element.dataset.date;
-        this.#debitCredit = element.dataset.debitCredit;
-        this.#currencyCode = element.dataset.currencyCode;
-        this.account = new JournalEntryAccount(element.dataset.accountCode, element.dataset.accountTitle, element.dataset.accountText, false);
-        this.description = element.dataset.description;
-        this.bareNetBalance = new Decimal(element.dataset.netBalance);
+     * @param lineItem {Object} the original line item from the server
+     */
+    constructor(selector, lineItem) {
+        this.id = String(lineItem.id);
+        this.date = lineItem.date;
+        this.account = new JournalEntryAccount(lineItem.account_code, lineItem.account_title, lineItem.account_text, false);
+        this.description = lineItem.description;
+        this.bareNetBalance = new Decimal(lineItem.net_balance);
         this.netBalance = this.bareNetBalance;
-        this.netBalanceText = document.getElementById(`accounting-original-line-item-selector-option-${this.id}-net-balance`);
-        this.text = element.dataset.text;
-        this.#queryValues = JSON.parse(element.dataset.queryValues);
-        this.#element.onclick = () => selector.lineItemEditor.saveOriginalLineItem(this);
-    }
-
-    /**
-     * Resets the net balance to its initial value, without the offset amounts on the form.
-     *
-     */
-    resetNetBalance() {
-        if (this.netBalance !== this.bareNetBalance) {
-            this.netBalance = this.bareNetBalance;
-            this.#updateNetBalanceText();
-        }
+        this.text = lineItem.text;
+
+        this.element = document.createElement("li");
+        this.element.className = "list-group-item d-flex justify-content-between accounting-clickable";
+        this.element.dataset.bsToggle = "modal";
+        this.element.dataset.bsTarget = "#accounting-line-item-editor-modal";
+        const content = document.createElement("div");
+        const header = document.createElement("div");
+        header.className = "small";
+        const code = document.createElement("span");
+        code.className = "d-none d-md-inline";
+        code.innerText = lineItem.account_code;
+        header.append(`${lineItem.date_text} `, code, ` ${lineItem.account_title}`);
+        content.append(header, lineItem.description);
+        const amount = document.createElement("div");
+        const badge = document.createElement("span");
+        badge.className = "badge bg-primary rounded-pill";
+        this.netBalanceText = document.createElement("span");
+        this.netBalanceText.innerText = lineItem.net_balance_text;
+        badge.append(this.netBalanceText, ` / ${lineItem.amount_text}`);
+        amount.append(badge);
+        this.element.append(content, amount);
+        this.element.onclick = () => selector.lineItemEditor.saveOriginalLineItem(this);
     }
 
     /**
@@ -312,86 +410,15 @@ class OriginalLineItem {
      */
     updateNetBalance(offset) {
         this.netBalance = this.bareNetBalance.minus(offset);
-        this.#updateNetBalanceText();
-    }
-
-    /**
-     * Updates the text display of the net balance.
-     *
-     */
-    #updateNetBalanceText() {
         this.netBalanceText.innerText = formatDecimal(this.netBalance);
     }
 
     /**
-     * Returns whether the original matches.
-     *
-     * @param debitCredit {string} either "debit" or "credit"
-     * @param currencyCode {string} the currency code
-     * @param query {string|null} the query term
-     */
-    isMatched(debitCredit, currencyCode, query = null) {
-        return this.netBalance.greaterThan(0)
-            && this.date <= this.#form.date
-            && this.#isDebitCreditMatched(debitCredit)
-            && this.#currencyCode === currencyCode
-            && this.#isQueryMatched(query);
-    }
-
-    /**
-     * Returns whether the original line item matches the debit or credit.
-     *
-     * @param debitCredit {string} either "debit" or credit
-     * @return {boolean} true if the option matches, or false otherwise
-     */
-    #isDebitCreditMatched(debitCredit) {
-        return (debitCredit === "debit" && this.#debitCredit === "credit")
-            || (debitCredit === "credit" && this.#debitCredit === "debit");
-    }
-
-    /**
-     * Returns whether the original line item matches the query term.
+     * Removes the option from the option list.
      *
-     * @param query {string|null} the query term
-     * @return {boolean} true if the option matches, or false otherwise
      */
-    #isQueryMatched(query) {
-        if (query === "") {
-            return true;
-        }
-        if (this.#getNetBalanceForQuery().includes(query.toLowerCase())) {
-            return true;
-        }
-        for (const queryValue of this.#queryValues) {
-            if (queryValue.toLowerCase().includes(query.toLowerCase())) {
-                return true;
-            }
-        }
-        return false;
-    }
-
-    /**
-     * Returns the net balance in the format for query match.
-     *
-     * @return {string} the net balance in the format for query match
-     */
-    #getNetBalanceForQuery() {
-        const frac = this.netBalance.modulo(1);
-        const whole = Number(this.netBalance.minus(frac));
-        return String(whole) + String(frac).substring(1);
-    }
-
-    /**
-     * Sets whether the option is shown.
-     *
-     * @param isShown {boolean} true to show, or false otherwise
-     */
-    setShown(isShown) {
-        if (isShown) {
-            this.#element.classList.remove("d-none");
-        } else {
-            this.#element.classList.add("d-none");
-        }
+    remove() {
+        this.element.remove();
     }
 
     /**
@@ -401,9 +428,9 @@ class OriginalLineItem {
      */
     setActive(isActive) {
         if (isActive) {
-            this.#element.classList.add("active");
+            this.element.classList.add("active");
         } else {
-            this.#element.classList.remove("active");
+            this.element.classList.remove("active");
         }
     }
 }
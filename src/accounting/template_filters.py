@@ -21,10 +21,9 @@ import datetime as dt
 from decimal import Decimal
 from typing import Any
 
-from flask_babel import get_locale
+from flask import has_request_context
 
-from accounting.locale import gettext
-from accounting.utils.timezone import get_tz_today
+from accounting.utils.format_context import amount_text, format_context
 
 
 def format_amount(value: Decimal | None) -> str | None:
@@ -35,11 +34,9 @@ def format_amount(value: Decimal | None) -> str | None:
     """
     if value is None:
         return None
-    if value == 0:
-        return "-"
-    whole: int = int(value)
-    frac: Decimal = (value - whole).normalize()
-    return "{:,}".format(whole) + str(abs(frac))[1:]
+    if not has_request_context():
+        return amount_text(value)
+    return format_context().format_amount(value)
 
 
 def format_date(value: dt.date) -> str:
@@ -48,28 +45,7 @@ def format_date(value: dt.date) -> str:
     :param value: The date.
     :return: The human-friendly date text.
     """
-    today: dt.date = get_tz_today()
-    if value == today:
-        return gettext("Today")
-    if value == today - dt.timedelta(days=1):
-        return gettext("Yesterday")
-    if value == today + dt.timedelta(days=1):
-        return gettext("Tomorrow")
-    locale = str(get_locale())
-    if locale == "zh" or locale.startswith("zh_"):
-        if value == today - dt.timedelta(days=2):
-            return gettext("The day before yesterday")
-        if value == today + dt.timedelta(days=2):
-            return gettext("The day after tomorrow")
-    if locale == "zh" or locale.startswith("zh_"):
-        weekdays = ["一", "二", "三", "四", "五", "六", "日"]
-        weekday = weekdays[value.weekday()]
-    else:
-        weekday = value.strftime("%a")
-    if value.year != today.year:
-        return "{}/{}/{}({})".format(
-            value.year, value.month, value.day, weekday)
-    return "{}/{}({})".format(value.month, value.day, weekday)
+    return format_context().format_date(value)
 
 
 def default(value: Any, default_value: Any = "") -> Any:
@@ -0,0 +1,218 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The archive of the closed fiscal years.
+
+The journal entries of the closed fiscal years can be moved into the archive
+tables by the "accounting-archive" console command, so that the live line item
+table only holds the open years.  The snapshot of the balances through the
+archived date is kept as the opening balances of the first open year.
+
+A journal entry stays live when its line items are not fully offset yet, or
+when it is linked by the offsets to a journal entry that stays live, so that
+an offset and its original line item are always in the same table.  The
+offset matcher and the unapplied and unmatched reports, which only look for
+the line items not fully offset, never need the archive.
+
+The reports and the search query the live tables only, unless they reach
+into the archived years, where the archive tables are unioned with the live
+tables.
+
+"""
+import datetime as dt
+from typing import Any
+
+import sqlalchemy as sa
+
+from accounting import db
+from accounting.change_log.capture import LOGGED, mark_changed
+from accounting.models import Account, ArchivedJournalEntry, \
+    ArchivedJournalEntryLineItem, JournalEntry, JournalEntryLineItem, \
+    PeriodClose
+
+
+def get_archived_date(session: sa.orm.Session | None = None) \
+        -> dt.date | None:
+    """Returns the date through which the journal entries are archived.
+
+    :param session: The database session, or None for the current one.
+    :return: The archived-through date, or None if nothing is archived.
+    """
+    return (db.session if session is None else session)\
+        .scalar(sa.select(sa.func.max(PeriodClose.date))
+                .filter(PeriodClose.is_archived))
+
+
+def is_archive_reached(start: dt.date | None,
+                       session: sa.orm.Session | None = None) -> bool:
+    """Returns whether a period starting from a date reaches into the
+    archived years.
+
+    :param start: The start of the period, or None from the beginning.
+    :param session: The database session, or None for the current one.
+    :return: True if the period reaches into the archived years, or False
+        otherwise.
+    """
+    archived_date: dt.date | None = get_archived_date(session)
+    return archived_date is not None \
+        and (start is None or start <= archived_date)
+
+
+def line_item_tables(start: dt.date | None,
+                     session: sa.orm.Session | None = None) \
+        -> tuple[Any, Any]:
+    """Returns the journal entry and the line item entities to query a period
+    from.  When the period reaches into the archived years, these are the
+    aliases of the live tables unioned with the archive tables.
+
+    :param start: The start of the period, or None from the beginning.
+    :param session: The database session, or None for the current one.
+    :return: The journal entry and the line item entities, or their aliases
+        with the archive.
+    """
+    if not is_archive_reached(start, session):
+        return JournalEntry, JournalEntryLineItem
+    return __with_archive(JournalEntry, ArchivedJournalEntry,
+                          "journal_entries"), \
+        __with_archive(JournalEntryLineItem, ArchivedJournalEntryLineItem,
+                       "journal_entry_line_items")
+
+
+def is_archived_column(journal_entry: Any) -> sa.ColumnElement[bool]:
+    """Returns the SQL column of whether a journal entry is archived.
+
+    :param journal_entry: The journal entry entity from line_item_tables().
+    :return: The SQL column of whether the journal entry is archived.
+    """
+    if journal_entry is JournalEntry:
+        return sa.literal(False, sa.Boolean)
+    return sa.inspect(journal_entry).selectable.c.is_archived
+
+
+def __with_archive(cls: Any, archive_cls: Any, name: str) -> Any:
+    """Returns the alias of a live table unioned with its archive table.
+
+    :param cls: The live model.
+    :param archive_cls: The archive model.
+    :param name: The name of the alias.
+    :return: The alias of the live table unioned with its archive table.
+    """
+    columns: list[str] = [x.name for x in cls.__table__.c]
+    union: sa.Subquery = sa.union_all(
+        sa.select(*[cls.__table__.c[x] for x in columns],
+                  sa.literal(False, sa.Boolean).label("is_archived")),
+        sa.select(*[archive_cls.__table__.c[x] for x in columns],
+                  sa.literal(True, sa.Boolean).label("is_archived")))\
+        .subquery(name)
+    return sa.orm.aliased(cls, union, adapt_on_names=True)
+
+
+def archive_through(date: dt.date, user_pk: int) -> int:
+    """Moves the journal entries through a date into the archive tables.  The
+    periods through the date must be closed.  The changes are not committed.
+
+    :param date: The date through which to archive.
+    :param user_pk: The primary key value of the user who archives.
+    :return: The number of the archived journal entries.
+    :raise ValueError: When the periods through the date are not closed.
+    """
+    from accounting.utils.period_close import add_period_close, \
+        get_closed_date
+    closed_date: dt.date | None = get_closed_date()
+    if closed_date is None or closed_date < date:
+        raise ValueError(f"The periods through {date} are not closed.")
+    period_close: PeriodClose | None = db.session.get(PeriodClose, date)
+    if period_close is None:
+        period_close = add_period_close(date, user_pk)
+    period_close.is_archived = True
+    kept: set[int] = __get_kept_journal_entries(date)
+    archived: sa.Select = sa.select(JournalEntry.id)\
+        .filter(JournalEntry.date <= date, JournalEntry.id.not_in(kept))
+    count: int = db.session.scalar(
+        sa.select(sa.func.count()).select_from(archived.subquery()))
+    if count == 0:
+        return 0
+    for cls, archive_cls, condition in [
+            (JournalEntry, ArchivedJournalEntry,
+             JournalEntry.id.in_(archived)),
+            (JournalEntryLineItem, ArchivedJournalEntryLineItem,
+             JournalEntryLineItem.journal_entry_id.in_(archived))]:
+        columns: list[str] = [x.name for x in cls.__table__.c]
+        db.session.execute(sa.insert(archive_cls).from_select(
+            columns, sa.select(*[cls.__table__.c[x] for x in columns])
+            .filter(condition)))
+    for delete in [sa.delete(JournalEntryLineItem).where(
+                       JournalEntryLineItem.journal_entry_id.in_(archived)),
+                   sa.delete(JournalEntry).where(
+                       JournalEntry.id.in_(archived))]:
+        db.session.execute(delete, execution_options={
+            "synchronize_session": False, LOGGED: False})
+    mark_changed(db.session)
+    return count
+
+
+def __get_kept_journal_entries(date: dt.date) -> set[int]:
+    """Returns the journal entries through a date that should stay live.
+    These are the journal entries with line items not fully offset yet, and
+    those linked by the offsets to them or to the later journal entries.
+
+    :param date: The date through which to archive.
+    :return: The IDs of the journal entries that should stay live.
+    """
+    offset: sa.Subquery = sa.select(
+        JournalEntryLineItem.original_line_item_id.label("id"),
+        sa.func.sum(JournalEntryLineItem.amount).label("amount"))\
+        .filter(JournalEntryLineItem.original_line_item_id.is_not(None))\
+        .group_by(JournalEntryLineItem.original_line_item_id).subquery()
+    select_unsettled: sa.Select \
+        = sa.select(JournalEntryLineItem.journal_entry_id)\
+        .join(JournalEntry).join(Account)\
+        .outerjoin(offset, JournalEntryLineItem.id == offset.c.id)\
+        .filter(JournalEntry.date <= date,
+                Account.is_need_offset,
+                JournalEntryLineItem.original_line_item_id.is_(None),
+                JournalEntryLineItem.amount
+                != sa.func.coalesce(offset.c.amount, 0))
+    kept: set[int] = set(db.session.scalars(select_unsettled))
+
+    original: sa.orm.util.AliasedClass = sa.orm.aliased(JournalEntryLineItem)
+    offset_entry: sa.orm.util.AliasedClass = sa.orm.aliased(JournalEntry)
+    original_entry: sa.orm.util.AliasedClass = sa.orm.aliased(JournalEntry)
+    select_links: sa.Select \
+        = sa.select(offset_entry.id.label("offset_id"),
+                    offset_entry.date.label("offset_date"),
+                    original_entry.id.label("original_id"),
+                    original_entry.date.label("original_date"))\
+        .select_from(JournalEntryLineItem)\
+        .join(offset_entry,
+              JournalEntryLineItem.journal_entry_id == offset_entry.id)\
+        .join(original,
+              JournalEntryLineItem.original_line_item_id == original.id)\
+        .join(original_entry, original.journal_entry_id == original_entry.id)\
+        .filter(original_entry.date <= date)
+    links: dict[int, set[int]] = {}
+    for row in db.session.execute(select_links):
+        if row.offset_date > date:
+            kept.add(row.original_id)
+        links.setdefault(row.offset_id, set()).add(row.original_id)
+        links.setdefault(row.original_id, set()).add(row.offset_id)
+    to_visit: list[int] = list(kept)
+    while len(to_visit) > 0:
+        for linked in links.get(to_visit.pop(), set()):
+            if linked not in kept:
+                kept.add(linked)
+                to_visit.append(linked)
+    return kept
@@ -0,0 +1,108 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The utilities for the optimistic concurrency control.
+
+The journal entries and the accounts carry a version that is increased on
+every update.  The updates are written only when the version in the database
+is still the version that was read, so that an update based on a stale copy
+fails instead of silently overwriting the newer data.
+
+The journal entries on the same date are numbered one transaction after
+another instead, by locking the numbering of the date first, so that they
+never take the same number, and the other journal entries on the date are
+not marked as changed.
+
+"""
+import datetime as dt
+from collections.abc import Iterable
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy.orm.exc import StaleDataError
+
+from accounting import db
+from accounting.models import JournalEntryNumbering
+
+
+def is_stale(obj: Any, version: int | None) -> bool:
+    """Returns whether the version that a form was based on is older than the
+    current version of the object.
+
+    :param obj: The journal entry or account.
+    :param version: The version submitted with the form, or None if the form
+        did not submit it.
+    :return: True if the form was based on a stale version, or False
+        otherwise.
+    """
+    return version is not None and version != obj.version
+
+
+def touch(obj: Any) -> None:
+    """Marks an object as updated, so that its version is increased and
+    checked on the next flush, even when only its line items are changed.
+
+    :param obj: The journal entry or account.
+    :return: None.
+    """
+    getattr(obj, "updated_at")
+    sa.orm.attributes.flag_modified(obj, "updated_at")
+
+
+def lock_numbering(dates: Iterable[dt.date]) -> None:
+    """Locks the numbering of the journal entries on the dates until the
+    transaction ends.  A concurrent transaction that numbers the journal
+    entries on the same date waits until this one ends, and then finds the
+    journal entries numbered by it.  The dates are locked in one statement,
+    and the missing ones are added in another, however many dates there are.
+
+    :param dates: The dates.
+    :return: None.
+    """
+    dates = sorted(set(dates))
+    if len(dates) == 0:
+        return
+    connection: sa.Connection = db.session.connection()
+    table: sa.Table = JournalEntryNumbering.__table__
+    connection.execute(sa.update(table)
+                       .where(table.c.date.in_(dates))
+                       .values(generation=table.c.generation + 1))
+    missing: set[dt.date] = set(dates) - set(connection.scalars(
+        sa.select(table.c.date).where(table.c.date.in_(dates))))
+    if len(missing) == 0:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(sa.insert(table),
+                               [{"date": x, "generation": 1}
+                                for x in sorted(missing)])
+    except sa.exc.IntegrityError:
+        # Another transaction added some of them first.
+        lock_numbering(missing)
+
+
+def try_commit() -> bool:
+    """Commits the current session.  The session is rolled back if any of the
+    updated objects was changed by another update in between.
+
+    :return: True if committed, or False if there was a conflict.
+    """
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return False
+    return True
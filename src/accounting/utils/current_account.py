@@ -80,14 +80,11 @@ class CurrentAccount:
         return accounts
 
     @classmethod
-    def sql_condition(cls) -> sa.BinaryExpression:
+    def sql_condition(cls) -> sa.ColumnElement[bool]:
         """Returns the SQL condition for the current assets and liabilities
         accounts.
 
         :return: The SQL condition for the current assets and liabilities
             accounts.
         """
-        return sa.or_(Account.base_code.startswith("11"),
-                      Account.base_code.startswith("12"),
-                      Account.base_code.startswith("21"),
-                      Account.base_code.startswith("22"))
+        return Account.is_current
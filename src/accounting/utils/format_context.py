@@ -0,0 +1,140 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The request-scoped formatting context.
+
+A report renders hundreds of dates and amounts.  Today in the client
+timezone, the locale, and the translated labels are looked up once per
+request, and the formatted dates and amounts are memorized, since the same
+dates and amounts repeat a lot in a report.
+
+"""
+import datetime as dt
+from decimal import Decimal
+
+from flask import g
+from flask_babel import get_locale
+
+from accounting.locale import gettext
+from accounting.utils.timezone import get_tz_today
+
+__KEY: str = "_accounting_format_context"
+"""The key of the request context for the formatting context."""
+
+
+class FormatContext:
+    """The formatting context of a request."""
+
+    def __init__(self):
+        """Constructs the formatting context of the current request."""
+        self.today: dt.date = get_tz_today()
+        """Today in the client timezone."""
+        self.locale: str = str(get_locale())
+        """The current locale."""
+        is_zh: bool = self.locale == "zh" or self.locale.startswith("zh_")
+        self.relative_days: dict[int, str] \
+            = {0: gettext("Today"),
+               -1: gettext("Yesterday"),
+               1: gettext("Tomorrow")}
+        """The labels of the days relative to today, by the number of days
+        from today."""
+        if is_zh:
+            self.relative_days[-2] = gettext("The day before yesterday")
+            self.relative_days[2] = gettext("The day after tomorrow")
+        self.weekdays: list[str] \
+            = ["一", "二", "三", "四", "五", "六", "日"] if is_zh \
+            else [dt.date(2024, 1, 1 + x).strftime("%a") for x in range(7)]
+        """The weekday labels, from Monday to Sunday."""
+        self.__dates: dict[dt.date, str] = {}
+        """The memorized formatted dates."""
+        self.__amounts: dict[Decimal, str] = {}
+        """The memorized formatted amounts."""
+        self.__csv_dates: dict[dt.date, str] = {}
+        """The memorized dates in the CSV files."""
+
+    def format_date(self, value: dt.date) -> str:
+        """Formats a date to be human-friendly.
+
+        :param value: The date.
+        :return: The human-friendly date text.
+        """
+        formatted: str | None = self.__dates.get(value)
+        if formatted is not None:
+            return formatted
+        formatted = self.relative_days.get((value - self.today).days)
+        if formatted is None:
+            weekday: str = self.weekdays[value.weekday()]
+            if value.year != self.today.year:
+                formatted = f"{value.year}/{value.month}/{value.day}" \
+                            f"({weekday})"
+            else:
+                formatted = f"{value.month}/{value.day}({weekday})"
+        self.__dates[value] = formatted
+        return formatted
+
+    def format_amount(self, value: Decimal) -> str:
+        """Formats an amount for readability.
+
+        :param value: The amount.
+        :return: The formatted amount text.
+        """
+        formatted: str | None = self.__amounts.get(value)
+        if formatted is None:
+            formatted = amount_text(value)
+            self.__amounts[value] = formatted
+        return formatted
+
+    def csv_value(self, value: str | Decimal | dt.date | None) \
+            -> str | Decimal | None:
+        """Returns a value as written in a CSV file.  The dates are
+        memorized.  The amounts are written as they are, since the equal
+        amounts may be written with different decimal places.
+
+        :param value: The value.
+        :return: The value as written in a CSV file.
+        """
+        if not isinstance(value, dt.date):
+            return value
+        formatted: str | None = self.__csv_dates.get(value)
+        if formatted is None:
+            formatted = value.isoformat()
+            self.__csv_dates[value] = formatted
+        return formatted
+
+
+def amount_text(value: Decimal) -> str:
+    """Formats an amount for readability, without the formatting context.
+
+    :param value: The amount.
+    :return: The formatted amount text.
+    """
+    if value == 0:
+        return "-"
+    whole: int = int(value)
+    frac: Decimal = (value - whole).normalize()
+    return "{:,}".format(whole) + str(abs(frac))[1:]
+
+
+def format_context() -> FormatContext:
+    """Returns the formatting context of the current request.
+
+    :return: The formatting context of the current request.
+    """
+    context: FormatContext | None = g.get(__KEY)
+    if context is None:
+        context = FormatContext()
+        setattr(g, __KEY, context)
+    return context
@@ -0,0 +1,100 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The ledger metadata.
+
+The period, currency, and account choosers of the reports only need to know
+the range of the journal entry dates, and the currencies and accounts in use.
+These are loaded once and cached against the data generation on the change
+counter, which is increased in the order of the commits by every transaction
+that changes the data, even in another process.  The generation is read
+before the metadata is loaded, so that the metadata is never older than the
+generation it is cached against.  A session with its own changes not
+committed yet does not use the cache.
+
+"""
+import datetime as dt
+
+import sqlalchemy as sa
+from flask import current_app
+
+from accounting import db
+from accounting.change_log.capture import is_changed
+from accounting.change_log.queries import get_generation
+from accounting.utils.archive import line_item_tables
+
+__EXTENSION: str = "accounting_ledger_metadata"
+"""The key of the application extension that keeps the cached metadata."""
+
+
+class LedgerMetadata:
+    """The ledger metadata."""
+
+    def __init__(self, generation: int):
+        """Constructs the ledger metadata, in two queries.  The archived years
+        are included.
+
+        :param generation: The data generation before the metadata is loaded.
+        """
+        self.generation: int = generation
+        """The data generation when the metadata is loaded."""
+        journal_entry, line_item = line_item_tables(None)
+        select_dates: sa.Select = sa.select(sa.func.min(journal_entry.date),
+                                            sa.func.max(journal_entry.date))
+        row: sa.Row = db.session.execute(select_dates).one()
+        self.start: dt.date | None = row[0]
+        """The date of the first journal entry, or None if there is no
+        journal entry."""
+        self.end: dt.date | None = row[1]
+        """The date of the last journal entry, or None if there is no
+        journal entry."""
+        self.currencies: dict[str, int] = {}
+        """The number of line items by their currency codes in use."""
+        self.accounts: dict[tuple[str, int], int] = {}
+        """The number of line items by the pairs of the currency codes and
+        the account IDs in use."""
+        select_pairs: sa.Select \
+            = sa.select(line_item.currency_code, line_item.account_id,
+                        sa.func.count().label("count"))\
+            .group_by(line_item.currency_code, line_item.account_id)
+        for row in db.session.execute(select_pairs):
+            self.accounts[(row.currency_code, row.account_id)] = row.count
+            self.currencies[row.currency_code] \
+                = self.currencies.get(row.currency_code, 0) + row.count
+
+    def account_ids(self, currency_code: str) -> set[int]:
+        """Returns the IDs of the accounts in use in a currency.
+
+        :param currency_code: The currency code.
+        :return: The IDs of the accounts in use in the currency.
+        """
+        return {x[1] for x in self.accounts if x[0] == currency_code}
+
+
+def ledger_metadata() -> LedgerMetadata:
+    """Returns the ledger metadata.  It is loaded again only when data are
+    committed after it was loaded.
+
+    :return: The ledger metadata.
+    """
+    generation: int = get_generation(db.session)
+    if is_changed(db.session):
+        return LedgerMetadata(generation)
+    metadata: LedgerMetadata | None = current_app.extensions.get(__EXTENSION)
+    if metadata is None or metadata.generation != generation:
+        metadata = LedgerMetadata(generation)
+        current_app.extensions[__EXTENSION] = metadata
+    return metadata
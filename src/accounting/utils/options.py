@@ -17,6 +17,7 @@
 """The getter and setter for the option management.
 
 """
+import datetime as dt
 import json
 
 import sqlalchemy as sa
@@ -24,6 +25,7 @@ import sqlalchemy as sa
 from accounting import db
 from accounting.models import Option, Account, Currency
 from accounting.utils.current_account import CurrentAccount
+from accounting.utils.period_close import get_closed_date, set_closed_date
 from accounting.utils.user import get_current_user_pk
 
 
@@ -170,6 +172,27 @@ class Options:
         """
         return Recurring(self.recurring_data)
 
+    @property
+    def closed_date(self) -> dt.date | None:
+        """Returns the date through which the periods are closed.
+
+        :return: The closed-through date, or None if no period is closed.
+        """
+        return get_closed_date()
+
+    @closed_date.setter
+    def closed_date(self, value: dt.date | None) -> None:
+        """Sets the date through which the periods are closed.
+
+        :param value: The closed-through date, or None to reopen all the
+            periods.
+        :return: None.
+        """
+        if value == get_closed_date():
+            return
+        set_closed_date(value)
+        self.is_modified = True
+
     @staticmethod
     def __get_option(name: str, default: str | None = None) -> str:
         """Returns the value of an option.
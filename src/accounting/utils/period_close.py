@@ -0,0 +1,281 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The closed accounting periods.
+
+The journal entries on or before the closed-through date cannot be created,
+edited, deleted, or reordered.  Since the closed history never changes, the
+balance of every account in every currency through each closed-through date
+is frozen into a snapshot when the period is closed.  The reports start from
+the latest snapshot, and only query the line items after it.
+
+"""
+import datetime as dt
+from decimal import Decimal
+from typing import Any
+
+import sqlalchemy as sa
+
+from accounting import db
+from accounting.models import Account, PeriodClose, PeriodCloseBalance
+from accounting.utils.archive import get_archived_date, line_item_tables
+from accounting.utils.user import get_current_user_pk
+
+
+def get_closed_date(session: sa.orm.Session | None = None) \
+        -> dt.date | None:
+    """Returns the latest closed-through date.
+
+    :param session: The database session, or None for the current one.
+    :return: The latest closed-through date, or None if no period is closed.
+    """
+    return (db.session if session is None else session).scalar(
+        sa.select(sa.func.max(PeriodClose.date)))
+
+
+def is_closed(date: dt.date) -> bool:
+    """Returns whether a date is in a closed period.
+
+    :param date: The date.
+    :return: True if the date is in a closed period, or False otherwise.
+    """
+    closed_date: dt.date | None = get_closed_date()
+    return closed_date is not None and date <= closed_date
+
+
+def set_closed_date(date: dt.date | None) -> None:
+    """Sets the closed-through date.  The later closed-through dates are
+    reopened, and the periods through the date are closed with a snapshot of
+    the balances.  The changes are not committed.
+
+    :param date: The new closed-through date, or None to reopen all the
+        periods.
+    :return: None.
+    :raise ValueError: When the archived periods would be reopened.
+    """
+    archived_date: dt.date | None = get_archived_date()
+    if archived_date is not None and (date is None or date < archived_date):
+        raise ValueError("The archived periods cannot be reopened.")
+    later: sa.Select = sa.select(PeriodClose)
+    if date is not None:
+        later = later.filter(PeriodClose.date > date)
+    for period_close in db.session.scalars(later):
+        db.session.delete(period_close)
+    if date is None or db.session.get(PeriodClose, date) is not None:
+        return
+    add_period_close(date, get_current_user_pk())
+
+
+def add_period_close(date: dt.date, user_pk: int) -> PeriodClose:
+    """Adds a closed-through date with a snapshot of the balances.  The
+    snapshot is computed from the previous snapshot and the line items after
+    it.  The changes are not committed.
+
+    :param date: The closed-through date.
+    :param user_pk: The primary key value of the user who closes the period.
+    :return: The closed-through date.
+    """
+    previous: dt.date | None = __latest_close(db.session, date)
+    balances: dict[tuple[str, int], Decimal] = {}
+    if previous is not None:
+        select_snapshot: sa.Select \
+            = sa.select(PeriodCloseBalance.currency_code,
+                        PeriodCloseBalance.account_id,
+                        PeriodCloseBalance.balance)\
+            .filter(PeriodCloseBalance.date == previous)
+        for row in db.session.execute(select_snapshot):
+            balances[(row.currency_code, row.account_id)] = row.balance
+    journal_entry, line_item = line_item_tables(__next_day(previous))
+    conditions: list[sa.ColumnElement[bool]] = [journal_entry.date <= date]
+    if previous is not None:
+        conditions.append(journal_entry.date > previous)
+    select_line_items: sa.Select \
+        = sa.select(line_item.currency_code, line_item.account_id,
+                    __balance(line_item))\
+        .join(journal_entry, line_item.journal_entry_id == journal_entry.id)\
+        .filter(*conditions)\
+        .group_by(line_item.currency_code, line_item.account_id)
+    for row in db.session.execute(select_line_items):
+        key: tuple[str, int] = (row.currency_code, row.account_id)
+        balances[key] = balances.get(key, Decimal("0")) + row.balance
+    period_close: PeriodClose = PeriodClose(
+        date=date, created_by_id=user_pk,
+        balances=[PeriodCloseBalance(currency_code=x[0], account_id=x[1],
+                                     balance=balances[x])
+                  for x in balances])
+    db.session.add(period_close)
+    return period_close
+
+
+def get_balances(currency_code: str, start: dt.date | None,
+                 end: dt.date | None,
+                 conditions: list[sa.ColumnElement[bool]] | None = None,
+                 session: sa.orm.Session | None = None) \
+        -> dict[int, Decimal]:
+    """Returns the balances of the accounts in a period, debit positive and
+    credit negative.  The closed history is served from the snapshots, so
+    that only the line items after the snapshots are queried.
+
+    :param currency_code: The currency code.
+    :param start: The start of the period, or None from the beginning.
+    :param end: The end of the period, or None to the latest.
+    :param conditions: The extra conditions on the accounts.
+    :param session: The database session, or None for the current one.
+    :return: The balances by the account IDs.  An account with line items
+        but a zero balance is included.
+    """
+    conditions = [] if conditions is None else conditions
+    session = db.session if session is None else session
+    end_close: dt.date | None = __latest_close(session, end)
+    if start is None:
+        if end_close is None:
+            return __sum_line_items(session, currency_code, None, end,
+                                    conditions)
+        return __add(get_snapshot(currency_code, end_close, conditions,
+                                  session),
+                     __sum_line_items(session, currency_code, end_close, end,
+                                      conditions))
+    start_close: dt.date | None = None
+    if end_close is not None and end_close >= start:
+        start_close = __latest_close(session, start - dt.timedelta(days=1))
+    if start_close is None:
+        return __sum_line_items(session, currency_code,
+                                start - dt.timedelta(days=1), end, conditions)
+    balances: dict[int, Decimal] \
+        = __add(get_snapshot(currency_code, end_close, conditions, session),
+                __sum_line_items(session, currency_code, end_close, end,
+                                 conditions))
+    return __add(balances,
+                 get_snapshot(currency_code, start_close, conditions,
+                              session),
+                 __sum_line_items(session, currency_code, start_close,
+                                  start - dt.timedelta(days=1), conditions),
+                 sign=-1)
+
+
+def get_snapshot_date(date: dt.date | None,
+                      session: sa.orm.Session | None = None) \
+        -> dt.date | None:
+    """Returns the latest closed-through date that has a snapshot on or
+    before a date.
+
+    :param date: The date, or None for the latest.
+    :param session: The database session, or None for the current one.
+    :return: The closed-through date, or None if there is no snapshot on or
+        before the date.
+    """
+    return __latest_close(db.session if session is None else session, date)
+
+
+def get_snapshot(currency_code: str, date: dt.date,
+                 conditions: list[sa.ColumnElement[bool]] | None = None,
+                 session: sa.orm.Session | None = None) \
+        -> dict[int, Decimal]:
+    """Returns the balances in a snapshot.
+
+    :param currency_code: The currency code.
+    :param date: The closed-through date of the snapshot.
+    :param conditions: The extra conditions on the accounts.
+    :param session: The database session, or None for the current one.
+    :return: The balances by the account IDs.
+    """
+    conditions = [] if conditions is None else conditions
+    select: sa.Select = sa.select(PeriodCloseBalance.account_id,
+                                  PeriodCloseBalance.balance)\
+        .join(Account)\
+        .filter(PeriodCloseBalance.date == date,
+                PeriodCloseBalance.currency_code == currency_code,
+                *conditions)
+    return {x.account_id: x.balance for x in
+            (db.session if session is None else session).execute(select)}
+
+
+def __latest_close(session: sa.orm.Session, date: dt.date | None) \
+        -> dt.date | None:
+    """Returns the latest closed-through date on or before a date.
+
+    :param session: The database session.
+    :param date: The date, or None for the latest.
+    :return: The latest closed-through date on or before the date, or None if
+        there is none.
+    """
+    select: sa.Select = sa.select(sa.func.max(PeriodClose.date))
+    if date is not None:
+        select = select.filter(PeriodClose.date <= date)
+    return session.scalar(select)
+
+
+def __sum_line_items(session: sa.orm.Session, currency_code: str,
+                     after: dt.date | None, through: dt.date | None,
+                     conditions: list[sa.ColumnElement[bool]]) \
+        -> dict[int, Decimal]:
+    """Returns the balances of the line items in a date range.  The archive
+    is queried only when the date range reaches into the archived years.
+
+    :param session: The database session.
+    :param currency_code: The currency code.
+    :param after: The date after which to sum, or None from the beginning.
+    :param through: The date through which to sum, or None to the latest.
+    :param conditions: The extra conditions on the accounts.
+    :return: The balances by the account IDs.
+    """
+    journal_entry, line_item = line_item_tables(__next_day(after), session)
+    conditions = [line_item.currency_code == currency_code, *conditions]
+    if after is not None:
+        conditions.append(journal_entry.date > after)
+    if through is not None:
+        conditions.append(journal_entry.date <= through)
+    select: sa.Select = sa.select(line_item.account_id, __balance(line_item))\
+        .join(journal_entry, line_item.journal_entry_id == journal_entry.id)\
+        .join(Account, line_item.account_id == Account.id)\
+        .filter(*conditions)\
+        .group_by(line_item.account_id)
+    return {x.account_id: x.balance for x in session.execute(select)}
+
+
+def __balance(line_item: Any) -> sa.Label:
+    """Returns the SQL expression of the balance.
+
+    :param line_item: The line item entity.
+    :return: The SQL expression of the balance.
+    """
+    return sa.func.sum(sa.case((line_item.is_debit, line_item.amount),
+                               else_=-line_item.amount)).label("balance")
+
+
+def __next_day(date: dt.date | None) -> dt.date | None:
+    """Returns the next day of a date.
+
+    :param date: The date, or None.
+    :return: The next day, or None if the date is None.
+    """
+    return None if date is None else date + dt.timedelta(days=1)
+
+
+def __add(balances: dict[int, Decimal], *others: dict[int, Decimal],
+          sign: int = 1) -> dict[int, Decimal]:
+    """Adds or subtracts balances.
+
+    :param balances: The balances to add to.
+    :param others: The balances to add or subtract.
+    :param sign: 1 to add, or -1 to subtract.
+    :return: The balances.
+    """
+    for other in others:
+        for account_id, balance in other.items():
+            balances[account_id] \
+                = balances.get(account_id, Decimal("0")) + sign * balance
+    return balances
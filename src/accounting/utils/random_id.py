@@ -22,16 +22,42 @@ This module should not import any other module from the application.
 from secrets import randbelow
 from typing import Type
 
+import sqlalchemy as sa
+
 from accounting import db
 
 
-def new_id(cls: Type[db.Model]):
+def new_id(cls: Type[db.Model], *others: Type[db.Model]):
     """Generates and returns a new, unused random ID for the data model.
 
     :param cls: The data model.
+    :param others: The other data models that share the IDs, like the
+        archive.
     :return: The newly-generated, unused random ID.
     """
     while True:
         obj_id: int = 100000000 + randbelow(900000000)
-        if db.session.get(cls, obj_id) is None:
+        if all(db.session.get(x, obj_id) is None for x in [cls, *others]):
             return obj_id
+
+
+def new_ids(count: int, cls: Type[db.Model], *others: Type[db.Model]) \
+        -> list[int]:
+    """Generates and returns new, unused random IDs for the data model in
+    bulk, with one query for each data model on each try.
+
+    :param count: The number of the IDs.
+    :param cls: The data model.
+    :param others: The other data models that share the IDs, like the
+        archive.
+    :return: The newly-generated, unused random IDs.
+    """
+    ids: set[int] = set()
+    while len(ids) < count:
+        candidates: set[int] = {100000000 + randbelow(900000000)
+                                for _ in range(count - len(ids))} - ids
+        for model in [cls, *others]:
+            candidates = candidates - set(db.session.scalars(
+                sa.select(model.id).filter(model.id.in_(candidates))))
+        ids = ids | candidates
+    return list(ids)
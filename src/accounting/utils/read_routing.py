@@ -0,0 +1,155 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The read routing.
+
+When a secondary bind is given for the read-only traffic, the read-only
+views, like the reports, the search, the lists, and the details, query from
+it, while the writes and the form validators stay on the primary database.
+Since the secondary database may lag behind, a user reads from the primary
+database for a short while after the user's own writes.
+
+"""
+import time
+from collections.abc import Callable
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import Flask, current_app, g, has_request_context, session
+
+from accounting import db
+
+FRESHNESS: float = 30
+"""The number of seconds to read from the primary database after the current
+user's own writes.  It can be changed with the ACCOUNTING_READ_FRESHNESS
+configuration."""
+__EXTENSION: str = "accounting_read_bind"
+"""The key of the application extension that keeps the read bind."""
+__READ_ONLY: str = "_accounting_read_only"
+"""The key of the request context that the view is read-only."""
+__CHANGED: str = "accounting_read_routing_changed"
+"""The key of the session info that the data is changed."""
+__WRITTEN_AT: str = "_accounting_written_at"
+"""The key of the user session for the time of the user's last write."""
+
+
+def read_only(view: Callable) -> Callable:
+    """The view decorator to mark a view as read-only, so that it may query
+    from the secondary bind.
+
+    :param view: The view.
+    :return: The decorated view.
+    """
+
+    @wraps(view)
+    def decorated_view(*args, **kwargs):
+        """The decorated view that queries from the secondary bind.
+
+        :param args: The arguments of the view.
+        :param kwargs: The keyword arguments of the view.
+        :return: The response of the view.
+        """
+        setattr(g, __READ_ONLY, True)
+        return view(*args, **kwargs)
+
+    return decorated_view
+
+
+def __is_read_routed() -> bool:
+    """Returns whether the current queries should read from the secondary
+    bind.
+
+    :return: True if the current queries should read from the secondary bind,
+        or False otherwise.
+    """
+    if not has_request_context() or not g.get(__READ_ONLY, False) \
+            or current_app.extensions.get(__EXTENSION) is None:
+        return False
+    freshness: float = current_app.config.get("ACCOUNTING_READ_FRESHNESS",
+                                              FRESHNESS)
+    return time.time() - session.get(__WRITTEN_AT, 0) >= freshness
+
+
+def __do_orm_execute(state: sa.orm.ORMExecuteState) -> None:
+    """Routes the queries in the read-only views to the secondary bind, and
+    marks the session when data is inserted, updated, or deleted in bulk.
+
+    :param state: The ORM execution state.
+    :return: None.
+    """
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[__CHANGED] = True
+        return
+    if not state.is_select \
+            or state.bind_arguments.get("bind") is not None \
+            or not __is_read_routed():
+        return
+    mapper: sa.orm.Mapper | None = state.bind_mapper
+    if mapper is not None \
+            and mapper.local_table.metadata.info.get("bind_key") is not None:
+        return
+    state.bind_arguments["bind"] \
+        = db.engines[current_app.extensions[__EXTENSION]]
+
+
+def __after_flush(db_session: sa.orm.Session, _) -> None:
+    """Marks the session when data is flushed.
+
+    :param db_session: The database session.
+    :return: None.
+    """
+    if len(db_session.new) + len(db_session.dirty) \
+            + len(db_session.deleted) > 0:
+        db_session.info[__CHANGED] = True
+
+
+def __after_commit(db_session: sa.orm.Session) -> None:
+    """Records the time of the current user's write, so that the user reads
+    from the primary database for a while.
+
+    :param db_session: The database session.
+    :return: None.
+    """
+    if db_session.info.pop(__CHANGED, False) and has_request_context() \
+            and current_app.extensions.get(__EXTENSION) is not None:
+        session[__WRITTEN_AT] = time.time()
+
+
+def __after_rollback(db_session: sa.orm.Session) -> None:
+    """Discards the mark of the changed data.
+
+    :param db_session: The database session.
+    :return: None.
+    """
+    db_session.info.pop(__CHANGED, None)
+
+
+def init_app(app: Flask, read_bind: str | None) -> None:
+    """Initializes the application.
+
+    :param app: The Flask application.
+    :param read_bind: The bind key of the secondary database for the read-only
+        traffic, or None to read from the primary database.
+    :return: None.
+    """
+    app.extensions[__EXTENSION] = read_bind
+    listeners: dict[str, Callable] = {"do_orm_execute": __do_orm_execute,
+                                      "after_flush": __after_flush,
+                                      "after_commit": __after_commit,
+                                      "after_rollback": __after_rollback}
+    for name, listener in listeners.items():
+        if not sa.event.contains(db.session, name, listener):
+            sa.event.listen(db.session, name, listener)
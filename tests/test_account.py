@@ -493,6 +493,53 @@ class AccountTestCase(unittest.TestCase):
             self.assertLess(account.created_at,
                             account.updated_at)
 
+    def test_concurrent_update(self) -> None:
+        """Tests the updates based on a stale version of the account.
+
+        :return: None.
+        """
+        from accounting.models import Account
+        detail_uri: str = f"{PREFIX}/{CASH.code}"
+        edit_uri: str = f"{PREFIX}/{CASH.code}/edit"
+        update_uri: str = f"{PREFIX}/{CASH.code}/update"
+        account: Account
+        response: httpx.Response
+
+        with self.__app.app_context():
+            version: int = Account.find_by_code(CASH.code).version
+
+        response = self.__client.get(edit_uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'name="version" value="{version}"', response.text)
+
+        # The update based on the current version
+        response = self.__client.post(update_uri,
+                                      data={"csrf_token": self.__csrf_token,
+                                            "base_code": CASH.base_code,
+                                            "title": f"{CASH.title}-1",
+                                            "version": str(version)})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], detail_uri)
+
+        # The update based on the stale version
+        response = self.__client.post(update_uri,
+                                      data={"csrf_token": self.__csrf_token,
+                                            "base_code": CASH.base_code,
+                                            "title": f"{CASH.title}-2",
+                                            "version": str(version)})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], edit_uri)
+
+        response = self.__client.get(edit_uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'name="version" value="{version + 1}"',
+                      response.text)
+
+        with self.__app.app_context():
+            account = Account.find_by_code(CASH.code)
+            self.assertEqual(account.version, version + 1)
+            self.assertEqual(account.title_l10n, f"{CASH.title}-1")
+
     def test_created_updated_by(self) -> None:
         """Tests the created-by and updated-by record.
 
@@ -698,6 +745,20 @@ class AccountTestCase(unittest.TestCase):
             self.assertEqual(db.session.get(Account, id_4).no, 1)
             self.assertEqual(db.session.get(Account, id_5).no, 2)
 
+        # The classification follows the base code.
+        response = self.__client.post(f"{PREFIX}/1112-002/update",
+                                      data={"csrf_token": self.__csrf_token,
+                                            "base_code": "6172",
+                                            "title": "Title"})
+        self.assertEqual(response.status_code, 302)
+        with self.__app.app_context():
+            account: Account = db.session.get(Account, id_5)
+            self.assertEqual(account.base_code, "6172")
+            self.assertEqual(account.account_class, 6)
+            self.assertFalse(account.is_current)
+            self.assertTrue(account.is_selectable_debit)
+            self.assertFalse(account.is_selectable_credit)
+
     def test_reorder(self) -> None:
         """Tests to reorder the accounts under a same base account.
 
@@ -0,0 +1,243 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The test for the change log.
+
+"""
+import datetime as dt
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+import httpx
+import sqlalchemy as sa
+from click.testing import Result
+from flask import Flask
+from flask.testing import FlaskCliRunner
+
+from accounting.utils.next_uri import encode_next
+from test_site import db
+from test_unmatched_offset import DifferentTestData
+from testlib import NEXT_URI, create_test_app, get_client, get_csrf_token, \
+    Accounts, add_journal_entry
+
+PREFIX: str = "/accounting/api/changes"
+"""The URL prefix for the change log API."""
+
+
+class ChangeLogTestCase(unittest.TestCase):
+    """The change log test case."""
+
+    def setUp(self) -> None:
+        """Sets up the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        self.__app: Flask = create_test_app()
+        """The Flask application."""
+
+        with self.__app.app_context():
+            self.__encoded_next_uri: str = encode_next(NEXT_URI)
+            """The encoded next URI."""
+
+        self.__client: httpx.Client = get_client(self.__app, "editor")
+        """The user client."""
+        self.__csrf_token: str = get_csrf_token(self.__client)
+        """The CSRF token."""
+
+    def tearDown(self) -> None:
+        """Tears down the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        with self.__app.app_context():
+            db.engine.dispose()
+
+    def test_nobody(self) -> None:
+        """Test the permission as nobody.
+
+        :return: None.
+        """
+        client: httpx.Client = get_client(self.__app, "nobody")
+        response: httpx.Response = client.get(PREFIX)
+        self.assertEqual(response.status_code, 403)
+
+    def test_viewer(self) -> None:
+        """Test the permission as viewer.
+
+        :return: None.
+        """
+        client: httpx.Client = get_client(self.__app, "viewer")
+        response: httpx.Response = client.get(PREFIX)
+        self.assertEqual(response.status_code, 200)
+
+    def test_change_log(self) -> None:
+        """Test the change log.
+
+        :return: None.
+        """
+        from accounting.models import Option
+
+        # The accounts and the currencies inserted in bulk by the
+        # initialization are in the change log.
+        changes: list[dict[str, Any]] = self.__get_changes(0)
+        self.assertIn(("currency", "USD", "create"),
+                      {(x["model"], x["key"], x["operation"])
+                       for x in changes})
+        self.assertEqual([x["seq"] for x in changes],
+                         sorted({x["seq"] for x in changes}))
+        cursor: int = changes[-1]["seq"]
+        self.assertEqual(self.__get_changes(cursor), [])
+
+        # The journal entries
+        journal_entry_id: int = add_journal_entry(
+            self.__client,
+            form={"csrf_token": self.__csrf_token,
+                  "next": self.__encoded_next_uri,
+                  "date": dt.date.today().isoformat(),
+                  "currency-1-code": "USD",
+                  "currency-1-credit-1-account_code": Accounts.SERVICE,
+                  "currency-1-credit-1-amount": "20"})
+        changes = self.__get_changes(cursor)
+        self.assertEqual([(x["model"], x["key"], x["operation"])
+                          for x in changes],
+                         [("journal-entry", str(journal_entry_id), "create")])
+        cursor = changes[-1]["seq"]
+
+        response: httpx.Response = self.__client.post(
+            f"/accounting/journal-entries/{journal_entry_id}/delete",
+            data={"csrf_token": self.__csrf_token,
+                  "next": self.__encoded_next_uri})
+        self.assertEqual(response.status_code, 302)
+        changes = self.__get_changes(cursor)
+        self.assertEqual([(x["model"], x["key"], x["operation"])
+                          for x in changes],
+                         [("journal-entry", str(journal_entry_id), "delete")])
+        cursor = changes[-1]["seq"]
+
+        # The offset matching
+        data: DifferentTestData = DifferentTestData(self.__app, "editor")
+        data.populate()
+        cursor = self.__get_changes(cursor)[-1]["seq"]
+        response = self.__client.post(
+            f"/accounting/match-offsets/USD/{Accounts.PAYABLE}",
+            data={"csrf_token": self.__csrf_token,
+                  "next": self.__encoded_next_uri})
+        self.assertEqual(response.status_code, 302)
+        changes = self.__get_changes(cursor)
+        self.assertGreater(len(changes), 0)
+        self.assertEqual({(x["model"], x["operation"]) for x in changes},
+                         {("journal-entry", "update")})
+        cursor = changes[-1]["seq"]
+
+        # The options, and the rolled-back changes
+        with self.__app.app_context():
+            db.session.add(Option(name="test", value="1", created_by_id=1,
+                                  updated_by_id=1))
+            db.session.flush()
+            db.session.rollback()
+            self.assertEqual(self.__get_changes(cursor), [])
+            db.session.add(Option(name="test", value="1", created_by_id=1,
+                                  updated_by_id=1))
+            db.session.commit()
+        changes = self.__get_changes(cursor)
+        self.assertEqual([(x["model"], x["key"], x["operation"])
+                          for x in changes],
+                         [("option", "test", "create")])
+        cursor = changes[-1]["seq"]
+
+        # The deletion in bulk
+        with self.__app.app_context():
+            Option.query.filter(Option.name == "test").delete()
+            db.session.commit()
+        self.assertEqual([(x["model"], x["key"], x["operation"])
+                          for x in self.__get_changes(cursor)],
+                         [("option", "test", "delete")])
+
+        # The console command
+        runner: FlaskCliRunner = self.__app.test_cli_runner()
+        with self.__app.app_context():
+            result: Result = runner.invoke(
+                args=["accounting-changes", "-b", "2", "0"])
+        self.assertEqual(result.exit_code, 0,
+                         result.output + str(result.exception))
+        self.assertEqual([json.loads(x) for x in result.output.splitlines()],
+                         self.__get_changes(0))
+
+    def test_concurrent_writers(self) -> None:
+        """Tests that the sequence numbers follow the commit order of two
+        interleaved sessions.
+
+        :return: None.
+        """
+        from accounting.change_log.queries import get_changes
+        from accounting.models import Change, Option
+        with TemporaryDirectory() as temp_dir:
+            app: Flask = create_test_app(
+                db_uri=f"sqlite:///{Path(temp_dir) / 'test.sqlite'}")
+            with app.app_context():
+                cursor: int = db.session.scalar(sa.select(
+                    sa.func.max(Change.seq)))
+                first: sa.orm.Session = db.session()
+                second: sa.orm.Session = db.session.session_factory()
+
+                # The second session starts its change first, while the first
+                # session writes its change and flushes.
+                second.add(Option(name="second", value="1", created_by_id=1,
+                                  updated_by_id=1))
+                first.add(Option(name="first", value="1", created_by_id=1,
+                                 updated_by_id=1))
+                first.flush()
+                self.assertEqual(first.scalar(
+                    sa.select(sa.func.count())
+                    .filter(Change.seq > cursor)), 0)
+
+                # The first session commits first, and a downstream system
+                # moves its cursor past it.
+                first.commit()
+                changes: list[Change] = get_changes(cursor, 10)
+                self.assertEqual([x.key for x in changes], ["first"])
+                cursor = changes[-1].seq
+
+                # The second session commits later, and is still after the
+                # cursor.
+                second.commit()
+                second.close()
+                changes = get_changes(cursor, 10)
+                self.assertEqual([x.key for x in changes], ["second"])
+                db.session.remove()
+                db.engine.dispose()
+
+    def __get_changes(self, cursor: int) -> list[dict[str, Any]]:
+        """Returns all the changes after a cursor, page by page.
+
+        :param cursor: The cursor.
+        :return: The changes after the cursor.
+        """
+        changes: list[dict[str, Any]] = []
+        while True:
+            response: httpx.Response \
+                = self.__client.get(f"{PREFIX}?after={cursor}&limit=50")
+            self.assertEqual(response.status_code, 200)
+            page: dict[str, Any] = response.json()
+            changes.extend(page["changes"])
+            cursor = page["next"]
+            if not page["has_more"]:
+                return changes
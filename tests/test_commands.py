@@ -19,10 +19,15 @@
 """
 import csv
 import datetime as dt
+import json
 import re
 import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from typing import Any
 
+import httpx
+
 import sqlalchemy as sa
 from click.testing import Result
 from flask import Flask
@@ -30,7 +35,7 @@ from flask.testing import FlaskCliRunner
 from sqlalchemy.sql.ddl import DropTable
 
 from test_site import db
-from testlib import create_test_app
+from testlib import create_test_app, get_client
 
 
 class ConsoleCommandTestCase(unittest.TestCase):
@@ -253,3 +258,178 @@ class ConsoleCommandTestCase(unittest.TestCase):
 
             db.session.delete(new_account)
             db.session.commit()
+
+    def test_classify_accounts(self) -> None:
+        """Tests the "accounting-classify-accounts" console command.
+
+        :return: None.
+        """
+        from accounting.models import Account
+        from accounting.utils.current_account import CurrentAccount
+        runner: FlaskCliRunner = self.__app.test_cli_runner()
+        columns: list[str] = ["account_class", "is_current",
+                              "is_selectable_debit", "is_selectable_credit"]
+
+        with self.__app.app_context():
+            expected: dict[str, tuple[int, bool, bool, bool]] \
+                = {x.code: (x.account_class, x.is_current,
+                            x.is_selectable_debit, x.is_selectable_credit)
+                   for x in Account.query}
+            self.assertEqual(expected["1111-001"], (1, True, True, True))
+            self.assertEqual(expected["1141-001"], (1, True, True, False))
+            self.assertEqual(expected["2141-001"], (2, True, False, True))
+            self.assertEqual(expected["3353-001"], (3, False, False, False))
+            self.assertEqual(expected["4111-001"], (4, False, False, True))
+            self.assertEqual(expected["6172-001"], (6, False, True, False))
+            self.assertEqual(expected["7111-001"], (7, False, False, True))
+            self.assertEqual(expected["7511-001"], (7, False, True, False))
+            self.assertEqual(
+                {x.code for x in Account.query
+                 .filter(CurrentAccount.sql_condition())},
+                {x for x in expected if x[:2] in {"11", "12", "21", "22"}})
+
+            # Drops the columns, as in a database created by an earlier
+            # version.
+            table: sa.Table = Account.__table__
+            for index in table.indexes:
+                index.drop(db.session.connection())
+            for column in columns:
+                db.session.execute(sa.text(
+                    f"ALTER TABLE {table.name} DROP COLUMN {column}"))
+            db.session.commit()
+
+            result: Result = runner.invoke(
+                args=["accounting-classify-accounts"])
+            self.assertEqual(result.exit_code, 0,
+                             result.output + str(result.exception))
+            self.assertIn(f"Columns added: {', '.join(columns)}.",
+                          result.output)
+            self.assertIn(f"{len(expected)} accounts classified.",
+                          result.output)
+            inspector: sa.Inspector = sa.inspect(db.session.connection())
+            self.assertEqual({x["name"] for x in
+                              inspector.get_indexes(table.name)},
+                             {x.name for x in table.indexes})
+            self.assertEqual({x.code: (x.account_class, x.is_current,
+                                       x.is_selectable_debit,
+                                       x.is_selectable_credit)
+                              for x in Account.query}, expected)
+
+            result = runner.invoke(args=["accounting-classify-accounts"])
+            self.assertEqual(result.exit_code, 0,
+                             result.output + str(result.exception))
+            self.assertEqual(result.output,
+                             "All accounts were already classified.\n")
+
+    def test_upgrade_db(self) -> None:
+        """Tests the "accounting-upgrade-db" console command.
+
+        :return: None.
+        """
+        from accounting.models import Account, JournalEntry, \
+            ArchivedJournalEntry
+        runner: FlaskCliRunner = self.__app.test_cli_runner()
+        tables: list[sa.Table] = [Account.__table__, JournalEntry.__table__,
+                                  ArchivedJournalEntry.__table__]
+
+        columns: list[str] = ["account_class", "is_current",
+                              "is_selectable_debit", "is_selectable_credit"]
+
+        with self.__app.app_context():
+            expected: dict[str, tuple[int, bool, bool, bool]] \
+                = {x.code: (x.account_class, x.is_current,
+                            x.is_selectable_debit, x.is_selectable_credit)
+                   for x in Account.query}
+
+            # Drops the version columns, the classification columns, and the
+            # change counter, as in a database created by an earlier version.
+            for table in tables:
+                db.session.execute(sa.text(
+                    f"ALTER TABLE {table.name} DROP COLUMN version"))
+            for index in Account.__table__.indexes:
+                index.drop(db.session.connection())
+            for column in columns:
+                db.session.execute(sa.text(
+                    f"ALTER TABLE {Account.__tablename__}"
+                    f" DROP COLUMN {column}"))
+            db.session.execute(sa.text(
+                "DROP TABLE accounting_change_counter"))
+            db.session.commit()
+
+            result: Result = runner.invoke(args=["accounting-upgrade-db"])
+            self.assertEqual(result.exit_code, 0,
+                             result.output + str(result.exception))
+            self.assertIn("Tables added: accounting_change_counter.",
+                          result.output)
+            for table in tables:
+                self.assertIn(f"{table.name}.version", result.output)
+            for column in columns:
+                self.assertIn(f"{Account.__tablename__}.{column}",
+                              result.output)
+            self.assertIn(f"{len(expected)} accounts classified.",
+                          result.output)
+            self.assertEqual({x.code: (x.account_class, x.is_current,
+                                       x.is_selectable_debit,
+                                       x.is_selectable_credit)
+                              for x in Account.query}, expected)
+            self.assertEqual({x.version for x in Account.query}, {2})
+
+            account: Account = Account.find_by_code("1111-001")
+            account.is_need_offset = True
+            db.session.commit()
+            self.assertEqual(account.version, 3)
+
+            result = runner.invoke(args=["accounting-upgrade-db"])
+            self.assertEqual(result.exit_code, 0,
+                             result.output + str(result.exception))
+            self.assertEqual(result.output,
+                             "The accounting database is already up to"
+                             " date.\n")
+
+    def test_build_assets(self) -> None:
+        """Tests the "accounting-build-assets" console command.
+
+        :return: None.
+        """
+        from accounting.assets import MANIFEST
+        runner: FlaskCliRunner = self.__app.test_cli_runner()
+        client: httpx.Client = get_client(self.__app, "editor")
+
+        with TemporaryDirectory() as output_dir:
+            self.__app.config["ACCOUNTING_ASSETS_DIR"] = output_dir
+
+            # Without the bundles, the original files are served.
+            response: httpx.Response = client.get("/accounting/journal")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("/accounting/static/js/period-chooser.js",
+                          response.text)
+
+            with self.__app.app_context():
+                result: Result = runner.invoke(
+                    args=["accounting-build-assets"])
+            self.assertEqual(result.exit_code, 0,
+                             result.output + str(result.exception))
+            manifest: dict[str, str] = json.loads(
+                (Path(output_dir) / MANIFEST).read_text(encoding="utf-8"))
+            self.assertRegex(manifest["report.js"],
+                             r"^report\.[0-9a-f]{12}\.js$")
+
+            # The bundles are served with an immutable cache.
+            response = client.get("/accounting/journal")
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("/accounting/static/js/period-chooser.js",
+                             response.text)
+            url: str = f"/accounting/assets/{manifest['report.js']}"
+            self.assertIn(url, response.text)
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("class PeriodChooser", response.text)
+            self.assertIn("immutable", response.headers["Cache-Control"])
+
+            # The original files are served in the debug mode.
+            self.__app.debug = True
+            response = client.get("/accounting/journal")
+            self.__app.debug = False
+            self.assertIn("/accounting/static/js/period-chooser.js",
+                          response.text)
+            self.assertNotIn(url, response.text)
@@ -0,0 +1,96 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The test for the start-up time.
+
+"""
+import os
+import re
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+IMPORT_TIME_BUDGET: int = 1000000
+"""The budget of the total self import time of the accounting modules when
+the application starts, in microseconds.  It is generous, so that the test
+does not fail on a slow machine."""
+LAZY_MODULES: list[str] = ["accounting.account.forms",
+                           "accounting.currency.forms",
+                           "accounting.journal_entry.forms",
+                           "accounting.journal_entry.utils.operators",
+                           "accounting.option.forms",
+                           "accounting.report.reports"]
+"""The modules that should only be loaded on their first use."""
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    """The start-up import time test case."""
+
+    def test_import_time(self) -> None:
+        """Tests the import time when the application starts.
+
+        :return: None.
+        """
+        self_times: dict[str, int] = self.__import_times(
+            "from test_site import create_app\n"
+            "create_app(is_testing=True)\n")
+        self.assertIn("accounting.report.views", self_times)
+        self.assertIn("accounting.commands", self_times)
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, self_times)
+        total: int = sum([self_times[x] for x in self_times
+                          if x == "accounting"
+                          or x.startswith("accounting.")])
+        self.assertLess(total, IMPORT_TIME_BUDGET)
+
+    def test_lazy_loading(self) -> None:
+        """Tests that the lazily-loaded modules are loaded on their first use.
+
+        :return: None.
+        """
+        self_times: dict[str, int] = self.__import_times(
+            "from testlib import create_test_app, get_client\n"
+            "app = create_test_app()\n"
+            "client = get_client(app, 'editor')\n"
+            "assert client.get('/accounting/journal').status_code == 200\n"
+            "assert client.get('/accounting/journal-entries/create/transfer')"
+            ".status_code == 200\n")
+        self.assertIn("accounting.report.reports", self_times)
+        self.assertIn("accounting.journal_entry.forms", self_times)
+        self.assertNotIn("accounting.account.forms", self_times)
+
+    @staticmethod
+    def __import_times(script: str) -> dict[str, int]:
+        """Runs a script with -X importtime, and returns the self import time
+        of each module.
+
+        :param script: The script.
+        :return: The self import time of each loaded module, in microseconds.
+        """
+        env: dict[str, str] = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(sys.path)
+        result: subprocess.CompletedProcess = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            cwd=Path(__file__).parent, env=env, capture_output=True,
+            text=True, check=True)
+        self_times: dict[str, int] = {}
+        for line in result.stderr.splitlines():
+            m: re.Match | None = re.match(
+                r"^import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)$", line)
+            if m is not None:
+                self_times[m[2]] = int(m[1])
+        return self_times
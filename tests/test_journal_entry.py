@@ -18,10 +18,15 @@
 
 """
 import datetime as dt
+import threading
+import time
 import unittest
 from decimal import Decimal
+from pathlib import Path
+from tempfile import TemporaryDirectory
 
 import httpx
+import sqlalchemy as sa
 from flask import Flask
 
 from accounting.utils.next_uri import encode_next
@@ -534,6 +539,108 @@ class CashReceiptJournalEntryTestCase(unittest.TestCase):
             self.assertIsNotNone(journal_entry)
             self.assertLess(journal_entry.created_at, journal_entry.updated_at)
 
+    def test_concurrent_update(self) -> None:
+        """Tests the updates based on a stale version of the journal entry.
+
+        :return: None.
+        """
+        from accounting.models import JournalEntry
+        from accounting.utils.concurrency import try_commit
+        journal_entry_id: int \
+            = add_journal_entry(self.__client, self.__get_add_form())
+        detail_uri: str = (f"{PREFIX}/{journal_entry_id}?"
+                           f"next={self.__encoded_next_uri}")
+        edit_uri: str = (f"{PREFIX}/{journal_entry_id}/edit?"
+                         f"next={self.__encoded_next_uri}")
+        update_uri: str = f"{PREFIX}/{journal_entry_id}/update"
+        journal_entry: JournalEntry
+        response: httpx.Response
+
+        with self.__app.app_context():
+            journal_entry = db.session.get(JournalEntry, journal_entry_id)
+            version: int = journal_entry.version
+
+        response = self.__client.get(edit_uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'name="version" value="{version}"', response.text)
+
+        # The update based on the current version
+        form: dict[str, str] = self.__get_update_form(journal_entry_id)
+        form["version"] = str(version)
+        response = self.__client.post(update_uri, data=form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], detail_uri)
+
+        # The update based on the stale version
+        form = self.__get_unchanged_update_form(journal_entry_id)
+        form["version"] = str(version)
+        form["note"] = "Stale"
+        response = self.__client.post(update_uri, data=form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], edit_uri)
+
+        response = self.__client.get(edit_uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'name="version" value="{version + 1}"',
+                      response.text)
+
+        with self.__app.app_context():
+            journal_entry = db.session.get(JournalEntry, journal_entry_id)
+            self.assertEqual(journal_entry.version, version + 1)
+            self.assertNotEqual(journal_entry.note, "Stale")
+
+            # Another update is written in between.
+            db.session.execute(sa.update(JournalEntry)
+                               .filter(JournalEntry.id == journal_entry_id)
+                               .values(version=JournalEntry.version + 1)
+                               .execution_options(synchronize_session=False))
+            journal_entry.note = "Stale"
+            self.assertFalse(try_commit())
+            journal_entry = db.session.get(JournalEntry, journal_entry_id)
+            self.assertEqual(journal_entry.version, version + 1)
+            self.assertNotEqual(journal_entry.note, "Stale")
+
+    def test_concurrent_append(self) -> None:
+        """Tests that appending a journal entry to a date does not conflict
+        with the edits of the other journal entries on the date.
+
+        :return: None.
+        """
+        from accounting.models import JournalEntry, JournalEntryNumbering
+        journal_entry_id: int \
+            = add_journal_entry(self.__client, self.__get_add_form())
+        detail_uri: str = (f"{PREFIX}/{journal_entry_id}?"
+                           f"next={self.__encoded_next_uri}")
+        update_uri: str = f"{PREFIX}/{journal_entry_id}/update"
+        response: httpx.Response
+
+        with self.__app.app_context():
+            journal_entry: JournalEntry \
+                = db.session.get(JournalEntry, journal_entry_id)
+            date: dt.date = journal_entry.date
+            version: int = journal_entry.version
+            generation: int \
+                = db.session.get(JournalEntryNumbering, date).generation
+
+        # Another journal entry is appended to the same date while the first
+        # one is being edited.
+        appended_id: int \
+            = add_journal_entry(self.__client, self.__get_add_form())
+        with self.__app.app_context():
+            self.assertEqual(db.session.get(JournalEntry, appended_id).no, 2)
+            self.assertEqual(
+                db.session.get(JournalEntry, journal_entry_id).version,
+                version)
+            self.assertGreater(
+                db.session.get(JournalEntryNumbering, date).generation,
+                generation)
+
+        form: dict[str, str] = self.__get_update_form(journal_entry_id)
+        form["version"] = str(version)
+        response = self.__client.post(update_uri, data=form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], detail_uri)
+
     def test_created_updated_by(self) -> None:
         """Tests the created-by and updated-by record.
 
@@ -2149,6 +2256,67 @@ class TransferJournalEntryTestCase(unittest.TestCase):
             journal_entry_id, self.__app, self.__csrf_token,
             self.__encoded_next_uri)
 
+    def test_api_accounts(self) -> None:
+        """Tests the API to look up the accounts for the account selector.
+
+        :return: None.
+        """
+        uri: str = "/accounting/api/journal-entries/accounts"
+        viewer: httpx.Client = get_client(self.__app, "viewer")
+        response: httpx.Response
+
+        response = viewer.get(f"{uri}/debit")
+        self.assertEqual(response.status_code, 403)
+
+        response = self.__client.get(f"{uri}/debit")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"accounts": [], "has_more": False})
+
+        response = self.__client.get(f"{uri}/debit?all=1")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["accounts"]), 50)
+        self.assertTrue(data["has_more"])
+
+        add_form: dict[str, str] = self.__get_add_form()
+        add_journal_entry(self.__client, add_form)
+
+        response = self.__client.get(f"{uri}/debit")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual({x["code"] for x in data["accounts"]},
+                         {add_form[x] for x in add_form
+                          if "-debit-" in x and x.endswith("-account_code")})
+        self.assertTrue(all(x["is_in_use"] for x in data["accounts"]))
+        self.assertFalse(data["has_more"])
+
+        response = self.__client.get(f"{uri}/debit?q=1113")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([x["code"] for x in data["accounts"]],
+                         [Accounts.BANK])
+        self.assertEqual(data["accounts"][0]["text"],
+                         f"{Accounts.BANK} Cash in Banks")
+
+        response = self.__client.get(f"{uri}/debit?q=bank&all=1")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["accounts"][0]["code"], Accounts.BANK)
+
+        response = self.__client.get(f"{uri}/credit?q=payable&all=1")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn(Accounts.PAYABLE, {x["code"] for x in data["accounts"]})
+
+        response = self.__client.get(f"{uri}/debit?q=payable&all=1")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertNotIn(Accounts.PAYABLE,
+                         {x["code"] for x in data["accounts"]})
+
+        response = self.__client.get(f"{uri}/other")
+        self.assertEqual(response.status_code, 404)
+
     def __get_update_form(self, journal_entry_id: int) -> dict[str, str]:
         """Returns the form data to update a journal entry, where the data are
         changed.
@@ -2353,3 +2521,240 @@ class JournalEntryReorderTestCase(unittest.TestCase):
         :return: The form data to add a new journal entry.
         """
         return get_add_form(self.__csrf_token, self.__encoded_next_uri)
+
+
+class BulkPostingTestCase(unittest.TestCase):
+    """The bulk posting test case."""
+
+    def setUp(self) -> None:
+        """Sets up the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        self.__app: Flask = create_test_app()
+        """The Flask application."""
+
+    def tearDown(self) -> None:
+        """Tears down the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        with self.__app.app_context():
+            db.engine.dispose()
+
+    def test_post(self) -> None:
+        """Tests to post the journal entries in bulk.
+
+        :return: None.
+        """
+        from accounting.journal_entry.posting import JournalEntryData, \
+            CurrencyData, LineItemData, PostingResult, post_journal_entries
+        from accounting.models import JournalEntry, JournalEntryLineItem
+        from accounting.utils.user import get_user_pk
+        today: dt.date = dt.date.today()
+        yesterday: dt.date = today - dt.timedelta(days=1)
+
+        def simple(date: dt.date, amount: str, debit: str, credit: str,
+                   original_line_item_id: int | None = None) \
+                -> JournalEntryData:
+            """Returns a simple journal entry to post.
+
+            :param date: The date.
+            :param amount: The amount.
+            :param debit: The debit account code.
+            :param credit: The credit account code.
+            :param original_line_item_id: The ID of the original line item of
+                the credit line item.
+            :return: The journal entry to post.
+            """
+            return JournalEntryData(date, [CurrencyData(
+                "USD", [LineItemData(debit, Decimal(amount), " Test ")],
+                [LineItemData(credit, Decimal(amount), " Test ",
+                              original_line_item_id)])])
+
+        with self.__app.test_request_context():
+            user_pk: int = get_user_pk("editor")
+            result: PostingResult = post_journal_entries(
+                [simple(yesterday, "1000", Accounts.RECEIVABLE,
+                        Accounts.SERVICE),
+                 simple(today, "500", Accounts.BANK, Accounts.SERVICE),
+                 simple(today, "300", Accounts.CASH, Accounts.BANK)],
+                user_pk)
+            db.session.commit()
+            self.assertTrue(result.is_success)
+            self.assertEqual(len(result.ids), 3)
+            journal_entries: list[JournalEntry] \
+                = [db.session.get(JournalEntry, x) for x in result.ids]
+            self.assertEqual([(x.date, x.no) for x in journal_entries],
+                             [(yesterday, 1), (today, 1), (today, 2)])
+            self.assertEqual(journal_entries[1].created_by_id, user_pk)
+            self.assertEqual(journal_entries[1].line_items[0].description,
+                             "Test")
+            self.assertEqual(JournalEntryLineItem.query.count(), 6)
+            receivable: JournalEntryLineItem \
+                = [x for x in journal_entries[0].line_items if x.is_debit][0]
+            self.assertEqual(receivable.account.code, Accounts.RECEIVABLE)
+
+            # The offsets, with the numbers after the existing journal
+            # entries.
+            result = post_journal_entries(
+                [simple(today, "400", Accounts.CASH, Accounts.RECEIVABLE,
+                        receivable.id),
+                 simple(today, "600", Accounts.BANK, Accounts.RECEIVABLE,
+                        receivable.id)],
+                user_pk)
+            db.session.commit()
+            self.assertTrue(result.is_success, result.errors)
+            self.assertEqual([db.session.get(JournalEntry, x).no
+                              for x in result.ids], [3, 4])
+            self.assertEqual(len(receivable.offsets), 2)
+
+            # Nothing is posted when there is any error.
+            count: int = JournalEntry.query.count()
+            unbalanced: JournalEntryData = simple(
+                today, "100", Accounts.CASH, Accounts.SALES)
+            unbalanced.currencies[0].credit[0].amount = Decimal("90")
+            offset_of_offset: JournalEntryData = simple(
+                today - dt.timedelta(days=2), "100", Accounts.RECEIVABLE,
+                Accounts.SALES)
+            offset_of_offset.currencies[0].debit[0].original_line_item_id \
+                = receivable.offsets[0].id
+            no_amount: JournalEntryData = simple(
+                today, "100", Accounts.CASH, Accounts.SALES)
+            no_amount.currencies[0].debit[0].amount = None
+            result = post_journal_entries(
+                [simple(today, "100", Accounts.CASH, Accounts.SALES),
+                 unbalanced,
+                 simple(today, "100", "9999-999", Accounts.SALES),
+                 simple(today, "1", Accounts.CASH, Accounts.RECEIVABLE,
+                        receivable.id),
+                 simple(today, "100", Accounts.CASH, Accounts.RECEIVABLE),
+                 simple(today, "-100", Accounts.CASH, Accounts.SALES),
+                 offset_of_offset,
+                 no_amount],
+                user_pk)
+            self.assertFalse(result.is_success)
+            self.assertEqual(result.ids, [])
+            self.assertEqual(
+                [(x.index, x.field) for x in result.errors],
+                [(1, "currency-1-whole_form"),
+                 (2, "currency-1-debit-1-account_code"),
+                 (3, "currency-1-credit-1-amount"),
+                 (4, "currency-1-credit-1-account_code"),
+                 (5, "currency-1-debit-1-amount"),
+                 (5, "currency-1-credit-1-amount"),
+                 (6, "currency-1-debit-1-original_line_item_id"),
+                 (6, "date"),
+                 (7, "currency-1-debit-1-amount")])
+            self.assertEqual(
+                str(result.errors[2].message),
+                "The amount must not exceed the net balance - of the"
+                " original line item.")
+            db.session.commit()
+            self.assertEqual(JournalEntry.query.count(), count)
+
+            # The batch is validated and posted in a few queries.
+            statements: list[str] = []
+
+            def on_execute(conn, cursor, statement, parameters, context,
+                           executemany) -> None:
+                statements.append(statement)
+
+            sa.event.listen(db.engine, "before_cursor_execute", on_execute)
+            try:
+                result = post_journal_entries(
+                    [simple(today - dt.timedelta(days=x % 10), "10",
+                            Accounts.CASH, Accounts.SALES)
+                     for x in range(50)], user_pk)
+                db.session.commit()
+            finally:
+                sa.event.remove(db.engine, "before_cursor_execute",
+                                on_execute)
+            self.assertTrue(result.is_success)
+            self.assertEqual(len(result.ids), 50)
+            self.assertLess(len(statements), 20)
+
+    def test_concurrent_post(self) -> None:
+        """Tests that two postings to the same date at the same time take
+        different numbers.
+
+        :return: None.
+        """
+        from accounting.journal_entry.posting import JournalEntryData, \
+            CurrencyData, LineItemData, PostingResult, post_journal_entries
+        from accounting.models import JournalEntry
+        from accounting.utils.user import get_user_pk
+        today: dt.date = dt.date.today()
+
+        with TemporaryDirectory() as temp_dir:
+            app: Flask = create_test_app(
+                db_uri=f"sqlite:///{Path(temp_dir) / 'test.sqlite'}")
+            with app.app_context():
+                user_pk: int = get_user_pk("editor")
+                engine: sa.Engine = db.engine
+            numbered: threading.Event = threading.Event()
+            proceed: threading.Event = threading.Event()
+            first: list[int] = []
+            results: list[PostingResult] = []
+
+            def on_execute(conn, cursor, statement, parameters, context,
+                           executemany) -> None:
+                """Holds the first posting after it numbers its journal
+                entries, until the second posting is started.
+
+                :return: None.
+                """
+                if threading.get_ident() in first \
+                        and statement.startswith(
+                            f"INSERT INTO {JournalEntry.__tablename__} "):
+                    numbered.set()
+                    proceed.wait(5)
+
+            def post() -> None:
+                """Posts a journal entry to today.
+
+                :return: None.
+                """
+                with app.test_request_context():
+                    results.append(post_journal_entries(
+                        [JournalEntryData(today, [CurrencyData(
+                            "USD",
+                            [LineItemData(Accounts.CASH, Decimal("10"))],
+                            [LineItemData(Accounts.SALES,
+                                          Decimal("10"))])])],
+                        user_pk))
+                    db.session.commit()
+
+            def post_first() -> None:
+                """Posts the first journal entry to today.
+
+                :return: None.
+                """
+                first.append(threading.get_ident())
+                post()
+
+            sa.event.listen(engine, "before_cursor_execute", on_execute)
+            try:
+                first_thread: threading.Thread \
+                    = threading.Thread(target=post_first)
+                first_thread.start()
+                self.assertTrue(numbered.wait(5))
+                second_thread: threading.Thread = threading.Thread(target=post)
+                second_thread.start()
+                time.sleep(0.5)
+                proceed.set()
+                first_thread.join()
+                second_thread.join()
+            finally:
+                sa.event.remove(engine, "before_cursor_execute", on_execute)
+
+            self.assertEqual([x.is_success for x in results], [True, True])
+            with app.app_context():
+                self.assertEqual(
+                    sorted(db.session.scalars(
+                        sa.select(JournalEntry.no)
+                        .filter(JournalEntry.date == today))),
+                    [1, 2])
+                db.engine.dispose()
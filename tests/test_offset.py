@@ -19,6 +19,7 @@
 """
 from __future__ import annotations
 
+import datetime as dt
 import unittest
 from decimal import Decimal
 
@@ -789,6 +790,71 @@ class OffsetTestCase(unittest.TestCase):
             self.assertEqual(journal_entry_or.date, journal_entry_of.date)
             self.assertLess(journal_entry_or.no, journal_entry_of.no)
 
+    def test_api_original_line_items(self) -> None:
+        """Tests the API to look up the original line items.
+
+        :return: None.
+        """
+        uri: str = "/accounting/api/journal-entries/original-line-items"
+        response: httpx.Response
+
+        def lookup(debit_credit: str, query: str) -> list[tuple[int, str]]:
+            """Looks up the original line items.
+
+            :param debit_credit: Either "debit" or "credit".
+            :param query: The query string.
+            :return: The ID and net balances of the original line items.
+            """
+            response = self.__client.get(
+                f"{uri}/{debit_credit}?currency=USD&{query}")
+            self.assertEqual(response.status_code, 200)
+            return [(x["id"], x["net_balance"])
+                    for x in response.json()["line_items"]]
+
+        viewer: httpx.Client = get_client(self.__app, "viewer")
+        response = viewer.get(f"{uri}/credit?currency=USD")
+        self.assertEqual(response.status_code, 403)
+
+        response = self.__client.get(f"{uri}/credit?currency=USD")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data["has_more"])
+        self.assertEqual(data["line_items"][0]["account_code"],
+                         Accounts.RECEIVABLE)
+        self.assertEqual(data["line_items"][0]["debit_credit"], "debit")
+        self.assertEqual([(x["id"], x["net_balance"])
+                          for x in data["line_items"]],
+                         [(self.__data.l_r_or3d.id, "100"),
+                          (self.__data.l_r_or2d.id, "360"),
+                          (self.__data.l_r_or1d.id, "400")])
+
+        self.assertEqual(lookup("debit", ""),
+                         [(self.__data.l_p_or3c.id, "120"),
+                          (self.__data.l_p_or2c.id, "500"),
+                          (self.__data.l_p_or1c.id, "800")])
+
+        on_form: str = "&".join(
+            f"exclude={x.id}" for x in [self.__data.l_r_of2c,
+                                        self.__data.l_r_of3c,
+                                        self.__data.l_r_of4c])
+        self.assertEqual(lookup("credit", on_form),
+                         [(self.__data.l_r_or3d.id, "100"),
+                          (self.__data.l_r_or2d.id, "600"),
+                          (self.__data.l_r_or1d.id, "700")])
+
+        self.assertEqual(lookup("credit", "q=Toy"),
+                         [(self.__data.l_r_or2d.id, "360")])
+        self.assertEqual(lookup("credit", "q=1200"),
+                         [(self.__data.l_r_or1d.id, "400")])
+        self.assertEqual(lookup("credit", f"id={self.__data.l_r_or1d.id}"),
+                         [(self.__data.l_r_or1d.id, "400")])
+        self.assertEqual(lookup("credit", f"account={Accounts.PAYABLE}"), [])
+        self.assertEqual(lookup("credit", "page=2"), [])
+
+        date: dt.date = dt.date.today() - dt.timedelta(days=40)
+        self.assertEqual(lookup("credit", f"date={date.isoformat()}"),
+                         [(self.__data.l_r_or1d.id, "400")])
+
 
 class OffsetTestData(BaseTestData):
     """The offset test data."""
@@ -0,0 +1,269 @@
+# The Mia! Accounting Project.
+# Author: imacat@mail.imacat.idv.tw (imacat), 2026/10/18
+
+#  Copyright (c) 2026-2026 imacat.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+"""The test for the bulk reclassification.
+
+"""
+import datetime as dt
+import unittest
+
+import httpx
+from click.testing import Result
+from flask import Flask
+from flask.testing import FlaskCliRunner
+
+from test_offset import OffsetTestData
+from test_site import db
+from testlib import Accounts, create_test_app, get_client, get_csrf_token
+
+PREFIX: str = "/accounting/reclassify"
+"""The URL prefix for the bulk reclassification."""
+
+
+class ReclassifyTestCase(unittest.TestCase):
+    """The bulk reclassification test case."""
+
+    def setUp(self) -> None:
+        """Sets up the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        self.__app: Flask = create_test_app()
+        """The Flask application."""
+        self.__client: httpx.Client = get_client(self.__app, "admin")
+        """The user client."""
+        self.__csrf_token: str = get_csrf_token(self.__client)
+        """The CSRF token."""
+        self.__data: OffsetTestData = OffsetTestData(self.__app, "editor")
+        """The offset test data."""
+        self.__data.populate()
+
+    def tearDown(self) -> None:
+        """Tears down the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        with self.__app.app_context():
+            db.engine.dispose()
+
+    def test_permission(self) -> None:
+        """Tests the permission.
+
+        :return: None.
+        """
+        client: httpx.Client = get_client(self.__app, "editor")
+        csrf_token: str = get_csrf_token(client)
+        response: httpx.Response
+
+        response = client.get(PREFIX)
+        self.assertEqual(response.status_code, 403)
+
+        response = client.post(PREFIX,
+                               data={"csrf_token": csrf_token,
+                                     "source": Accounts.SALES,
+                                     "target": Accounts.SERVICE})
+        self.assertEqual(response.status_code, 403)
+
+        response = self.__client.get(PREFIX)
+        self.assertEqual(response.status_code, 200)
+
+    def test_constraints(self) -> None:
+        """Tests that the line items that the journal entry forms would
+        reject are left.
+
+        :return: None.
+        """
+        from accounting.models import Account, JournalEntry, \
+            JournalEntryLineItem
+        from accounting.reclassify.reclassifier import Reclassifier
+        from accounting.utils.period_close import add_period_close
+        from accounting.utils.user import get_user_pk
+        data: OffsetTestData = self.__data
+        reclassifier: Reclassifier
+
+        with self.__app.app_context():
+            user_pk: int = get_user_pk("admin")
+
+            def account_of(line_item_id: int) -> str:
+                return db.session.get(JournalEntryLineItem,
+                                      line_item_id).account.code
+
+            # The income line items are all moved.
+            reclassifier = Reclassifier(Account.find_by_code(Accounts.SALES),
+                                        Account.find_by_code(Accounts.SERVICE))
+            self.assertEqual((reclassifier.total, reclassifier.movable),
+                             (2, 2))
+            self.assertEqual(reclassifier.reclassify(user_pk), 2)
+            db.session.commit()
+            self.assertEqual(account_of(data.l_r_or2c.id), Accounts.SERVICE)
+            self.assertEqual(account_of(data.l_r_or3c.id), Accounts.SERVICE)
+            self.assertEqual(
+                db.session.get(JournalEntry, data.j_r_or2.id).version, 2)
+            self.assertEqual(
+                db.session.get(JournalEntry, data.j_r_or1.id).version, 1)
+
+            # The offsets and the original line items with offsets are left.
+            reclassifier = Reclassifier(
+                Account.find_by_code(Accounts.RECEIVABLE),
+                Account.find_by_code(Accounts.NOTES_RECEIVABLE))
+            self.assertEqual(reclassifier.total, 9)
+            self.assertEqual(reclassifier.movable, 1)
+            self.assertEqual(reclassifier.with_offsets, 8)
+            self.assertEqual(reclassifier.reclassify(user_pk), 1)
+            db.session.commit()
+            self.assertEqual(account_of(data.l_r_or3d.id),
+                             Accounts.NOTES_RECEIVABLE)
+            self.assertEqual(account_of(data.l_r_or1d.id),
+                             Accounts.RECEIVABLE)
+            self.assertEqual(account_of(data.l_r_of1c.id),
+                             Accounts.RECEIVABLE)
+
+            # Payable line items cannot start from debit.
+            reclassifier = Reclassifier(
+                Account.find_by_code(Accounts.OFFICE),
+                Account.find_by_code(Accounts.PAYABLE))
+            self.assertEqual((reclassifier.total, reclassifier.movable,
+                              reclassifier.wrong_side), (2, 0, 2))
+            self.assertEqual(reclassifier.reclassify(user_pk), 0)
+
+            # Each line item that is left is counted only once.
+            add_period_close(dt.date.today(), user_pk)
+            db.session.commit()
+            reclassifier = Reclassifier(
+                Account.find_by_code(Accounts.RECEIVABLE),
+                Account.find_by_code(Accounts.PAYABLE))
+            self.assertEqual((reclassifier.total, reclassifier.movable,
+                              reclassifier.in_closed_periods,
+                              reclassifier.with_offsets,
+                              reclassifier.wrong_side), (8, 0, 8, 0, 0))
+
+    def test_filter(self) -> None:
+        """Tests the filter and the closed periods.
+
+        :return: None.
+        """
+        from accounting.models import Account, Currency
+        from accounting.reclassify.reclassifier import Reclassifier
+        from accounting.utils.period_close import add_period_close
+        from accounting.utils.user import get_user_pk
+        today: dt.date = dt.date.today()
+        reclassifier: Reclassifier
+
+        with self.__app.app_context():
+            cash: Account = Account.find_by_code(Accounts.CASH)
+            bank: Account = Account.find_by_code(Accounts.BANK)
+
+            reclassifier = Reclassifier(cash, bank)
+            self.assertEqual((reclassifier.total, reclassifier.movable),
+                             (10, 10))
+            reclassifier = Reclassifier(cash, bank,
+                                        currency=db.session.get(Currency,
+                                                                "TWD"))
+            self.assertEqual(reclassifier.total, 0)
+            reclassifier = Reclassifier(cash, bank, description="Airplane%")
+            self.assertEqual(reclassifier.total, 3)
+            reclassifier = Reclassifier(cash, bank,
+                                        start=today - dt.timedelta(days=16),
+                                        end=today - dt.timedelta(days=12))
+            self.assertEqual(reclassifier.total, 2)
+
+            add_period_close(today - dt.timedelta(days=18),
+                             get_user_pk("admin"))
+            db.session.commit()
+            reclassifier = Reclassifier(cash, bank)
+            self.assertEqual((reclassifier.total, reclassifier.movable,
+                              reclassifier.in_closed_periods), (10, 6, 4))
+
+    def test_reclassify(self) -> None:
+        """Tests to move the line items in the view.
+
+        :return: None.
+        """
+        from accounting.models import Account, JournalEntryLineItem
+        response: httpx.Response
+
+        response = self.__client.post(PREFIX,
+                                      data={"csrf_token": self.__csrf_token,
+                                            "source": Accounts.SALES,
+                                            "target": Accounts.SALES})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], PREFIX)
+        self.assertIn("The target account must be different",
+                      self.__client.get("/.messages").text)
+
+        response = self.__client.post(PREFIX,
+                                      data={"csrf_token": self.__csrf_token,
+                                            "source": Accounts.RECEIVABLE,
+                                            "target": Accounts.CASH,
+                                            "currency_code": "USD",
+                                            "description": "%"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], PREFIX)
+        messages: str = self.__client.get("/.messages").text
+        self.assertIn("Moved 1 line items.", messages)
+        self.assertIn("Left 0 line items in the closed periods, 8 matched"
+                      " with offsets", messages)
+
+        with self.__app.app_context():
+            cash: Account = Account.find_by_code(Accounts.CASH)
+            self.assertEqual(
+                db.session.get(JournalEntryLineItem,
+                               self.__data.l_r_or3d.id).account_id, cash.id)
+
+    def test_command(self) -> None:
+        """Tests the "accounting-reclassify" console command.
+
+        :return: None.
+        """
+        from accounting.models import JournalEntryLineItem
+        runner: FlaskCliRunner = self.__app.test_cli_runner()
+        result: Result
+
+        with self.__app.app_context():
+            result = runner.invoke(args=["accounting-reclassify", "-u",
+                                         "admin", Accounts.SALES,
+                                         Accounts.SALES])
+            self.assertNotEqual(result.exit_code, 0)
+            self.assertIn("The same account as SOURCE.", result.output)
+
+            result = runner.invoke(args=["accounting-reclassify", "-u",
+                                         "admin", "-n", Accounts.OFFICE,
+                                         Accounts.PAYABLE])
+            self.assertEqual(result.exit_code, 0,
+                             result.output + str(result.exception))
+            self.assertEqual(result.output,
+                             "0 of 2 line items can be moved.\n"
+                             "Left 0 line items in the closed periods, 0"
+                             " matched with offsets, and 2 on the debit or"
+                             " credit side where the target account cannot"
+                             " be used.\n")
+
+            result = runner.invoke(args=["accounting-reclassify", "-u",
+                                         "admin", "-d", "Toy",
+                                         Accounts.SALES, Accounts.SERVICE])
+            self.assertEqual(result.exit_code, 0,
+                             result.output + str(result.exception))
+            self.assertEqual(result.output,
+                             f"1 line items moved from {Accounts.SALES} to"
+                             f" {Accounts.SERVICE}.\n")
+            self.assertEqual(db.session.get(JournalEntryLineItem,
+                                            self.__data.l_r_or2c.id)
+                             .account.code, Accounts.SERVICE)
+            self.assertEqual(db.session.get(JournalEntryLineItem,
+                                            self.__data.l_r_or3c.id)
+                             .account.code, Accounts.SALES)
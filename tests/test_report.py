@@ -17,15 +17,34 @@
 """The test for the reports.
 
 """
+import asyncio
+import csv
 import datetime as dt
+import gzip
+import importlib.util
+import io
+import json
+import time
 import unittest
+import zipfile
+from decimal import Decimal
+from pathlib import Path
+from tempfile import TemporaryDirectory
 
 import httpx
+import sqlalchemy as sa
+from click.testing import Result
 from flask import Flask
+from flask.testing import FlaskCliRunner
 
+from accounting.report.utils.amount_column import AmountColumn, to_cents, \
+    from_cents, running_balances
 from test_site import db
-from test_site.lib import BaseTestData
-from testlib import create_test_app, get_client, get_csrf_token, Accounts
+from test_site.lib import BaseTestData, JournalEntryData, \
+    JournalEntryCurrencyData, JournalEntryLineItemData
+from testlib import create_test_app, get_client, get_csrf_token, \
+    set_locale, Accounts, NEXT_URI, add_journal_entry
+from testlib_journal_entry import get_add_form, get_unchanged_update_form
 
 PREFIX: str = "/accounting"
 """The URL prefix for the reports."""
@@ -450,6 +469,949 @@ class ReportTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.headers["Content-Type"], CSV_MIME)
 
+    def test_line_item_rows(self) -> None:
+        """Tests the line item rows in the reports.
+
+        :return: None.
+        """
+        ReportTestData(self.__app, "editor").populate()
+        today: dt.date = dt.date.today()
+        yesterday: dt.date = today - dt.timedelta(days=1)
+        period: str = f"{yesterday.isoformat()}-{today.isoformat()}"
+        response: httpx.Response
+
+        response = self.__client.get(f"{PREFIX}/journal/{period}?as=csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text.splitlines(),
+                         ["Date,Currency,Account,Description,Debit,Credit,"
+                          "Note",
+                          f"{yesterday},USD,{Accounts.CASH} Cash on Hand,"
+                          "Withdraw領錢,1000.00,,",
+                          f"{yesterday},USD,{Accounts.BANK} Cash in Banks,"
+                          "Withdraw領錢,,1000.00,",
+                          f"{today},USD,{Accounts.MEAL} Meal (Expenses),"
+                          "Dinner晚餐,40.00,,",
+                          f"{today},USD,{Accounts.CASH} Cash on Hand,"
+                          "Dinner晚餐,,40.00,"])
+
+        set_locale(self.__app, self.__client, self.__csrf_token, "zh_Hant")
+
+        response = self.__client.get(f"{PREFIX}/search?q=Dinner&as=csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text.splitlines()[1:],
+                         [f"{today},USD,{Accounts.CASH} 庫存現金,Dinner晚餐,"
+                          ",40.00,",
+                          f"{today},USD,{Accounts.MEAL} 伙食費,Dinner晚餐,"
+                          "40.00,,"])
+
+        response = self.__client.get(
+            f"{PREFIX}/income-expenses/USD/{Accounts.CASH}/{period}?as=csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text.splitlines()[1:3],
+                         [f"{yesterday},{Accounts.BANK} 銀行存款,Withdraw領錢,"
+                          "1000.00,,1000.00,",
+                          f"{today},{Accounts.MEAL} 伙食費,Dinner晚餐,,40.00,"
+                          "960.00,"])
+
+    def test_comparative(self) -> None:
+        """Tests the comparative statements.
+
+        :return: None.
+        """
+        ReportTestData(self.__app, "editor").populate()
+        year: int = dt.date.today().year
+        response: httpx.Response
+
+        def get_csv(uri: str) -> dict[str, list[str]]:
+            """Returns the CSV rows by their title.
+
+            :param uri: The URI of the CSV.
+            :return: The CSV rows by their title.
+            """
+            response: httpx.Response = self.__client.get(uri)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers["Content-Type"], CSV_MIME)
+            return {x[0].strip(): x[1:]
+                    for x in csv.reader(io.StringIO(response.text))}
+
+        for report in ["trial-balance", "income-statement", "balance-sheet"]:
+            for spec in [f"{year}-monthly", f"{year}-quarterly",
+                         f"{year - 5}-{year}-yearly"]:
+                response = self.__client.get(
+                    f"{PREFIX}/{report}/USD/compare/{spec}")
+                self.assertEqual(response.status_code, 200)
+        response = self.__client.get(
+            f"{PREFIX}/trial-balance/USD/compare/{year - 9}-{year}-yearly")
+        self.assertEqual(response.status_code, 200)
+        response = self.__client.get(
+            f"{PREFIX}/trial-balance/USD/compare/{year - 10}-{year}-yearly")
+        self.assertEqual(response.status_code, 404)
+
+        monthly: dict[str, list[str]] = get_csv(
+            f"{PREFIX}/trial-balance/USD/compare/{year}-monthly?as=csv")
+        self.assertEqual(len(monthly["Account"]), 12)
+        self.assertEqual(monthly["Account"][0], f"{year}-01")
+        quarterly: dict[str, list[str]] = get_csv(
+            f"{PREFIX}/income-statement/USD/compare/{year}-quarterly?as=csv")
+        self.assertEqual(quarterly["Account"],
+                         [f"{year}Q1", f"{year}Q2", f"{year}Q3", f"{year}Q4"])
+        yearly: dict[str, list[str]] = get_csv(
+            f"{PREFIX}/income-statement/USD/compare/"
+            f"{year - 1}-{year}-yearly?as=csv")
+        self.assertEqual(yearly["Account"], [str(year - 1), str(year)])
+        income: dict[str, list[str]] = get_csv(
+            f"{PREFIX}/income-statement/USD/{year}?as=csv")
+        net: str = "Net Income or Loss for Current Period"
+        self.assertEqual(Decimal(yearly[net][1]), Decimal(income[net][0]))
+        self.assertEqual(sum([Decimal(x) for x in quarterly[net]]),
+                         Decimal(income[net][0]))
+
+        # The last balances match the balance sheet of the whole year.
+        balance_sheet: dict[str, list[str]] = get_csv(
+            f"{PREFIX}/balance-sheet/USD/compare/{year}-monthly?as=csv")
+        response = self.__client.get(f"{PREFIX}/balance-sheet/USD/{year}"
+                                     "?as=csv")
+        self.assertEqual(response.status_code, 200)
+        matched: int = 0
+        for row in csv.reader(io.StringIO(response.text)):
+            for title, amount in [(row[0], row[1]), (row[2], row[3])]:
+                if title.strip() in balance_sheet and amount != "" \
+                        and title.strip() != "Total":
+                    self.assertEqual(
+                        Decimal(balance_sheet[title.strip()][-1]),
+                        Decimal(amount))
+                    matched = matched + 1
+        self.assertEqual(matched, 3)
+
+        response = self.__client.get(
+            f"{PREFIX}/balance-sheet/USD/compare/{year}-weekly")
+        self.assertEqual(response.status_code, 404)
+        response = self.__client.get(
+            f"{PREFIX}/balance-sheet/USD/compare/{year}-{year - 1}-yearly")
+        self.assertEqual(response.status_code, 404)
+
+    def test_balance_sheet_scans(self) -> None:
+        """Tests that the balance sheet scans the line items only once.
+
+        :return: None.
+        """
+        ReportTestData(self.__app, "editor").populate()
+        statements: list[str] = []
+
+        def on_execute(conn, cursor, statement, parameters, context,
+                       executemany) -> None:
+            statements.append(statement)
+
+        with self.__app.app_context():
+            engine: sa.Engine = db.engine
+        sa.event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            for period in ["all-time", str(dt.date.today().year)]:
+                statements.clear()
+                response: httpx.Response = self.__client.get(
+                    f"{PREFIX}/balance-sheet/USD/{period}?as=csv")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    len([x for x in statements
+                         if "FROM accounting_journal_entry_line_items" in x]),
+                    1)
+        finally:
+            sa.event.remove(engine, "before_cursor_execute", on_execute)
+
+    def test_closed_periods(self) -> None:
+        """Tests the closed periods and their report snapshots.
+
+        :return: None.
+        """
+        from accounting.models import JournalEntry, PeriodClose, \
+            PeriodCloseBalance
+        from accounting.utils.next_uri import encode_next
+        ClosedPeriodTestData(self.__app, "editor").populate()
+        year: int = dt.date.today().year
+        periods: list[str] = ["all-time", str(year), str(year - 1),
+                              str(year - 2), str(year - 3), str(year - 4),
+                              f"{year - 1}-06", f"{year - 1}-07"]
+        uris: list[str] = []
+        for period in periods:
+            uris.extend([f"{PREFIX}/trial-balance/USD/{period}?as=csv",
+                         f"{PREFIX}/income-statement/USD/{period}?as=csv",
+                         f"{PREFIX}/balance-sheet/USD/{period}?as=csv",
+                         f"{PREFIX}/ledger/USD/{Accounts.BANK}/{period}"
+                         "?as=csv",
+                         f"{PREFIX}/income-expenses/USD/{Accounts.BANK}/"
+                         f"{period}?as=csv"])
+        before: dict[str, str] = {x: self.__client.get(x).text for x in uris}
+
+        admin: httpx.Client = get_client(self.__app, "admin")
+        admin_csrf_token: str = get_csrf_token(admin)
+        response: httpx.Response
+        with self.__app.app_context():
+            encoded_next_uri: str = encode_next(NEXT_URI)
+        detail_option_uri: str = f"{PREFIX}/options?next={encoded_next_uri}"
+        form: dict[str, str] = {"csrf_token": admin_csrf_token,
+                                "next": encoded_next_uri,
+                                "default_currency_code": "USD",
+                                "default_ie_account_code": Accounts.CASH,
+                                "closed_date": str(dt.date.today()
+                                                   + dt.timedelta(days=1))}
+        response = admin.post(f"{PREFIX}/options/update", data=form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"],
+                         f"{PREFIX}/options/edit?next={encoded_next_uri}")
+        for closed_date in [dt.date(year - 3, 12, 31),
+                            dt.date(year - 1, 6, 30)]:
+            form["closed_date"] = closed_date.isoformat()
+            response = admin.post(f"{PREFIX}/options/update", data=form)
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(response.headers["Location"], detail_option_uri)
+        with self.__app.app_context():
+            self.assertEqual(db.session.scalars(sa.select(PeriodClose.date)
+                                                .order_by(PeriodClose.date))
+                             .all(),
+                             [dt.date(year - 3, 12, 31),
+                              dt.date(year - 1, 6, 30)])
+            self.assertGreater(PeriodCloseBalance.query.count(), 0)
+
+        # The reports from the snapshots are the same.
+        for uri in uris:
+            response = self.__client.get(uri)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.text, before[uri], uri)
+
+        # The journal entries in the closed periods are locked.
+        with self.__app.app_context():
+            journal_entry: JournalEntry = JournalEntry.query\
+                .filter(JournalEntry.date <= dt.date(year - 1, 6, 30))\
+                .order_by(JournalEntry.date.desc()).first()
+            journal_entry_id: int = journal_entry.id
+            date: dt.date = journal_entry.date
+        detail_uri: str = f"{PREFIX}/journal-entries/{journal_entry_id}"
+        response = self.__client.get(f"{detail_uri}/edit")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], detail_uri)
+        form = get_unchanged_update_form(journal_entry_id, self.__app,
+                                         self.__csrf_token, "")
+        del form["next"]
+        response = self.__client.post(f"{detail_uri}/update", data=form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], detail_uri)
+        response = self.__client.post(f"{detail_uri}/delete",
+                                      data={"csrf_token": self.__csrf_token})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], detail_uri)
+        response = self.__client.post(
+            f"{PREFIX}/journal-entries/dates/{date}",
+            data={"csrf_token": self.__csrf_token,
+                  f"{journal_entry_id}-no": "3"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("The date is in a closed period.",
+                      self.__client.get("/.messages").text)
+        form = get_add_form(self.__csrf_token, "")
+        del form["next"]
+        form["date"] = date.isoformat()
+        response = self.__client.post(
+            f"{PREFIX}/journal-entries/store/transfer", data=form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"],
+                         f"{PREFIX}/journal-entries/create/transfer")
+        with self.__app.app_context():
+            self.assertIsNotNone(db.session.get(JournalEntry,
+                                                journal_entry_id))
+
+        # The journal entries after the closed periods can still be added.
+        form["date"] = (dt.date(year - 1, 6, 30)
+                        + dt.timedelta(days=1)).isoformat()
+        response = self.__client.post(
+            f"{PREFIX}/journal-entries/store/transfer", data=form)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.headers["Location"].startswith(
+            f"{PREFIX}/journal-entries/"))
+        self.assertNotEqual(response.headers["Location"],
+                            f"{PREFIX}/journal-entries/create/transfer")
+
+        # Reopens all the periods.
+        form = {"csrf_token": admin_csrf_token,
+                "next": encoded_next_uri,
+                "default_currency_code": "USD",
+                "default_ie_account_code": Accounts.CASH,
+                "closed_date": ""}
+        response = admin.post(f"{PREFIX}/options/update", data=form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], detail_option_uri)
+        with self.__app.app_context():
+            self.assertEqual(PeriodClose.query.count(), 0)
+            self.assertEqual(PeriodCloseBalance.query.count(), 0)
+        response = self.__client.get(f"{detail_uri}/edit")
+        self.assertEqual(response.status_code, 200)
+
+    def test_archive(self) -> None:
+        """Tests the archive of the closed fiscal years.
+
+        :return: None.
+        """
+        from accounting.change_log.queries import get_generation
+        from accounting.models import JournalEntry, ArchivedJournalEntry, \
+            ArchivedJournalEntryLineItem, PeriodClose
+        from accounting.utils.next_uri import encode_next
+        data: ArchiveTestData = ArchiveTestData(self.__app, "editor")
+        data.populate()
+        year: int = dt.date.today().year
+        runner: FlaskCliRunner = self.__app.test_cli_runner()
+        uris: list[str] = [f"{PREFIX}/journal/all-time?as=csv",
+                           f"{PREFIX}/search?q=Salary&as=csv",
+                           f"{PREFIX}/search?q=Receivable&as=csv",
+                           f"{PREFIX}/unapplied/USD/{Accounts.RECEIVABLE}"
+                           "?as=csv",
+                           f"{PREFIX}/balance-sheet/USD/compare/"
+                           f"{year - 4}-{year}-yearly?as=csv",
+                           f"{PREFIX}/income-statement/USD/compare/"
+                           f"{year - 2}-monthly?as=csv"]
+        for period in ["all-time", str(year), str(year - 1), str(year - 2),
+                       str(year - 3), f"{year - 2}-06"]:
+            uris.extend([f"{PREFIX}/journal/{period}?as=csv",
+                         f"{PREFIX}/trial-balance/USD/{period}?as=csv",
+                         f"{PREFIX}/income-statement/USD/{period}?as=csv",
+                         f"{PREFIX}/balance-sheet/USD/{period}?as=csv",
+                         f"{PREFIX}/ledger/USD/{Accounts.BANK}/{period}"
+                         "?as=csv",
+                         f"{PREFIX}/ledger/USD/{Accounts.RECEIVABLE}/"
+                         f"{period}?as=csv",
+                         f"{PREFIX}/income-expenses/USD/{Accounts.BANK}/"
+                         f"{period}?as=csv"])
+        before: dict[str, str] = {x: self.__client.get(x).text for x in uris}
+
+        # The periods must be closed before they are archived.
+        with self.__app.app_context():
+            result: Result = runner.invoke(
+                args=["accounting-archive", "-u", "editor", str(year - 2)])
+            self.assertNotEqual(result.exit_code, 0)
+            self.assertEqual(ArchivedJournalEntry.query.count(), 0)
+
+        admin: httpx.Client = get_client(self.__app, "admin")
+        with self.__app.app_context():
+            encoded_next_uri: str = encode_next(NEXT_URI)
+        form: dict[str, str] = {"csrf_token": get_csrf_token(admin),
+                                "next": encoded_next_uri,
+                                "default_currency_code": "USD",
+                                "default_ie_account_code": Accounts.CASH,
+                                "closed_date": f"{year - 1}-06-30"}
+        response: httpx.Response = admin.post(f"{PREFIX}/options/update",
+                                              data=form)
+        self.assertEqual(response.status_code, 302)
+        with self.__app.app_context():
+            live: int = JournalEntry.query.count()
+            generation: int = get_generation(db.session)
+            result = runner.invoke(
+                args=["accounting-archive", "-u", "editor", str(year - 2)])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertGreater(get_generation(db.session), generation)
+            archived: int = ArchivedJournalEntry.query.count()
+            self.assertGreater(archived, 0)
+            self.assertGreater(ArchivedJournalEntryLineItem.query.count(), 0)
+            self.assertEqual(JournalEntry.query.count(), live - archived)
+            self.assertIsNone(JournalEntry.query.filter(
+                JournalEntry.date <= dt.date(year - 4, 12, 31),
+                JournalEntry.id.not_in(data.kept)).first())
+            for journal_entry_id in data.kept:
+                self.assertIsNotNone(db.session.get(JournalEntry,
+                                                    journal_entry_id))
+            self.assertTrue(db.session.get(PeriodClose,
+                                           dt.date(year - 2, 12, 31))
+                            .is_archived)
+
+        # The reports are the same, with the archive unioned.
+        for uri in uris:
+            response = self.__client.get(uri)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.text, before[uri], uri)
+        for uri in [f"{PREFIX}/journal/{year - 3}",
+                    f"{PREFIX}/search?q=Salary",
+                    f"{PREFIX}/ledger/USD/{Accounts.BANK}/{year - 3}",
+                    f"{PREFIX}/income-expenses/USD/{Accounts.BANK}/"
+                    f"{year - 3}"]:
+            response = self.__client.get(uri)
+            self.assertEqual(response.status_code, 200)
+
+        # The day-to-day reports query only the live years.  The cached
+        # ledger metadata for the choosers covers all the years, and is
+        # loaded beforehand.
+        self.assertEqual(self.__client.get(f"{PREFIX}/journal").status_code,
+                         200)
+        statements: list[str] = []
+
+        def on_execute(conn, cursor, statement, parameters, context,
+                       executemany) -> None:
+            statements.append(statement)
+
+        with self.__app.app_context():
+            engine: sa.Engine = db.engine
+        sa.event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            for uri in [f"{PREFIX}/journal/{year}",
+                        f"{PREFIX}/trial-balance/USD/{year}",
+                        f"{PREFIX}/income-statement/USD/{year}",
+                        f"{PREFIX}/balance-sheet/USD/{year}",
+                        f"{PREFIX}/ledger/USD/{Accounts.BANK}/{year}",
+                        f"{PREFIX}/income-expenses/USD/{Accounts.BANK}/"
+                        f"{year}",
+                        f"{PREFIX}/unapplied/USD/{Accounts.RECEIVABLE}"]:
+                statements.clear()
+                response = self.__client.get(uri)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    [x for x in statements if "accounting_archived_" in x],
+                    [], uri)
+        finally:
+            sa.event.remove(engine, "before_cursor_execute", on_execute)
+
+        # The archived periods cannot be reopened.
+        form["closed_date"] = f"{year - 3}-12-31"
+        response = admin.post(f"{PREFIX}/options/update", data=form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"],
+                         f"{PREFIX}/options/edit?next={encoded_next_uri}")
+        with self.__app.app_context():
+            self.assertIsNotNone(db.session.get(PeriodClose,
+                                                dt.date(year - 2, 12, 31)))
+
+    def test_export_reports(self) -> None:
+        """Tests the export of all the reports into a ZIP file.
+
+        :return: None.
+        """
+        ClosedPeriodTestData(self.__app, "editor").populate()
+        year: int = dt.date.today().year
+        uri: str = f"{PREFIX}/export/{year - 1}"
+        response: httpx.Response = self.__client.get(uri)
+        self.assertEqual(response.status_code, 403)
+
+        admin: httpx.Client = get_client(self.__app, "admin")
+        response = admin.get(uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            files: dict[str, bytes] = {x: archive.read(x)
+                                       for x in archive.namelist()}
+        self.assertEqual(
+            set(files),
+            {f"journal-{year - 1}.csv",
+             f"trial-balance-USD-{year - 1}.csv",
+             f"income-statement-USD-{year - 1}.csv",
+             f"balance-sheet-USD-{year - 1}.csv",
+             *[f"ledger-USD-{x}-{year - 1}.csv"
+               for x in [Accounts.CASH, Accounts.BANK, Accounts.SERVICE,
+                         Accounts.MEAL]]})
+        self.assertEqual(
+            files[f"ledger-USD-{Accounts.BANK}-{year - 1}.csv"],
+            self.__client.get(f"{PREFIX}/ledger/USD/{Accounts.BANK}/"
+                              f"{year - 1}?as=csv").content)
+        response = admin.get(f"{PREFIX}/export")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "application/zip")
+
+        # The console command exports in the worker processes, each with its
+        # own database engine.
+        with TemporaryDirectory() as temp_dir:
+            app: Flask = create_test_app(
+                db_uri=f"sqlite:///{Path(temp_dir) / 'db.sqlite'}")
+            ClosedPeriodTestData(app, "editor").populate()
+            runner: FlaskCliRunner = app.test_cli_runner()
+            output: Path = Path(temp_dir) / "reports.zip"
+            with app.app_context():
+                result: Result = runner.invoke(
+                    args=["accounting-export-reports", "-w", "2",
+                          "-o", str(output), str(year - 1)])
+                db.engine.dispose()
+            self.assertEqual(result.exit_code, 0,
+                             result.output + str(result.exception))
+            self.assertIn(f"{len(files)} reports exported", result.output)
+            with zipfile.ZipFile(output) as archive:
+                self.assertEqual({x: archive.read(x)
+                                  for x in archive.namelist()}, files)
+
+    def test_export_formats(self) -> None:
+        """Tests the compressed CSV and the JSON Lines exports.
+
+        :return: None.
+        """
+        ReportTestData(self.__app, "editor").populate()
+        uri: str = f"{PREFIX}/journal/all-time"
+        response: httpx.Response = self.__client.get(f"{uri}?as=csv")
+        self.assertEqual(response.status_code, 200)
+        rows: list[list[str]] = list(csv.reader(io.StringIO(response.text)))
+        self.assertGreater(len(rows), 100)
+
+        response = self.__client.get(f"{uri}?as=csv.gz")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "application/gzip")
+        self.assertEqual(response.headers["Content-Disposition"],
+                         "attachment; filename=journal-all-time.csv.gz")
+        self.assertEqual(gzip.decompress(response.content).decode("utf-8"),
+                         self.__client.get(f"{uri}?as=csv").text)
+        self.assertLess(len(response.content),
+                        len(gzip.decompress(response.content)) // 5)
+
+        def load_jsonl(data: bytes) -> list[list[str]]:
+            """Loads the JSON Lines, with the empty values as empty strings
+            as in the CSV.
+
+            :param data: The JSON Lines data.
+            :return: The rows.
+            """
+            return [["" if y is None else y for y in json.loads(x)]
+                    for x in data.decode("utf-8").splitlines()]
+
+        response = self.__client.get(f"{uri}?as=jsonl")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "application/jsonl")
+        self.assertEqual(response.headers["Content-Disposition"],
+                         "attachment; filename=journal-all-time.jsonl")
+        self.assertEqual(load_jsonl(response.content), rows)
+
+        response = self.__client.get(f"{uri}?as=jsonl.gz")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(load_jsonl(gzip.decompress(response.content)), rows)
+
+        response = self.__client.get(
+            f"{PREFIX}/ledger/USD/{Accounts.CASH}/all-time?as=csv.gz")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            gzip.decompress(response.content).decode("utf-8"),
+            self.__client.get(
+                f"{PREFIX}/ledger/USD/{Accounts.CASH}/all-time?as=csv").text)
+
+        # An unknown format shows the report.
+        response = self.__client.get(f"{uri}?as=xml")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"],
+                         "text/html; charset=utf-8")
+
+    @unittest.skipIf(importlib.util.find_spec("aiosqlite") is None
+                     or importlib.util.find_spec("greenlet") is None,
+                     "The asyncio support of SQLAlchemy is not installed.")
+    def test_async_reports(self) -> None:
+        """Tests the asyncio report API on the AsyncSession.
+
+        :return: None.
+        """
+        from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, \
+            create_async_engine
+        from accounting.models import Account
+        from accounting.report import aio, queries
+        year: int = dt.date.today().year
+        start: dt.date = dt.date(year - 1, 1, 1)
+        end: dt.date = dt.date(year - 1, 12, 31)
+
+        async def fetch(path: Path, bank_id: int) -> list[object]:
+            """Fetches several reports concurrently, each on its own session.
+
+            :param path: The database file.
+            :param bank_id: The ID of the bank account.
+            :return: The report data.
+            """
+            engine: AsyncEngine = create_async_engine(
+                f"sqlite+aiosqlite:///{path}")
+            new_session: async_sessionmaker = async_sessionmaker(engine)
+            async with new_session() as s1, new_session() as s2, \
+                    new_session() as s3, new_session() as s4, \
+                    new_session() as s5:
+                result: list[object] = list(await asyncio.gather(
+                    aio.get_ledger(s1, "USD", bank_id, start, end, "en"),
+                    aio.get_income_expenses(s2, "USD", bank_id, start, end,
+                                            "en"),
+                    aio.get_trial_balance(s3, "USD", start, end),
+                    aio.get_income_statement(s4, "USD", start, end),
+                    aio.get_balance_sheet(s5, "USD", start, end)))
+            await engine.dispose()
+            return result
+
+        with TemporaryDirectory() as temp_dir:
+            db_path: Path = Path(temp_dir) / "db.sqlite"
+            app: Flask = create_test_app(db_uri=f"sqlite:///{db_path}")
+            ClosedPeriodTestData(app, "editor").populate()
+            with app.app_context():
+                bank_id: int = Account.find_by_code(Accounts.BANK).id
+                ledger: queries.LineItemData = queries.query_ledger(
+                    db.session, "USD", bank_id, start, end, "en")
+                income_expenses: queries.LineItemData \
+                    = queries.query_income_expenses(
+                        db.session, "USD", bank_id, start, end, "en")
+                trial_balance: dict[int, Decimal] \
+                    = queries.query_trial_balance(db.session, "USD",
+                                                  start, end)
+                income_statement: dict[int, Decimal] \
+                    = queries.query_income_statement(db.session, "USD",
+                                                     start, end)
+                balance_sheet: queries.BalanceSheetData \
+                    = queries.query_balance_sheet(db.session, "USD",
+                                                  start, end)
+                db.engine.dispose()
+            result: list[object] = asyncio.run(fetch(db_path, bank_id))
+
+        self.assertEqual(len(ledger.line_items), 24)
+        self.assertEqual(ledger.brought_forward, Decimal("32400"))
+        self.assertEqual(result[0].brought_forward, ledger.brought_forward)
+        self.assertEqual([(x.id, x.amount, str(x.account))
+                          for x in result[0].line_items],
+                         [(x.id, x.amount, str(x.account))
+                          for x in ledger.line_items])
+        self.assertEqual(result[1].brought_forward,
+                         income_expenses.brought_forward)
+        self.assertEqual([x.id for x in result[1].line_items],
+                         [x.id for x in income_expenses.line_items])
+        self.assertEqual(result[2], trial_balance)
+        self.assertEqual(result[3], income_statement)
+        self.assertEqual(result[4].balances, balance_sheet.balances)
+        self.assertEqual(result[4].accumulated, balance_sheet.accumulated)
+        self.assertEqual(result[4].current, balance_sheet.current)
+
+    def test_api(self) -> None:
+        """Tests the JSON API of the reports.
+
+        :return: None.
+        """
+        from accounting.report.queries import select_journal
+        from accounting.report.utils.line_item_rows import LineItemRow, \
+            load_line_item_rows
+        api: str = f"{PREFIX}/api/reports"
+        client: httpx.Client = get_client(self.__app, "nobody")
+        response: httpx.Response = client.get(f"{api}/journal/all-time")
+        self.assertEqual(response.status_code, 403)
+
+        ReportTestData(self.__app, "editor").populate()
+
+        def fetch(uri: str, limit: int, query: dict[str, str] | None = None) \
+                -> list[dict]:
+            """Fetches all the pages.
+
+            :param uri: The URI.
+            :param limit: The number of the rows in a page.
+            :param query: The other query parameters.
+            :return: The pages.
+            """
+            pages: list[dict] = []
+            cursor: str | None = None
+            while True:
+                params: dict[str, str | int] = {**(query or {}),
+                                                "limit": limit}
+                if cursor is not None:
+                    params["after"] = cursor
+                result: httpx.Response = self.__client.get(uri,
+                                                           params=params)
+                self.assertEqual(result.status_code, 200)
+                pages.append(result.json())
+                self.assertLessEqual(len(pages[-1]["rows"]), limit)
+                cursor = pages[-1]["next"]
+                if cursor is None:
+                    return pages
+
+        def column(pages: list[dict], name: str) -> list[object]:
+            """Returns a column in all the pages.
+
+            :param pages: The pages.
+            :param name: The column name.
+            :return: The column in all the pages.
+            """
+            index: int = pages[0]["columns"].index(name)
+            return [x[index] for page in pages for x in page["rows"]]
+
+        # The journal, paged by the keyset cursor.
+        pages: list[dict] = fetch(f"{api}/journal/all-time", 7)
+        self.assertGreater(len(pages), 2)
+        with self.__app.test_request_context():
+            line_items: list[LineItemRow] \
+                = load_line_item_rows(select_journal(db.session, None, None))
+        self.assertEqual(column(pages, "id"), [x.id for x in line_items])
+
+        # The field selection and the invalid parameters.
+        response = self.__client.get(f"{api}/journal/all-time",
+                                     params={"fields": "date,debit",
+                                             "limit": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["columns"], ["date", "debit"])
+        self.assertEqual(len(response.json()["rows"][0]), 2)
+        response = self.__client.get(f"{api}/journal/all-time",
+                                     params={"fields": "date,nothing"})
+        self.assertEqual(response.status_code, 400)
+        response = self.__client.get(f"{api}/journal/all-time",
+                                     params={"after": "nothing"})
+        self.assertEqual(response.status_code, 400)
+
+        # The running balances are carried across the pages.
+        pages = fetch(f"{api}/ledger/USD/{Accounts.CASH}/all-time", 1)
+        self.assertEqual(column(pages, "balance"), ["1000.00", "960.00"])
+        self.assertIsNone(pages[0]["brought_forward"])
+        pages = fetch(f"{api}/income-expenses/USD/{Accounts.CASH}/all-time",
+                      1)
+        self.assertEqual(column(pages, "income"), ["1000.00", None])
+        self.assertEqual(column(pages, "expense"), [None, "40.00"])
+        self.assertEqual(column(pages, "balance"), ["1000.00", "960.00"])
+        pages = fetch(f"{api}/ledger/USD/{Accounts.BANK}"
+                      f"/{dt.date.today().year + 1}", 1)
+        self.assertIsNotNone(pages[0]["brought_forward"])
+        self.assertEqual(Decimal(column(pages, "balance")[-1]),
+                         Decimal(pages[0]["brought_forward"])
+                         + sum([Decimal(x or "0")
+                                for x in column(pages, "debit")])
+                         - sum([Decimal(x or "0")
+                                for x in column(pages, "credit")]))
+
+        # The account reports
+        pages = fetch(f"{api}/trial-balance/USD/all-time", 100)
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(column(pages, "account"),
+                         [Accounts.CASH, Accounts.BANK, Accounts.SERVICE,
+                          Accounts.MEAL])
+        self.assertEqual(sum([Decimal(x) for x in column(pages, "balance")]),
+                         0)
+        pages = fetch(f"{api}/income-statement/USD/all-time", 100)
+        self.assertEqual(column(pages, "account"),
+                         [Accounts.SERVICE, Accounts.MEAL])
+        pages = fetch(f"{api}/balance-sheet/USD/all-time", 100)
+        self.assertEqual(column(pages, "account"),
+                         [Accounts.CASH, Accounts.BANK, "3353-001"])
+        self.assertEqual(sum([Decimal(x) for x in column(pages, "balance")]),
+                         0)
+
+        # The search
+        pages = fetch(f"{api}/search", 1, {"q": "Dinner"})
+        self.assertEqual(column(pages, "account"),
+                         [Accounts.CASH, Accounts.MEAL])
+
+    def test_income_expenses_windows(self) -> None:
+        """Tests that the income and expenses log computed with the window
+        functions is the same as computed in Python.
+
+        :return: None.
+        """
+        from accounting.models import Account
+        from accounting.report.queries import IncomeExpensesData, \
+            query_income_expenses
+        ClosedPeriodTestData(self.__app, "editor").populate()
+        today: dt.date = dt.date.today()
+        periods: list[tuple[dt.date | None, dt.date | None]] \
+            = [(None, None), (dt.date(today.year, 1, 1), None),
+               (dt.date(today.year - 1, 1, 1),
+                dt.date(today.year - 1, 12, 31)),
+               (dt.date(today.year - 2, 6, 1), dt.date(today.year - 2, 6, 30)),
+               (today + dt.timedelta(days=1), None)]
+        with self.__app.test_request_context():
+            account_ids: list[int | None] \
+                = [None, Account.find_by_code(Accounts.CASH).id,
+                   Account.find_by_code(Accounts.BANK).id]
+            for account_id in account_ids:
+                for start, end in periods:
+                    windowed: IncomeExpensesData = query_income_expenses(
+                        db.session, "USD", account_id, start, end,
+                        is_windowed=True)
+                    python: IncomeExpensesData = query_income_expenses(
+                        db.session, "USD", account_id, start, end,
+                        is_windowed=False)
+                    self.assertEqual([x.id for x in windowed.line_items],
+                                     [x.id for x in python.line_items])
+                    self.assertEqual(str(windowed.brought_forward),
+                                     str(python.brought_forward))
+                    self.assertEqual([str(x) for x in windowed.balances],
+                                     [str(x) for x in python.balances])
+                    self.assertEqual(str(windowed.income), str(python.income))
+                    self.assertEqual(str(windowed.expense),
+                                     str(python.expense))
+            windowed = query_income_expenses(
+                db.session, "USD", account_ids[1], None, None,
+                is_windowed=True)
+        self.assertEqual(len(windowed.line_items), len(windowed.balances))
+        self.assertGreater(len(windowed.line_items), 0)
+        self.assertEqual(windowed.balances[-1],
+                         windowed.income - windowed.expense)
+
+    def test_report_cache(self) -> None:
+        """Tests the report cache and its warm-up after the commits.
+
+        :return: None.
+        """
+        from accounting.change_log.queries import get_generation
+        from accounting.models import Account
+        from accounting.report.cache import cached_query, report_cache
+        from accounting.report.queries import LineItemData, \
+            query_trial_balance
+        from accounting.utils.next_uri import encode_next
+        today: dt.date = dt.date.today()
+        start: dt.date = dt.date(today.year, today.month, 1)
+        end: dt.date = (start + dt.timedelta(days=31)).replace(day=1) \
+            - dt.timedelta(days=1)
+
+        def warmed(app: Flask, key: tuple[object, ...]) -> object:
+            """Waits for a report to be warmed up at the current data
+            generation.
+
+            :param app: The Flask application.
+            :param key: The key of the report.
+            :return: The warmed-up result.
+            """
+            for _ in range(50):
+                with app.app_context():
+                    result: object | None \
+                        = report_cache().get(get_generation(db.session), key)
+                if result is not None:
+                    return result
+                time.sleep(0.1)
+            self.fail(f"{key[0]} is not warmed up.")
+
+        with TemporaryDirectory() as temp_dir:
+            app: Flask = create_test_app(
+                db_uri=f"sqlite:///{Path(temp_dir) / 'db.sqlite'}")
+            app.config["ACCOUNTING_WARM_REPORTS"] \
+                = ["income-expenses", "trial-balance", "balance-sheet"]
+            app.config["ACCOUNTING_WARM_DELAY"] = 0.1
+            client: httpx.Client = get_client(app, "editor")
+            csrf_token: str = get_csrf_token(client)
+            with app.app_context():
+                cash_id: int = Account.find_by_code(Accounts.CASH).id
+                service_id: int = Account.find_by_code(Accounts.SERVICE).id
+                form: dict[str, str] \
+                    = {"csrf_token": csrf_token,
+                       "next": encode_next(NEXT_URI),
+                       "date": today.isoformat(),
+                       "currency-1-code": "USD",
+                       "currency-1-credit-1-account_code": Accounts.SERVICE,
+                       "currency-1-credit-1-amount": "20"}
+            key: tuple[object, ...] \
+                = ("query_trial_balance", "USD", start, end)
+
+            # The reports are cached until the next commit.
+            response: httpx.Response \
+                = client.get(f"{PREFIX}/trial-balance")
+            self.assertEqual(response.status_code, 200)
+            with app.test_request_context():
+                result: object = report_cache().get(
+                    get_generation(db.session), key)
+                self.assertEqual(result, {})
+                self.assertIs(cached_query(query_trial_balance, "USD",
+                                           start, end), result)
+
+            # The hot reports are warmed up after the commit.
+            add_journal_entry(client, form)
+            self.assertEqual(warmed(app, key),
+                             {cash_id: Decimal("20"),
+                              service_id: Decimal("-20")})
+            income_expenses: LineItemData = warmed(
+                app, ("query_income_expenses", "USD", cash_id, start, end,
+                      "en"))
+            self.assertEqual([x.amount for x in income_expenses.line_items],
+                             [Decimal("20")])
+
+            # The cached results are never served after a newer commit.
+            add_journal_entry(client, form)
+            with app.test_request_context():
+                self.assertEqual(cached_query(query_trial_balance, "USD",
+                                              start, end)[cash_id],
+                                 Decimal("40"))
+            self.assertEqual(warmed(app, key)[cash_id], Decimal("40"))
+            with app.app_context():
+                db.engine.dispose()
+
+    def test_ledger_metadata(self) -> None:
+        """Tests the cached ledger metadata.
+
+        :return: None.
+        """
+        from accounting.models import ChangeCounter, JournalEntry, \
+            JournalEntryLineItem
+        from accounting.utils.ledger_metadata import LedgerMetadata, \
+            ledger_metadata
+
+        with self.__app.app_context():
+            metadata: LedgerMetadata = ledger_metadata()
+            self.assertIsNone(metadata.start)
+            self.assertEqual(metadata.currencies, {})
+
+        ReportTestData(self.__app, "editor").populate()
+        with self.__app.app_context():
+            metadata = ledger_metadata()
+            self.assertIsNotNone(metadata.start)
+            self.assertLessEqual(metadata.start, metadata.end)
+            self.assertEqual(set(metadata.currencies), {"USD"})
+            self.assertEqual(sum(metadata.accounts.values()),
+                             metadata.currencies["USD"])
+            self.assertEqual(metadata.currencies["USD"],
+                             JournalEntryLineItem.query.count())
+            self.assertIs(ledger_metadata(), metadata)
+
+            # A commit in another process increases the data generation.
+            db.session.execute(sa.update(ChangeCounter)
+                               .values(generation=ChangeCounter.generation
+                                       + 1))
+            db.session.commit()
+            self.assertIsNot(ledger_metadata(), metadata)
+            metadata = ledger_metadata()
+            self.assertIs(ledger_metadata(), metadata)
+
+            # The changes not committed yet are not cached.
+            JournalEntryLineItem.query.delete()
+            self.assertEqual(ledger_metadata().accounts, {})
+            db.session.rollback()
+            self.assertIs(ledger_metadata(), metadata)
+
+            JournalEntryLineItem.query.delete()
+            JournalEntry.query.delete()
+            db.session.commit()
+            metadata = ledger_metadata()
+            self.assertIsNone(metadata.start)
+            self.assertEqual(metadata.accounts, {})
+
+
+class AmountColumnTestCase(unittest.TestCase):
+    """The test case for the integer-cent amount columns."""
+
+    def test_conversion(self) -> None:
+        """Tests the conversion between the amounts and the scaled integers.
+
+        :return: None.
+        """
+        self.assertEqual(to_cents(Decimal("1200.00")), 120000)
+        self.assertEqual(to_cents(Decimal("-0.05")), -5)
+        self.assertEqual(to_cents(None), 0)
+        self.assertEqual(str(from_cents(120000)), "1200.00")
+        self.assertEqual(str(from_cents(-5)), "-0.05")
+        self.assertEqual(str(from_cents(0)), "0.00")
+        self.assertEqual(str(from_cents(0, 0)), "0")
+
+    def test_total(self) -> None:
+        """Tests the totals of the amount columns.
+
+        :return: None.
+        """
+        amounts: list[Decimal | None] \
+            = [Decimal("0.10"), None, Decimal("0.20"), Decimal("-12.34")]
+        column: AmountColumn = AmountColumn(amounts)
+        self.assertEqual(len(column), 4)
+        self.assertEqual(column.total,
+                         sum([x for x in amounts if x is not None]))
+        self.assertEqual(str(column.total), "-12.04")
+        column.append(Decimal("12.04"))
+        self.assertEqual(str(column.total), "0.00")
+        self.assertEqual(str(AmountColumn().total), str(sum([])))
+        self.assertEqual(str(AmountColumn([None]).total), str(sum([])))
+
+    def test_running_balances(self) -> None:
+        """Tests the running balances of the amount columns.
+
+        :return: None.
+        """
+        debits: AmountColumn \
+            = AmountColumn([Decimal("1000.00"), None, Decimal("0.30")])
+        credits: AmountColumn \
+            = AmountColumn([None, Decimal("40.10"), None])
+        self.assertEqual(running_balances(debits, credits),
+                         [Decimal("1000.00"), Decimal("959.90"),
+                          Decimal("960.20")])
+        self.assertEqual(running_balances(debits, credits, Decimal("-5.00")),
+                         [Decimal("995.00"), Decimal("954.90"),
+                          Decimal("955.20")])
+        self.assertEqual(running_balances(debits),
+                         [Decimal("1000.00"), Decimal("1000.00"),
+                          Decimal("1000.30")])
+
 
 class ReportTestData(BaseTestData):
     """The report test data."""
@@ -473,3 +1435,74 @@ class ReportTestData(BaseTestData):
             1, "USD", "Withdraw領錢", "1000", Accounts.CASH, Accounts.BANK)
         self._add_simple_journal_entry(
             0, "USD", "Dinner晚餐", "40", Accounts.MEAL, Accounts.CASH)
+
+
+class ClosedPeriodTestData(BaseTestData):
+    """The test data for the closed periods."""
+
+    def _init_data(self) -> None:
+        today: dt.date = dt.date.today()
+        date: dt.date = dt.date(today.year - 4, 1, 5)
+        while date <= today:
+            self._add_simple_journal_entry(
+                (today - date).days, "USD",
+                "Salary薪水", "1200", Accounts.BANK, Accounts.SERVICE)
+            self._add_simple_journal_entry(
+                (today - date).days, "USD",
+                "Withdraw領錢", "300", Accounts.CASH, Accounts.BANK)
+            self._add_simple_journal_entry(
+                (today - date).days, "USD",
+                "Dinner晚餐", "250", Accounts.MEAL, Accounts.CASH)
+            date = dt.date(date.year + date.month // 12,
+                           date.month % 12 + 1, 5)
+
+
+class ArchiveTestData(ClosedPeriodTestData):
+    """The test data for the archive of the closed fiscal years."""
+
+    def _init_data(self) -> None:
+        super()._init_data()
+        today: dt.date = dt.date.today()
+
+        def add(date: dt.date, original: JournalEntryLineItemData | None,
+                description: str) -> tuple[JournalEntryData,
+                                           JournalEntryLineItemData]:
+            """Adds a receivable or its offset.
+
+            :param date: The date.
+            :param original: The original line item, or None to add a
+                receivable.
+            :param description: The description.
+            :return: The journal entry and the receivable line item.
+            """
+            if original is None:
+                receivable = JournalEntryLineItemData(
+                    Accounts.RECEIVABLE, description, "500")
+                debit, credit = [receivable], [JournalEntryLineItemData(
+                    Accounts.SERVICE, description, "500")]
+            else:
+                receivable = JournalEntryLineItemData(
+                    Accounts.RECEIVABLE, description, "500", original)
+                debit, credit = [JournalEntryLineItemData(
+                    Accounts.BANK, description, "500")], [receivable]
+            journal_entry: JournalEntryData = JournalEntryData(
+                (today - date).days,
+                [JournalEntryCurrencyData("USD", debit, credit)])
+            self._add_journal_entry(journal_entry)
+            return journal_entry, receivable
+
+        # Settled in the archived years.
+        _, original = add(dt.date(today.year - 4, 3, 10), None,
+                          "Receivable settled")
+        add(dt.date(today.year - 3, 4, 10), original, "Receivable settled")
+        # Settled in the live years.
+        late_original, original = add(dt.date(today.year - 4, 3, 11), None,
+                                      "Receivable settled late")
+        late_offset, _ = add(dt.date(today.year - 1, 4, 11), original,
+                             "Receivable settled late")
+        # Not settled.
+        unsettled, _ = add(dt.date(today.year - 3, 3, 12), None,
+                           "Receivable unsettled")
+        self.kept: set[int] = {late_original.id, late_offset.id,
+                               unsettled.id}
+        """The journal entries that stay live."""
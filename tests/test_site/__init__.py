@@ -41,7 +41,8 @@ db: SQLAlchemy = SQLAlchemy()
 
 
 def create_app(is_testing: bool = False, is_skip_accounts: bool = False,
-               is_skip_currencies: bool = False) -> Flask:
+               is_skip_currencies: bool = False, db_uri: str | None = None,
+               read_db_uri: str | None = None) -> Flask:
     """Create and configure the application.
 
     :param is_testing: True if we are running for testing, or False otherwise.
@@ -49,12 +50,16 @@ def create_app(is_testing: bool = False, is_skip_accounts: bool = False,
         otherwise.
     :param is_skip_currencies: True to skip currency initialization, or False
         otherwise.
+    :param db_uri: The database URI, or None to use the default.
+    :param read_db_uri: The URI of the secondary database for the read-only
+        traffic, or None to read from the primary database.
     :return: The application.
     """
     import accounting
 
     app: Flask = Flask(__name__)
-    db_uri: str = "sqlite://" if is_testing else "sqlite:///local.sqlite"
+    if db_uri is None:
+        db_uri = "sqlite://" if is_testing else "sqlite:///local.sqlite"
     app.config.from_mapping({
         "SECRET_KEY": os.environ.get("SECRET_KEY", token_urlsafe(32)),
         "SESSION_COOKIE_SAMESITE": "Lax",
@@ -65,6 +70,8 @@ def create_app(is_testing: bool = False, is_skip_accounts: bool = False,
     })
     if is_testing:
         app.config["TESTING"] = True
+    if read_db_uri is not None:
+        app.config["SQLALCHEMY_BINDS"] = {"read": read_db_uri}
 
     babel_js.init_app(app)
     csrf.init_app(app)
@@ -119,7 +126,8 @@ def create_app(is_testing: bool = False, is_skip_accounts: bool = False,
         def get_pk(self, user: auth.User) -> int:
             return user.id
 
-    accounting.init_app(app, user_utils=UserUtilities())
+    accounting.init_app(app, user_utils=UserUtilities(),
+                        read_bind=None if read_db_uri is None else "read")
 
     with app.app_context():
         init_db(app, is_skip_accounts, is_skip_currencies)
@@ -138,7 +146,9 @@ def init_db(app: Flask, is_skip_accounts: bool,
         otherwise.
     :return: None.
     """
-    db.create_all()
+    # The read bind is a replica of the primary database, not a bind of its
+    # own tables.
+    db.create_all(bind_key=None)
     from .auth import User
     for username in ["viewer", "editor", "admin", "nobody"]:
         if User.query.filter(User.username == username).first() is None:
@@ -17,6 +17,7 @@
 """The test for the unmatched offsets.
 
 """
+import datetime as dt
 import unittest
 
 import httpx
@@ -395,6 +396,61 @@ class UnmatchedOffsetTestCase(unittest.TestCase):
             self.assertEqual(line_item.original_line_item_id, data.l_p_or4c.id)
 
 
+    def test_closed(self) -> None:
+        """Tests not to match the line items in the closed periods.
+
+        :return: None.
+        """
+        from accounting.models import Currency, Account, JournalEntryLineItem
+        from accounting.report.utils.offset_matcher import OffsetMatcher
+        from accounting.template_globals import default_currency_code
+        from accounting.utils.period_close import add_period_close
+        from accounting.utils.user import get_user_pk
+        data: SameTestData = SameTestData(self.__app, "editor")
+        data.populate()
+        account: Account | None
+        line_item: JournalEntryLineItem | None
+        matcher: OffsetMatcher
+        response: httpx.Response
+
+        with self.__app.app_context():
+            currency: Currency | None \
+                = db.session.get(Currency, default_currency_code())
+            assert currency is not None
+            add_period_close(dt.date.today() - dt.timedelta(days=38),
+                             get_user_pk("admin"))
+            db.session.commit()
+            versions: dict[int, int] \
+                = {x: db.session.get(JournalEntryLineItem, x)
+                   .journal_entry.version
+                   for x in {data.l_r_or1d.id, data.l_r_or3d.id}}
+
+            account = Account.find_by_code(Accounts.RECEIVABLE)
+            assert account is not None
+            matcher = OffsetMatcher(currency, account)
+            self.assertEqual({(x.original_line_item.id, x.offset.id)
+                              for x in matcher.matched_pairs},
+                             {(data.l_r_or4d.id, data.l_r_of6c.id)})
+
+        response = self.__client.post(f"{PREFIX}/{Accounts.RECEIVABLE}",
+                                      data={"csrf_token": self.__csrf_token,
+                                            "next": self.__encoded_next_uri})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.headers["Location"], NEXT_URI)
+
+        with self.__app.app_context():
+            for line_item_id in {data.l_r_of2c.id, data.l_r_of4c.id}:
+                line_item = db.session.get(JournalEntryLineItem, line_item_id)
+                self.assertIsNotNone(line_item)
+                self.assertIsNone(line_item.original_line_item_id)
+            line_item = db.session.get(JournalEntryLineItem, data.l_r_of6c.id)
+            self.assertIsNotNone(line_item)
+            self.assertEqual(line_item.original_line_item_id, data.l_r_or4d.id)
+            for line_item_id, version in versions.items():
+                line_item = db.session.get(JournalEntryLineItem, line_item_id)
+                self.assertEqual(line_item.journal_entry.version, version)
+
+
 class DifferentTestData(BaseTestData):
     """The test data for different descriptions and amounts."""
 
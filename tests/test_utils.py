@@ -17,18 +17,28 @@
 """The test for the independent utilities.
 
 """
+import datetime as dt
+import re
+import shutil
+import timeit
 import unittest
+from collections.abc import Callable
+from decimal import Decimal
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from urllib.parse import quote_plus
 
 import httpx
 from flask import Flask, request
 
+from accounting.utils.format_context import FormatContext, amount_text
 from accounting.utils.next_uri import append_next, inherit_next, or_next, \
     encode_next, decode_next
 from accounting.utils.pagination import Pagination, DEFAULT_PAGE_SIZE
 from accounting.utils.query import parse_query_keywords
 from test_site import db
-from testlib import TEST_SERVER, create_test_app, get_csrf_token, NEXT_URI
+from testlib import TEST_SERVER, create_test_app, get_csrf_token, \
+    get_client, NEXT_URI, Accounts, add_journal_entry
 
 
 class NextUriTestCase(unittest.TestCase):
@@ -398,3 +408,258 @@ class PaginationTestCase(unittest.TestCase):
                               range(1, 691),
                               "q=word&page-size=15&page-no=1&next=%2F",
                               is_reversed=True)
+
+
+class JavaScriptCatalogTestCase(unittest.TestCase):
+    """The test case for the precompiled JavaScript message catalog."""
+
+    def setUp(self) -> None:
+        """Sets up the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        self.__app: Flask = create_test_app()
+        """The Flask application."""
+
+    def tearDown(self) -> None:
+        """Tears down the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        with self.__app.app_context():
+            db.engine.dispose()
+
+    def test_js_catalog(self) -> None:
+        """Tests the JavaScript message catalog.
+
+        :return: None.
+        """
+        client: httpx.Client = get_client(self.__app, "editor")
+        response: httpx.Response = client.get("/accounting/journal")
+        self.assertEqual(response.status_code, 200)
+        m: re.Match | None = re.search(
+            r"\"(/accounting/_jstrans\.js\?v=([0-9a-f]{12}))\"",
+            response.text)
+        self.assertIsNotNone(m)
+        url: str = m[1]
+        digest: str = m[2]
+
+        # With the content hash, it is cached as immutable.
+        response = client.get(url, headers={"Accept-Encoding": "identity"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn("window.A_ = babel.gettext;", response.text)
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertEqual(response.headers["ETag"], f"\"{digest}\"")
+        content: bytes = response.content
+
+        # The pre-compressed body.
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.content, content)
+        self.assertEqual(response.headers["ETag"], f"\"{digest}-gzip\"")
+
+        # The conditional request.
+        response = client.get(url, headers={"Accept-Encoding": "identity",
+                                            "If-None-Match": f"\"{digest}\""})
+        self.assertEqual(response.status_code, 304)
+
+        # Without the current content hash, it is validated each time.
+        response = client.get("/accounting/_jstrans.js?v=0",
+                              headers={"Accept-Encoding": "identity"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, content)
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+
+
+class ReadRoutingTestCase(unittest.TestCase):
+    """The test case for the read routing."""
+
+    def setUp(self) -> None:
+        """Sets up the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        self.__temp_dir: TemporaryDirectory = TemporaryDirectory()
+        """The temporary directory of the databases."""
+        self.__primary: Path = Path(self.__temp_dir.name) / "primary.sqlite"
+        """The primary database file."""
+        self.__replica: Path = Path(self.__temp_dir.name) / "replica.sqlite"
+        """The replica database file."""
+        self.__app: Flask = create_test_app(
+            db_uri=f"sqlite:///{self.__primary}",
+            read_db_uri=f"sqlite:///{self.__replica}")
+        """The Flask application."""
+        self.__replicate()
+
+    def tearDown(self) -> None:
+        """Tears down the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        with self.__app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        self.__temp_dir.cleanup()
+
+    def __replicate(self) -> None:
+        """Replicates the primary database to the replica.
+
+        :return: None.
+        """
+        with self.__app.app_context():
+            db.engines["read"].dispose()
+        shutil.copyfile(self.__primary, self.__replica)
+
+    def test_read_routing(self) -> None:
+        """Tests the read routing.
+
+        :return: None.
+        """
+        from accounting.utils.next_uri import encode_next
+        editor: httpx.Client = get_client(self.__app, "editor")
+        viewer: httpx.Client = get_client(self.__app, "viewer")
+        with self.__app.app_context():
+            encoded_next_uri: str = encode_next(NEXT_URI)
+        description: str = "Read routing test"
+        add_journal_entry(editor,
+                          form={"csrf_token": get_csrf_token(editor),
+                                "next": encoded_next_uri,
+                                "date": dt.date.today().isoformat(),
+                                "currency-1-code": "USD",
+                                "currency-1-credit-1-account_code":
+                                    Accounts.BANK,
+                                "currency-1-credit-1-description":
+                                    description,
+                                "currency-1-credit-1-amount": "20"})
+
+        # The editor reads from the primary database after the write.
+        response: httpx.Response = editor.get("/accounting/journal")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(description, response.text)
+
+        # The viewer reads from the replica that is not replicated yet.
+        response = viewer.get("/accounting/journal")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(description, response.text)
+
+        # The editor reads from the replica after the freshness window.
+        self.__app.config["ACCOUNTING_READ_FRESHNESS"] = 0
+        response = editor.get("/accounting/journal")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(description, response.text)
+
+        self.__replicate()
+        response = viewer.get("/accounting/journal")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(description, response.text)
+
+    def test_read_only_name(self) -> None:
+        """Tests that the read-only views keep their names and documentation.
+
+        :return: None.
+        """
+        from accounting.utils.read_routing import read_only
+
+        def read_only_view() -> str:
+            """The read-only view."""
+            return ""
+
+        decorated_view: Callable = read_only(read_only_view)
+        self.assertEqual(decorated_view.__name__, "read_only_view")
+        self.assertEqual(decorated_view.__doc__, "The read-only view.")
+
+
+class FormatContextTestCase(unittest.TestCase):
+    """The test case for the request-scoped formatting context."""
+
+    def setUp(self) -> None:
+        """Sets up the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        self.__app: Flask = create_test_app()
+        """The Flask application."""
+
+    def tearDown(self) -> None:
+        """Tears down the test.
+        This is run once per test.
+
+        :return: None.
+        """
+        with self.__app.app_context():
+            db.engine.dispose()
+
+    def test_format_date(self) -> None:
+        """Tests formatting the dates.
+
+        :return: None.
+        """
+        from accounting.locale import gettext
+        from accounting.template_filters import format_date
+        today: dt.date = dt.date.today()
+        other: dt.date = dt.date(today.year - 1, 3, 4)
+        with self.__app.test_request_context(
+                headers={"Accept-Language": "en"}):
+            self.assertEqual(format_date(today), "Today")
+            self.assertEqual(format_date(today - dt.timedelta(days=1)),
+                             "Yesterday")
+            self.assertEqual(format_date(today + dt.timedelta(days=1)),
+                             "Tomorrow")
+            self.assertEqual(format_date(other),
+                             f"{other.year}/3/4({other.strftime('%a')})")
+        with self.__app.test_request_context(
+                headers={"Accept-Language": "zh-TW"}):
+            self.assertEqual(format_date(today), gettext("Today"))
+            self.assertEqual(format_date(today - dt.timedelta(days=2)),
+                             gettext("The day before yesterday"))
+            self.assertEqual(format_date(today + dt.timedelta(days=2)),
+                             gettext("The day after tomorrow"))
+            self.assertEqual(format_date(other),
+                             f"{other.year}/3/4"
+                             f"({'一二三四五六日'[other.weekday()]})")
+
+    def test_format_amount(self) -> None:
+        """Tests formatting the amounts.
+
+        :return: None.
+        """
+        from accounting.template_filters import format_amount
+        self.assertEqual(format_amount(Decimal("1234.50")), "1,234.5")
+        with self.__app.test_request_context():
+            self.assertIsNone(format_amount(None))
+            self.assertEqual(format_amount(Decimal("0")), "-")
+            self.assertEqual(format_amount(Decimal("1234567")), "1,234,567")
+            self.assertEqual(format_amount(Decimal("1234.50")), "1,234.5")
+            self.assertEqual(format_amount(Decimal("1234.5")), "1,234.5")
+            self.assertEqual(format_amount(Decimal("-12.25")), "-12.25")
+
+    def test_benchmark(self) -> None:
+        """Tests that the memorized formatting is faster than formatting each
+        value with a new formatting context, as it was before, in a report of
+        repeating dates and amounts.
+
+        :return: None.
+        """
+        from accounting.template_filters import format_date, format_amount
+        today: dt.date = dt.date.today()
+        dates: list[dt.date] = [today - dt.timedelta(days=x % 30)
+                                for x in range(1000)]
+        amounts: list[Decimal] = [Decimal(x % 50) * Decimal("12.5")
+                                  for x in range(1000)]
+        with self.__app.test_request_context():
+            memorized: float = min(timeit.repeat(
+                lambda: ([format_date(x) for x in dates],
+                         [format_amount(x) for x in amounts]),
+                number=5, repeat=3))
+            uncached: float = min(timeit.repeat(
+                lambda: ([FormatContext().format_date(x) for x in dates],
+                         [amount_text(x) for x in amounts]),
+                number=5, repeat=3))
+        self.assertLess(memorized, uncached)
@@ -61,17 +61,23 @@ class Accounts:
 
 
 def create_test_app(is_skip_accounts: bool = False,
-                    is_skip_currencies: bool = False) -> Flask:
+                    is_skip_currencies: bool = False,
+                    db_uri: str | None = None,
+                    read_db_uri: str | None = None) -> Flask:
     """Creates and returns the testing Flask application.
 
     :param is_skip_accounts: True to skip account initialization, or False
         otherwise.
     :param is_skip_currencies: True to skip currency initialization, or False
         otherwise.
+    :param db_uri: The database URI, or None to use the in-memory database.
+    :param read_db_uri: The URI of the secondary database for the read-only
+        traffic, or None to read from the primary database.
     :return: The testing Flask application.
     """
     app: Flask = create_app(is_testing=True, is_skip_accounts=is_skip_accounts,
-                            is_skip_currencies=is_skip_currencies)
+                            is_skip_currencies=is_skip_currencies,
+                            db_uri=db_uri, read_db_uri=read_db_uri)
 
     @app.get("/.csrf-token")
     def get_csrf_token_view() -> str: